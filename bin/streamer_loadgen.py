@@ -0,0 +1,314 @@
+"""
+Measure how quickly the streamer fans realtime events out to clients.
+
+This runs the streamer in-process with the in-memory realtime transport,
+connects a number of simulated WebSocket clients to it and publishes a stream
+of annotation and user events, then reports the throughput and the latency
+from an event being published to each resulting message being written to a
+client.
+
+Annotation events are published for recent public annotations in the
+configured database, so there must be some (e.g. from `make devdata`).
+
+Usage:
+
+    python3 bin/streamer_loadgen.py conf/websocket-dev.ini --sockets 5000
+
+"""
+
+# The streamer expects to run under gevent, and this has to happen before kombu
+# is imported as it keeps its own references to `time.sleep()`.
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import random  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+import psycogreen.gevent  # noqa: E402
+from pyramid.paster import bootstrap  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from ws4py.messaging import TextMessage  # noqa: E402
+
+from h.models import Annotation  # noqa: E402
+from h.realtime import Publisher  # noqa: E402
+from h.security import Identity  # noqa: E402
+from h.security.identity import LongLivedUser  # noqa: E402
+from h.streamer import streamer, websocket  # noqa: E402
+from h.streamer.metrics import COUNTERS  # noqa: E402
+
+psycogreen.gevent.patch_psycopg()
+
+
+class Stats:
+    """Latencies of the messages received by the simulated clients."""
+
+    def __init__(self):
+        self.published_at = {}
+        """The time the last event for each annotation id was published."""
+
+        self.latencies = []
+        self.first_published_at = None
+        self.last_received_at = None
+
+    def published(self, annotation_id=None):
+        now = time.monotonic()
+        if self.first_published_at is None:
+            self.first_published_at = now
+        if annotation_id:
+            self.published_at[annotation_id] = now
+        return now
+
+    def received(self, frame):
+        now = time.monotonic()
+
+        # Our frames are never masked, so the JSON payload follows the header
+        payload = json.loads(frame[frame.index(b"{") :])
+
+        if payload["type"] == "annotation-notification":
+            published_at = self.published_at.get(payload["payload"][0]["id"])
+        elif payload["type"] == "session-change":
+            published_at = payload["model"].get("loadgen_published_at")
+        else:
+            return
+
+        if published_at is not None:
+            self.latencies.append(now - published_at)
+            self.last_received_at = now
+
+
+class ClientSocket:
+    """A stand-in for a client's TCP connection which records what it's sent."""
+
+    def __init__(self, stats):
+        self._stats = stats
+
+    def sendall(self, data):
+        self._stats.received(data)
+
+
+def connect_clients(count, uris, userids, stats):
+    """Connect `count` simulated clients, spread evenly over `uris` and `userids`."""
+    authority = userids[0].split("@")[-1] if userids else None
+    clients = []
+
+    for i in range(count):
+        identity = None
+        if userids:
+            identity = Identity(
+                user=LongLivedUser(
+                    id=i,
+                    userid=userids[i % len(userids)],
+                    authority=authority,
+                    staff=False,
+                    admin=False,
+                )
+            )
+
+        client = websocket.WebSocket(
+            ClientSocket(stats),
+            environ={
+                "h.ws.debug": False,
+                "h.ws.streamer_work_queue": streamer.WORK_QUEUE,
+                "h.ws.identity": identity,
+            },
+        )
+        # Go through the same path as a real client subscribing to a page
+        client.received_message(
+            TextMessage(
+                json.dumps(
+                    {
+                        "type": "filter",
+                        "filter": {
+                            "match_policy": "include_any",
+                            "actions": {},
+                            "clauses": [
+                                {
+                                    "field": "/uri",
+                                    "operator": "one_of",
+                                    "value": [uris[i % len(uris)]],
+                                }
+                            ],
+                        },
+                    }
+                )
+            )
+        )
+        clients.append(client)
+
+    return clients
+
+
+def publish_events(  # noqa: PLR0913
+    publisher, stats, count, annotation_ids, userids, user_event_ratio, rate
+):
+    """Publish `count` events, at `rate` events per second if given."""
+    for _ in range(count):
+        if userids and random.random() < user_event_ratio:  # noqa: S311
+            publisher.publish_user(
+                {
+                    "type": "group-join",
+                    "userid": random.choice(userids),  # noqa: S311
+                    "group": "__world__",
+                    "session_model": {"loadgen_published_at": stats.published()},
+                }
+            )
+        else:
+            annotation_id = random.choice(annotation_ids)  # noqa: S311
+            stats.published(annotation_id)
+            publisher.publish_annotation(
+                {
+                    "action": "update",
+                    "annotation_id": annotation_id,
+                    "src_client_id": "loadgen",
+                }
+            )
+
+        gevent.sleep(1 / rate if rate else 0)
+
+
+def wait_until_idle(stats, quiet_period):
+    """Wait until the clients haven't received anything for `quiet_period` seconds."""
+    while True:
+        gevent.sleep(quiet_period)
+        last_activity = stats.last_received_at or stats.first_published_at or 0
+        if (
+            streamer.WORK_QUEUE.empty()
+            and time.monotonic() - last_activity >= quiet_period
+        ):
+            return
+
+
+def report(stats, events):
+    received = len(stats.latencies)
+    print(f"Events published:  {events}")  # noqa: T201
+    print(f"Messages received: {received}")  # noqa: T201
+
+    for name in (
+        "WorkQueue/DroppedMessages",
+        "Outbox/CoalescedFrames",
+        "Outbox/DroppedFrames",
+        "Outbox/EvictedSockets",
+    ):
+        print(f"{name}: {COUNTERS[name]}")  # noqa: T201
+
+    if received < 2:
+        return
+
+    duration = stats.last_received_at - stats.first_published_at
+    print(f"Duration:          {duration:.3f}s")  # noqa: T201
+    print(f"Throughput:        {events / duration:.1f} events/s")  # noqa: T201
+    print(f"                   {received / duration:.1f} messages/s")  # noqa: T201
+
+    percentiles = statistics.quantiles(stats.latencies, n=100, method="inclusive")
+    for name, value in (
+        ("p50", percentiles[49]),
+        ("p90", percentiles[89]),
+        ("p99", percentiles[98]),
+        ("max", max(stats.latencies)),
+    ):
+        print(f"Latency {name}:       {value * 1000:.1f}ms")  # noqa: T201
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how quickly the streamer fans events out to clients."
+    )
+
+    parser.add_argument(
+        "config_uri",
+        help="the URI to the streamer's config file, e.g. 'conf/websocket-dev.ini'",
+    )
+    parser.add_argument(
+        "--sockets", type=int, default=1000, help="number of simulated clients"
+    )
+    parser.add_argument(
+        "--events", type=int, default=1000, help="number of events to publish"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="events to publish per second (default: as fast as possible)",
+    )
+    parser.add_argument(
+        "--annotations",
+        type=int,
+        default=100,
+        help="number of recent public annotations to publish events about",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=100,
+        help="number of users the clients are logged in as (0 for anonymous)",
+    )
+    parser.add_argument(
+        "--user-event-ratio",
+        type=float,
+        default=0.1,
+        help="proportion of events which are user rather than annotation events",
+    )
+    parser.add_argument(
+        "--quiet-period",
+        type=float,
+        default=1.0,
+        help="seconds without messages after which the run is considered done",
+    )
+
+    args = parser.parse_args()
+
+    # Carry realtime messages in this process rather than via RabbitMQ, and
+    # don't try to report metrics to New Relic
+    os.environ["REALTIME_TRANSPORT"] = "memory"
+    os.environ["KILL_SWITCH_WEBSOCKET_METRICS"] = "1"
+
+    with bootstrap(args.config_uri) as env:
+        request = env["request"]
+
+        annotations = request.db.execute(
+            select(Annotation.id, Annotation.target_uri)
+            .where(
+                Annotation.shared.is_(True),
+                Annotation.deleted.is_(False),
+                Annotation.groupid == "__world__",
+            )
+            .order_by(Annotation.updated.desc())
+            .limit(args.annotations)
+        ).all()
+        request.db.rollback()
+
+        if not annotations:
+            parser.error("no public annotations found in the database")
+
+        authority = request.registry.settings["h.authority"]
+        userids = [f"acct:loadgen{i}@{authority}" for i in range(args.users)]
+
+        stats = Stats()
+        clients = connect_clients(
+            args.sockets, [uri for _, uri in annotations], userids, stats
+        )
+        wait_until_idle(stats, quiet_period=0.1)
+        print(f"Connected {len(clients)} clients")  # noqa: T201
+
+        publish_events(
+            Publisher(request),
+            stats,
+            args.events,
+            [id_ for id_, _ in annotations],
+            userids,
+            args.user_event_ratio,
+            args.rate,
+        )
+        wait_until_idle(stats, args.quiet_period)
+
+        report(stats, args.events)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import click
 
 from h.search import config
+from h.search import reindex as reindex_
 
 
 @click.group()
@@ -24,3 +25,58 @@ def update_settings(ctx):
         config.update_index_settings(request.es)
     except RuntimeError as exc:
         raise click.ClickException(str(exc))  # noqa: B904
+
+
+@search.command("reindex")
+@click.option(
+    "--processes",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of slices of annotations to index at once.",
+)
+@click.option(
+    "--slices",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Number of slices to split the annotations into.",
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=500,
+    show_default=True,
+    help="Number of annotations to send to Elasticsearch in each request.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Carry on with a previous reindex which was interrupted.",
+)
+@click.pass_context
+def reindex(ctx, processes, slices, chunk_size, resume):
+    """
+    Reindex all annotations into a new index.
+
+    Creates a new index, fills it from the database in parallel and then
+    points the alias at it. Annotations changed while this runs are written
+    to both indexes. If it's interrupted it can be carried on with --resume.
+
+    If some annotations can't be indexed, even after retrying them, the new
+    index isn't made current and this fails. Running it again with --resume
+    retries them.
+    """
+    request = ctx.obj["bootstrap"]()
+
+    try:
+        reindex_.reindex(
+            request,
+            ctx.obj["bootstrap"],
+            processes=processes,
+            slice_count=slices,
+            chunk_size=chunk_size,
+            resume=resume,
+        )
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc))  # noqa: B904
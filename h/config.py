@@ -31,6 +31,9 @@ def configure(environ=None, settings=None):  # noqa: PLR0915
     settings_manager = SettingsManager(settings, environ)
     # Configuration for external components
     settings_manager.set("broker_url", "BROKER_URL")
+    # How realtime messages reach the streamer: "amqp" (via `broker_url`) or
+    # "memory" (in-process, for development and load testing).
+    settings_manager.set("h.realtime.transport", "REALTIME_TRANSPORT", default="amqp")
     settings_manager.set(
         "es.client_poolsize", "ELASTICSEARCH_CLIENT_POOLSIZE", type_=int
     )
@@ -53,6 +56,15 @@ def configure(environ=None, settings=None):  # noqa: PLR0915
         type_=asbool,
         default=True,
     )
+    # How annotation changes are synced into Elasticsearch as a safety net:
+    # "queue" (a job per change) or "watermark" (by tailing
+    # `annotation.updated`, see `AnnotationSyncService.sync_from_watermark()`).
+    settings_manager.set("h.search.sync_mode", "SEARCH_SYNC_MODE", default="queue")
+    # The most replies a search with `_separate_replies` returns. Threads with
+    # more are cut off and the response says so (see `h.search.core.Search`).
+    settings_manager.set(
+        "h.search.max_replies", "SEARCH_MAX_REPLIES", type_=int, default=200
+    )
     settings_manager.set("mail.default_sender", "MAIL_DEFAULT_SENDER")
     settings_manager.set("mail.host", "MAIL_HOST")
     settings_manager.set("mail.port", "MAIL_PORT", type_=int)
@@ -60,6 +72,26 @@ def configure(environ=None, settings=None):  # noqa: PLR0915
     settings_manager.set(
         "sqlalchemy.replica.url", "REPLICA_DATABASE_URL", required=False
     )
+    # The size of the replica database's connection pool in each process, how
+    # many connections it can open beyond that when busy, and after how many
+    # seconds connections are replaced. SQLAlchemy's defaults are used if unset.
+    settings_manager.set(
+        "sqlalchemy.replica.pool_size", "REPLICA_DATABASE_POOL_SIZE", type_=int
+    )
+    settings_manager.set(
+        "sqlalchemy.replica.max_overflow", "REPLICA_DATABASE_MAX_OVERFLOW", type_=int
+    )
+    settings_manager.set(
+        "sqlalchemy.replica.pool_recycle", "REPLICA_DATABASE_POOL_RECYCLE", type_=int
+    )
+    # Whether views declared `read_only` read from the replica, as long as it's
+    # no more than `replica_max_lag` seconds behind (see `h.db.routing`).
+    settings_manager.set(
+        "h.db.replica_reads", "REPLICA_READS", type_=asbool, default=False
+    )
+    settings_manager.set(
+        "h.db.replica_max_lag", "REPLICA_MAX_LAG", type_=float, default=5.0
+    )
 
     # Configuration for Pyramid
     settings_manager.set("secret_key", "SECRET_KEY", type_=_to_utf8, required=True)
@@ -69,6 +101,9 @@ def configure(environ=None, settings=None):  # noqa: PLR0915
 
     # Configuration for h
     settings_manager.set("csp.enabled", "CSP_ENABLED", type_=asbool)
+    # Encode JSON responses with `orjson` rather than the standard library
+    # (see `h.renderers`).
+    settings_manager.set("h.fast_json", "FAST_JSON", type_=asbool, default=False)
     settings_manager.set("csp.report_uri", "CSP_REPORT_URI")
     settings_manager.set("csp.report_only", "CSP_REPORT_ONLY")
     settings_manager.set(
@@ -118,6 +153,71 @@ def configure(environ=None, settings=None):  # noqa: PLR0915
 
     settings_manager.set("h.websocket_url", "WEBSOCKET_URL")
 
+    # Streamer settings: the number of greenlets processing the streamer's work
+    # queue, and how many waiting messages each takes from it at once.
+    settings_manager.set(
+        "h.streamer.worker_count", "STREAMER_WORKER_COUNT", type_=int, default=1
+    )
+    settings_manager.set(
+        "h.streamer.batch_size", "STREAMER_BATCH_SIZE", type_=int, default=1
+    )
+    # Use a faster (but less forgiving) JSON encoder for messages the streamer
+    # sends to many clients at once.
+    settings_manager.set(
+        "h.streamer.fast_json", "STREAMER_FAST_JSON", type_=asbool, default=False
+    )
+    # How far behind a client can fall (in queued messages) before we start
+    # dropping messages for it, and for how long (in seconds) before we
+    # disconnect it.
+    settings_manager.set(
+        "h.streamer.outbox_high_water_mark",
+        "STREAMER_OUTBOX_HIGH_WATER_MARK",
+        type_=int,
+        default=100,
+    )
+    settings_manager.set(
+        "h.streamer.outbox_evict_after",
+        "STREAMER_OUTBOX_EVICT_AFTER",
+        type_=float,
+        default=30.0,
+    )
+    # How many expanded document URIs the streamer remembers, and for how long
+    # (in seconds). Changes to documents made by other processes can take this
+    # long to be noticed.
+    settings_manager.set(
+        "h.streamer.uri_cache_size", "STREAMER_URI_CACHE_SIZE", type_=int, default=10000
+    )
+    settings_manager.set(
+        "h.streamer.uri_cache_ttl", "STREAMER_URI_CACHE_TTL", type_=float, default=60.0
+    )
+
+    # How many badge counts each web process remembers, and for how long (in
+    # seconds). New annotations can take this long to be counted.
+    settings_manager.set(
+        "h.badge.cache_size", "BADGE_CACHE_SIZE", type_=int, default=10000
+    )
+    settings_manager.set(
+        "h.badge.cache_ttl", "BADGE_CACHE_TTL", type_=float, default=30.0
+    )
+    # If set, badge counts stop being exact above this many annotations, which
+    # makes counting busy pages cheaper.
+    settings_manager.set("h.badge.count_limit", "BADGE_COUNT_LIMIT", type_=int)
+    # Groups with at least this many annotations have the totals on their
+    # moderation listing cached for a while (in seconds), rather than being
+    # counted for every page.
+    settings_manager.set(
+        "h.group_annotations.cache_totals_above",
+        "GROUP_ANNOTATIONS_CACHE_TOTALS_ABOVE",
+        type_=int,
+        default=10000,
+    )
+    settings_manager.set(
+        "h.group_annotations.total_cache_ttl",
+        "GROUP_ANNOTATIONS_TOTAL_CACHE_TTL",
+        type_=float,
+        default=60.0,
+    )
+
     # Reporting settings
     settings_manager.set("h.report.fdw_users", "REPORT_FDW_USERS", type_=aslist)
 
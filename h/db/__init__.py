@@ -14,12 +14,16 @@ property `request.db` which is provided by this module.
 import logging
 from os import environ
 
+import newrelic.agent
 import sqlalchemy
 import zope.sqlalchemy
 import zope.sqlalchemy.datamanager
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
+from h.db.pool import MeasuredQueuePool, pool_metrics
+from h.db.routing import count_queries, reader_session
+
 __all__ = ("Base", "Session", "create_engine", "post_create", "pre_create")
 
 log = logging.getLogger(__name__)
@@ -65,9 +69,36 @@ def post_create(engine):  # pragma: no cover
     _maybe_create_world_group(engine, authority, default_org)
 
 
-def create_engine(database_url):  # pragma: no cover
+def create_engine(database_url, **kwargs):  # pragma: no cover
     """Construct a sqlalchemy engine from the passed ``settings``."""
-    return sqlalchemy.create_engine(database_url)
+    return sqlalchemy.create_engine(database_url, poolclass=MeasuredQueuePool, **kwargs)
+
+
+def create_replica_engine(settings):  # pragma: no cover
+    """
+    Construct the engine for the read-only replica database.
+
+    The pool can be sized with the `sqlalchemy.replica.pool_size`,
+    `sqlalchemy.replica.max_overflow` and `sqlalchemy.replica.pool_recycle`
+    settings.
+    """
+    pool_settings = {
+        key: settings[f"sqlalchemy.replica.{key}"]
+        for key in ("pool_size", "max_overflow", "pool_recycle")
+        if settings.get(f"sqlalchemy.replica.{key}") is not None
+    }
+    engine = create_engine(settings["sqlalchemy.replica.url"], **pool_settings)
+
+    # While this is superflux when using a real replica it guarantees that usage of request.db_replica
+    # in the codebase never expects to be able to write to the DB, useful on the dev and tests environments.
+    @event.listens_for(engine, "connect")
+    def set_read_only(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY;")
+        cursor.close()
+        dbapi_connection.commit()
+
+    return engine
 
 
 def _session(request):  # pragma: no cover
@@ -82,6 +113,8 @@ def _session(request):  # pragma: no cover
     else:
         zope.sqlalchemy.register(session, transaction_manager=tm)
 
+    count_queries(request, session, "Primary")
+
     # pyramid_tm doesn't always close the database session for us.
     #
     # If anything that executes later in the Pyramid request processing cycle
@@ -103,12 +136,9 @@ def _session(request):  # pragma: no cover
 
 
 def _replica_session(request):  # pragma: no cover
-    engine = create_engine(request.registry.settings["sqlalchemy.replica.url"])
+    engine = request.registry["sqlalchemy.replica.engine"]
     session = Session(bind=engine)
-
-    # While this is superflux when using a real replica it guarantees that usage of request.db_replica
-    # in the codebase never expects to be able to write to the DB, useful on the dev and tests environments.
-    session.execute(text("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY;"))
+    count_queries(request, session, "Replica")
 
     @request.add_finished_callback
     def close_the_sqlalchemy_session(_request):
@@ -121,6 +151,19 @@ def _replica_session(request):  # pragma: no cover
     return session
 
 
+def _pool_metrics_data_source(registry):  # pragma: no cover
+    """Return a New Relic data source reporting on the app's connection pools."""
+
+    def metrics():
+        yield from pool_metrics("Primary", registry["sqlalchemy.engine"].pool)
+        if replica_engine := registry.get("sqlalchemy.replica.engine"):
+            yield from pool_metrics("Replica", replica_engine.pool)
+
+    return newrelic.agent.data_source_generator(name="Database connection pools")(
+        metrics
+    )
+
+
 def _maybe_create_default_organization(engine, authority):  # pragma: no cover
     from h.services.organization import OrganizationService  # noqa: PLC0415
 
@@ -160,8 +203,25 @@ def includeme(config):  # pragma: no cover
     engine = create_engine(config.registry.settings["sqlalchemy.url"])
     config.registry["sqlalchemy.engine"] = engine
 
+    # The replica gets an engine (and so a pool of connections) of its own,
+    # which is shared by every request in the process like the primary's.
+    if config.registry.settings.get("sqlalchemy.replica.url"):
+        config.registry["sqlalchemy.replica.engine"] = create_replica_engine(
+            config.registry.settings
+        )
+
+    # Sample the connection pools' metrics whenever New Relic harvests them
+    newrelic.agent.register_data_source(_pool_metrics_data_source(config.registry))
+
     # Add a property to all requests for easy access to the session. This means
     # that view functions need only refer to `request.db` in order to retrieve
     # the current database session.
     config.add_request_method(_session, name="db", reify=True)
     config.add_request_method(_replica_session, name="db_replica", reify=True)
+
+    # Services which do heavy reads can use `request.db_reader`, which is the
+    # replica's session during views declared with `read_only=True` (see
+    # `h.db.routing`). It's worked out whenever it's used, as services can be
+    # created before the view is known to be read-only.
+    config.add_request_method(lambda _request: False, name="read_only", reify=True)
+    config.add_request_method(reader_session, name="db_reader", property=True)
@@ -0,0 +1,82 @@
+"""Database connection pools which report on how they're being used."""
+
+import threading
+import time
+
+from sqlalchemy.pool import QueuePool
+
+
+class MeasuredQueuePool(QueuePool):
+    """
+    A `QueuePool` which measures how long checkouts wait for a connection.
+
+    Checkouts wait when every connection in the pool (and its overflow) is in
+    use, or when a new connection has to be opened. The wait times are kept
+    until they're reported by `pool_metrics()`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        """The number of checkouts since the wait times were last reset."""
+        self.wait_time = 0.0
+        """The total seconds checkouts have waited since the last reset."""
+        self.max_wait_time = 0.0
+        """The longest a checkout has waited since the last reset."""
+
+    def reset_wait_times(self):
+        """Start measuring wait times again."""
+        with self._lock:
+            self.checkouts = 0
+            self.wait_time = self.max_wait_time = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            with self._lock:
+                self.checkouts += 1
+                self.wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+
+
+def pool_metrics(name, pool):
+    """
+    Return New Relic-style metrics about a connection pool.
+
+    The metrics are about the pool's current state and (for a
+    `MeasuredQueuePool`) how long checkouts have waited since this was last
+    called.
+
+    :param name: The name of the pool in the metrics, e.g. "Primary"
+    :param pool: The `sqlalchemy.pool.Pool` to report on
+    """
+    prefix = f"Custom/DB/Pool/{name}"
+    metrics = []
+
+    if isinstance(pool, QueuePool):
+        metrics.extend(
+            [
+                (f"{prefix}/Size", pool.size()),
+                (f"{prefix}/CheckedOut", pool.checkedout()),
+                # The overflow counts down from `-size` while the pool fills up
+                (f"{prefix}/Overflow", max(pool.overflow(), 0)),
+            ]
+        )
+
+    if isinstance(pool, MeasuredQueuePool):
+        if pool.checkouts:
+            metrics.extend(
+                [
+                    (f"{prefix}/Checkouts", pool.checkouts),
+                    (f"{prefix}/Wait/Average", pool.wait_time / pool.checkouts),
+                    (f"{prefix}/Wait/Max", pool.max_wait_time),
+                ]
+            )
+        pool.reset_wait_times()
+
+    return metrics
@@ -0,0 +1,134 @@
+"""
+Send the reads of read-only views to the replica database.
+
+Views which only read from the database can declare that with the
+`read_only=True` view option (see `h.viewderivers.read_only_view`). Services
+which do heavy reads get their session from `request.db_reader`, which during
+those views is the replica's session, as long as replica reads are enabled
+(`h.db.replica_reads`) and the replica isn't lagging too far behind
+(`h.db.replica_max_lag`). Otherwise it's the primary's session, as usual.
+"""
+
+import logging
+import time
+from collections import Counter
+
+import newrelic.agent
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+
+log = logging.getLogger(__name__)
+
+REPLICA_LAG_KEY = "h.db.routing.replica_lag"
+"""The registry key of the process wide `ReplicaLag`."""
+
+# The lag is 0 if the replica has replayed everything it's received, as
+# otherwise `pg_last_xact_replay_timestamp()` only tells us how long it's been
+# since the last write on the primary. A database that isn't a replica at all
+# (as in development) is never lagging.
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaLag:
+    """
+    A process wide record of how far the replica is behind the primary.
+
+    The lag is only measured again every `check_interval` seconds, so most
+    requests don't need a query to find out whether they can use the replica.
+    """
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+
+        # A `(checked_at, lag)` tuple, swapped as a whole so threads sharing
+        # this never see a lag with the wrong time
+        self._checked = None
+
+    def get(self, session):
+        """
+        Return the replica's lag in seconds.
+
+        :param session: A session connected to the replica to measure with
+        :return: The lag, or `None` if it couldn't be measured
+        """
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked[0] < self.check_interval:
+            return self._checked[1]
+
+        try:
+            lag = session.execute(LAG_QUERY).scalar()
+        except SQLAlchemyError:
+            log.warning("Failed to measure the replica's lag", exc_info=True)
+            session.rollback()
+            lag = None
+        else:
+            lag = None if lag is None else float(lag)
+
+        self._checked = (now, lag)
+        return lag
+
+
+def replica_lag(registry):
+    """Return the process wide `ReplicaLag` for an app."""
+    return registry.setdefault(REPLICA_LAG_KEY, ReplicaLag())
+
+
+def reader_session(request):
+    """
+    Return the session to read from for `request`.
+
+    This is the replica's session for views declared with `read_only=True`
+    when replica reads are enabled and the replica is up to date enough, and
+    the primary's session otherwise.
+    """
+    settings = request.registry.settings
+
+    if not (
+        request.read_only
+        and settings.get("h.db.replica_reads")
+        and settings.get("sqlalchemy.replica.url")
+    ):
+        return request.db
+
+    lag = replica_lag(request.registry).get(request.db_replica)
+    if lag is None or lag > settings.get("h.db.replica_max_lag", 5.0):
+        newrelic.agent.add_custom_attribute("db_reader", "primary (replica lag)")
+        return request.db
+
+    newrelic.agent.add_custom_attribute("db_reader", "replica")
+    return request.db_replica
+
+
+def count_queries(request, session, name):
+    """
+    Count the statements `session` executes and report them for the route.
+
+    The counts are recorded as `Custom/DB/Queries/Route/{route}/{name}` New
+    Relic metrics when the request finishes, so we can see how much of each
+    route's work falls on the primary and the replica.
+
+    :param name: The name of the database in the metrics, e.g. "Primary"
+    """
+    counts = Counter()
+
+    @event.listens_for(session, "do_orm_execute")
+    def count(_orm_execute_state):
+        counts[name] += 1
+
+    @request.add_finished_callback
+    def record(request):
+        if not counts[name]:
+            return
+
+        route = request.matched_route.name if request.matched_route else None
+        newrelic.agent.record_custom_metric(
+            f"Custom/DB/Queries/Route/{route}/{name}", counts[name]
+        )
@@ -1,6 +1,15 @@
 """Provides links to different representations of annotations."""
 
+from functools import lru_cache
 from urllib.parse import unquote, urljoin, urlparse
+from weakref import WeakKeyDictionary
+
+from pyramid.request import Request
+
+_ID_PLACEHOLDER = "__annotation_id__"
+
+_url_templates: WeakKeyDictionary[Request, dict[str, str]] = WeakKeyDictionary()
+"""The URL of each annotation route for each request, with a placeholder id."""
 
 
 def pretty_link(url):
@@ -25,7 +34,7 @@ def html_link(request, annotation):
         # We don't currently support HTML representations of third party
         # annotations.
         return None
-    return request.route_url("annotation", id=annotation.id)
+    return _annotation_route_url(request, "annotation", annotation.id)
 
 
 def incontext_link(request, annotation):
@@ -34,7 +43,9 @@ def incontext_link(request, annotation):
     if not bouncer_url:
         return None
 
-    link = urljoin(bouncer_url, annotation.thread_root_id)
+    link = _incontext_template(bouncer_url).replace(
+        _ID_PLACEHOLDER, annotation.thread_root_id
+    )
     uri = annotation.target_uri
     if uri.startswith(("http://", "https://")):
         # We can't use urljoin here, because if it detects the second argument
@@ -51,11 +62,33 @@ def incontext_link(request, annotation):
 
 
 def json_link(request, annotation):
-    return request.route_url("api.annotation", id=annotation.id)
+    return _annotation_route_url(request, "api.annotation", annotation.id)
 
 
 def jsonld_id_link(request, annotation):
-    return request.route_url("annotation", id=annotation.id)
+    return _annotation_route_url(request, "annotation", annotation.id)
+
+
+@lru_cache(maxsize=8)
+def _incontext_template(bouncer_url):
+    """Return the in-context link for a placeholder id (`urljoin()` is slow)."""
+    return urljoin(bouncer_url, _ID_PLACEHOLDER)
+
+
+def _annotation_route_url(request, route_name, annotation_id):
+    """
+    Return `request.route_url(route_name, id=annotation_id)`, but faster.
+
+    Generating a route's URL is slow compared to the rest of presenting an
+    annotation, and all the URLs for a route differ only by the id, so we
+    generate each route's URL once per request and fill the id in.
+    """
+    templates = _url_templates.setdefault(request, {})
+    if route_name not in templates:
+        templates[route_name] = request.route_url(route_name, id=_ID_PLACEHOLDER)
+
+    # Annotation ids are URL-safe, so this is the same as they'd be quoted
+    return templates[route_name].replace(_ID_PLACEHOLDER, annotation_id)
 
 
 def includeme(config):  # pragma: no cover
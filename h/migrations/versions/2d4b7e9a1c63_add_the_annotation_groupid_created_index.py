@@ -0,0 +1,22 @@
+"""Add an index for listing a group's annotations newest first."""
+
+from alembic import op
+
+revision = "2d4b7e9a1c63"
+down_revision = "8e2f6b1d0c4a"
+
+
+def upgrade():
+    # Creating a concurrent index does not work inside a transaction
+    op.execute("COMMIT")
+
+    op.create_index(
+        op.f("ix__annotation_groupid_created_id"),
+        "annotation",
+        ["groupid", "created", "id"],
+        postgresql_concurrently=True,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix__annotation_groupid_created_id"), "annotation")
@@ -0,0 +1,29 @@
+"""Add the job.collapsed column and an index for finding duplicate jobs."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "5c1e9a4f7d20"
+down_revision = "b6be2385d907"
+
+
+def upgrade():
+    op.add_column(
+        "job",
+        sa.Column("collapsed", sa.Integer, nullable=False, server_default=sa.text("0")),
+    )
+
+    # Creating a concurrent index does not work inside a transaction
+    op.execute("COMMIT")
+
+    op.create_index(
+        "ix__job_name_annotation_id",
+        "job",
+        ["name", sa.text("(kwargs ->> 'annotation_id')")],
+        postgresql_concurrently=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix__job_name_annotation_id", "job")
+    op.drop_column("job", "collapsed")
@@ -0,0 +1,20 @@
+"""Add the public_annotation_count table."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "8e2f6b1d0c4a"
+down_revision = "5c1e9a4f7d20"
+
+
+def upgrade():
+    op.create_table(
+        "public_annotation_count",
+        sa.Column("scope", sa.UnicodeText(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", name=op.f("pk__public_annotation_count")),
+    )
+
+
+def downgrade():
+    op.drop_table("public_annotation_count")
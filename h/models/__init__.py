@@ -38,6 +38,7 @@ from h.models.mention import Mention
 from h.models.moderation_log import ModerationLog
 from h.models.notification import Notification
 from h.models.organization import Organization
+from h.models.public_annotation_count import PublicAnnotationCount
 from h.models.setting import Setting
 from h.models.subscriptions import Subscriptions
 from h.models.task_done import TaskDone
@@ -69,6 +70,7 @@ __all__ = (
     "Mention",
     "Notification",
     "Organization",
+    "PublicAnnotationCount",
     "Setting",
     "Subscriptions",
     "TaskDone",
@@ -40,6 +40,8 @@ class Annotation(Base):
         sa.Index("ix__annotation_tags", "tags", postgresql_using="gin"),
         sa.Index("ix__annotation_created", "created"),
         sa.Index("ix__annotation_updated", "updated"),
+        # For paging through a group's annotations, newest first
+        sa.Index("ix__annotation_groupid_created_id", "groupid", "created", "id"),
         # This is a functional index on the *first* of the annotation's
         # references, pointing to the top-level annotation it refers to. We're
         # using 1 here because Postgres uses 1-based array indexing.
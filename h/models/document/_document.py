@@ -122,12 +122,15 @@ class Document(Base, mixins.Timestamps):
         return documents
 
 
-def merge_documents(session, documents, updated=None):
+def merge_documents(session, documents, updated=None, on_uris_change=None):
     """
     Take a list of documents and merges them together. It returns the new master document.
 
     The support for setting a specific value for the `updated` should only
     be used during the Postgres migration. It should be removed afterwards.
+
+    :param on_uris_change: A function to call with the normalized URIs of
+        the master document, which all expand to different URIs now
     """
 
     if updated is None:
@@ -168,9 +171,16 @@ def merge_documents(session, documents, updated=None):
     except sa.exc.IntegrityError as err:
         raise ConcurrentUpdateError("concurrent document merges") from err  # noqa: EM101, TRY003
 
+    if on_uris_change:
+        on_uris_change(_normalized_uris(master))
+
     return master
 
 
+def _normalized_uris(document):
+    return {document_uri.uri_normalized for document_uri in document.document_uris}
+
+
 def _merge_checkpoints(session, duplicate_ids, master):
     """
     Re-point Hide & Reveal checkpoints from the duplicate documents to master.
@@ -229,6 +239,7 @@ def update_document_metadata(  # noqa: PLR0913
     document_uri_dicts,
     created=None,
     updated=None,
+    on_uris_change=None,
 ):
     """
     Create and update document metadata from the given annotation.
@@ -248,6 +259,8 @@ def update_document_metadata(  # noqa: PLR0913
 
     :param created: Date and time value for the new document records
     :param updated: Date and time value for the new document records
+    :param on_uris_change: A function to call with the normalized URIs which
+        expand to different URIs than before, if there are any
 
     :returns: the matched or created document
     :rtype: h.models.Document
@@ -266,11 +279,14 @@ def update_document_metadata(  # noqa: PLR0913
     )
 
     if documents.count() > 1:
-        document = merge_documents(session, documents, updated=updated)
+        document = merge_documents(
+            session, documents, updated=updated, on_uris_change=on_uris_change
+        )
     else:
         document = documents.first()
 
     document.updated = updated
+    initial_uris = _normalized_uris(document) if on_uris_change else None
 
     for document_uri_dict in document_uri_dicts:
         create_or_update_document_uri(
@@ -283,6 +299,9 @@ def update_document_metadata(  # noqa: PLR0913
 
     document.update_web_uri()
 
+    if on_uris_change and (uris := _normalized_uris(document)) != initial_uris:
+        on_uris_change(uris | {uri_normalize(target_uri)})
+
     for document_meta_dict in document_meta_dicts:
         create_or_update_document_meta(
             session=session,
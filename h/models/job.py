@@ -56,7 +56,13 @@ class Job(Base):
 
     __tablename__ = "job"
 
-    __table_args__ = (Index("ix__job_priority_enqueued_at", "priority", "enqueued_at"),)
+    __table_args__ = (
+        Index("ix__job_priority_enqueued_at", "priority", "enqueued_at"),
+        # For finding pending jobs to collapse new ones into
+        Index(
+            "ix__job_name_annotation_id", "name", text("(kwargs ->> 'annotation_id')")
+        ),
+    )
 
     id = Column(Integer, Sequence("job_id_seq", cycle=True), primary_key=True)
     name = Column(UnicodeText, nullable=False)
@@ -72,6 +78,8 @@ class Job(Base):
         server_default=text("'{}'::jsonb"),
         nullable=False,
     )
+    collapsed = Column(Integer, nullable=False, server_default=text("0"))
+    """The number of duplicate jobs which were collapsed into this one."""
 
     def __repr__(self):
         return helpers.repr_(
@@ -84,5 +92,6 @@ class Job(Base):
                 "expires_at",
                 "priority",
                 "tag",
+                "collapsed",
             ],
         )
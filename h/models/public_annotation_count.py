@@ -0,0 +1,26 @@
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from h.db import Base
+
+
+class PublicAnnotationCount(Base):
+    """
+    The number of annotations anyone can see on a page.
+
+    This is kept up to date as annotations are written (see
+    `PublicAnnotationCountService`) so counting a page's public annotations is
+    a single lookup rather than a search.
+    """
+
+    __tablename__ = "public_annotation_count"
+
+    scope: Mapped[str] = mapped_column(sa.UnicodeText, primary_key=True)
+    """The normalized URI (and version) the annotations are on.
+
+    This is the same as the annotations' `target.scope` in the search index
+    (see `h.util.uri.build_scope_key()`).
+    """
+
+    count: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    """The number of public annotations (and replies) on the page."""
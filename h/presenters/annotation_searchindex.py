@@ -5,7 +5,12 @@ from h.util.user import split_user
 
 
 class AnnotationSearchIndexPresenter:
-    """Present an annotation in the JSON format used in the search index."""
+    """
+    Present an annotation in the JSON format used in the search index.
+
+    Bulk indexing builds the same format from rows instead, with
+    `h.search.index.present_row()`, so changes here need making there too.
+    """
 
     def __init__(self, annotation, request):
         self.annotation = annotation
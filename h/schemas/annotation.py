@@ -7,7 +7,14 @@ from dateutil.parser import parse
 from pyramid import i18n
 
 from h.schemas.base import JSONSchema, ValidationError
-from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX
+from h.search.query import (
+    LIMIT_DEFAULT,
+    LIMIT_MAX,
+    OFFSET_MAX,
+    SORT_FIELDS,
+    SORT_ORDERS,
+    Cursor,
+)
 from h.search.util import wildcard_uri_is_valid
 from h.util import document_claims
 
@@ -350,7 +357,7 @@ class SearchParamsSchema(colander.Schema):
     )
     sort = colander.SchemaNode(
         colander.String(),
-        validator=colander.OneOf(["created", "updated", "group", "id", "user"]),
+        validator=colander.OneOf(SORT_FIELDS),
         missing="updated",
         description="The field by which annotations should be sorted.",
     )
@@ -363,6 +370,15 @@ class SearchParamsSchema(colander.Schema):
                     epoch. This is used for iteration through large collections
                     of results.""",
     )
+    cursor = colander.SchemaNode(
+        colander.String(allow_empty=True),
+        missing=colander.drop,
+        description="""Page through results with a cursor. Pass an empty
+                    cursor to get the first page, and the `next_cursor` from
+                    each response to get the page after it. This is the most
+                    efficient way to iterate through large collections of
+                    results.""",
+    )
     limit = colander.SchemaNode(
         colander.Integer(),
         validator=colander.Range(min=0, max=LIMIT_MAX),
@@ -371,7 +387,7 @@ class SearchParamsSchema(colander.Schema):
     )
     order = colander.SchemaNode(
         colander.String(),
-        validator=colander.OneOf(["asc", "desc"]),
+        validator=colander.OneOf(SORT_ORDERS),
         missing="desc",
         description="The direction of sort.",
     )
@@ -496,6 +512,16 @@ class SearchParamsSchema(colander.Schema):
             # offset must be set to 0 if search_after is specified.
             cstruct["offset"] = 0
 
+        if "cursor" in cstruct:
+            if cstruct["cursor"]:
+                try:
+                    Cursor.decode(cstruct["cursor"])
+                except ValueError as err:
+                    raise colander.Invalid(node, "cursor is not valid.") from err
+
+            # Pages after a cursor always start from its position
+            cstruct["offset"] = 0
+
     @staticmethod
     def _date_is_parsable(value):
         """Return True if date is parsable and False otherwise."""
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from colander import DateTime, Integer, Range, Schema, SchemaNode
+from colander import DateTime, Integer, Invalid, Range, Schema, SchemaNode, String
 
+from h.db.types import InvalidUUID, URLSafeUUID
 from h.schemas.util import validate_query_params
 
 
@@ -35,15 +36,34 @@ class Pagination:
         )
 
 
+def _annotation_id(node, value):
+    try:
+        URLSafeUUID.url_safe_to_hex(value)
+    except InvalidUUID as err:
+        raise Invalid(node, "Not a valid annotation id") from err
+
+
 class CursorPaginationQueryParamsSchema(Schema):
     after = SchemaNode(DateTime(), name="page[after]", missing=None)
+    # The id of the last item of the previous page, to tell apart items
+    # with the same `page[after]` date
+    after_id = SchemaNode(
+        String(), name="page[after_id]", validator=_annotation_id, missing=None
+    )
     size = page_size_node()
 
+    def validator(self, node, cstruct):
+        if cstruct["page[after_id]"] and not cstruct["page[after]"]:
+            exc = Invalid(node)
+            exc["page[after_id]"] = "Can only be used with page[after]"
+            raise exc
+
 
 @dataclass
 class CursorPagination:
     size: int
     after: str | None
+    after_id: str | None = None
 
     @classmethod
     def from_params(cls, params: dict) -> CursorPagination:
@@ -52,5 +72,7 @@ class CursorPagination:
         )
 
         return cls(
-            size=pagination_params["page[size]"], after=pagination_params["page[after]"]
+            size=pagination_params["page[size]"],
+            after=pagination_params["page[after]"],
+            after_id=pagination_params["page[after_id]"],
         )
@@ -3,23 +3,29 @@ from h.search.config import init
 from h.search.core import Search
 from h.search.query import (
     AuthorityFilter,
+    Cursor,
     DeletedFilter,
+    ExpiredCursorError,
     Limiter,
     SharedAnnotationsFilter,
     TagsAggregation,
     TopLevelAnnotationsFilter,
+    TotalHitsLimit,
     UserFilter,
     UsersAggregation,
 )
 
 __all__ = (
     "AuthorityFilter",
+    "Cursor",
     "DeletedFilter",
+    "ExpiredCursorError",
     "Limiter",
     "Search",
     "SharedAnnotationsFilter",
     "TagsAggregation",
     "TopLevelAnnotationsFilter",
+    "TotalHitsLimit",
     "UserFilter",
     "UsersAggregation",
     "get_client",
@@ -20,6 +20,25 @@ class Client:
         # to close the underlying transport directly.
         self.conn.transport.close()
 
+    def open_point_in_time(self, keep_alive):
+        """
+        Open a point in time (PIT) on the index and return its id.
+
+        Searches made with the PIT see the index as it was when it was opened,
+        so pages of results don't shift as annotations are indexed. This needs
+        Elasticsearch >= 7.10 and the `elasticsearch` package we use doesn't
+        know about it, so the request is made directly.
+
+        :param keep_alive: How long to keep the PIT open, e.g. "1m"
+        """
+        return self.conn.transport.perform_request(
+            "POST", f"/{self.index}/_pit", params={"keep_alive": keep_alive}
+        )["id"]
+
+    def close_point_in_time(self, pit_id):
+        """Close a point in time opened with `open_point_in_time()`."""
+        self.conn.transport.perform_request("DELETE", "/_pit", body={"id": pit_id})
+
     @cached_property
     def mapping_type(self):
         """Get the name of the index's mapping type (aka. document type)."""
@@ -1,18 +1,28 @@
-import logging
 from collections import namedtuple
 
+import elasticsearch
 import elasticsearch_dsl
 from webob.multidict import MultiDict
 
 from h.search import query
 from h.util import metrics
 
-log = logging.getLogger(__name__)
-
 SearchResult = namedtuple(  # noqa: PYI024
-    "SearchResult", ["total", "annotation_ids", "reply_ids", "aggregations"]
+    "SearchResult",
+    [
+        "total",
+        "annotation_ids",
+        "reply_ids",
+        "aggregations",
+        "next_cursor",
+        "replies_truncated",
+    ],
+    defaults=[None, False],
 )
 
+MAX_REPLIES_DEFAULT = 200
+"""The default for the `h.search.max_replies` setting."""
+
 
 class Search:
     """
@@ -24,6 +34,8 @@ class Search:
     :param separate_replies: Whether or not to return all replies to the
         annotations returned by this search. If this is True then the
         resulting annotations will only include top-level annotations, not replies.
+        No more than the `h.search.max_replies` setting's number of replies are
+        returned, and the result's `replies_truncated` says if there were more.
     :type separate_replies: bool
 
     :param separate_wildcard_uri_keys: If True, wildcard searches are only performed
@@ -43,6 +55,9 @@ class Search:
         self.es = request.es
         self.separate_replies = separate_replies
         self._replies_limit = _replies_limit
+        self._max_replies = int(
+            request.registry.settings.get("h.search.max_replies", MAX_REPLIES_DEFAULT)
+        )
         # Order matters! The KeyValueMatcher must be run last,
         # after all other modifiers have popped off the params.
         self._modifiers = [
@@ -67,17 +82,32 @@ class Search:
         """
         Execute the search query.
 
+        If `params` has a `cursor` the results are paged through with a cursor
+        instead of `offset` or `search_after`: an empty cursor gets the first
+        page, and the `next_cursor` of each result gets the page after it.
+
         :param params: the search parameters that will be popped by each of the filters.
         :type params: webob.multidict.MultiDict
 
         :returns: The search results
         :rtype: SearchResult
+        :raises ExpiredCursorError: If the cursor has expired
         """
         metrics.record_search_query_params(params, self.separate_replies)
-        total, annotation_ids, aggregations = self._search_annotations(params)
-        reply_ids = self._search_replies(annotation_ids)
+        cursor = self._pop_cursor(params)
+        total, annotation_ids, aggregations, next_cursor = self._search_annotations(
+            params, cursor
+        )
+        reply_ids, replies_truncated = self._search_replies(annotation_ids)
 
-        return SearchResult(total, annotation_ids, reply_ids, aggregations)
+        return SearchResult(
+            total,
+            annotation_ids,
+            reply_ids,
+            aggregations,
+            next_cursor,
+            replies_truncated,
+        )
 
     def clear(self):
         """Clear search modifiers, aggregators, and matchers."""
@@ -109,41 +139,110 @@ class Search:
 
         return search.execute()
 
-    def _search_annotations(self, params):
+    def _pop_cursor(self, params):
+        """Pop the `cursor` param and return the `Cursor` to page with, if any."""
+        if "cursor" not in params:
+            return None
+
+        if value := params.pop("cursor"):
+            return query.Cursor.decode(value)
+
+        # An empty cursor starts paging from the first page
+        return query.Cursor(
+            pit_id=self.es.open_point_in_time(query.CursorSorter.KEEP_ALIVE),
+            sort=params.get("sort", "updated"),
+            order=params.get("order", "desc"),
+        )
+
+    def _search_annotations(self, params, cursor=None):
         # If separate_replies is True, don't return any replies to annotations.
         modifiers = self._modifiers
         if self.separate_replies:
             modifiers = [query.TopLevelAnnotationsFilter()] + modifiers  # noqa: RUF005
 
-        response = self._search(modifiers, self._aggregations, params)
+        if cursor:
+            modifiers = self._with_cursor(modifiers, cursor)
+
+        try:
+            response = self._search(modifiers, self._aggregations, params)
+        except elasticsearch.exceptions.NotFoundError as err:
+            if cursor:
+                raise query.ExpiredCursorError from err
+            raise
 
         total = self._get_total_hits(response)
-        annotation_ids = [hit["_id"] for hit in response["hits"]["hits"]]
+        hits = response["hits"]["hits"]
+        annotation_ids = [hit["_id"] for hit in hits]
         aggregations = self._parse_aggregation_results(response.aggregations)
-        return (total, annotation_ids, aggregations)
+
+        next_cursor = None
+        if cursor:
+            if hits:
+                next_cursor = cursor.next(
+                    response["pit_id"], list(hits[-1]["sort"])
+                ).encode()
+            else:
+                # There are no more pages so we're done with the point in time
+                self.es.close_point_in_time(cursor.pit_id)
+
+        return (total, annotation_ids, aggregations, next_cursor)
 
     def _search_replies(self, annotation_ids):
+        """Return the ids of the replies to show, and whether there were more."""
         if not self.separate_replies:
-            return []
+            return [], False
 
+        reply_ids = [
+            reply_id
+            for batch in self._reply_id_batches(annotation_ids)
+            for reply_id in batch
+        ]
+
+        return reply_ids[: self._max_replies], len(reply_ids) > self._max_replies
+
+    def _reply_id_batches(self, annotation_ids):
+        """
+        Yield the ids of the replies to the given annotations in batches.
+
+        Threads can have any number of replies, so rather than cutting them off
+        at the size of a single search this pages through them with
+        `search_after`, `_replies_limit` at a time. It stops after one more
+        than `_max_replies`, which is enough to tell there are too many.
+        """
         # The only difference between a search for annotations and a search for
         # replies to annotations is the RepliesMatcher and the params passed to
         # the modifiers.
-        response = self._search(
-            [query.RepliesMatcher(annotation_ids)] + self._modifiers,  # noqa: RUF005
-            [],  # Aggregations aren't used in replies.
-            MultiDict({"limit": self._replies_limit}),
-        )
-
-        if len(response["hits"]["hits"]) < self._get_total_hits(response):
-            log.warning(
-                "The number of reply annotations exceeded the page size "
-                "of the Elasticsearch query. We currently don't handle "
-                "this, our search API doesn't support pagination of the "
-                "reply set."
+        cursor = query.Cursor(pit_id=None)
+        remaining = self._max_replies + 1
+        while remaining:
+            limit = min(self._replies_limit, remaining)
+            response = self._search(
+                [
+                    query.RepliesMatcher(annotation_ids),
+                    *self._with_cursor(self._modifiers, cursor),
+                ],
+                [],  # Aggregations aren't used in replies.
+                MultiDict({"limit": limit}),
             )
+            hits = response["hits"]["hits"]
+            if hits:
+                yield [hit["_id"] for hit in hits]
+
+            if len(hits) < limit:
+                return
 
-        return [hit["_id"] for hit in response["hits"]["hits"]]
+            remaining -= len(hits)
+            cursor = cursor.next(None, list(hits[-1]["sort"]))
+
+    @staticmethod
+    def _with_cursor(modifiers, cursor):
+        """Return `modifiers` with the `Sorter` replaced to page with `cursor`."""
+        return [
+            query.CursorSorter(cursor)
+            if isinstance(modifier, query.Sorter)
+            else modifier
+            for modifier in modifiers
+        ]
 
     def _parse_aggregation_results(self, aggregations):
         if not aggregations:
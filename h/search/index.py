@@ -2,13 +2,16 @@
 
 import logging
 import time
+from functools import partial
 
 import sqlalchemy as sa
 from elasticsearch import helpers as es_helpers
 from packaging.version import Version
-from sqlalchemy.orm import subqueryload
 
-from h import models, presenters
+from h import models
+from h.util.datetime import utc_iso8601
+from h.util.uri import build_scope_key
+from h.util.user import split_user
 
 log = logging.getLogger(__name__)
 
@@ -40,7 +43,9 @@ class BatchIndexer:
         :returns: a set of errored ids
         :rtype: set
         """
-        annotations = _filtered_annotations(session=self.session, ids=annotation_ids)
+        annotations = _annotation_rows(
+            self.session, models.Annotation.id.in_(annotation_ids)
+        )
 
         # Report indexing status as we go
         annotations = _log_status(annotations, log_every=windowsize)
@@ -50,19 +55,55 @@ class BatchIndexer:
             annotations,
             chunk_size=2500,
             raise_on_error=False,
-            expand_action_callback=self._prepare,
+            expand_action_callback=self._action_callback(),
         )
         errored = set()
         for ok, item in indexing:
-            if not ok:
-                status = item[self.op_type]
+            if self._failed(ok, item):
+                errored.add(item[self.op_type]["_id"])
+        return errored
 
-                was_doc_exists_err = "document already exists" in status["error"]
-                if self.op_type == "create" and was_doc_exists_err:
-                    continue
+    def index_updated_between(
+        self, start=None, end=None, thread_count=2, chunk_size=500
+    ) -> tuple[int, set]:
+        """
+        Index the annotations last updated from `start` up to (not including) `end`.
 
-                errored.add(status["_id"])
-        return errored
+        The bulk requests are sent from a pool of `thread_count` threads, so
+        presenting one chunk of annotations overlaps with sending the last.
+
+        :param start: Index annotations updated at or after this time, or
+            from the beginning if `None`
+        :param end: Index annotations updated before this time, or up to the
+            present if `None`
+        :param thread_count: Number of bulk requests to send at once
+        :param chunk_size: Number of annotations to send in each request
+
+        :returns: the number of annotations indexed and a set of errored ids
+        """
+        criteria = []
+        if start is not None:
+            criteria.append(models.Annotation.updated >= start)
+        if end is not None:
+            criteria.append(models.Annotation.updated < end)
+
+        indexing = es_helpers.parallel_bulk(
+            self.es_client.conn,
+            _annotation_rows(self.session, *criteria),
+            thread_count=thread_count,
+            chunk_size=chunk_size,
+            raise_on_error=False,
+            expand_action_callback=self._action_callback(),
+        )
+
+        indexed, errored = 0, set()
+        for ok, item in indexing:
+            if self._failed(ok, item):
+                errored.add(item[self.op_type]["_id"])
+            else:
+                indexed += 1
+
+        return indexed, errored
 
     def delete(self, annotation_ids: list[str]) -> None:
         """Delete `annotation_ids` from Elasticsearch."""
@@ -108,34 +149,134 @@ class BatchIndexer:
             # Elasticsearch).
             pass
 
-    def _prepare(self, annotation):
+    def _failed(self, ok, item):
+        """Return True if a bulk result is a failure we care about."""
+        if ok:
+            return False
+
+        # Annotations which are already there are fine when creating them
+        was_doc_exists_err = "document already exists" in item[self.op_type]["error"]
+        return not (self.op_type == "create" and was_doc_exists_err)
+
+    def _action_callback(self):
+        """Return a function turning annotation rows into bulk actions."""
+        # Look up all the NIPSA'd users once, rather than once per annotation
+        flagged_userids = self.request.find_service(
+            name="nipsa"
+        ).fetch_all_flagged_userids()
+
+        return partial(self._prepare, flagged_userids=flagged_userids)
+
+    def _prepare(self, row, flagged_userids):
         operation = {
             "_index": self._target_index,
-            "_id": annotation.id,
+            "_id": row.id,
         }
         if self._include_mapping_type():  # pragma: no cover
             operation["_type"] = self.es_client.mapping_type
 
-        data = presenters.AnnotationSearchIndexPresenter(
-            annotation, self.request
-        ).asdict()
-
-        return {self.op_type: operation}, data
+        return {self.op_type: operation}, present_row(row, flagged_userids)
 
     def _include_mapping_type(self):
         """Return True if the `_type` field should be included in request payloads."""
         return self.es_client.server_version < Version("7.0.0")
 
 
-def _filtered_annotations(session, ids):
-    annotations = (
-        _eager_loaded_annotations(session)
-        .execution_options(stream_results=True)
-        .filter(_annotation_filter())
-        .filter(models.Annotation.id.in_(ids))
+def present_row(row, flagged_userids):
+    """
+    Return the search index body for a row from `_annotation_rows()`.
+
+    This gives the same result as `AnnotationSearchIndexPresenter`, without
+    needing to load `Annotation` and `Document` objects.
+
+    :param row: A row from `_annotation_rows()`
+    :param flagged_userids: The userids of all NIPSA'd users
+    """
+    tags = row.tags or []
+
+    target = {"source": row.target_uri}
+    if row.target_description is not None:
+        target["description"] = row.target_description
+    if row.target_selectors:
+        target["selector"] = row.target_selectors
+    target["scope"] = [build_scope_key(row.target_uri_normalized, row.version)]
+
+    document = {}
+    if row.title:
+        document["title"] = [row.title]
+    if row.web_uri:
+        document["web_uri"] = row.web_uri
+
+    body = {
+        "authority": split_user(row.userid)["domain"],
+        "id": row.id,
+        "created": utc_iso8601(row.created),
+        "updated": utc_iso8601(row.updated),
+        "user": row.userid,
+        "user_raw": row.userid,
+        "uri": row.target_uri,
+        "text": row.text or "",
+        "tags": tags,
+        "tags_raw": tags,
+        "group": row.groupid,
+        "shared": row.shared,
+        "target": [target],
+        "document": document,
+        "thread_ids": row.thread_ids or [],
+        "hidden": bool(
+            row.moderation_status
+            and row.moderation_status != models.ModerationStatus.APPROVED
+        ),
+    }
+
+    if row.references:
+        body["references"] = row.references
+
+    if row.userid in flagged_userids:
+        body["nipsa"] = True
+
+    return body
+
+
+def _annotation_rows(session, *criteria):
+    """
+    Stream the columns needed to index the non-deleted annotations matching `criteria`.
+
+    The document's fields and the ids of the annotation's replies are joined
+    in by the query, so no ORM objects are built.
+    """
+    reply = sa.orm.aliased(models.Annotation)
+    thread_ids = (
+        sa.select(sa.func.array_agg(reply.id))
+        .where(reply.references[0] == models.Annotation.id)
+        .scalar_subquery()
     )
 
-    yield from annotations
+    return session.execute(
+        sa.select(
+            models.Annotation.id,
+            models.Annotation.created,
+            models.Annotation.updated,
+            models.Annotation.userid,
+            models.Annotation.groupid,
+            models.Annotation.text,
+            models.Annotation.tags,
+            models.Annotation.shared,
+            models.Annotation.target_uri,
+            models.Annotation.target_uri_normalized,
+            models.Annotation.target_selectors,
+            models.Annotation.target_description,
+            models.Annotation.references,
+            models.Annotation.moderation_status,
+            models.Annotation.version,
+            models.Document.title,
+            models.Document.web_uri,
+            thread_ids.label("thread_ids"),
+        )
+        .join(models.Document, models.Document.id == models.Annotation.document_id)
+        .where(_annotation_filter(), *criteria)
+        .execution_options(yield_per=PG_WINDOW_SIZE)
+    )
 
 
 def _annotation_filter():
@@ -143,16 +284,6 @@ def _annotation_filter():
     return sa.not_(models.Annotation.deleted)
 
 
-def _eager_loaded_annotations(session):
-    return session.query(models.Annotation).options(
-        subqueryload(models.Annotation.document).subqueryload(
-            models.Document.document_uris
-        ),
-        subqueryload(models.Annotation.document).subqueryload(models.Document.meta),
-        subqueryload(models.Annotation.thread).load_only(models.Annotation.id),
-    )
-
-
 def _log_status(stream, log_every=1000):
     i = 0
     then = time.time()
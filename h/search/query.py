@@ -1,3 +1,7 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 
 from dateutil.parser import parse
@@ -5,9 +9,9 @@ from elasticsearch_dsl import Q
 from elasticsearch_dsl.query import SimpleQueryString
 
 from h import storage
-from h.models import Group, User
+from h.models import Group
 from h.search.util import add_default_scheme, wildcard_uri_is_valid
-from h.security import Identity, Permission, identity_permits
+from h.security import Identity, Permission
 from h.services.checkpoint import CheckpointService
 from h.traversal import GroupContext
 from h.util import uri
@@ -18,6 +22,17 @@ LIMIT_DEFAULT = 20
 LIMIT_MAX = 200
 OFFSET_MAX = 9800
 DEFAULT_DATE = datetime(1970, 1, 1, 0, 0, 0, 0, tzinfo=UTC)
+SORT_FIELDS = ("created", "updated", "group", "id", "user")
+"""The fields annotations can be sorted by."""
+SORT_VALUE_TYPES = {
+    "created": int,
+    "updated": int,
+    "group": str,
+    "id": str,
+    "user": str,
+}
+"""The type of Elasticsearch's sort values for each of `SORT_FIELDS`."""
+SORT_ORDERS = ("asc", "desc")
 
 
 def popall(multidict, key):
@@ -154,6 +169,115 @@ class Sorter:
         return None
 
 
+class ExpiredCursorError(Exception):
+    """The point in time a `Cursor` was searching has expired."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    A position in a set of search results being paged through.
+
+    Cursors are handed to API clients as opaque strings (see `encode()`). They
+    hold the id of the Elasticsearch point in time (PIT) being searched, what
+    the results are sorted by and the sort values of the last result returned.
+    Cursors used internally can leave out the PIT to search the index itself.
+    """
+
+    pit_id: str | None
+    sort: str = "updated"
+    order: str = "desc"
+    after: list | None = None
+    """The sort values of the last result returned, or `None` on the first page."""
+
+    def next(self, pit_id, after):
+        """Return a cursor for the page after the one ending at `after`."""
+        return replace(self, pit_id=pit_id, after=after)
+
+    def encode(self):
+        """Return this cursor as an opaque, URL safe string."""
+        return base64.urlsafe_b64encode(
+            json.dumps(
+                [self.pit_id, self.sort, self.order, self.after],
+                separators=(",", ":"),
+            ).encode()
+        ).decode()
+
+    @classmethod
+    def decode(cls, value):
+        """
+        Return a cursor from a string returned by `encode()`.
+
+        :raises ValueError: If `value` isn't a valid cursor
+        """
+        try:
+            pit_id, sort, order, after = json.loads(base64.urlsafe_b64decode(value))
+        except (binascii.Error, TypeError, ValueError) as err:
+            raise ValueError("Invalid cursor") from err  # noqa: EM101, TRY003
+
+        if not (
+            isinstance(pit_id, str)
+            and sort in SORT_FIELDS
+            and order in SORT_ORDERS
+            and cls._is_after(sort, after)
+        ):
+            raise ValueError("Invalid cursor")  # noqa: EM101, TRY003
+
+        return cls(pit_id=pit_id, sort=sort, order=order, after=after)
+
+    @staticmethod
+    def _is_after(sort, after):
+        """Return whether `after` is a value of the `sort` field and an id."""
+        if not isinstance(after, list) or len(after) != 2:
+            return False
+
+        return all(
+            # `bool` is a subclass of `int` but never a sort value
+            isinstance(value, type_) and not isinstance(value, bool)
+            for value, type_ in zip(after, (SORT_VALUE_TYPES[sort], str), strict=True)
+        )
+
+
+class CursorSorter:
+    """
+    Sorts and returns annotations after a cursor.
+
+    This takes the place of `Sorter` when paging through results with a
+    `Cursor`. The search is made against the cursor's point in time (if it
+    has one) rather than the index, and sorted by the cursor's field with the
+    annotation id to break ties, so each page starts exactly where the last
+    one ended no matter how deep into the results it is.
+    """
+
+    KEEP_ALIVE = "1m"
+    """How long the point in time is kept open between pages."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __call__(self, search, params):
+        for key in ("sort", "order", "search_after"):
+            params.pop(key, None)
+
+        sort_by = self.cursor.sort
+        # Sorting must be done on non-analyzed fields.
+        if sort_by == "user":
+            sort_by = "user_raw"
+
+        if self.cursor.pit_id:
+            # Searches against a point in time mustn't name an index
+            search = search.index().extra(
+                pit={"id": self.cursor.pit_id, "keep_alive": self.KEEP_ALIVE}
+            )
+        if self.cursor.after:
+            search = search.extra(search_after=self.cursor.after)
+
+        return search.sort(
+            {sort_by: {"order": self.cursor.order, "unmapped_type": "boolean"}},
+            {"id": {"order": self.cursor.order}},
+        )
+
+
 class TopLevelAnnotationsFilter:
     """Matches top-level annotations only, filters out replies."""
 
@@ -161,6 +285,21 @@ class TopLevelAnnotationsFilter:
         return search.exclude("exists", field="references")
 
 
+class TotalHitsLimit:
+    """
+    Only count matching annotations up to a limit.
+
+    Counting every match can be slow for popular searches. With this the total
+    is exact up to `limit`, and just `limit` (as a lower bound) beyond that.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def __call__(self, search, _):
+        return search.extra(track_total_hits=self.limit)
+
+
 class AuthorityFilter:
     """Match annotations created by users belonging to a specific authority."""
 
@@ -215,13 +354,13 @@ class GroupAndModerationFilter:
     def __init__(self, request):
         self.user = request.user
         self.group_service = request.find_service(name="group")
+        self.permits_cache = request.permits_cache
 
-    @staticmethod
-    def _is_moderator(user: User, group: Group) -> bool:
-        return identity_permits(
-            identity=Identity.from_models(user=user),
-            context=GroupContext(group),
-            permission=Permission.Group.MODERATE,
+    def _is_moderator(self, identity: Identity, group: Group) -> bool:
+        return bool(
+            self.permits_cache.identity_permits(
+                identity, GroupContext(group), Permission.Group.MODERATE
+            )
         )
 
     def __call__(self, search, params):
@@ -245,12 +384,15 @@ class GroupAndModerationFilter:
             )
 
         user_annotations = Q("term", user=self.user.userid.lower())
+        # Building an identity looks at all the user's memberships, so we do
+        # it once rather than for every group
+        identity = Identity.from_models(user=self.user)
         query_clauses = []
         # If the user is logged in and we are filtering by groups
         # we'll check for each group if we are a moderator
         for group in user_readable_groups:
             group_annotations = Q("term", group=group.pubid)
-            if self._is_moderator(self.user, group):
+            if self._is_moderator(identity, group):
                 # We don't filter out hidden annotations for moderators
                 query_clauses.append(group_annotations)
 
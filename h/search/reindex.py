@@ -0,0 +1,257 @@
+"""
+Reindex all annotations into a new search index.
+
+The annotations are split into slices by when they were last updated, which
+are indexed in parallel by a pool of processes. Progress is saved after each
+slice so an interrupted reindex can be resumed.
+"""
+
+import json
+import logging
+import multiprocessing
+import time
+
+import sqlalchemy as sa
+from dateutil.parser import isoparse
+
+from h import models
+from h.search import config
+from h.search.index import BatchIndexer
+from h.services.search_index import SearchIndexService
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_SETTING_KEY = "reindex.checkpoint"
+"""The DB setting that stores the progress of a reindex, to allow resuming it."""
+
+BULK_INDEXING_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+"""Index settings which speed up filling a new index, used until it's done."""
+
+
+def reindex(  # noqa: PLR0913
+    request, bootstrap, *, processes=4, slice_count=64, chunk_size=500, resume=False
+):
+    """
+    Reindex all annotations into a new index and point the alias at it.
+
+    While this runs, annotations changed by the app are written to both the
+    current and the new index (see `SearchIndexService`). The old index is
+    left in place once the alias has moved.
+
+    Annotations which fail to index are retried once all the slices are
+    done. Any which still fail are saved with the progress, so resuming
+    retries them again, and the alias isn't moved until there are none.
+
+    :param request: A bootstrapped request
+    :param bootstrap: A picklable function returning a bootstrapped request,
+        called once in each worker process
+    :param processes: Number of slices to index at once
+    :param slice_count: Number of slices to split the annotations into
+    :param chunk_size: Number of annotations to send in each bulk request
+    :param resume: Carry on with a previous reindex which didn't finish,
+        rather than starting a new one
+    :raise RuntimeError: If the index isn't aliased, if asked to resume
+        and there's nothing to resume, or if some annotations couldn't be
+        indexed
+    """
+    settings = request.find_service(name="settings")
+
+    current_index = config.get_aliased_index(request.es)
+    if current_index is None:
+        raise RuntimeError("Cannot reindex if the index is not aliased")  # noqa: EM101, TRY003
+
+    if resume:
+        checkpoint = settings.get(CHECKPOINT_SETTING_KEY)
+        if checkpoint is None:
+            raise RuntimeError("There is no reindex to resume")  # noqa: EM101, TRY003
+        checkpoint = json.loads(checkpoint)
+        checkpoint.setdefault("errored", [])
+    else:
+        checkpoint = _start(request, settings, slice_count)
+
+    new_index = checkpoint["index"]
+    slices = [
+        (number, start, end)
+        for number, (start, end) in enumerate(checkpoint["slices"])
+        if number not in checkpoint["done"]
+    ]
+    log.info(
+        "Reindexing %d of %d slices into %s",
+        len(slices),
+        len(checkpoint["slices"]),
+        new_index,
+    )
+
+    with multiprocessing.get_context("spawn").Pool(
+        processes, initializer=_init_worker, initargs=(bootstrap,)
+    ) as pool:
+        results = pool.imap_unordered(
+            _index_slice,
+            [
+                (new_index, number, start, end, chunk_size)
+                for number, start, end in slices
+            ],
+        )
+        for number, indexed, errored, seconds in results:
+            log.info(
+                "Slice %d/%d: indexed %d annotations in %.1fs (%.0f docs/s)",
+                number + 1,
+                len(checkpoint["slices"]),
+                indexed,
+                seconds,
+                indexed / seconds if seconds else 0,
+            )
+
+            checkpoint["done"].append(number)
+            checkpoint["errored"].extend(sorted(errored))
+            _save(request, settings, checkpoint)
+
+    if checkpoint["errored"]:
+        _retry_errored(request, settings, checkpoint)
+
+    _finish(request, settings, checkpoint)
+    log.info("Finished reindexing. The old index %s can be deleted.", current_index)
+
+
+def annotation_slices(session, count):
+    """
+    Split the annotations into ranges of `updated` times of similar sizes.
+
+    :returns: a list of `(start, end)` tuples, where the first start and the
+        last end are `None` and each end is the start of the next
+    """
+    fractions = [number / count for number in range(1, count)]
+    boundaries = []
+    if fractions:
+        boundaries = session.execute(
+            sa.select(
+                sa.func.percentile_disc(
+                    sa.literal(fractions, sa.ARRAY(sa.Float))
+                ).within_group(models.Annotation.updated)
+            )
+        ).scalar()
+
+    # Small or empty tables can produce duplicate (or no) boundaries
+    boundaries = sorted({boundary for boundary in boundaries or () if boundary})
+
+    return list(zip([None, *boundaries], [*boundaries, None], strict=True))
+
+
+def _start(request, settings, slice_count):
+    """Create the new index and save the plan for filling it."""
+    new_index = config.configure_index(request.es)
+    log.info("Created new index %s", new_index)
+
+    index_settings = request.es.conn.indices.get_settings(index=new_index)[new_index][
+        "settings"
+    ]["index"]
+    request.es.conn.indices.put_settings(
+        index=new_index, body={"index": BULK_INDEXING_SETTINGS}
+    )
+
+    checkpoint = {
+        "index": new_index,
+        "slices": [
+            [start.isoformat() if start else None, end.isoformat() if end else None]
+            for start, end in annotation_slices(request.db, slice_count)
+        ],
+        "done": [],
+        # The ids of annotations which failed to index
+        "errored": [],
+        # The settings to put back when we're done
+        "index_settings": {
+            key: index_settings.get(key, default)
+            for key, default in (("refresh_interval", "1s"), ("number_of_replicas", 1))
+        },
+    }
+
+    # Changes made while we're reindexing should go to the new index too
+    settings.put(SearchIndexService.REINDEX_SETTING_KEY, new_index)
+    _save(request, settings, checkpoint)
+
+    return checkpoint
+
+
+def _retry_errored(request, settings, checkpoint):
+    """
+    Try indexing the annotations which failed again.
+
+    :raise RuntimeError: If some of them still fail
+    """
+    log.info("Retrying %d annotations which failed", len(checkpoint["errored"]))
+
+    indexer = BatchIndexer(
+        request.db,
+        request.es,
+        request,
+        target_index=checkpoint["index"],
+        op_type="create",
+    )
+    checkpoint["errored"] = sorted(indexer.index(checkpoint["errored"]))
+    _save(request, settings, checkpoint)
+
+    if checkpoint["errored"]:
+        log.warning(
+            "Failed to index %d annotations: %s",
+            len(checkpoint["errored"]),
+            checkpoint["errored"],
+        )
+        raise RuntimeError(  # noqa: TRY003
+            f"Failed to index {len(checkpoint['errored'])} annotations, "  # noqa: EM102
+            "run again with --resume to retry them"
+        )
+
+
+def _save(request, settings, checkpoint):
+    """Save the progress of the reindex."""
+    settings.put(CHECKPOINT_SETTING_KEY, json.dumps(checkpoint))
+    request.tm.commit()
+
+
+def _finish(request, settings, checkpoint):
+    """Make the new index ready for searching and point the alias at it."""
+    new_index = checkpoint["index"]
+
+    request.es.conn.indices.put_settings(
+        index=new_index, body={"index": checkpoint["index_settings"]}
+    )
+    request.es.conn.indices.refresh(index=new_index)
+
+    log.info("Making new index %s current", new_index)
+    config.update_aliased_index(request.es, new_index)
+
+    settings.delete(SearchIndexService.REINDEX_SETTING_KEY)
+    settings.delete(CHECKPOINT_SETTING_KEY)
+    request.tm.commit()
+
+
+_worker_request = None
+"""The bootstrapped request for this worker process."""
+
+
+def _init_worker(bootstrap):  # pragma: no cover
+    global _worker_request  # noqa: PLW0603
+    _worker_request = bootstrap()
+
+
+def _index_slice(args):
+    """Index one slice of annotations, in a worker process."""
+    new_index, number, start, end, chunk_size = args
+    started_at = time.monotonic()
+
+    indexer = BatchIndexer(
+        _worker_request.db,
+        _worker_request.es,
+        _worker_request,
+        target_index=new_index,
+        # Don't overwrite anything the app has written to the new index
+        op_type="create",
+    )
+    indexed, errored = indexer.index_updated_between(
+        start=isoparse(start) if start else None,
+        end=isoparse(end) if end else None,
+        chunk_size=chunk_size,
+    )
+    _worker_request.tm.commit()
+
+    return number, indexed, errored, time.monotonic() - started_at
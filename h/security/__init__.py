@@ -9,7 +9,7 @@ from h.security.encryption import (
 )
 from h.security.identity import Identity
 from h.security.permissions import Permission
-from h.security.permits import identity_permits
+from h.security.permits import PermitsCache, identity_permits
 from h.security.policy import StreamerPolicy, TopLevelPolicy
 
 log = logging.getLogger(__name__)
@@ -10,12 +10,15 @@ at least one sub-list:
 
 * Every predicate function included evaluates to True
 * Every permission included would also be granted (by recursing)
+
+The recursion is done once, when this module is loaded, by replacing each
+included permission with its own clauses.
 """
 
 import h.security.predicates as p
 from h.models import GroupMembershipRoles
 from h.security.permissions import Permission
-from h.security.predicates import resolve_predicates
+from h.security.predicates import flatten_permissions, resolve_predicates
 
 # The logic for who is allowed to moderate annotations in a group unfortunately
 # has to be duplicated in the PERMISSION_MAP below and elsewhere when sending
@@ -114,3 +117,7 @@ PERMISSION_MAP = {
 # This turns the abstract predicates above into lists which include all of
 # their parents in the correct order to evaluate them.
 PERMISSION_MAP = resolve_predicates(PERMISSION_MAP)
+
+# Finally we replace the permissions used inside clauses with the clauses they
+# stand for, so checking a permission is just a matter of calling predicates.
+PERMISSION_MAP = flatten_permissions(PERMISSION_MAP)
@@ -1,3 +1,5 @@
+from dataclasses import fields, is_dataclass
+
 from pyramid.security import Allowed, Denied
 
 from h.security.identity import Identity
@@ -17,24 +19,114 @@ def identity_permits(
     :param context: Context object representing the objects acted upon
     :param permission: Permission requested
     """
-    if clauses := PERMISSION_MAP.get(permission):  # noqa: SIM102
-        # Grant the permissions if for *any* single clause...
-        if any(
-            # .. *all* elements in it are true
-            all(_predicate_true(predicate, identity, context) for predicate in clause)
-            for clause in clauses
-        ):
+    # The same predicate can appear in many clauses, so we only call it once
+    results = {}
+
+    def predicate_true(predicate):
+        if predicate not in results:
+            results[predicate] = predicate(identity, context)
+        return results[predicate]
+
+    # Grant the permissions if for *any* single clause *all* predicates in it
+    # are true. Permissions in clauses have already been replaced with their
+    # own clauses (see `h.security.permission_map`).
+    for clause in PERMISSION_MAP.get(permission, ()):
+        if all(predicate_true(predicate) for predicate in clause):
             return Allowed("Allowed")
 
     return Denied("Denied")
 
 
-def _predicate_true(predicate, identity, context):
-    """Check whether a predicate is true."""
-    try:
-        return predicate(identity, context)
+class PermitsCache:
+    """
+    A memo of permission checks for when the same check is made many times.
+
+    Results are remembered by who is asking (see `_identity_key()`), the kind
+    of context and the objects it's about, and the permission. This assumes
+    the objects don't change in ways which matter while the cache is in use,
+    so it should only live as long as a request (or message).
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._identity_keys = {}
+        self.evaluations = 0
+        """The number of checks which were actually worked out."""
+        self.hits = 0
+        """The number of checks answered from the cache."""
+
+    def identity_permits(
+        self, identity: Identity | None, context, permission, context_key=None
+    ) -> Allowed | Denied:
+        """
+        Check permission like `identity_permits()` but remember the result.
+
+        :param context_key: The things about `context` the check depends on,
+            for callers which know better than the objects it's about
+        """
+        if context_key is None:
+            context_key = self._context_key(context)
+            if context_key is None:
+                self.evaluations += 1
+                return identity_permits(identity, context, permission)
+        else:
+            context_key = (type(context), *context_key)
+
+        key = (self._identity_key(identity), context_key, permission)
+        if (cached := self._results.get(key)) is not None:
+            self.hits += 1
+            return cached[-1]
+
+        self.evaluations += 1
+        result = identity_permits(identity, context, permission)
+        # Keep the objects we're keyed by the `id()` of, so they can't be
+        # garbage collected and have their ids reused by something else
+        self._results[key] = (context, result)
+        return result
+
+    def _identity_key(self, identity: Identity | None):
+        """
+        Get a key for what an identity's permissions depend on.
+
+        Different identities for the same user (like two of their sockets)
+        get the same key. Working it out looks at all of the user's
+        memberships, so it's only done once for each identity object.
+        """
+        if identity is None:
+            return None
+
+        if (cached := self._identity_keys.get(id(identity))) is not None:
+            return cached[-1]
+
+        user, auth_client = identity.user, identity.auth_client
+        key = (
+            user
+            and (
+                user.userid,
+                user.authority,
+                user.staff,
+                user.admin,
+                frozenset(
+                    (membership.group.id, frozenset(membership.roles))
+                    for membership in user.memberships
+                ),
+            ),
+            auth_client and (auth_client.id, auth_client.authority),
+        )
+        self._identity_keys[id(identity)] = (identity, key)
+        return key
+
+    @staticmethod
+    def _context_key(context):
+        """Get a key for the kind of context and the objects it's about."""
+        if context is None:
+            return (None,)
+
+        # Contexts are dataclasses holding the objects they're about
+        if not is_dataclass(context):
+            return None
 
-    # If the "predicate" isn't callable, we'll assume it's a permission
-    # and work out if we have that permission
-    except TypeError:
-        return identity_permits(identity, context, predicate)
+        return (
+            type(context),
+            *(id(getattr(context, field.name)) for field in fields(context)),
+        )
@@ -311,3 +311,45 @@ def _expand_predicate(predicate, seen_before):
     if predicate not in seen_before:
         seen_before.add(predicate)
         yield predicate
+
+
+def flatten_permissions(mapping):
+    """
+    Replace permissions inside clauses with the clauses for those permissions.
+
+    This takes a permission map where clauses can include other permissions
+    (like `Permission.Group.READ`) and converts each such clause into one
+    clause for every way of being granted the included permission. The result
+    only contains predicates, so checking a permission never has to look up
+    another one.
+    """
+
+    return {key: _flatten_clauses(clauses, mapping) for key, clauses in mapping.items()}
+
+
+def _flatten_clauses(clauses, mapping):
+    """Get the predicate only clauses equivalent to some clauses without dupes."""
+
+    flattened = []
+    for clause in clauses:
+        for flat_clause in _flatten_clause(list(clause), mapping):
+            if flat_clause not in flattened:
+                flattened.append(flat_clause)
+
+    return flattened
+
+
+def _flatten_clause(clause, mapping):
+    """Generate the predicate only clauses equivalent to a clause."""
+
+    for position, item in enumerate(clause):
+        if item in mapping:
+            # Put each of the clauses for this permission in its place
+            for nested in _flatten_clauses(mapping[item], mapping):
+                yield from _flatten_clause(
+                    clause[:position] + nested + clause[position + 1 :], mapping
+                )
+            return
+
+    # Splicing in other clauses can repeat predicates we already check
+    yield list(dict.fromkeys(clause))
@@ -1,3 +1,8 @@
+import newrelic.agent
+
+from h.security.permits import PermitsCache
+
+
 def default_authority(request):
     """
     Return the value of the h.authority config settings.
@@ -24,7 +29,30 @@ def effective_authority(request):
     return request.default_authority
 
 
+def permits_cache(request):
+    """
+    Return a `PermitsCache` for the rest of the request.
+
+    Presenting and searching annotations makes the same permission checks
+    many times, so they share this. How many checks it saved is recorded in
+    New Relic once the request has finished.
+    """
+    cache = PermitsCache()
+
+    @request.add_finished_callback
+    def record_metrics(_request):
+        newrelic.agent.record_custom_metrics(
+            [
+                ("Custom/PermitsCache/Evaluations", cache.evaluations),
+                ("Custom/PermitsCache/Hits", cache.hits),
+            ]
+        )
+
+    return cache
+
+
 def includeme(config):  # pragma: no cover
     # Allow retrieval of the authority from the request object.
     config.add_request_method(default_authority, reify=True)
     config.add_request_method(effective_authority, reify=True)
+    config.add_request_method(permits_cache, reify=True)
@@ -19,6 +19,7 @@ from h.services.jwt import JWTService
 from h.services.mention import MentionService
 from h.services.notification import NotificationService
 from h.services.oidc import OIDCService
+from h.services.public_annotation_count import PublicAnnotationCountService
 from h.services.subscription import SubscriptionService
 from h.services.task_done import TaskDoneService
 from h.services.user import UserService
@@ -63,6 +64,10 @@ def includeme(config):  # pragma: no cover  # noqa: PLR0915
         "h.services.annotation_authority_queue.factory",
         iface=AnnotationAuthorityQueueService,
     )
+    config.register_service_factory(
+        "h.services.public_annotation_count.factory",
+        iface=PublicAnnotationCountService,
+    )
 
     # Other services
     config.register_service_factory(
@@ -7,6 +7,7 @@ from h.events import AnnotationEvent
 from h.models import Annotation
 from h.services.annotation_write import AnnotationWriteService
 from h.services.job_queue import JobQueueService
+from h.services.public_annotation_count import PublicAnnotationCountService
 
 
 class AnnotationDeleteService:
@@ -15,10 +16,12 @@ class AnnotationDeleteService:
         request: Request,
         annotation_write: AnnotationWriteService,
         job_queue: JobQueueService,
+        public_annotation_count: PublicAnnotationCountService,
     ):
         self.request = request
         self.annotation_write = annotation_write
         self.job_queue = job_queue
+        self.public_annotation_count = public_annotation_count
 
     def delete(self, annotation):
         """
@@ -27,8 +30,10 @@ class AnnotationDeleteService:
         :param annotation: the annotation to be deleted
         :type annotation: h.models.Annotation
         """
+        count_scope = self.public_annotation_count.scope(annotation)
         annotation.updated = datetime.utcnow()  # noqa: DTZ003
         annotation.deleted = True
+        self.public_annotation_count.update(count_scope, None)
         self.job_queue.add_by_id(
             name="sync_annotation",
             annotation_id=annotation.id,
@@ -82,4 +87,5 @@ def annotation_delete_service_factory(_context, request):
         request,
         request.find_service(AnnotationWriteService),
         request.find_service(name="queue_service"),
+        request.find_service(PublicAnnotationCountService),
     )
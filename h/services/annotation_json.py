@@ -5,7 +5,7 @@ from pyramid.request import Request
 from h.models import Annotation, ModerationStatus, User
 from h.presenters import DocumentJSONPresenter
 from h.presenters.mention_json import MentionJSONPresenter
-from h.security import Identity, identity_permits
+from h.security import Identity, PermitsCache
 from h.security.permissions import Permission
 from h.services import MentionService
 from h.services.annotation_read import AnnotationReadService
@@ -17,6 +17,26 @@ from h.traversal import AnnotationContext
 from h.util.datetime import utc_iso8601
 
 
+class _Batch:
+    """
+    The parts of annotations' JSON shared between the annotations in a response.
+
+    When presenting many annotations to the same user, many of them will be in
+    the same groups, on the same documents, by the same authors and mention
+    the same users. This stores the JSON (or the author) for each of those,
+    so they only have to be worked out once.
+
+    Each annotation gets its own copy of the shared JSON, so changing one
+    presented annotation doesn't change the others.
+    """
+
+    def __init__(self, user: User | None):
+        self.identity = Identity.from_models(user=user)
+        self.documents: dict[int | None, dict] = {}
+        self.mentions: dict[tuple[int, str], dict] = {}
+        self.users: dict[str, User | None] = {}
+
+
 class AnnotationJSONService:
     """A service for generating API compatible JSON for annotations."""
 
@@ -27,6 +47,7 @@ class AnnotationJSONService:
         flag_service: FlagService,
         user_service: UserService,
         mention_service: MentionService,
+        permits_cache: PermitsCache,
         request: Request,
     ):
         """
@@ -37,6 +58,7 @@ class AnnotationJSONService:
         :param flag_service: FlagService instance
         :param user_service: UserService instance
         :param mention_service: MentionService instance
+        :param permits_cache: The request's PermitsCache
         :param request: The current request
         """
         self._annotation_read_service = annotation_read_service
@@ -44,6 +66,7 @@ class AnnotationJSONService:
         self._flag_service = flag_service
         self._user_service = user_service
         self._mention_service = mention_service
+        self._permits_cache = permits_cache
         self._request = request
 
     def present(
@@ -62,7 +85,11 @@ class AnnotationJSONService:
         :param user: User that the annotation is being presented to, if any
         :return: A dict suitable for JSON serialisation
         """
-        model: dict = deepcopy(annotation.extra) or {}
+        return self._present(annotation, user, with_metadata, _Batch(user))
+
+    def _present(self, annotation, user, with_metadata, batch: _Batch):
+        # Only the top level is changed, so we don't need to copy any deeper
+        model: dict = dict(annotation.extra or {})
 
         model.update(
             {
@@ -85,18 +112,16 @@ class AnnotationJSONService:
                     "delete": [annotation.userid],
                 },
                 "target": annotation.target,
-                "document": DocumentJSONPresenter(annotation.document).asdict(),
+                "document": self._present_document(annotation.document, batch),
                 "links": self._links_service.get_all(annotation),
                 "actions": [],
             }
         )
 
-        author = self._user_service.fetch(annotation.userid)
         model["mentions"] = [
-            MentionJSONPresenter(mention, self._request).asdict()
-            for mention in annotation.mentions
+            self._present_mention(mention, batch) for mention in annotation.mentions
         ]
-        model.update(user_info(author))
+        model.update(self._present_user_info(annotation.userid, batch))
 
         if annotation.references:
             model["references"] = annotation.references
@@ -107,10 +132,8 @@ class AnnotationJSONService:
         # The flagged value depends on whether this particular user has flagged
         model["flagged"] = self._flag_service.flagged(user=user, annotation=annotation)
 
-        user_is_moderator = identity_permits(
-            identity=Identity.from_models(user=user),
-            context=AnnotationContext(annotation),
-            permission=Permission.Annotation.MODERATE,
+        user_is_moderator = self._permits(
+            batch.identity, annotation, Permission.Annotation.MODERATE
         )
         if user_is_moderator:
             # Only moderators see the full flag count
@@ -132,7 +155,9 @@ class AnnotationJSONService:
 
         return model
 
-    def present_all_for_user(self, annotation_ids, user: User):
+    def present_all_for_user(
+        self, annotation_ids, user: User, chunk_size: int | None = None
+    ):
         """
         Get the JSON presentation of many annotations for a particular user.
 
@@ -142,9 +167,24 @@ class AnnotationJSONService:
 
         :param annotation_ids: Annotation to present
         :param user: User that the annotation is being presented to
+        :param chunk_size: Load and present the annotations this many at a
+            time, to keep the queries for long lists of annotations bounded
         :return: A list of dicts suitable for JSON serialisation.
         """
-
+        batch = _Batch(user)
+        if chunk_size is None:
+            return self._present_all_for_user(annotation_ids, user, batch)
+
+        presented = []
+        for start in range(0, len(annotation_ids), chunk_size):
+            presented.extend(
+                self._present_all_for_user(
+                    annotation_ids[start : start + chunk_size], user, batch
+                )
+            )
+        return presented
+
+    def _present_all_for_user(self, annotation_ids, user: User, batch: _Batch):
         # This primes the cache for `flagged()` and `flag_count()`
         self._flag_service.all_flagged(user, annotation_ids)
         self._flag_service.flag_counts(annotation_ids)
@@ -166,20 +206,59 @@ class AnnotationJSONService:
         # Optimise the user service `fetch()` call
         self._user_service.fetch_all([annotation.userid for annotation in annotations])
 
-        return [self.present(annotation, user) for annotation in annotations]
+        return [
+            self._present(annotation, user, with_metadata=False, batch=batch)
+            for annotation in annotations
+        ]
+
+    def _present_document(self, document, batch: _Batch):
+        key = document.id if document else None
+        if key not in batch.documents:
+            batch.documents[key] = DocumentJSONPresenter(document).asdict()
+
+        return deepcopy(batch.documents[key])
+
+    def _present_mention(self, mention, batch: _Batch):
+        key = (mention.user.id, mention.username)
+        if key not in batch.mentions:
+            batch.mentions[key] = MentionJSONPresenter(mention, self._request).asdict()
+
+        # The values are all strings, so a shallow copy will do
+        return dict(batch.mentions[key])
+
+    def _present_user_info(self, userid, batch: _Batch):
+        if userid not in batch.users:
+            batch.users[userid] = self._user_service.fetch(userid)
+
+        return user_info(batch.users[userid])
+
+    def _permits(self, identity, annotation, permission) -> bool:
+        # These permissions depend only on who is asking, the annotation's
+        # group and the attributes below, so annotations which have them in
+        # common can share the results
+        return bool(
+            self._permits_cache.identity_permits(
+                identity,
+                AnnotationContext(annotation),
+                permission,
+                context_key=(
+                    annotation.groupid,
+                    annotation.deleted,
+                    annotation.shared,
+                    annotation.is_hidden,
+                ),
+            )
+        )
 
-    @classmethod
-    def _get_read_permission(cls, annotation):
+    def _get_read_permission(self, annotation):
         if not annotation.shared:
             # It's not shared so only the owner can read it
             return annotation.userid
 
         # If the annotation's group is the public group, or an unauthorized person could
         # read the annotation, then the annotation is world readable.
-        if annotation.groupid == "__world__" or identity_permits(
-            identity=None,
-            context=AnnotationContext(annotation),
-            permission=Permission.Annotation.READ,
+        if annotation.groupid == "__world__" or self._permits(
+            None, annotation, Permission.Annotation.READ
         ):
             return "group:__world__"
 
@@ -206,5 +285,6 @@ def factory(_context, request):
         flag_service=request.find_service(name="flag"),
         user_service=request.find_service(name="user"),
         mention_service=request.find_service(MentionService),
+        permits_cache=request.permits_cache,
         request=request,
     )
@@ -8,6 +8,7 @@ from h import links
 from h.events import AnnotationAction
 from h.models import Annotation, ModerationLog, ModerationStatus, Subscriptions, User
 from h.services.email import EmailData, EmailTag, TaskData
+from h.services.public_annotation_count import PublicAnnotationCountService
 from h.services.subscription import SubscriptionService
 from h.services.user import UserService
 from h.tasks import email
@@ -19,11 +20,13 @@ class AnnotationModerationService:
         session,
         user_service: UserService,
         subscription_service: SubscriptionService,
+        public_annotation_count_service: PublicAnnotationCountService,
         email_subaccount: str | None = None,
     ):
         self._session = session
         self._user_service = user_service
         self._subscription_service = subscription_service
+        self._public_annotation_count_service = public_annotation_count_service
         self._email_subaccount = email_subaccount
 
     def all_hidden(self, annotation_ids: str) -> set[str]:
@@ -48,6 +51,21 @@ class AnnotationModerationService:
         user: User | None = None,
     ) -> ModerationLog | None:
         """Set the moderation status for an annotation."""
+        count_scope = self._public_annotation_count_service.scope(annotation)
+        moderation_log = self._set_status(annotation, status, user)
+        self._public_annotation_count_service.update(
+            count_scope, self._public_annotation_count_service.scope(annotation)
+        )
+        return moderation_log
+
+    def _set_status(
+        self,
+        annotation: Annotation,
+        status: ModerationStatus | None,
+        user: User | None = None,
+    ) -> ModerationLog | None:
+        # `AnnotationWriteService` updates the public annotation counts itself
+        # when it changes the status, so this doesn't
         if status and status != annotation.moderation_status:
             moderation_log = ModerationLog(
                 annotation=annotation,
@@ -77,7 +95,7 @@ class AnnotationModerationService:
             # Set the default `APPROVED` status
             if action == "update":
                 # If the annotation was updated we want to record this in the moderation log
-                self.set_status(annotation, ModerationStatus.APPROVED)
+                self._set_status(annotation, ModerationStatus.APPROVED)
             else:
                 annotation.moderation_status = ModerationStatus.APPROVED
 
@@ -100,7 +118,7 @@ class AnnotationModerationService:
             if annotation.moderation_status == ModerationStatus.DENIED:
                 new_status = ModerationStatus.PENDING
 
-        self.set_status(annotation, new_status)
+        self._set_status(annotation, new_status)
 
     def queue_moderation_change_email(self, request, moderation_log_id: int) -> None:
         """Queue an email to be sent to the user about moderation changes on their annotations."""
@@ -223,6 +241,9 @@ def annotation_moderation_service_factory(_context, request):
         request.db,
         user_service=request.find_service(name="user"),
         subscription_service=request.find_service(SubscriptionService),
+        public_annotation_count_service=request.find_service(
+            PublicAnnotationCountService
+        ),
         email_subaccount=request.registry.settings.get(
             "mailchimp_user_actions_subaccount"
         ),
@@ -1,9 +1,10 @@
 from collections.abc import Iterable
 
-from sqlalchemy import Select, func, or_, select
+from sqlalchemy import Select, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session, subqueryload
 
-from h.db.types import InvalidUUID
+from h.db.types import InvalidUUID, URLSafeUUID
 from h.models import Annotation, ModerationStatus
 
 
@@ -25,7 +26,11 @@ class AnnotationReadService:
             return None
 
     def get_annotations_by_id(
-        self, ids: list[str], eager_load: list | None = None
+        self,
+        ids: list[str],
+        eager_load: list | None = None,
+        *,
+        order_in_sql: bool = False,
     ) -> Iterable[Annotation]:
         """
         Get annotations in the same order as the provided ids.
@@ -33,21 +38,29 @@ class AnnotationReadService:
         :param ids: the list of annotation ids
         :param eager_load: A list of annotation relationships to eager load
             like `Annotation.document`
+        :param order_in_sql: Have the database return the annotations in
+            order, rather than sorting them after they've been loaded
         """
 
         if not ids:
             return []
 
-        annotations = self._db.execute(
-            self.annotation_search_query(
-                ids=ids,
-                eager_load=eager_load,
-                include_deleted=True,
-                include_private=True,
+        query = self.annotation_search_query(
+            ids=ids,
+            eager_load=eager_load,
+            include_deleted=True,
+            include_private=True,
+        )
+
+        if order_in_sql:
+            query = query.order_by(
+                func.array_position(
+                    literal(list(ids), ARRAY(URLSafeUUID)), Annotation.id
+                )
             )
-        ).scalars()
+            return list(self._db.execute(query).scalars())
 
-        return sorted(annotations, key=lambda annotation: ids.index(annotation.id))
+        return _sort_by_ids(self._db.execute(query).scalars(), ids)
 
     @staticmethod
     def annotation_search_query(  # noqa: PLR0913
@@ -94,13 +107,30 @@ class AnnotationReadService:
         return query
 
     @staticmethod
-    def count_query(query: Select[tuple[Annotation]]) -> Select[tuple[int]]:
-        """Convert an annotations query into a count of annotations."""
+    def count_query(
+        query: Select[tuple[Annotation]], limit: int | None = None
+    ) -> Select[tuple[int]]:
+        """
+        Convert an annotations query into a count of annotations.
+
+        :param limit: Stop counting at this many annotations, which is much
+            quicker than counting them all when there are a lot
+        """
+        if limit is None:
+            return query.with_only_columns(func.count(Annotation.id))
+
+        return select(func.count()).select_from(
+            query.with_only_columns(Annotation.id).limit(limit).subquery()
+        )
+
 
-        return query.with_only_columns(func.count(Annotation.id))
+def _sort_by_ids(annotations, ids):
+    """Return `annotations` in the same order as `ids`, once each."""
+    by_id = {annotation.id: annotation for annotation in annotations}
+    return [by_id[id_] for id_ in dict.fromkeys(ids) if id_ in by_id]
 
 
 def service_factory(_context, request) -> AnnotationReadService:
     """Get an annotation service instance."""
 
-    return AnnotationReadService(db_session=request.db)
+    return AnnotationReadService(db_session=request.db_reader)
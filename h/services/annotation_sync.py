@@ -1,22 +1,42 @@
+import json
+import time
 from collections import defaultdict
+from datetime import datetime, timedelta
 
 from dateutil.parser import isoparse
+from sqlalchemy import select, tuple_
 
 from h.db.types import URLSafeUUID
 from h.models import Annotation, Job
 from h.search.index import BatchIndexer
 
+WATERMARK_SETTING_KEY = "annotation_sync.watermark"
+"""The DB setting recording how far `sync_from_watermark()` has got."""
+
+SETTLE_TIME = timedelta(seconds=60)
+"""
+How long to leave changed annotations before syncing them from the watermark.
+
+`Annotation.updated` is set before the change is committed, so a change can
+become visible after changes with later `updated` times that we've already
+synced past. Waiting this long gives transactions time to commit (it's the
+same delay the job queue uses).
+"""
+
 
 class AnnotationSyncService:
     """A service for synchronizing annotations from Postgres to Elasticsearch."""
 
-    def __init__(self, batch_indexer, db_helper, es_helper, queue_service):
+    def __init__(
+        self, batch_indexer, db_helper, es_helper, queue_service, settings_service
+    ):
         self._batch_indexer = batch_indexer
         self._db_helper = db_helper
         self._es_helper = es_helper
         self._queue_service = queue_service
+        self._settings_service = settings_service
 
-    def sync(self, limit):
+    def sync(self, limit, partition=0, partitions=1):
         """
         Synchronize a batch of annotations from Postgres to Elasticsearch.
 
@@ -32,8 +52,16 @@ class AnnotationSyncService:
           than in the DB then re-sync the annotation into Elastic. Leave the
           job on the queue to be re-checked and removed the next time the
           method runs.
+
+        Several workers can sync at once by each taking a different
+        `partition` of the jobs (see `JobQueueService.get()`).
         """
-        jobs = self._queue_service.get(name="sync_annotation", limit=limit)
+        jobs = self._queue_service.get(
+            name="sync_annotation",
+            limit=limit,
+            partition=partition,
+            partitions=partitions,
+        )
 
         if not jobs:
             return {}
@@ -87,6 +115,80 @@ class AnnotationSyncService:
 
         return counter.counts
 
+    def sync_from_watermark(self, limit):
+        """
+        Synchronize annotations changed since the last time this ran.
+
+        Called periodically by a Celery task when `h.search.sync_mode` is
+        "watermark", instead of adding a job to the queue for every change.
+
+        This finds up to `limit` annotations with an `updated` time after the
+        saved watermark (and older than `SETTLE_TIME`), indexes them into (or
+        deletes them from) Elasticsearch in bulk, and moves the watermark on
+        to the last one. Changes which don't change `updated` still go via
+        the job queue and `sync()`.
+
+        The first time this runs it only saves a watermark: until then the job
+        queue keeps getting a job for every change (see the `queue_service`
+        factory), so anything changed before that is synced by the job queue.
+        """
+        started_at = time.monotonic()
+        now = datetime.utcnow()  # noqa: DTZ003
+        watermark = self._get_watermark()
+
+        if watermark is None:
+            watermark = (now - SETTLE_TIME, None)
+            annotations = []
+        else:
+            annotations = self._db_helper.get_updated_after(
+                watermark, before=now - SETTLE_TIME, limit=limit
+            )
+
+        ids_to_sync = [
+            annotation.id for annotation in annotations if not annotation.deleted
+        ]
+        ids_to_delete = [
+            annotation.id for annotation in annotations if annotation.deleted
+        ]
+
+        if ids_to_sync:
+            self._batch_indexer.index(ids_to_sync)
+
+        if ids_to_delete:
+            self._batch_indexer.delete(ids_to_delete)
+
+        if annotations:
+            watermark = (annotations[-1].updated, annotations[-1].id)
+        elif watermark[1] is not None:
+            # We've caught up, so everything up to the settle time is synced
+            watermark = (max(watermark[0], now - SETTLE_TIME), None)
+
+        self._put_watermark(watermark)
+        seconds = time.monotonic() - started_at
+
+        return {
+            "Watermark/Synced": len(ids_to_sync),
+            "Watermark/Deleted": len(ids_to_delete),
+            "Watermark/LagSeconds": (now - watermark[0]).total_seconds(),
+            "Watermark/RowsPerSecond": len(annotations) / seconds if seconds else 0,
+        }
+
+    def _get_watermark(self):
+        """Return the saved `(updated, annotation_id)` watermark, if any."""
+        value = self._settings_service.get(WATERMARK_SETTING_KEY)
+        if value is None:
+            return None
+
+        value = json.loads(value)
+        return (isoparse(value["updated"]), value["id"])
+
+    def _put_watermark(self, watermark):
+        updated, annotation_id = watermark
+        self._settings_service.put(
+            WATERMARK_SETTING_KEY,
+            json.dumps({"updated": updated.isoformat(), "id": annotation_id}),
+        )
+
     @staticmethod
     def _equal(annotation_from_es, annotation_from_db):
         """Test if the annotations are equal."""
@@ -135,6 +237,34 @@ class DBHelper:
             .filter(Annotation.id.in_(annotation_ids))
         }
 
+    def get_updated_after(self, watermark, before, limit):
+        """
+        Return annotations updated after `watermark`, oldest first.
+
+        Return up to `limit` (id, updated, deleted) rows for annotations,
+        including deleted ones, ordered by `updated` and then by ID.
+
+        :param watermark: An `(updated, annotation_id)` tuple. Annotations
+            updated at the same time are only returned if their ID is greater
+            than `annotation_id`, unless `annotation_id` is `None`
+        :param before: Only return annotations updated before this time
+        """
+        updated, annotation_id = watermark
+
+        query = select(Annotation.id, Annotation.updated, Annotation.deleted).where(
+            Annotation.updated < before
+        )
+        if annotation_id is None:
+            query = query.where(Annotation.updated >= updated)
+        else:
+            query = query.where(
+                tuple_(Annotation.updated, Annotation.id) > (updated, annotation_id)
+            )
+
+        return self._db.execute(
+            query.order_by(Annotation.updated, Annotation.id).limit(limit)
+        ).all()
+
 
 class ESHelper:
     """Helper for working with annotations in Elasticsearch."""
@@ -274,4 +404,5 @@ def factory(_context, request):
         db_helper=DBHelper(db=request.db),
         es_helper=ESHelper(es=request.es),
         queue_service=request.find_service(name="queue_service"),
+        settings_service=request.find_service(name="settings"),
     )
@@ -1,11 +1,12 @@
 from collections.abc import Callable
 from datetime import datetime
+from functools import partial
 
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from h import i18n
+from h import i18n, storage
 from h.models import Annotation, AnnotationSlim, User
 from h.models.document import update_document_metadata
 from h.schemas import ValidationError
@@ -15,6 +16,7 @@ from h.services.annotation_moderation import AnnotationModerationService
 from h.services.annotation_read import AnnotationReadService
 from h.services.job_queue import JobQueueService
 from h.services.mention import MentionService
+from h.services.public_annotation_count import PublicAnnotationCountService
 from h.traversal.group import GroupContext
 from h.util.group_scope import url_in_scope
 
@@ -33,7 +35,15 @@ class AnnotationWriteService:
         annotation_metadata_service: AnnotationMetadataService,
         mention_service: MentionService,
         moderation_service: AnnotationModerationService,
+        public_annotation_count_service: PublicAnnotationCountService,
+        on_document_uris_change: Callable,
     ):
+        """
+        Initialize the service.
+
+        :param on_document_uris_change: A function to call with the
+            normalized URIs which expand to different URIs after a write
+        """
         self._db = db_session
         self._has_permission = has_permission
         self._queue_service = queue_service
@@ -41,6 +51,8 @@ class AnnotationWriteService:
         self._annotation_metadata_service = annotation_metadata_service
         self._mention_service = mention_service
         self._moderation_service = moderation_service
+        self._public_annotation_count_service = public_annotation_count_service
+        self._on_document_uris_change = on_document_uris_change
 
     def create_annotation(self, data: dict) -> Annotation:
         """
@@ -87,11 +99,15 @@ class AnnotationWriteService:
             document_data["document_uri_dicts"],
             created=annotation.created,
             updated=annotation.updated,
+            on_uris_change=self._on_document_uris_change,
         )
         self._moderation_service.update_status("create", annotation)
 
         self._db.add(annotation)
         self.upsert_annotation_slim(annotation)
+        self._public_annotation_count_service.update(
+            None, self._public_annotation_count_service.scope(annotation)
+        )
 
         if annotation_metadata:
             self._annotation_metadata_service.set(annotation, annotation_metadata)
@@ -128,6 +144,7 @@ class AnnotationWriteService:
             to write to the group the annotation is in
         """
         initial_target_uri = annotation.target_uri
+        initial_count_scope = self._public_annotation_count_service.scope(annotation)
 
         annotation_metadata = data.pop("metadata", None)
         self._update_annotation_values(annotation, data)
@@ -154,9 +171,13 @@ class AnnotationWriteService:
                 document.get("document_meta_dicts", {}),
                 document.get("document_uri_dicts", {}),
                 updated=annotation.updated,
+                on_uris_change=self._on_document_uris_change,
             )
         self._moderation_service.update_status("update", annotation)
         self.upsert_annotation_slim(annotation)
+        self._public_annotation_count_service.update(
+            initial_count_scope, self._public_annotation_count_service.scope(annotation)
+        )
 
         if annotation_metadata:
             self._annotation_metadata_service.set(annotation, annotation_metadata)
@@ -285,4 +306,8 @@ def service_factory(_context, request) -> AnnotationWriteService:
         annotation_metadata_service=request.find_service(AnnotationMetadataService),
         mention_service=request.find_service(MentionService),
         moderation_service=request.find_service(name="annotation_moderation"),
+        public_annotation_count_service=request.find_service(
+            PublicAnnotationCountService
+        ),
+        on_document_uris_change=partial(storage.publish_expanded_uris_change, request),
     )
@@ -1,10 +1,16 @@
+from collections.abc import Callable, Iterator
 from datetime import datetime
+from typing import TypeVar
 
 import sqlalchemy as sa
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql import Select
 
 from h.services.bulk_api.exceptions import BadDateFilter
 
+T = TypeVar("T")
+
 
 def date_match(column: InstrumentedAttribute[datetime], spec: dict):
     """
@@ -46,3 +52,36 @@ def date_match(column: InstrumentedAttribute[datetime], spec: dict):
             raise BadDateFilter(f"Unknown date filter operator: {op_key}")  # noqa: EM102, TRY003
 
     return sa.and_(*clauses)
+
+
+def stream_rows(
+    session: Session,
+    query: Select,
+    factory: Callable[[Row], T],
+    yield_per=1000,
+) -> Iterator[T]:
+    """
+    Yield objects made from the rows of a query as they're read from a cursor.
+
+    The rows are fetched from the database `yield_per` at a time, so the
+    memory used doesn't depend on how many rows there are.
+
+    The query runs in a session of its own, bound to the same database as
+    `session`. Streamed responses are iterated over after the request's
+    session has been committed and closed, so we can't use that. The
+    query doesn't run until the first row is asked for, and the session is
+    closed once all the rows have been read or the iterator is closed.
+
+    The objects are made here, rather than by wrapping the rows in another
+    generator, so that closing what we return closes the session too.
+
+    :param session: A session connected to the database to query
+    :param query: The query to run
+    :param factory: A callable to make the object to yield from each row
+    :param yield_per: The number of rows to fetch from the cursor at a time
+    """
+    with Session(bind=session.get_bind()) as stream_session:
+        for row in stream_session.execute(
+            query, execution_options={"yield_per": yield_per}
+        ):
+            yield factory(row)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from dataclasses import dataclass
 
 import sqlalchemy as sa
@@ -5,7 +6,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select
 
 from h.models import AnnotationMetadata, AnnotationSlim, Group, GroupMembership, User
-from h.services.bulk_api._helpers import date_match
+from h.services.bulk_api._helpers import date_match, stream_rows
 
 
 @dataclass
@@ -33,9 +34,12 @@ class BulkAnnotationService:
         username: str,
         created: dict,
         limit=100000,
-    ) -> list[BulkAnnotation]:
+    ) -> Iterator[BulkAnnotation]:
         """
-        Get a list of annotations or rows viewable by a given user.
+        Get the annotations viewable by a given user.
+
+        The annotations are streamed from the database as they're iterated
+        over (see `stream_rows()`), rather than being loaded all at once.
 
         :param authority: The authority to search by
         :param username: The username to search by
@@ -45,21 +49,19 @@ class BulkAnnotationService:
 
         :raises BadDateFilter: For poorly specified date conditions
         """
-
-        results = self._db.execute(
-            self._search_query(authority, username=username, created=created).limit(
-                limit
-            )
-        )
-
-        return [
-            BulkAnnotation(
+        # Build the query now, so bad filters are raised here and not when
+        # the annotations are iterated over
+        query = self._search_query(authority, username=username, created=created)
+
+        return stream_rows(
+            self._db,
+            query.limit(limit),
+            lambda row: BulkAnnotation(
                 username=row.username,
                 authority_provided_id=row.authority_provided_id,
                 metadata=row.metadata,
-            )
-            for row in results.all()
-        ]
+            ),
+        )
 
     @classmethod
     def _search_query(cls, authority, username, created) -> Select:
@@ -100,4 +102,4 @@ class BulkAnnotationService:
 def service_factory(_context, request) -> BulkAnnotationService:
     """Service factory for the bulk annotation service."""
 
-    return BulkAnnotationService(db_session=request.db)
+    return BulkAnnotationService(db_session=request.db_reader)
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Flag, auto
@@ -6,6 +7,7 @@ from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from h.models import Annotation, AnnotationMetadata, AnnotationSlim, Group, User
+from h.services.bulk_api._helpers import stream_rows
 
 
 @dataclass
@@ -111,10 +113,13 @@ class BulkLMSStatsService:
         group_by: CountsGroupBy,
         h_userids: list[str] | None = None,
         assignment_ids: list[str] | None = None,
-    ) -> list[AnnotationCounts]:
+    ) -> Iterator[AnnotationCounts]:
         """
         Get basic stats per user for an LMS assignment.
 
+        The stats are streamed from the database as they're iterated over
+        (see `stream_rows()`).
+
         :param groups: List of "authority_provided_id" to filter groups by.
         :param group_by: By which column to aggregate the data.
         :param h_userids: List of User.userid to filter annotations by
@@ -166,23 +171,23 @@ class BulkLMSStatsService:
         # And finally the group by
         query = query.group_by(group_by_clause[group_by])
 
-        results = self._db.execute(query)
-        return [
-            AnnotationCounts(
-                assignment_id=row.get("assignment_id"),
-                userid=row.get("userid"),
-                display_name=row.get("display_name"),
+        return stream_rows(
+            self._db,
+            query,
+            lambda row: AnnotationCounts(
+                assignment_id=getattr(row, "assignment_id", None),
+                userid=getattr(row, "userid", None),
+                display_name=getattr(row, "display_name", None),
                 annotations=row.annotations,
                 replies=row.replies,
                 page_notes=row.page_notes,
                 last_activity=row.last_activity,
-            )
-            for row in results.mappings()
-        ]
+            ),
+        )
 
 
 def service_factory(_context, request) -> BulkLMSStatsService:
     return BulkLMSStatsService(
-        db=request.db,
+        db=request.db_reader,
         authorized_authority=request.identity.auth_client.authority,
     )
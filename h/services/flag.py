@@ -137,4 +137,4 @@ class FlagService:
 
 
 def flag_service_factory(_context, request):
-    return FlagService(request.db)
+    return FlagService(request.db_reader)
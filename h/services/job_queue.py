@@ -1,9 +1,23 @@
 from datetime import datetime, timedelta
 
-from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    Text,
+    and_,
+    any_,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    update,
+)
 from zope.sqlalchemy import mark_changed
 
 from h.models import Annotation, Job
+from h.services.annotation_sync import WATERMARK_SETTING_KEY
 
 
 class Priority:
@@ -15,15 +29,48 @@ class Priority:
 
 
 class JobQueueService:
-    def __init__(self, db):
+    def __init__(self, db, watermark_sync=False):  # noqa: FBT002
+        """
+        Create a new job queue service.
+
+        :param db: The SQLAlchemy session
+        :param watermark_sync: Whether annotations are synced into
+            Elasticsearch from a watermark (see
+            `AnnotationSyncService.sync_from_watermark()`), in which case
+            unforced "sync_annotation" jobs for single annotations aren't needed.
+            This should only be set once a watermark has been saved, otherwise
+            changes made before the first sync from the watermark are missed
+        """
         self._db = db
+        self._watermark_sync = watermark_sync
+
+    def get(self, name, limit, partition=0, partitions=1):
+        """
+        Get and lock up to `limit` jobs which are ready to be processed.
 
-    def get(self, name, limit):
+        Jobs can be split into `partitions` partitions by annotation ID, so
+        that several workers (each getting a different `partition`) can
+        process the queue at once without waiting for each other's locks, and
+        without processing the same annotation at the same time.
+
+        :param name: Name of the task in the queue
+        :param limit: The maximum number of jobs to get
+        :param partition: Which partition (from 0) to get jobs from
+        :param partitions: The number of partitions the jobs are split into
+        """
         now = datetime.utcnow()  # noqa: DTZ003
 
         query = self._db.query(Job).filter(
             Job.name == name, Job.expires_at >= now, Job.scheduled_at < now
         )
+        if partitions > 1:
+            # Masking off the sign bit keeps the hash positive (`abs()` would
+            # overflow for the smallest integer)
+            query = query.filter(
+                func.hashtext(Job.kwargs["annotation_id"].astext).op("&")(0x7FFFFFFF)
+                % partitions
+                == partition
+            )
 
         return (
             query.order_by(Job.priority, Job.enqueued_at)
@@ -33,8 +80,21 @@ class JobQueueService:
         )
 
     def delete(self, jobs):
+        """Delete completed jobs from the queue in one statement."""
+        if not jobs:
+            return
+
+        self._db.execute(
+            delete(Job).where(
+                Job.id == any_(literal([job.id for job in jobs], ARRAY(Integer)))
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        mark_changed(self._db)
+
         for job in jobs:
-            self._db.delete(job)
+            if job in self._db:
+                self._db.expunge(job)
 
     def add_between_times(self, name, start_time, end_time, tag, force=False):  # noqa: FBT002
         """
@@ -57,6 +117,11 @@ class JobQueueService:
         :param annotation_id: The ID of the annotation to be queued, in the
             application-level URL-safe format
         """
+        if name == "sync_annotation" and self._watermark_sync and not force:
+            # This is called when an annotation is written, which changes
+            # `Annotation.updated`, so the watermark sync will pick it up
+            return
+
         where = [Annotation.id == annotation_id]
         self.add_where(name, where, tag, Priority.SINGLE_ITEM, force, schedule_in)
 
@@ -125,21 +190,58 @@ class JobQueueService:
         :param schedule_in: A number of seconds from now to wait before making
             the job available for processing. The annotation won't be synced
             until at least `schedule_in` seconds from now
+
+        If there's already a job for an annotation which hasn't become
+        available for processing yet (so no worker can have started on it)
+        and which is forced if this one is, no new job is added. Instead the
+        existing job is collapsed with this one: it's put back to when this
+        one would have been available, and `Job.collapsed` is incremented.
         """
         where_clause = and_(*where) if len(where) > 1 else where[0]
-        schedule_at = datetime.utcnow() + timedelta(seconds=schedule_in or 0)  # noqa: DTZ003
-
-        query = Job.__table__.insert().from_select(
-            [Job.name, Job.scheduled_at, Job.priority, Job.tag, Job.kwargs],
-            select(
-                literal_column(f"'{name}'"),
-                literal_column(f"'{schedule_at}'"),
-                literal_column(str(priority)),
-                literal_column(repr(tag)),
-                func.jsonb_build_object(
-                    "annotation_id", Annotation.id, "force", bool(force)
+        now = datetime.utcnow()  # noqa: DTZ003
+        schedule_at = now + timedelta(seconds=schedule_in or 0)
+
+        job_annotation_id = Job.kwargs["annotation_id"].astext
+        collapse_where = [
+            Job.name == name,
+            Job.scheduled_at > now,
+            job_annotation_id.in_(
+                select(cast(Annotation.id, Text)).where(where_clause)
+            ),
+        ]
+        if force:
+            collapse_where.append(Job.kwargs["force"].as_boolean())
+
+        collapsed = (
+            update(Job)
+            .where(*collapse_where)
+            .values(
+                scheduled_at=func.greatest(Job.scheduled_at, schedule_at),
+                priority=func.least(Job.priority, priority),
+                collapsed=Job.collapsed + 1,
+            )
+            .returning(job_annotation_id.label("annotation_id"))
+            .cte("collapsed")
+        )
+
+        query = (
+            Job.__table__.insert()
+            .from_select(
+                [Job.name, Job.scheduled_at, Job.priority, Job.tag, Job.kwargs],
+                select(
+                    literal_column(f"'{name}'"),
+                    literal_column(f"'{schedule_at}'"),
+                    literal_column(str(priority)),
+                    literal_column(repr(tag)),
+                    func.jsonb_build_object(
+                        "annotation_id", Annotation.id, "force", bool(force)
+                    ),
+                ).where(
+                    where_clause,
+                    cast(Annotation.id, Text).not_in(select(collapsed.c.annotation_id)),
                 ),
-            ).where(where_clause),
+            )
+            .add_cte(collapsed)
         )
 
         self._db.execute(query)
@@ -147,4 +249,11 @@ class JobQueueService:
 
 
 def factory(_context, request):
-    return JobQueueService(request.db)
+    # Keep queueing jobs until the first watermark has been saved, so there's
+    # no gap between the last job and where syncing from the watermark starts
+    watermark_sync = (
+        request.registry.settings.get("h.search.sync_mode") == "watermark"
+        and request.find_service(name="settings").get(WATERMARK_SETTING_KEY) is not None
+    )
+
+    return JobQueueService(request.db, watermark_sync=watermark_sync)
@@ -54,6 +54,29 @@ class JobQueueMetrics:
             count for _, count in priority_counts
         )
 
+        # Duplicate jobs which were collapsed into unexpired jobs, by name.
+        collapsed_counts = (
+            self._db.query(Job.name, func.sum(Job.collapsed))
+            .filter(Job.expires_at >= now)
+            .group_by(Job.name)
+        )
+        for name, count in collapsed_counts:
+            metrics[f"Custom/JobQueue/Collapsed/Name/{name}"] = count
+
+        # How long jobs which are ready to be processed have been waiting to be
+        # dequeued, in seconds, by name.
+        wait = func.extract("epoch", now - Job.scheduled_at)
+        latencies = (
+            self._db.query(Job.name, func.max(wait), func.avg(wait))
+            .filter(Job.expires_at >= now, Job.scheduled_at < now)
+            .group_by(Job.name)
+        )
+        for name, max_latency, average_latency in latencies:
+            metrics[f"Custom/JobQueue/Latency/Name/{name}/Max"] = float(max_latency)
+            metrics[f"Custom/JobQueue/Latency/Name/{name}/Average"] = float(
+                average_latency
+            )
+
         return metrics.items()
 
 
@@ -1,12 +1,100 @@
+import logging
+import time
+from functools import partial
+from uuid import uuid4
+
+import sqlalchemy as sa
+
 from h import tasks
+from h.exceptions import RealtimeMessageQueueError
 from h.models import User
 
+log = logging.getLogger(__name__)
+
+VERSION_SETTING_KEY = "nipsa.version"
+"""The DB setting which is changed whenever any user's NIPSA flag changes."""
+
+NIPSA_CHANGE_EVENT = "nipsa-change"
+"""The type of realtime `user` message published when a NIPSA flag changes."""
+
+FLAGGED_USERIDS_KEY = "h.services.nipsa.flagged_userids"
+"""The registry key of the process wide `FlaggedUserids` cache."""
+
+
+class FlaggedUserids:
+    """
+    A process wide cache of the userids of all NIPSA'd users.
+
+    The userids are stored along with the version setting they were loaded
+    at, and are only loaded again when the version changes. To avoid a query
+    for every lookup the version is only checked every `check_interval`
+    seconds, or on the next lookup after `expire()` (which is called when we
+    hear about a change).
+
+    The check interval needs to be shorter than the delay before a user's
+    annotations are reindexed after a change (see `NipsaService`), so the
+    reindex sees the change.
+    """
+
+    def __init__(self, check_interval=10):
+        self.check_interval = check_interval
+
+        # A `(version, userids)` tuple, swapped as a whole so threads sharing
+        # the cache never see a version with the wrong userids
+        self._loaded = None
+        self._checked_at = None
+
+    def get(self, session, settings):
+        """
+        Return the userids of all NIPSA'd users.
+
+        :param session: The SQLAlchemy session to load the userids with
+        :param settings: The settings service to check the version with
+        :rtype: frozenset of unicode strings
+        """
+        now = time.monotonic()
+        if (
+            self._loaded is not None
+            and self._checked_at is not None
+            and now - self._checked_at < self.check_interval
+        ):
+            return self._loaded[1]
+
+        # We get the version before the userids, so if a change is committed
+        # in between we'll have an out of date version and load them again
+        version = settings.get(VERSION_SETTING_KEY)
+        if self._loaded is None or self._loaded[0] != version:
+            # Filter using `is_` to match the index predicate for `User.nipsa`.
+            userids = frozenset(
+                session.scalars(sa.select(User.userid).where(User.nipsa.is_(True)))
+            )
+            self._loaded = (version, userids)
+
+        self._checked_at = now
+        return self._loaded[1]
+
+    def expire(self):
+        """Check for a new version on the next lookup."""
+        self._checked_at = None
+
 
 class NipsaService:
     """A service which provides access to the state of "not-in-public-site-areas" (NIPSA) flags on userids."""
 
-    def __init__(self, session):
+    def __init__(self, session, settings, flagged_userids, publish):
+        """
+        Create a new NIPSA service.
+
+        :param session: The SQLAlchemy session object
+        :param settings: The settings service
+        :param flagged_userids: The process wide `FlaggedUserids` cache
+        :param publish: A function to call with a userid to tell other
+            processes their NIPSA flag has changed
+        """
         self.session = session
+        self._settings = settings
+        self._flagged_userids_cache = flagged_userids
+        self._publish = publish
 
         # Cache of all userids which have been flagged.
         self._flagged_userids = None
@@ -15,32 +103,23 @@ class NipsaService:
         """
         Fetch the userids of all shadowbanned / NIPSA'd users.
 
-        The set of userids is cached to speed up subsequent `flagged_userids`
-        and `is_flagged` calls in the same request.
+        The set of userids is shared by everything in this process and is
+        only loaded again when it has changed (see `FlaggedUserids`). It's
+        also cached to keep subsequent `flagged_userids` and `is_flagged`
+        calls in the same request consistent.
 
-        :rtype: set of unicode strings
+        :rtype: frozenset of unicode strings
         """
-        if self._flagged_userids is not None:
-            return self._flagged_userids
-
-        # Filter using `is_` to match the index predicate for `User.nipsa`.
-        query = self.session.query(User).filter(User.nipsa.is_(True))
-        self._flagged_userids = {u.userid for u in query}
+        if self._flagged_userids is None:
+            self._flagged_userids = self._flagged_userids_cache.get(
+                self.session, self._settings
+            )
 
         return self._flagged_userids
 
     def is_flagged(self, userid):
         """Return whether the given userid is flagged as "NIPSA"."""
-
-        # Use the cache if populated.
-        if self._flagged_userids is not None:
-            return userid in self._flagged_userids
-
-        # Otherwise lookup the status for a single user, which is more efficient
-        # than populating the cache if we are only looking up the NIPSA status
-        # for a small number of users in a given task/request.
-        user = self.session.query(User).filter_by(userid=userid).one_or_none()
-        return user and user.nipsa
+        return userid in self.fetch_all_flagged_userids()
 
     def flag(self, user):
         """
@@ -52,8 +131,8 @@ class NipsaService:
         """
         user.nipsa = True
         if self._flagged_userids is not None:
-            self._flagged_userids.add(user.userid)
-        self._reindex_users_annotations(user, tag="NipsaService.flag")
+            self._flagged_userids = self._flagged_userids | {user.userid}
+        self._changed(user, tag="NipsaService.flag")
 
     def unflag(self, user):
         """
@@ -65,19 +144,52 @@ class NipsaService:
         """
         user.nipsa = False
         if self._flagged_userids is not None:
-            self._flagged_userids.remove(user.userid)
-        self._reindex_users_annotations(user, tag="NipsaService.unflag")
+            self._flagged_userids = self._flagged_userids - {user.userid}
+        self._changed(user, tag="NipsaService.unflag")
 
     def clear(self):
         """Unload the cache of flagged userids, if populated."""
         self._flagged_userids = None
 
-    def _reindex_users_annotations(self, user, tag):
+    def _changed(self, user, tag):
+        # A new version tells every process to load the userids again
+        self._settings.put(VERSION_SETTING_KEY, uuid4().hex)
+        self._publish(user.userid)
+
         tasks.job_queue.add_annotations_from_user.delay(
             "sync_annotation", user.userid, tag=tag, force=True, schedule_in=30
         )
 
 
+def flagged_userids_cache(registry):
+    """Return the process wide `FlaggedUserids` cache for an app."""
+    return registry.setdefault(FLAGGED_USERIDS_KEY, FlaggedUserids())
+
+
 def nipsa_factory(_context, request):
     """Return a NipsaService instance for the passed context and request."""
-    return NipsaService(request.db)
+    return NipsaService(
+        request.db,
+        settings=request.find_service(name="settings"),
+        flagged_userids=flagged_userids_cache(request.registry),
+        publish=partial(_publish_after_commit, request),
+    )
+
+
+def _publish_after_commit(request, userid):
+    """Tell other processes about a change to a NIPSA flag once it's committed."""
+
+    def publish(success):
+        if not success:
+            return
+
+        flagged_userids_cache(request.registry).expire()
+        try:
+            request.realtime.publish_user(
+                {"type": NIPSA_CHANGE_EVENT, "userid": userid}
+            )
+        except RealtimeMessageQueueError:
+            # Other processes will still see the new version, just a bit later
+            log.warning("Failed to publish NIPSA change for %s", userid, exc_info=True)
+
+    request.tm.get().addAfterCommitHook(publish)
@@ -0,0 +1,223 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Text, case, cast, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from zope.sqlalchemy import mark_changed
+
+from h import storage
+from h.models import Annotation, Group, ModerationStatus, PublicAnnotationCount
+from h.models.group import ReadableBy
+from h.search.util import add_default_scheme
+from h.util.uri import build_scope_key, parse_uri_versions
+
+RECONCILED_SETTING_KEY = "public_annotation_count.reconciled"
+"""The DB setting which records when the counts were last reconciled."""
+
+
+class PublicAnnotationCountService:
+    """
+    A service for counting the annotations anyone can see on a page.
+
+    These are the annotations an anonymous search would find: shared, not
+    deleted, not hidden by a moderator, in a world readable group and not by
+    a NIPSA'd user. Replies are counted too, as they are by searches.
+
+    The counts are adjusted as annotations are written, and `reconcile()`
+    (which is run periodically) fixes any which have drifted because of
+    changes made some other way, like a user being NIPSA'd or a group's
+    readability changing.
+
+    The counts are only used once `reconcile()` has run at least once, as
+    until then they only include annotations written since they were added.
+    """
+
+    def __init__(self, db, nipsa_service, settings):
+        self._db = db
+        self._nipsa_service = nipsa_service
+        self._settings = settings
+
+    def scope(self, annotation: Annotation) -> str | None:
+        """
+        Return the scope `annotation` is counted towards.
+
+        :returns: The annotation's scope key (see `h.util.uri.build_scope_key()`)
+            or `None` if the annotation isn't publicly visible
+        """
+        if (
+            annotation.deleted
+            or not annotation.shared
+            or annotation.is_hidden
+            or annotation.group is None
+            or annotation.group.readable_by != ReadableBy.world
+            or self._nipsa_service.is_flagged(annotation.userid)
+        ):
+            return None
+
+        return build_scope_key(annotation.target_uri_normalized, annotation.version)
+
+    def update(self, before: str | None, after: str | None) -> None:
+        """
+        Move an annotation's count from one scope to another.
+
+        :param before: The annotation's scope (from `scope()`) before it was
+            changed, or `None` if it wasn't counted
+        :param after: The annotation's scope after it was changed, or `None`
+            if it isn't counted any more
+        """
+        if before == after:
+            return
+
+        if before is not None:
+            self._db.execute(
+                update(PublicAnnotationCount)
+                .where(PublicAnnotationCount.scope == before)
+                .values(count=func.greatest(PublicAnnotationCount.count - 1, 0))
+            )
+
+        if after is not None:
+            stmt = insert(PublicAnnotationCount).values(scope=after, count=1)
+            self._db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[PublicAnnotationCount.scope],
+                    set_={"count": PublicAnnotationCount.count + 1},
+                )
+            )
+
+        mark_changed(self._db)
+
+    def count(self, uri: str) -> int | None:
+        """
+        Return the number of public annotations on a page.
+
+        This counts the annotations on `uri` and the URIs of the same document
+        (see `h.storage.expand_uri()`), like a search for `uri` does.
+
+        :returns: The count, or `None` for URIs which can't be counted this
+            way (those for specific versions of a document), or if the counts
+            haven't been reconciled yet
+        """
+        base_uri, versions = parse_uri_versions(uri)
+        if versions or self._settings.get(RECONCILED_SETTING_KEY) is None:
+            return None
+
+        scopes = storage.expand_uri(
+            self._db, add_default_scheme(base_uri), normalized=True
+        )
+        return self._db.scalar(
+            select(func.coalesce(func.sum(PublicAnnotationCount.count), 0)).where(
+                PublicAnnotationCount.scope.in_(scopes)
+            )
+        )
+
+    def remove(self, annotation_ids: list[str]) -> None:
+        """
+        Stop counting annotations which have just been deleted in bulk.
+
+        This is for annotations marked as deleted without going through
+        `scope()` and `update()` one by one.
+
+        :param annotation_ids: The ids of annotations which weren't deleted
+            before, but are now
+        """
+        if not annotation_ids:
+            return
+
+        scope = self._scope_column()
+        counts = (
+            select(scope.label("scope"), func.count().label("count"))
+            .where(Annotation.id.in_(annotation_ids), *self._public_filters())
+            .group_by(scope)
+            .subquery()
+        )
+        self._db.execute(
+            update(PublicAnnotationCount)
+            .where(PublicAnnotationCount.scope == counts.c.scope)
+            .values(
+                count=func.greatest(PublicAnnotationCount.count - counts.c["count"], 0)
+            )
+        )
+        mark_changed(self._db)
+
+    def reconcile(self) -> dict:
+        """
+        Count the public annotations on every page again.
+
+        Counts which are wrong are corrected and counts for pages which no
+        longer have any public annotations are removed. Changes committed
+        while this runs may be lost, to be corrected by the next run.
+
+        :returns: The number of counts corrected (or added) and removed
+        """
+        scope = self._scope_column()
+        counts = (
+            select(scope.label("scope"), func.count().label("count"))
+            .where(Annotation.deleted.is_(False), *self._public_filters())
+            .group_by(scope)
+            .cte("counts")
+        )
+
+        removed = (
+            delete(PublicAnnotationCount)
+            .where(PublicAnnotationCount.scope.not_in(select(counts.c.scope)))
+            .returning(PublicAnnotationCount.scope)
+            .cte("removed")
+        )
+        upsert = insert(PublicAnnotationCount).from_select(
+            ["scope", "count"], select(counts.c.scope, counts.c["count"])
+        )
+        corrected = (
+            upsert.on_conflict_do_update(
+                index_elements=[PublicAnnotationCount.scope],
+                set_={"count": upsert.excluded["count"]},
+                where=PublicAnnotationCount.count != upsert.excluded["count"],
+            )
+            .returning(PublicAnnotationCount.scope)
+            .cte("corrected")
+        )
+
+        # Everything happens in one statement, so it all sees the same counts
+        corrected_count, removed_count = self._db.execute(
+            select(
+                select(func.count()).select_from(corrected).scalar_subquery(),
+                select(func.count()).select_from(removed).scalar_subquery(),
+            )
+        ).one()
+        self._settings.put(RECONCILED_SETTING_KEY, datetime.now(UTC).isoformat())
+        mark_changed(self._db)
+
+        return {"Corrected": corrected_count, "Removed": removed_count}
+
+    @staticmethod
+    def _scope_column():
+        """Return the scope key of `Annotation` rows in SQL (see `scope()`)."""
+        return case(
+            (
+                func.coalesce(Annotation.version, 0) == 0,
+                Annotation.target_uri_normalized,
+            ),
+            else_=Annotation.target_uri_normalized
+            + "__v"
+            + cast(Annotation.version, Text),
+        )
+
+    def _public_filters(self):
+        """Return the conditions (besides not being deleted) for being counted."""
+        return (
+            Annotation.shared.is_(True),
+            or_(
+                Annotation.moderation_status.is_(None),
+                Annotation.moderation_status == ModerationStatus.APPROVED,
+            ),
+            Annotation.groupid.in_(
+                select(Group.pubid).where(Group.readable_by == ReadableBy.world)
+            ),
+            Annotation.userid.not_in(self._nipsa_service.fetch_all_flagged_userids()),
+        )
+
+
+def factory(_context, request):
+    return PublicAnnotationCountService(
+        request.db,
+        nipsa_service=request.find_service(name="nipsa"),
+        settings=request.find_service(name="settings"),
+    )
@@ -1,3 +1,5 @@
+import newrelic.agent
+from elasticsearch import helpers as es_helpers
 from h_pyramid_sentry import report_exception
 
 from h import tasks
@@ -27,6 +29,10 @@ class SearchIndexService:
         self._settings = settings
         self._annotation_read_service = annotation_read_service
 
+        # Bulk API actions waiting to be sent by `flush()`, when writes are
+        # being buffered (see `handle_annotation_event()`)
+        self._write_buffer = None
+
     def add_annotation_by_id(self, annotation_id):
         """
         Add an annotation into the search index by id.
@@ -89,6 +95,10 @@ class SearchIndexService:
         This will attempt to fulfill the request synchronously if asked, or
         fall back on a delayed celery task if not or if this fails.
 
+        Writes to Elasticsearch are buffered until the current transaction
+        ends and then sent together (see `flush()`), so this must be called
+        inside a transaction.
+
         :param event: AnnotationEvent object
         """
         if event.action in ["create", "update"]:
@@ -104,6 +114,8 @@ class SearchIndexService:
         else:
             return False
 
+        self._buffer_writes()
+
         try:
             return sync_handler(event.annotation_id)
 
@@ -113,15 +125,76 @@ class SearchIndexService:
         # Either the synchronous method was disabled, or failed...
         return async_task.delay(event.annotation_id)
 
-    def _index_annotation_body(self, annotation_id, body, refresh, target_index=None):
-        self._es.conn.index(
-            index=self._es.index if target_index is None else target_index,
-            doc_type=self._es.mapping_type,
-            body=body,
-            id=annotation_id,
-            refresh=refresh,
+    def flush(self):
+        """
+        Send any buffered writes to Elasticsearch in a single bulk request.
+
+        Any annotations which fail to be written are queued to be indexed by
+        a celery task instead.
+        """
+        actions, self._write_buffer = self._write_buffer, None
+        if not actions:
+            return
+
+        try:
+            _, errors = es_helpers.bulk(self._es.conn, actions, raise_on_error=False)
+        except Exception as err:  # noqa: BLE001
+            report_exception(err)
+            failed_ids = {action["_id"] for action in actions}
+        else:
+            failed_ids = {error["index"]["_id"] for error in errors}
+
+        newrelic.agent.record_custom_metrics(
+            [
+                ("Custom/SearchIndex/BulkWrite/Actions", len(actions)),
+                ("Custom/SearchIndex/BulkWrite/Failed", len(failed_ids)),
+            ]
         )
 
+        deleted_ids = {
+            action["_id"]
+            for action in actions
+            if action["_source"] == {"deleted": True}
+        }
+        for annotation_id in failed_ids:
+            if annotation_id in deleted_ids:
+                tasks.indexer.delete_annotation.delay(annotation_id)
+            else:
+                tasks.indexer.add_annotation.delay(annotation_id)
+
+    def _buffer_writes(self):
+        """Buffer writes until the end of the current transaction."""
+        if self._write_buffer is not None:
+            return
+
+        self._write_buffer = []
+
+        transaction = self._request.tm.get()
+        transaction.addAfterCommitHook(lambda _success: self.flush())
+        transaction.addAfterAbortHook(self.flush)
+
+    def _index_annotation_body(self, annotation_id, body, refresh, target_index=None):
+        index = self._es.index if target_index is None else target_index
+
+        if self._write_buffer is not None and not refresh:
+            self._write_buffer.append(
+                {
+                    "_op_type": "index",
+                    "_index": index,
+                    "_type": self._es.mapping_type,
+                    "_id": annotation_id,
+                    "_source": body,
+                }
+            )
+        else:
+            self._es.conn.index(
+                index=index,
+                doc_type=self._es.mapping_type,
+                body=body,
+                id=annotation_id,
+                refresh=refresh,
+            )
+
         if target_index is not None:
             return
 
@@ -16,6 +16,7 @@ from h.models import (
     User,
     UserDeletion,
 )
+from h.services.public_annotation_count import PublicAnnotationCountService
 
 log = logging.getLogger(__name__)
 
@@ -54,10 +55,11 @@ def log_deleted_rows(user, model_class, deleted_ids, log_ids=True):  # noqa: FBT
 
 
 class UserDeleteService:
-    def __init__(self, db, job_queue, user_svc):
+    def __init__(self, db, job_queue, user_svc, public_annotation_count):
         self.db = db
         self.job_queue = job_queue
         self.user_svc = user_svc
+        self.public_annotation_count = public_annotation_count
 
     def delete_user(self, user: User, requested_by: User, tag: str):
         """Mark `user` as deleted and start purging their data in the background."""
@@ -105,7 +107,12 @@ class UserDeleteService:
             return
 
         completed_jobs = []
-        purger = UserPurger(self.db, self.job_queue, LimitedWorker(self.db, limit))
+        purger = UserPurger(
+            self.db,
+            self.job_queue,
+            LimitedWorker(self.db, limit),
+            self.public_annotation_count,
+        )
 
         for job in jobs:
             userid = job.kwargs.get("userid")
@@ -144,10 +151,11 @@ class UserDeleteService:
 class UserPurger:
     """Helper methods for purging data belonging to a given user."""
 
-    def __init__(self, db, job_queue, worker):
+    def __init__(self, db, job_queue, worker, public_annotation_count):
         self.db = db
         self.job_queue = job_queue
         self.worker = worker
+        self.public_annotation_count = public_annotation_count
 
     def delete_authtickets(self, user):
         """Delete all AuthTicket's belonging to `user`."""
@@ -210,6 +218,7 @@ class UserPurger:
         )
 
         log_updated_rows(user, "marked annotations as deleted", deleted_annotation_ids)
+        self.public_annotation_count.remove(deleted_annotation_ids)
 
         # Whenever we update annotations we also need to update the corresponding annotation_slims.
         deleted_annotation_slim_ids = sorted(
@@ -422,4 +431,5 @@ def service_factory(_context, request):
         request.db,
         job_queue=request.find_service(name="queue_service"),
         user_svc=request.find_service(name="user"),
+        public_annotation_count=request.find_service(PublicAnnotationCountService),
     )
@@ -6,15 +6,36 @@ for storing and retrieving annotations. Data passed to these functions is
 assumed to be validated.
 """
 
+import logging
+from collections import defaultdict
+
 from pyramid import i18n
+from sqlalchemy.orm import aliased
 
 from h import models
+from h.exceptions import RealtimeMessageQueueError
+from h.util.cache import TTLCache
 from h.util.uri import normalize as normalize_uri
 
 _ = i18n.TranslationStringFactory(__package__)
 
+log = logging.getLogger(__name__)
+
+EXPANDED_URI_CACHE = TTLCache(maxsize=10000, ttl=60)
+"""
+The document URIs of each normalized URI, for `expand_uris(cached=True)`.
+
+This is only used by the streamer, while documents' URIs are changed by
+the web app and Celery workers, so they tell the streamer which entries to
+forget with an `EXPANDED_URIS_CHANGE_EVENT` message (see
+`publish_expanded_uris_change()`).
+"""
+
+EXPANDED_URIS_CHANGE_EVENT = "expanded-uris-change"
+"""The type of realtime `user` message published when documents' URIs change."""
 
-def expand_uri(session, uri, normalized=False):  # noqa: FBT002
+
+def expand_uri(session, uri, normalized=False, cached=False):  # noqa: FBT002
     """
     Return all URIs which refer to the same underlying document as `uri`.
 
@@ -25,9 +46,13 @@ def expand_uri(session, uri, normalized=False):  # noqa: FBT002
     :param session: Database session
     :param uri: URI associated with the document
     :param normalized: Return normalized URIs instead of the raw value
+    :param cached: Use (and fill) `EXPANDED_URI_CACHE` rather than always
+        querying the database
 
     :returns: a list of equivalent URIs
     """
+    if cached:
+        return expand_uris(session, [uri], normalized=normalized, cached=True)[uri]
 
     normalized_uri = normalize_uri(uri)
 
@@ -48,6 +73,104 @@ def expand_uri(session, uri, normalized=False):  # noqa: FBT002
         ).filter(models.DocumentURI.document_id == document_id)
     )
 
+    return _expanded_uris(uri, normalized_uri, type_uris, normalized)
+
+
+def expand_uris(session, uris, normalized=False, cached=False):  # noqa: FBT002
+    """
+    Return all URIs which refer to the same underlying document as each of `uris`.
+
+    This is the same as calling `expand_uri()` for each URI, but uses a single
+    query for all of them.
+
+    :param session: Database session
+    :param uris: Iterable of URIs associated with documents
+    :param normalized: Return normalized URIs instead of the raw values
+    :param cached: Use (and fill) `EXPANDED_URI_CACHE` rather than always
+        querying the database
+
+    :returns: a dict of each URI to a list of equivalent URIs
+    """
+    normalized_uris = {uri: normalize_uri(uri) for uri in uris}
+    if not normalized_uris:
+        return {}
+
+    type_uris = {}
+    if cached:
+        for normalized_uri in set(normalized_uris.values()):
+            cached_type_uris = EXPANDED_URI_CACHE.get(normalized_uri)
+            if cached_type_uris is not None:
+                type_uris[normalized_uri] = cached_type_uris
+
+    if missing := set(normalized_uris.values()) - type_uris.keys():
+        fetched = _fetch_type_uris(session, missing)
+        for normalized_uri in missing:
+            type_uris[normalized_uri] = fetched.get(normalized_uri, ())
+            if cached:
+                EXPANDED_URI_CACHE.set(normalized_uri, type_uris[normalized_uri])
+
+    return {
+        uri: _expanded_uris(uri, normalized_uri, type_uris[normalized_uri], normalized)
+        for uri, normalized_uri in normalized_uris.items()
+    }
+
+
+def invalidate_expanded_uris(normalized_uris):
+    """Forget the cached expansions of `normalized_uris` in this process."""
+    EXPANDED_URI_CACHE.invalidate(normalized_uris)
+
+
+def publish_expanded_uris_change(request, normalized_uris):
+    """
+    Tell the streamer that the expansions of `normalized_uris` have changed.
+
+    The message is only sent once the current transaction is committed, so
+    the streamer won't look the URIs up again before it can see the change.
+    """
+    normalized_uris = sorted(normalized_uris)
+
+    def publish(success):
+        if not success:
+            return
+
+        invalidate_expanded_uris(normalized_uris)
+        try:
+            request.realtime.publish_user(
+                {"type": EXPANDED_URIS_CHANGE_EVENT, "uris": normalized_uris}
+            )
+        except RealtimeMessageQueueError:
+            # The streamer will still see the change once its entries expire
+            log.warning("Failed to publish the expanded URIs change", exc_info=True)
+
+    request.tm.get().addAfterCommitHook(publish)
+
+
+def _fetch_type_uris(session, normalized_uris):
+    """Get the `(type, uri, uri_normalized)` of each URI's document's URIs."""
+    matched = aliased(models.DocumentURI)
+    rows = session.query(
+        matched.uri_normalized,
+        models.DocumentURI.document_id,
+        models.DocumentURI.type,
+        models.DocumentURI.uri,
+        models.DocumentURI.uri_normalized,
+    ).filter(
+        matched.uri_normalized.in_(normalized_uris),
+        models.DocumentURI.document_id == matched.document_id,
+    )
+
+    # If more than one document has a matching URI, use the first like
+    # `expand_uri()` does.
+    document_ids = {}
+    type_uris = defaultdict(list)
+    for matched_uri, document_id, doc_type, plain_uri, uri_normalized in rows:
+        if document_ids.setdefault(matched_uri, document_id) == document_id:
+            type_uris[matched_uri].append((doc_type, plain_uri, uri_normalized))
+
+    return {uri: tuple(rows) for uri, rows in type_uris.items()}
+
+
+def _expanded_uris(uri, normalized_uri, type_uris, normalized):
     if not type_uris:
         return [normalized_uri if normalized else uri]
 
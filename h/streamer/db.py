@@ -17,9 +17,7 @@ def get_session(settings):
 def read_only_transaction(session):
     """Wrap a call in a read only transaction context manager."""
     try:
-        session.execute(
-            text("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE READ ONLY DEFERRABLE")
-        )
+        _set_read_only(session)
 
         yield
 
@@ -33,3 +31,19 @@ def read_only_transaction(session):
         session.commit()
     finally:
         session.close()
+
+
+def restart_read_only_transaction(session):
+    """
+    Roll back the session's read only transaction and start another.
+
+    This lets a transaction which has failed part way through carry on.
+    """
+    session.rollback()
+    _set_read_only(session)
+
+
+def _set_read_only(session):
+    session.execute(
+        text("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE READ ONLY DEFERRABLE")
+    )
@@ -1,6 +1,16 @@
+import weakref
+from functools import lru_cache
+from typing import ClassVar
+
 from h import storage
-from h.util.uri import build_scope_key, parse_uri_versions
-from h.util.uri import normalize as normalize_uri
+from h.util.uri import build_scope_key, normalize, parse_uri_versions
+
+
+@lru_cache(maxsize=10000)
+def normalize_uri(uri):
+    """Normalize a URI, remembering the results as clients send the same ones."""
+    return normalize(uri)
+
 
 FILTER_SCHEMA = {
     "type": "object",
@@ -29,6 +39,9 @@ FILTER_SCHEMA = {
 class SocketFilter:
     KNOWN_FIELDS = {"/id", "/group", "/uri", "/references"}  # noqa: RUF012
 
+    _index: ClassVar[dict[tuple[str, str], weakref.WeakSet]] = {}
+    """Inverted index of `(field, value)` filter rows to sockets with that row."""
+
     @classmethod
     def matching(cls, sockets, annotation, session):
         """
@@ -37,33 +50,17 @@ class SocketFilter:
         For this to work, the sockets must have first had `set_filter()` called
         on them.
 
+        This checks every filter row of every socket given. See
+        `indexed_matching()` for a version which only looks at the sockets
+        which can possibly match.
+
         :param sockets: Iterable of sockets to check
         :param annotation: Annotation to match
         :param session: DB session
 
         :return: A generator of matching socket objects
         """
-
-        # Expand the URI to ensure we match any variants of it. This should
-        # match the normalization when searching (see `h.search.query`)
-        expanded_uris = set(
-            storage.expand_uri(session, annotation.target_uri, normalized=True)
-        )
-        # Versioned annotations only match clients filtering by that version.
-        # Unversioned annotations only match clients without version filter.
-        if annotation.version:
-            uri_scope_keys = {
-                build_scope_key(uri, annotation.version) for uri in expanded_uris
-            }
-        else:
-            uri_scope_keys = set(expanded_uris)
-
-        values = {
-            "/id": [annotation.id],
-            "/group": [annotation.groupid],
-            "/uri": uri_scope_keys,
-            "/references": set(annotation.references),
-        }
+        values = cls._values_for(annotation, session)
 
         for socket in sockets:
             # Some sockets might not yet have the filter applied (or had a non
@@ -80,6 +77,35 @@ class SocketFilter:
                 except KeyError:
                     continue
 
+    @classmethod
+    def indexed_matching(cls, annotation, session, expanded_uris=None):
+        """
+        Find all sockets with matching filters for the given annotation.
+
+        This looks up the sockets for each of the annotation's values in the
+        index maintained by `set_filter()` and `remove_filter()`, so the cost
+        depends on the number of matches rather than the number of sockets.
+
+        :param annotation: Annotation to match
+        :param session: DB session
+        :param expanded_uris: Optional pre-fetched result of
+            `storage.expand_uris()` including the annotation's target URI
+
+        :return: A generator of matching socket objects
+        """
+        values = cls._values_for(annotation, session, expanded_uris)
+        seen = set()
+
+        for field, field_values in values.items():
+            for value in field_values:
+                # Take a copy, as sockets can be added or removed while we are
+                # yielding (for example if sending to a socket yields to
+                # another greenlet)
+                for socket in tuple(cls._index.get((field, value), ())):
+                    if socket not in seen:
+                        seen.add(socket)
+                        yield socket
+
     @classmethod
     def set_filter(cls, socket, filter_):
         """
@@ -88,8 +114,64 @@ class SocketFilter:
         :param socket: Socket to add filtering information too
         :param filter_: Filter JSON to process
         """
+        cls.remove_filter(socket)
+
         socket.filter_rows = tuple(cls._rows_for(filter_))
 
+        for row in socket.filter_rows:
+            try:
+                cls._index.setdefault(row, weakref.WeakSet()).add(socket)
+            except TypeError:
+                # Unhashable values (e.g. objects) can never match anything
+                continue
+
+    @classmethod
+    def remove_filter(cls, socket):
+        """
+        Remove a socket's filtering information from the index.
+
+        :param socket: Socket to remove
+        """
+        for row in getattr(socket, "filter_rows", ()):
+            try:
+                sockets = cls._index.get(row)
+            except TypeError:
+                continue
+
+            if sockets is None:
+                continue
+
+            sockets.discard(socket)
+            if not sockets:
+                del cls._index[row]
+
+    @classmethod
+    def _values_for(cls, annotation, session, expanded_uris=None):
+        """Get the values of the annotation to compare with filter rows."""
+        # Expand the URI to ensure we match any variants of it. This should
+        # match the normalization when searching (see `h.search.query`)
+        if expanded_uris and annotation.target_uri in expanded_uris:
+            uris = set(expanded_uris[annotation.target_uri])
+        else:
+            uris = set(
+                storage.expand_uri(
+                    session, annotation.target_uri, normalized=True, cached=True
+                )
+            )
+        # Versioned annotations only match clients filtering by that version.
+        # Unversioned annotations only match clients without version filter.
+        if annotation.version:
+            uri_scope_keys = {build_scope_key(uri, annotation.version) for uri in uris}
+        else:
+            uri_scope_keys = uris
+
+        return {
+            "/id": [annotation.id],
+            "/group": [annotation.groupid],
+            "/uri": uri_scope_keys,
+            "/references": set(annotation.references),
+        }
+
     @classmethod
     def _rows_for(cls, filter_):
         """Convert a filter to field value pairs."""
@@ -1,24 +1,32 @@
 import logging
+import time
 from collections import namedtuple
 from itertools import chain
 
 from gevent.queue import Full
+from pyramid.settings import asbool
 
-from h import realtime
+from h import realtime, storage
+from h.db.types import InvalidUUID
 from h.realtime import Consumer
-from h.security import Identity, Permission, identity_permits
+from h.security import Identity, Permission, PermitsCache
 from h.services.annotation_read import AnnotationReadService
 from h.services.checkpoint import CheckpointService
-from h.streamer import websocket
+from h.services.nipsa import NIPSA_CHANGE_EVENT, flagged_userids_cache
+from h.streamer import db, websocket
 from h.streamer.contexts import request_context
 from h.streamer.filter import SocketFilter
+from h.streamer.metrics import COUNTERS
 from h.traversal import AnnotationContext
 
 log = logging.getLogger(__name__)
 
 
-# An incoming message from a subscribed realtime consumer
-Message = namedtuple("Message", ["topic", "payload"])  # noqa: PYI024
+# An incoming message from a subscribed realtime consumer. `enqueued_at` is the
+# `time.monotonic()` time the message was put on the work queue.
+Message = namedtuple(  # noqa: PYI024
+    "Message", ["topic", "payload", "enqueued_at"], defaults=[None]
+)
 
 
 def process_messages(settings, routing_key, work_queue, raise_error=True):  # noqa: FBT002
@@ -31,10 +39,13 @@ def process_messages(settings, routing_key, work_queue, raise_error=True):  # no
     """
 
     def _handler(payload):
-        message = Message(topic=routing_key, payload=payload)
+        message = Message(
+            topic=routing_key, payload=payload, enqueued_at=time.monotonic()
+        )
         try:
             work_queue.put(message, timeout=0.1)
         except Full:  # pragma: no cover
+            COUNTERS["WorkQueue/DroppedMessages"] += 1
             log.warning(
                 "Streamer work queue full! Unable to queue message from "
                 "h.realtime having waited 0.1s: giving up."
@@ -78,28 +89,93 @@ def handle_message(message, registry, session, topic_handlers):
         handler(message.payload, sockets, request, session)
 
 
-def handle_user_event(message, sockets, _request, _session):
+def handle_annotation_events(messages, registry, session):
+    """
+    Process a batch of messages from the annotation topic together.
+
+    This loads the annotations, their authors' NIPSA status and their URI
+    expansions for the whole batch with one query each, and then handles each
+    message as `handle_message()` would.
+    """
+    sockets = list(websocket.WebSocket.instances)
+
+    with request_context(registry) as request:
+        payloads = [message.payload for message in messages]
+        annotation_ids = [payload["annotation_id"] for payload in payloads]
+
+        try:
+            # These will be in the session, so `get_annotation_by_id()` won't
+            # need to query for them again
+            annotations = request.find_service(
+                AnnotationReadService
+            ).get_annotations_by_id(annotation_ids)
+        except InvalidUUID:
+            # Fall back to loading the annotations one at a time
+            annotations = []
+
+        if annotations:
+            request.find_service(name="nipsa").fetch_all_flagged_userids()
+
+        expanded_uris = storage.expand_uris(
+            session,
+            {annotation.target_uri for annotation in annotations},
+            normalized=True,
+            cached=True,
+        )
+
+        for payload in payloads:
+            try:
+                handle_annotation_event(
+                    payload, sockets, request, session, expanded_uris=expanded_uris
+                )
+            except Exception:  # noqa: BLE001
+                # Don't let one bad event stop the rest of the batch
+                log.warning(
+                    "Caught exception handling annotation event %s:",
+                    payload.get("annotation_id"),
+                    exc_info=True,
+                )
+                # A database error leaves the transaction aborted, which would
+                # make every later event in the batch fail too
+                db.restart_read_only_transaction(session)
+
+
+def handle_user_event(message, sockets, request, _session):
+    if message["type"] == NIPSA_CHANGE_EVENT:
+        # This isn't for the user's clients, it tells us to look for the new
+        # set of NIPSA'd users
+        flagged_userids_cache(request.registry).expire()
+        return
+
+    if message["type"] == storage.EXPANDED_URIS_CHANGE_EVENT:
+        # Documents' URIs have changed, so forget what the URIs expand to
+        storage.invalidate_expanded_uris(message["uris"])
+        return
+
     # for session state change events, the full session model
     # is included so that clients can update themselves without
     # further API requests
 
-    reply = None
+    frame = None
 
     for socket in sockets:
         if not socket.identity or socket.identity.user.userid != message["userid"]:
             continue
 
-        if reply is None:
-            reply = {
-                "type": "session-change",
-                "action": message["type"],
-                "model": message["session_model"],
-            }
+        if frame is None:
+            frame = websocket.prepare_frame(
+                {
+                    "type": "session-change",
+                    "action": message["type"],
+                    "model": message["session_model"],
+                },
+                fast_json=_fast_json(request),
+            )
 
-        socket.send_json(reply)
+        socket.send_frame(frame)
 
 
-def handle_annotation_event(message, sockets, request, session):
+def handle_annotation_event(message, _sockets, request, session, expanded_uris=None):
     id_ = message["annotation_id"]
     annotation = request.find_service(AnnotationReadService).get_annotation_by_id(id_)
 
@@ -107,8 +183,12 @@ def handle_annotation_event(message, sockets, request, session):
         log.warning("received annotation event for missing annotation: %s", id_)
         return
 
-    # Find connected clients which are interested in this annotation.
-    matching_sockets = SocketFilter.matching(sockets, annotation, session)
+    # Find connected clients which are interested in this annotation. We use
+    # the filter index here rather than checking each socket in turn, as
+    # there can be many thousands of connected clients.
+    matching_sockets = SocketFilter.indexed_matching(
+        annotation, session, expanded_uris=expanded_uris
+    )
 
     try:
         # Check to see if the generator has any items
@@ -120,15 +200,22 @@ def handle_annotation_event(message, sockets, request, session):
     # Create a generator which has the first socket back again
     matching_sockets = chain((first_socket,), matching_sockets)
 
+    # Work which doesn't depend on the socket is done once for the event
     annotator_nipsad = request.find_service(name="nipsa").is_flagged(annotation.userid)
     annotation_context = AnnotationContext(annotation)
     checkpoint_service = request.find_service(CheckpointService)
+    # Anonymous sockets (and sockets of the same user) get the same answer
+    permits = PermitsCache()
 
-    for socket in matching_sockets:
-        reply = _generate_annotation_event(
-            request, message, annotation, socket.identity
-        )
+    # The reply and the checkpoint check only depend on the user, so we work
+    # them out once per user rather than once per socket. Anonymous sockets
+    # all share the `None` entry, and deletes send the same reply to everyone.
+    # Replies are encoded once into frames which are written to each socket.
+    frames = {}
+    fast_json = _fast_json(request)
+    hidden_by_checkpoint = {}
 
+    for socket in matching_sockets:
         # Don't send notifications back to the person who sent them
         if message["src_client_id"] == socket.client_id:
             continue
@@ -141,22 +228,44 @@ def handle_annotation_event(message, sockets, request, session):
         ):
             continue
 
-        # Check whether client is authorized to read this annotation.
-        if not identity_permits(
+        # Check whether client is authorized to read this annotation. This
+        # depends on the group memberships captured when the socket connected,
+        # so it's checked per socket.
+        if not permits.identity_permits(
             socket.identity,
             annotation_context,
             Permission.Annotation.READ_REALTIME_UPDATES,
         ):
             continue
 
+        user = socket.identity.user if socket.identity else None
+        userid = user.userid if user else None
+
         # Hide & Reveal: don't leak annotations hidden by an active checkpoint
         # over the live channel. Search filtering is a separate read path, so
         # the same visibility rule must be enforced here too.
-        user = socket.identity.user if socket.identity else None
-        if checkpoint_service.hides_annotation(user, annotation):
+        if userid not in hidden_by_checkpoint:
+            hidden_by_checkpoint[userid] = checkpoint_service.hides_annotation(
+                user, annotation
+            )
+        if hidden_by_checkpoint[userid]:
             continue
 
-        socket.send_json(reply)
+        reply_key = None if message["action"] == "delete" else userid
+        if reply_key not in frames:
+            frames[reply_key] = websocket.prepare_frame(
+                _generate_annotation_event(
+                    request, message, annotation, socket.identity
+                ),
+                fast_json=fast_json,
+            )
+            COUNTERS["AnnotationEvent/PayloadsBuilt"] += 1
+
+        socket.send_frame(frames[reply_key], coalesce_key=annotation.id, droppable=True)
+        COUNTERS["AnnotationEvent/SocketsServed"] += 1
+
+    COUNTERS["AnnotationEvent/PermissionChecks"] += permits.evaluations
+    COUNTERS["AnnotationEvent/PermissionCacheHits"] += permits.hits
 
 
 def _generate_annotation_event(request, message, annotation, identity: Identity | None):
@@ -186,3 +295,7 @@ def _generate_annotation_event(request, message, annotation, identity: Identity
         "options": {"action": message["action"]},
         "payload": [payload],
     }
+
+
+def _fast_json(request):
+    return asbool(request.registry.settings.get("h.streamer.fast_json", False))
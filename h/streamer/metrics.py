@@ -1,25 +1,78 @@
+from collections import Counter
 from pathlib import Path
 
 import gevent
 import importlib_resources
 import newrelic.agent
 
-from h.streamer import db
-from h.streamer.websocket import WebSocket
+from h import storage
+from h.streamer import db, websocket
+from h.streamer.filter import normalize_uri
 from h.streamer.worker import WSGIServer
 
 PREFIX = "Custom/WebSocket"
 METRICS_INTERVAL = 60
 
+COUNTERS: Counter[str] = Counter()
+"""Counts of events since metrics were last reported, keyed by metric name."""
 
-def websocket_metrics(queue):
+TIMINGS: dict[str, dict] = {}
+"""Summaries of durations since metrics were last reported, keyed by metric name."""
+
+TIMING_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5)
+"""Upper bounds (in seconds) of the histogram buckets for recorded durations."""
+
+
+def record_timing(name, seconds):
+    """
+    Record a duration to be reported with the other websocket metrics.
+
+    Each duration is added to a summary (reported as a New Relic summary
+    metric, which gives the count, average, minimum and maximum) and counted
+    in a histogram bucket, reported as `<name>/Buckets/<bucket>`.
+
+    :param name: Name of the metric, without the prefix
+    :param seconds: The duration to record
+    """
+    summary = TIMINGS.get(name)
+    if summary is None:
+        summary = TIMINGS[name] = {
+            "count": 0,
+            "total": 0.0,
+            "min": seconds,
+            "max": seconds,
+            "sum_of_squares": 0.0,
+        }
+
+    summary["count"] += 1
+    summary["total"] += seconds
+    summary["min"] = min(summary["min"], seconds)
+    summary["max"] = max(summary["max"], seconds)
+    summary["sum_of_squares"] += seconds**2
+
+    for upper_bound in TIMING_BUCKETS:
+        if seconds <= upper_bound:
+            bucket = f"LessThan{int(upper_bound * 1000)}ms"
+            break
+    else:
+        bucket = f"MoreThan{int(TIMING_BUCKETS[-1] * 1000)}ms"
+
+    COUNTERS[f"{name}/Buckets/{bucket}"] += 1
+
+
+def websocket_metrics(queue, worker_queues=()):
     """
     Report metrics about the websocket service to New Relic.
 
     See https://docs.newrelic.com/docs/agents/python-agent/supported-features/python-custom-metrics.
+
+    :param queue: The work queue messages arrive in
+    :param worker_queues: The queues of each worker, when the work is shared
+        between several of them
     """
-    connections_active = len(WebSocket.instances)
-    connections_anonymous = sum(1 for ws in WebSocket.instances if not ws.identity)
+    instances = websocket.WebSocket.instances
+    connections_active = len(instances)
+    connections_anonymous = sum(1 for ws in instances if not ws.identity)
 
     # Allow us to tell the difference between reporting 0 and not reporting
     yield f"{PREFIX}/Alive", 1
@@ -32,6 +85,8 @@ def websocket_metrics(queue):
     yield f"{PREFIX}/Connections/Anonymous", connections_anonymous
 
     yield f"{PREFIX}/WorkQueueSize", queue.qsize()
+    for number, worker_queue in enumerate(worker_queues):
+        yield f"{PREFIX}/WorkerQueueSize/{number}", worker_queue.qsize()
 
     # There really only should be one server per instance
     for server in WSGIServer.instances:
@@ -44,11 +99,38 @@ def websocket_metrics(queue):
         yield f"{PREFIX}/Worker/Pool/Free", free
         yield f"{PREFIX}/Worker/Pool/Used", pool.size - free
 
+    # How well the URI caches are working, to help size them
+    uri_cache = storage.EXPANDED_URI_CACHE
+    yield f"{PREFIX}/URICache/Size", len(uri_cache)
+    yield f"{PREFIX}/URICache/Hits", uri_cache.hits
+    yield f"{PREFIX}/URICache/Misses", uri_cache.misses
+    if lookups := uri_cache.hits + uri_cache.misses:
+        yield f"{PREFIX}/URICache/HitRatio", uri_cache.hits / lookups
+    uri_cache.reset_counts()
+
+    normalize_info = normalize_uri.cache_info()
+    yield f"{PREFIX}/NormalizeURICache/Size", normalize_info.currsize
+    if lookups := normalize_info.hits + normalize_info.misses:
+        yield (
+            f"{PREFIX}/NormalizeURICache/HitRatio",
+            normalize_info.hits / lookups,
+        )
+
+    # Report the counts and timings since we were last called, and start
+    # counting again
+    counts, timings = dict(COUNTERS), dict(TIMINGS)
+    COUNTERS.clear()
+    TIMINGS.clear()
+    for name, count in counts.items():
+        yield f"{PREFIX}/{name}", count
+    for name, summary in timings.items():
+        yield f"{PREFIX}/{name}", summary
+
 
 NEW_RELIC_CONFIG_PATH = Path("conf/websocket-newrelic.ini")
 
 
-def metrics_process(registry, queue):  # pragma: no cover
+def metrics_process(registry, queue, worker_queues=()):  # pragma: no cover
     session = db.get_session(registry.settings)
 
     with importlib_resources.as_file(NEW_RELIC_CONFIG_PATH) as config_file:
@@ -58,6 +140,6 @@ def metrics_process(registry, queue):  # pragma: no cover
 
     while True:
         with db.read_only_transaction(session):
-            application.record_custom_metrics(websocket_metrics(queue))
+            application.record_custom_metrics(websocket_metrics(queue, worker_queues))
 
         gevent.sleep(METRICS_INTERVAL)
@@ -1,12 +1,15 @@
 import logging
 import os
 import sys
+import time
 
 import gevent
+from gevent.queue import Empty
 from pyramid.events import ApplicationCreated, subscriber
 
+from h import storage
 from h.streamer import db, messages, websocket
-from h.streamer.metrics import metrics_process
+from h.streamer.metrics import metrics_process, record_timing
 
 log = logging.getLogger(__name__)
 
@@ -44,17 +47,51 @@ def start(event):  # pragma: no cover
     registry = event.app.registry
     settings = registry.settings
 
-    greenlets = [
-        # Start greenlets to process messages from RabbitMQ
-        gevent.spawn(messages.process_messages, settings, ANNOTATION_TOPIC, WORK_QUEUE),
-        gevent.spawn(messages.process_messages, settings, USER_TOPIC, WORK_QUEUE),
-        # And one to process the queued work
-        gevent.spawn(process_work_queue, registry, WORK_QUEUE),
-    ]
+    worker_count = int(settings.get("h.streamer.worker_count", 1))
+    batch_size = int(settings.get("h.streamer.batch_size", 1))
+
+    storage.EXPANDED_URI_CACHE.maxsize = int(
+        settings.get("h.streamer.uri_cache_size", storage.EXPANDED_URI_CACHE.maxsize)
+    )
+    storage.EXPANDED_URI_CACHE.ttl = float(
+        settings.get("h.streamer.uri_cache_ttl", storage.EXPANDED_URI_CACHE.ttl)
+    )
+
+    if worker_count > 1:
+        # Each worker gets its own queue, and a dispatcher shares the work
+        # between them so messages which must stay in order go to one worker
+        worker_queues = [
+            gevent.queue.Queue(maxsize=WORK_QUEUE.maxsize) for _ in range(worker_count)
+        ]
+        greenlets = [gevent.spawn(dispatch_work_queue, WORK_QUEUE, worker_queues)]
+    else:
+        worker_queues = [WORK_QUEUE]
+        greenlets = []
+
+    greenlets.extend(
+        [
+            # Start greenlets to process messages from RabbitMQ
+            gevent.spawn(
+                messages.process_messages, settings, ANNOTATION_TOPIC, WORK_QUEUE
+            ),
+            gevent.spawn(messages.process_messages, settings, USER_TOPIC, WORK_QUEUE),
+            # And some to process the queued work
+            *(
+                gevent.spawn(process_work_queue, registry, queue, batch_size)
+                for queue in worker_queues
+            ),
+        ]
+    )
 
     if not os.environ.get("KILL_SWITCH_WEBSOCKET_METRICS"):
         greenlets.append(
-            gevent.spawn(metrics_process, registry, WORK_QUEUE),
+            gevent.spawn(
+                metrics_process,
+                registry,
+                WORK_QUEUE,
+                # The workers' own queues, if they have them
+                worker_queues if worker_count > 1 else (),
+            ),
         )
 
     # Start a "greenlet of last resort" to monitor the worker greenlets and
@@ -62,7 +99,30 @@ def start(event):  # pragma: no cover
     gevent.spawn(supervise, greenlets)
 
 
-def process_work_queue(registry, queue):
+def dispatch_work_queue(queue, worker_queues):
+    """
+    Share the messages from the queue between the worker queues.
+
+    Messages from the same WebSocket client, and messages about the same
+    annotation or user, always go to the same worker queue so they are
+    processed in the order they were received.
+    """
+    for msg in queue:
+        worker_queues[hash(_ordering_key(msg)) % len(worker_queues)].put(msg)
+
+
+def _ordering_key(msg):
+    if isinstance(msg, websocket.Message):
+        return id(msg.socket)
+
+    if isinstance(msg, messages.Message):
+        return msg.payload.get("annotation_id") or msg.payload.get("userid")
+
+    # Let the worker deal with anything else
+    return None
+
+
+def process_work_queue(registry, queue, batch_size=1):
     """
     Process each message from the queue in turn, handling exceptions.
 
@@ -70,18 +130,76 @@ def process_work_queue(registry, queue):
     dispatching them as appropriate. The handling of each message is wrapped in
     code that ensures the database session is appropriately committed and
     closed between messages.
+
+    Up to `batch_size` messages which are already waiting are taken from the
+    queue at once, and runs of annotation events among them are handled
+    together in one transaction (see `messages.handle_annotation_events()`).
     """
 
     session = db.get_session(registry.settings)
 
+    for batch in _batches(queue, batch_size):
+        for group in _group_annotation_events(batch):
+            started_at = time.monotonic()
+
+            with db.read_only_transaction(session):
+                if len(group) > 1:
+                    messages.handle_annotation_events(group, registry, session)
+                elif isinstance(group[0], messages.Message):
+                    messages.handle_message(
+                        group[0], registry, session, topic_handlers=TOPIC_HANDLERS
+                    )
+                elif isinstance(group[0], websocket.Message):
+                    websocket.handle_message(group[0], session)
+                else:
+                    raise UnknownMessageType(repr(group[0]))
+
+            _record_timings(group, started_at)
+
+
+def _batches(queue, batch_size):
+    """Yield lists of up to `batch_size` messages which are waiting in `queue`."""
     for msg in queue:
-        with db.read_only_transaction(session):
-            if isinstance(msg, messages.Message):
-                messages.handle_message(msg, registry, session, TOPIC_HANDLERS)
-            elif isinstance(msg, websocket.Message):
-                websocket.handle_message(msg, session)
-            else:
-                raise UnknownMessageType(repr(msg))
+        batch = [msg]
+
+        while len(batch) < batch_size:
+            try:
+                batch.append(queue.get_nowait())
+            except Empty:
+                break
+
+        yield batch
+
+
+def _group_annotation_events(batch):
+    """Split a batch into runs of annotation events and single other messages."""
+    group = []
+
+    for msg in batch:
+        if isinstance(msg, messages.Message) and msg.topic == ANNOTATION_TOPIC:
+            group.append(msg)
+            continue
+
+        if group:
+            yield group
+            group = []
+
+        yield [msg]
+
+    if group:
+        yield group
+
+
+def _record_timings(group, started_at):
+    finished_at = time.monotonic()
+
+    for msg in group:
+        enqueued_at = getattr(msg, "enqueued_at", None)
+        if enqueued_at is None:
+            continue
+
+        record_timing("WorkQueue/WaitTime", started_at - enqueued_at)
+        record_timing("WorkQueue/Latency", finished_at - enqueued_at)
 
 
 def supervise(greenlets):  # pragma: no cover
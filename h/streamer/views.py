@@ -8,6 +8,8 @@ from h.streamer import streamer, websocket
 
 @view_config(route_name="ws")
 def websocket_view(request):
+    settings = request.registry.settings
+
     # Provide environment which the WebSocket handler can use...
     request.environ.update(
         {
@@ -16,6 +18,10 @@ def websocket_view(request):
             "h.ws.identity": request.identity,
         }
     )
+    # Settings from ini files are strings, so they need casting
+    for key, type_ in (("outbox_high_water_mark", int), ("outbox_evict_after", float)):
+        if f"h.streamer.{key}" in settings:
+            request.environ[f"h.ws.{key}"] = type_(settings[f"h.streamer.{key}"])
 
     app = WebSocketWSGIApplication(handler_cls=websocket.WebSocket)
     return request.get_response(app)
@@ -1,14 +1,19 @@
 import copy
 import json
 import logging
+import time
 import weakref
-from collections import namedtuple
+from collections import deque, namedtuple
 from typing import Self
 
+import gevent
 import jsonschema
+import orjson
 from gevent.queue import Full
+from ws4py.messaging import TextMessage
 from ws4py.websocket import WebSocket as _WebSocket
 
+from h.streamer import metrics
 from h.streamer.filter import FILTER_SCHEMA, SocketFilter
 
 log = logging.getLogger(__name__)
@@ -18,8 +23,11 @@ log = logging.getLogger(__name__)
 MESSAGE_HANDLERS = {}
 
 
-# An incoming message from a WebSocket client.
-class Message(namedtuple("Message", ["socket", "payload"])):  # noqa: PYI024, SLOT002
+# An incoming message from a WebSocket client. `enqueued_at` is the
+# `time.monotonic()` time the message was put on the work queue.
+class Message(  # noqa: SLOT002
+    namedtuple("Message", ["socket", "payload", "enqueued_at"], defaults=[None])  # noqa: PYI024
+):
     def reply(self, payload, ok=True):  # noqa: FBT002
         """
         Send a response to this message.
@@ -50,6 +58,12 @@ class WebSocket(_WebSocket):
     debug = False
     """Enable debug logging for this connection."""
 
+    outbox_high_water_mark = 100
+    """Number of waiting outgoing frames above which the client is too slow."""
+
+    outbox_evict_after = 30.0
+    """Seconds a client can stay above the high water mark before eviction."""
+
     def __init__(self, sock, protocols=None, extensions=None, environ=None):
         super().__init__(
             sock,
@@ -64,6 +78,20 @@ class WebSocket(_WebSocket):
 
         self._work_queue = environ["h.ws.streamer_work_queue"]
 
+        self.outbox_high_water_mark = environ.get(
+            "h.ws.outbox_high_water_mark", self.outbox_high_water_mark
+        )
+        self.outbox_evict_after = environ.get(
+            "h.ws.outbox_evict_after", self.outbox_evict_after
+        )
+
+        # Outgoing frames waiting to be written, as `[coalesce_key, frame]`
+        # entries, and the entries which can still be coalesced by key
+        self._outbox = deque()
+        self._coalescable = {}
+        self._outbox_writer = None
+        self._over_limit_since = None
+
     def __new__(cls, *_args, **_kwargs):
         instance = super(WebSocket, cls).__new__(cls)  # noqa: UP008
         cls.instances.add(instance)
@@ -82,8 +110,12 @@ class WebSocket(_WebSocket):
             return
 
         try:
-            self._work_queue.put(Message(socket=self, payload=payload), timeout=0.1)
+            self._work_queue.put(
+                Message(socket=self, payload=payload, enqueued_at=time.monotonic()),
+                timeout=0.1,
+            )
         except Full:  # pragma: no cover
+            metrics.COUNTERS["WorkQueue/DroppedMessages"] += 1
             log.warning(
                 "Streamer work queue full! Unable to queue message from "
                 "WebSocket client having waited 0.1s: giving up."
@@ -96,12 +128,113 @@ class WebSocket(_WebSocket):
             self.instances.remove(self)
         except KeyError:
             pass
+        SocketFilter.remove_filter(self)
 
     def send_json(self, payload):
         if self.debug:
             log.info("Sending message %s (terminated: %s)", payload, self.terminated)
         if not self.terminated:
-            self.send(json.dumps(payload))
+            self._queue_frame(prepare_frame(payload))
+
+    def send_frame(self, frame, coalesce_key=None, droppable=False):  # noqa: FBT002
+        """
+        Send a frame prepared by `prepare_frame()`.
+
+        Frames are queued and written by a separate greenlet, so a slow client
+        doesn't hold up the caller. If the client falls more than
+        `outbox_high_water_mark` frames behind, droppable frames are dropped
+        and if it stays that far behind for `outbox_evict_after` seconds it is
+        disconnected.
+
+        :param frame: The frame to send
+        :param coalesce_key: Replace any frame with the same key which is still
+            waiting to be sent, instead of sending both
+        :param droppable: Whether the frame can be dropped if the client is
+            too far behind
+        """
+        if self.debug:
+            log.info("Sending frame %s (terminated: %s)", frame, self.terminated)
+        if not self.terminated:
+            self._queue_frame(frame, coalesce_key, droppable)
+
+    def _queue_frame(self, frame, coalesce_key=None, droppable=False):  # noqa: FBT002
+        if coalesce_key is not None and coalesce_key in self._coalescable:
+            self._coalescable[coalesce_key][1] = frame
+            metrics.COUNTERS["Outbox/CoalescedFrames"] += 1
+            return
+
+        if len(self._outbox) >= self.outbox_high_water_mark:
+            now = time.monotonic()
+            if self._over_limit_since is None:
+                self._over_limit_since = now
+            elif now - self._over_limit_since > self.outbox_evict_after:
+                self._evict()
+                return
+
+            if droppable:
+                metrics.COUNTERS["Outbox/DroppedFrames"] += 1
+                return
+
+        entry = [coalesce_key, frame]
+        self._outbox.append(entry)
+        if coalesce_key is not None:
+            self._coalescable[coalesce_key] = entry
+
+        if self._outbox_writer is None:
+            self._outbox_writer = gevent.spawn(self._write_outbox)
+
+    def _write_outbox(self):
+        try:
+            while self._outbox:
+                entry = self._outbox.popleft()
+                coalesce_key, frame = entry
+                if self._coalescable.get(coalesce_key) is entry:
+                    del self._coalescable[coalesce_key]
+
+                if len(self._outbox) < self.outbox_high_water_mark:
+                    self._over_limit_since = None
+
+                self._write(frame)
+        except (RuntimeError, OSError):
+            # The connection has gone, so there's no one to send the rest to
+            self._clear_outbox()
+        finally:
+            self._outbox_writer = None
+
+    def _evict(self):
+        log.warning(
+            "Disconnecting slow WebSocket client with %d frames waiting",
+            len(self._outbox),
+        )
+        metrics.COUNTERS["Outbox/EvictedSockets"] += 1
+        self._clear_outbox()
+
+        # Drop the connection without a closing handshake, which would have to
+        # wait behind everything the client hasn't read yet
+        self.server_terminated = True
+        self.close_connection()
+
+    def _clear_outbox(self):
+        self._outbox.clear()
+        self._coalescable.clear()
+        self._over_limit_since = None
+
+
+def prepare_frame(payload, fast_json=False):  # noqa: FBT002
+    """
+    Serialize `payload` to a WebSocket text frame for `WebSocket.send_frame()`.
+
+    When the same payload is sent to many sockets this is much cheaper than
+    calling `WebSocket.send_json()` on each of them, as the JSON encoding and
+    framing is only done once. Frames sent by a server are never masked, so
+    the same bytes can be written to every socket.
+
+    :param payload: JSON serializable payload to send
+    :param fast_json: Use `orjson` instead of the standard library to encode
+        the payload
+    """
+    data = orjson.dumps(payload) if fast_json else json.dumps(payload)
+    return TextMessage(data).single(mask=False)
 
 
 def handle_message(message, session=None):
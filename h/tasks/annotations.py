@@ -1,7 +1,10 @@
+import newrelic.agent
+
 from h.db.types import URLSafeUUID
 from h.models import Annotation
 from h.services.annotation_authority_queue import AnnotationAuthorityQueueService
 from h.services.annotation_write import AnnotationWriteService
+from h.services.public_annotation_count import PublicAnnotationCountService
 from h.tasks.celery import celery, get_task_logger
 
 log = get_task_logger(__name__)
@@ -47,3 +50,17 @@ def publish_annotation_event_for_authority(event_action, annotation_id):
     celery.request.find_service(AnnotationAuthorityQueueService).publish(
         event_action, annotation_id
     )
+
+
+@celery.task
+def reconcile_public_annotation_counts():
+    """Correct any public annotation counts which have drifted."""
+    counts = celery.request.find_service(PublicAnnotationCountService).reconcile()
+
+    log.info(counts)
+    newrelic.agent.record_custom_metrics(
+        [
+            (f"Custom/PublicAnnotationCount/{key}", value)
+            for key, value in counts.items()
+        ]
+    )
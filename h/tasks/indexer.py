@@ -28,10 +28,12 @@ def delete_annotation(id_):
 
 
 @celery.task
-def sync_annotations(limit):
+def sync_annotations(limit, partition=0, partitions=1):
     annotation_sync_service = celery.request.find_service(AnnotationSyncService)
 
-    counts = annotation_sync_service.sync(limit)
+    counts = annotation_sync_service.sync(
+        limit, partition=partition, partitions=partitions
+    )
 
     log.info(dict(counts))
     newrelic.agent.record_custom_metrics(
@@ -42,6 +44,18 @@ def sync_annotations(limit):
     )
 
 
+@celery.task
+def sync_annotations_from_watermark(limit):
+    annotation_sync_service = celery.request.find_service(AnnotationSyncService)
+
+    counts = annotation_sync_service.sync_from_watermark(limit)
+
+    log.info(counts)
+    newrelic.agent.record_custom_metrics(
+        [(f"Custom/SyncAnnotations/{key}", value) for key, value in counts.items()]
+    )
+
+
 @celery.task
 def report_job_queue_metrics():
     metrics = celery.request.find_service(name="job_queue_metrics").metrics()
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A size bounded, least recently used cache whose entries expire.
+
+    Entries are evicted once there are more than `maxsize` of them (least
+    recently used first), and are ignored once they are older than `ttl`
+    seconds. Both can be changed at any time.
+
+    The number of hits and misses since it was created (or since the counts
+    were last reset) are kept in `hits` and `misses`, to help size the cache.
+
+    Example::
+
+        cache = TTLCache(maxsize=1000, ttl=60)
+
+        cache.set("key", "value")
+        cache.get("key")  # => "value"
+        cache.invalidate(["key"])
+        cache.get("key")  # => None
+    """
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._timer = timer
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` if there isn't one."""
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        if expires_at <= self._timer():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Cache `value` for `key`, evicting the oldest entries if over size."""
+        self._entries[key] = (self._timer() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """Remove any cached values for `keys`."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all cached values."""
+        self._entries.clear()
+
+    def reset_counts(self):
+        """Start counting hits and misses from zero again."""
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
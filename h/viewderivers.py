@@ -1,5 +1,7 @@
 from secrets import token_hex
 
+from pyramid.viewderivers import INGRESS
+
 
 def csp_protected_view(view, info):
     """
@@ -47,5 +49,28 @@ def csp_protected_view(view, info):
 csp_protected_view.options = ("csp_insecure_optout",)  # type: ignore[attr-defined]
 
 
+def read_only_view(view, info):
+    """
+    Mark requests for views which only read from the database.
+
+    Views can specify ``read_only=True`` in their view options to let the
+    services they use read from the replica database (see `h.db.routing`).
+    This runs before any other deriver so it's in place before services are
+    created, e.g. by permission checks.
+    """
+    if not info.options.get("read_only"):
+        return view
+
+    def wrapper_view(context, request):
+        request.read_only = True
+        return view(context, request)
+
+    return wrapper_view
+
+
+read_only_view.options = ("read_only",)  # type: ignore[attr-defined]
+
+
 def includeme(config):  # pragma: nocover
     config.add_view_deriver(csp_protected_view)
+    config.add_view_deriver(read_only_view, under=INGRESS)
@@ -32,7 +32,7 @@ class SearchController:
         # Cache a copy of the extracted query params for the child controllers to use if needed.
         self.parsed_query_params = query.extract(self.request)
 
-    @view_config(request_method="GET")
+    @view_config(request_method="GET", read_only=True)
     def search(self):  # pragma: no cover
         # Make a copy of the query params to be consumed by search.
         query_params = self.parsed_query_params.copy()
@@ -94,7 +94,7 @@ class GroupSearchController(SearchController):
         self.context = context
         self.group = context.group
 
-    @view_config(request_method="GET")
+    @view_config(request_method="GET", read_only=True)
     def search(self):
         result = self._check_access_permissions()
         if result is not None:
@@ -322,7 +322,7 @@ class UserSearchController(SearchController):
         super().__init__(request)
         self.user = context.user
 
-    @view_config(request_method="GET")
+    @view_config(request_method="GET", read_only=True)
     def search(self):
         result = super().search()
 
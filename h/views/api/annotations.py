@@ -26,20 +26,28 @@ from h.schemas.annotation import (
     SearchParamsSchema,
     UpdateAnnotationSchema,
 )
+from h.schemas.base import ValidationError
 from h.schemas.util import validate_query_params
 from h.security import Permission
-from h.services import AnnotationWriteService
+from h.services import AnnotationWriteService, PublicAnnotationCountService
 from h.views.api.config import api_config
 from h.views.api.helpers.json_payload import json_payload
 
 _ = i18n.TranslationStringFactory(__package__)
 
+_COUNT_ONLY_PARAMS = {"limit", "offset", "order", "search_after", "sort", "uri", "url"}
+"""Search params which don't change which annotations are counted (besides the URI)."""
+
+_REPLIES_CHUNK_SIZE = 200
+"""How many replies to load and present at a time, as threads can be any size."""
+
 
 @api_config(
     versions=["v1", "v2"],
     route_name="api.search",
     link_name="search",
     description="Search for annotations",
+    read_only=True,
 )
 def search(request):
     """Search the database for annotations matching with the given query."""
@@ -48,7 +56,17 @@ def search(request):
 
     separate_replies = params.pop("_separate_replies", False)
 
-    result = search_lib.Search(request, separate_replies=separate_replies).run(params)
+    if not separate_replies and (count := _public_count(request, params)) is not None:
+        return {"total": count, "rows": []}
+
+    try:
+        result = search_lib.Search(request, separate_replies=separate_replies).run(
+            params
+        )
+    except search_lib.ExpiredCursorError as err:
+        raise ValidationError(
+            _("cursor has expired, start again with an empty cursor")
+        ) from err
 
     svc = request.find_service(name="annotation_json")
 
@@ -61,12 +79,40 @@ def search(request):
 
     if separate_replies:
         out["replies"] = svc.present_all_for_user(
-            annotation_ids=result.reply_ids, user=request.user
+            annotation_ids=result.reply_ids,
+            user=request.user,
+            chunk_size=_REPLIES_CHUNK_SIZE,
         )
+        out["replies_truncated"] = result.replies_truncated
+
+    if "cursor" in request.params:
+        out["next_cursor"] = result.next_cursor
 
     return out
 
 
+def _public_count(request, params):
+    """
+    Count public annotations without searching, if that's all that's asked for.
+
+    This is for anonymous requests for the number of annotations on a page
+    (`limit=0` and a single `uri`), which are answered from the counts kept
+    by `PublicAnnotationCountService`.
+
+    :returns: The count, or `None` if the request needs a search
+    """
+    uris = params.getall("uri") + params.getall("url")
+    if (
+        params.get("limit") != 0
+        or request.authenticated_userid is not None
+        or len(uris) != 1
+        or not _COUNT_ONLY_PARAMS.issuperset(params.keys())
+    ):
+        return None
+
+    return request.find_service(PublicAnnotationCountService).count(uris[0])
+
+
 @api_config(
     versions=["v1", "v2"],
     route_name="api.annotations",
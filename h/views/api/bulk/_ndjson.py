@@ -1,32 +1,114 @@
-import json
-from collections.abc import Iterable
-from itertools import chain
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, repeat
 
 from pyramid.response import Response
 
+from h.renderers import dumps
 
-def get_ndjson_response(results: Iterable | None) -> Response:
+CHUNK_SIZE = 64 * 1024
+"""The rough number of bytes to write to the client at a time."""
+
+
+def get_ndjson_response(
+    results: Iterable | None,
+    fast_json=False,  # noqa: FBT002
+    present: Callable | None = None,
+) -> Response:
     """
     Create a streaming response for an NDJSON based end-point.
 
     :param results: Iterable series of responses to convert to JSON
+    :param fast_json: Encode with `orjson` (see `h.renderers.dumps()`)
+    :param present: A callable to turn each result into what's converted
+        to JSON. Pass this rather than wrapping `results` in a generator,
+        so that `results` itself is closed if the client goes away
     """
     if results is None:
         return Response(status=204)
 
+    lines = (
+        _encode(result, fast_json, present) + b"\n" for result in _started(results)
+    )
+
+    # An NDJSON response is required
+    return Response(
+        app_iter=_chunked(lines, close=results),
+        status=200,
+        content_type="application/x-ndjson",
+    )
+
+
+def get_json_array_response(
+    results: Iterable,
+    content_type: str,
+    fast_json=False,  # noqa: FBT002
+    present: Callable | None = None,
+) -> Response:
+    """
+    Create a streaming response containing a JSON array.
+
+    This is for end-points which have always returned a single JSON array,
+    but whose results can be streamed just like NDJSON ones.
+
+    :param results: Iterable series of items to convert to JSON
+    :param content_type: The content type of the response
+    :param fast_json: Encode with `orjson` (see `h.renderers.dumps()`)
+    :param present: A callable to turn each item into what's converted to
+        JSON (see `get_ndjson_response()`)
+    """
+    items = (_encode(result, fast_json, present) for result in _started(results))
+    separators = chain([b""], repeat(b","))
+    parts = chain.from_iterable(zip(separators, items, strict=False))
+
+    return Response(
+        app_iter=_chunked(chain([b"["], parts, [b"]"]), close=results),
+        status=200,
+        content_type=content_type,
+    )
+
+
+def _started(results: Iterable) -> Iterator:
     # When we get an iterator we must force the first return value to be
     # created to be sure input validation has occurred. Otherwise, we might
     # raise errors outside the view when called.
     results = iter(results)
 
     try:
-        results = chain([next(results)], results)
+        return chain([next(results)], results)
     except StopIteration:
-        results = []
+        return iter([])
 
-    # An NDJSON response is required
-    return Response(
-        app_iter=((json.dumps(result) + "\n").encode("utf-8") for result in results),
-        status=200,
-        content_type="application/x-ndjson",
-    )
+
+def _encode(result, fast_json, present=None) -> bytes:
+    if present:
+        result = present(result)
+
+    data = dumps(result, fast_json=fast_json)
+    return data if isinstance(data, bytes) else data.encode("utf-8")
+
+
+def _chunked(parts: Iterable[bytes], close: Iterable) -> Iterator[bytes]:
+    """
+    Join `parts` into chunks of around `CHUNK_SIZE` bytes.
+
+    Writing every line to the client separately is slow, but so is
+    building the whole body in memory. `close` is closed when we're done,
+    including when the client goes away before the end, so any database
+    cursor behind it is released straight away.
+    """
+    chunk, size = [], 0
+
+    try:
+        for part in parts:
+            chunk.append(part)
+            size += len(part)
+
+            if size >= CHUNK_SIZE:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+
+        if chunk:
+            yield b"".join(chunk)
+    finally:
+        if hasattr(close, "close"):
+            close.close()
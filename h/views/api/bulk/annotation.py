@@ -2,6 +2,7 @@ import json
 
 from importlib_resources import files
 
+from h.renderers import fast_json
 from h.schemas import ValidationError
 from h.schemas.base import JSONSchema
 from h.security import Permission
@@ -26,6 +27,7 @@ class BulkAnnotationSchema(JSONSchema):
     description="Retrieve a large number of annotations in one go",
     subtype="x-ndjson",
     permission=Permission.API.BULK_ACTION,
+    read_only=True,
 )
 def bulk_annotation(request):
     """Retrieve a large number of annotations at once for LMS."""
@@ -51,7 +53,9 @@ def bulk_annotation(request):
         raise ValidationError(str(err)) from err
 
     return get_ndjson_response(
-        _present_annotation(annotation) for annotation in annotations
+        annotations,
+        fast_json=fast_json(request.registry),
+        present=_present_annotation,
     )
 
 
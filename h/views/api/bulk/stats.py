@@ -1,11 +1,16 @@
 import json
 
 from importlib_resources import files
-from pyramid.response import Response
 
+from h.renderers import fast_json
 from h.schemas.base import JSONSchema
 from h.security import Permission
-from h.services.bulk_api.lms_stats import BulkLMSStatsService, CountsGroupBy
+from h.services.bulk_api.lms_stats import (
+    AnnotationCounts,
+    BulkLMSStatsService,
+    CountsGroupBy,
+)
+from h.views.api.bulk._ndjson import get_json_array_response
 from h.views.api.config import api_config
 
 
@@ -23,6 +28,7 @@ class AssignmentStatsSchema(JSONSchema):
     link_name="bulk.lms.annotations",
     subtype="x-ndjson",
     permission=Permission.API.BULK_ACTION,
+    read_only=True,
 )
 def get_annotation_counts(request):
     data = AssignmentStatsSchema().validate(request.json)
@@ -35,19 +41,22 @@ def get_annotation_counts(request):
         h_userids=query_filter.get("h_userids"),
     )
 
-    return Response(
-        json=[
-            {
-                "assignment_id": row.assignment_id,
-                "userid": row.userid,
-                "display_name": row.display_name,
-                "annotations": row.annotations,
-                "replies": row.replies,
-                "page_notes": row.page_notes,
-                "last_activity": row.last_activity.isoformat(),
-            }
-            for row in stats
-        ],
-        status=200,
+    # This has always returned a single JSON array, despite the content type
+    return get_json_array_response(
+        stats,
         content_type="application/x-ndjson",
+        fast_json=fast_json(request.registry),
+        present=_present_counts,
     )
+
+
+def _present_counts(row: AnnotationCounts) -> dict:
+    return {
+        "assignment_id": row.assignment_id,
+        "userid": row.userid,
+        "display_name": row.display_name,
+        "annotations": row.annotations,
+        "replies": row.replies,
+        "page_notes": row.page_notes,
+        "last_activity": row.last_activity.isoformat(),
+    }
@@ -1,3 +1,5 @@
+from sqlalchemy import tuple_
+
 from h.models import Annotation
 from h.models.annotation import ModerationStatus
 from h.schemas.api.group import FilterGroupAnnotationsSchema
@@ -6,8 +8,29 @@ from h.schemas.util import validate_query_params
 from h.security import Permission
 from h.services.annotation_read import AnnotationReadService
 from h.traversal import GroupContext
+from h.util.cache import TTLCache
+from h.util.datetime import utc_iso8601
 from h.views.api.config import api_config
 
+TOTAL_CACHE_KEY = "h.views.api.group_annotations.total_cache"
+"""The registry key of the process wide cache of big groups' totals."""
+
+
+def total_cache(registry):
+    """Return the process wide cache of big groups' annotation totals."""
+    cache = registry.get(TOTAL_CACHE_KEY)
+    if cache is None:
+        cache = registry.setdefault(
+            TOTAL_CACHE_KEY,
+            TTLCache(
+                maxsize=1000,
+                ttl=float(
+                    registry.settings.get("h.group_annotations.total_cache_ttl", 60.0)
+                ),
+            ),
+        )
+    return cache
+
 
 @api_config(
     versions=["v1", "v2"],
@@ -35,18 +58,74 @@ def list_annotations(context: GroupContext, request):
         groupid=group.pubid, moderation_status=moderation_status_filter
     )
 
-    total = request.db.execute(AnnotationReadService.count_query(query)).scalar_one()
+    total = _total(request, query, cache_key=(group.pubid, moderation_status_filter))
 
-    query = query.order_by(Annotation.created.desc()).limit(pagination.size)
+    page_query = (
+        query.with_only_columns(Annotation.id, Annotation.created)
+        .order_by(Annotation.created.desc(), Annotation.id.desc())
+        .limit(pagination.size)
+    )
+
+    if pagination.after and pagination.after_id:
+        # Annotations can be created at the same time, so we page by the
+        # creation time and id together
+        page_query = page_query.where(
+            tuple_(Annotation.created, Annotation.id)
+            < (pagination.after, pagination.after_id)
+        )
+    elif pagination.after:
+        page_query = page_query.where(Annotation.created < pagination.after)
 
-    if pagination.after:
-        query = query.where(Annotation.created < pagination.after)
+    # The annotations are presented from `request.db_reader` (see
+    # `AnnotationReadService`) so we look up their ids there too, otherwise
+    # annotations the replica hasn't caught up with would go missing
+    rows = request.db_reader.execute(page_query).all()
+
+    annotations_dicts = annotation_json_service.present_all_for_user(
+        [row.id for row in rows], request.user
+    )
 
-    annotations = request.db.scalars(query)
+    return {
+        "meta": {"page": {"total": total, "next": _next_page(rows, pagination)}},
+        "data": annotations_dicts,
+    }
 
-    annotations_dicts = [
-        annotation_json_service.present(annotation, request.user)
-        for annotation in annotations
-    ]
 
-    return {"meta": {"page": {"total": total}}, "data": annotations_dicts}
+def _next_page(rows, pagination):
+    """Return the `page[after]` and `page[after_id]` params of the next page."""
+    if len(rows) < pagination.size:
+        # This is the last page
+        return None
+
+    return {"after": utc_iso8601(rows[-1].created), "after_id": rows[-1].id}
+
+
+def _total(request, query, cache_key):
+    """
+    Return the number of annotations `query` matches.
+
+    Counting every annotation of a big group is slow, so groups with at
+    least `h.group_annotations.cache_totals_above` matching annotations have
+    their totals cached for a while (see `total_cache()`), shared by every
+    page and moderator. Other groups are counted exactly every time, which
+    is cheap as the count stops at that number.
+    """
+    cache = total_cache(request.registry)
+    total = cache.get(cache_key)
+    if total is not None:
+        return total
+
+    threshold = int(
+        request.registry.settings.get("h.group_annotations.cache_totals_above", 10000)
+    )
+    total = request.db_reader.execute(
+        AnnotationReadService.count_query(query, limit=threshold)
+    ).scalar_one()
+    if total < threshold:
+        return total
+
+    total = request.db_reader.execute(
+        AnnotationReadService.count_query(query)
+    ).scalar_one()
+    cache.set(cache_key, total)
+    return total
@@ -1,26 +1,93 @@
 import re
 
+import newrelic.agent
 from pyramid import httpexceptions
 from sqlalchemy import text
 from webob.multidict import MultiDict
 
 from h import search
+from h.services import PublicAnnotationCountService
+from h.util.cache import TTLCache
 from h.util.uri import normalize
 from h.util.view import json_view
 
+COUNT_CACHE_KEY = "h.views.badge.count_cache"
+"""The registry key of the process wide cache of badge counts."""
 
-def _has_uri_ever_been_annotated(db, uri):
-    """Return `True` if a given URI has ever been annotated."""
+
+def count_cache(registry):
+    """Return the process wide cache of badge counts for an app."""
+    cache = registry.get(COUNT_CACHE_KEY)
+    if cache is None:
+        settings = registry.settings
+        cache = registry.setdefault(
+            COUNT_CACHE_KEY,
+            TTLCache(
+                maxsize=int(settings.get("h.badge.cache_size", 10000)),
+                ttl=float(settings.get("h.badge.cache_ttl", 30.0)),
+            ),
+        )
+    return cache
+
+
+def _readable_groups_fingerprint(user):
+    """
+    Return a key for everything about a user which changes their count.
+
+    Besides the groups they can read, a user sees their own private
+    annotations and, in groups they moderate, hidden annotations. So the
+    fingerprint is their userid along with their memberships and roles, and
+    anonymous users all share the same (`None`) one.
+    """
+    if user is None:
+        return None
+
+    return (
+        user.userid,
+        tuple(
+            sorted(
+                (membership.group_id, tuple(membership.roles))
+                for membership in user.memberships
+            )
+        ),
+    )
+
+
+def _has_uri_ever_been_annotated(db, uri_normalized):
+    """Return `True` if a given (normalized) URI has ever been annotated."""
 
     # This check is written with SQL directly to guarantee an efficient query
     # and minimize SQLAlchemy overhead. We query `document_uri.uri_normalized`
     # instead of `annotation.target_uri_normalized` because there is an existing
     # index on `uri_normalized`.
     query = "SELECT EXISTS(SELECT 1 FROM document_uri WHERE uri_normalized = :uri)"
-    result = db.execute(text(query), {"uri": normalize(uri)}).first()
+    result = db.execute(text(query), {"uri": uri_normalized}).first()
     return result[0] is True
 
 
+def _count_annotations(request, uri, uri_normalized):
+    """Return the number of annotations the requester can see on a page."""
+    if request.authenticated_userid is None:
+        # Anonymous users only see public annotations, which are counted as
+        # they're written
+        count = request.find_service(PublicAnnotationCountService).count(uri)
+        if count is not None:
+            return count
+
+    if not _has_uri_ever_been_annotated(request.db, uri_normalized):
+        # Do a cheap check to see if this URI has ever been annotated. If not,
+        # and most haven't, then we can skip the costs of a blocklist lookup or
+        # search request. In addition to the Elasticsearch query, the search request
+        # involves several DB queries to expand URIs and enumerate group IDs
+        # readable by the current user.
+        return 0
+
+    searcher = search.Search(request)
+    if count_limit := request.registry.settings.get("h.badge.count_limit"):
+        searcher.append_modifier(search.TotalHitsLimit(int(count_limit)))
+    return searcher.run(MultiDict({"uri": uri, "limit": 0})).total
+
+
 def _regex_or(options):
     """Create a regex pattern matching any of the provided strings."""
 
@@ -81,6 +148,11 @@ def badge(request):
     Certain pages are blocklisted so that the badge never shows a number on
     those pages. The Chrome extension is oblivious to this, we just tell it
     that there are 0 annotations.
+
+    Counts are cached for a short time (see `count_cache()`). Whether each
+    request hit the cache is recorded on its New Relic transaction as the
+    `badge_cache` attribute, to compare latencies (e.g. the 95th percentile)
+    of hits and misses.
     """
     # Disable NewRelic for this function.
     # newrelic.agent.ignore_transaction(flag=True)  # noqa: ERA001
@@ -91,8 +163,6 @@ def badge(request):
         raise httpexceptions.HTTPBadRequest()  # noqa: RSE102
 
     if Blocklist.is_blocked(uri):
-        count = 0
-
         # Blocked things stay blocked, so we can calm down the traffic to us
         cache_control = request.response.cache_control
         cache_control.prevent_auto = True
@@ -104,17 +174,22 @@ def badge(request):
         # much we can do about this, but browsers will still individually
         # respect the caching headers.
 
-    elif not _has_uri_ever_been_annotated(request.db, uri):
-        # Do a cheap check to see if this URI has ever been annotated. If not,
-        # and most haven't, then we can skip the costs of a blocklist lookup or
-        # search request. In addition to the Elasticsearch query, the search request
-        # involves several DB queries to expand URIs and enumerate group IDs
-        # readable by the current user.
-        count = 0
+        newrelic.agent.add_custom_attribute("badge_cache", "blocked")
+        return {"total": 0}
+
+    # Counts are cached per page and per set of readable annotations, so all
+    # anonymous users share one count for each page without touching the DB
+    uri_normalized = normalize(uri)
+    cache = count_cache(request.registry)
+    cache_key = (uri_normalized, _readable_groups_fingerprint(request.user))
 
-    else:
-        query = MultiDict({"uri": uri, "limit": 0})
-        result = search.Search(request).run(query)
-        count = result.total
+    count = cache.get(cache_key)
+    outcome = "Miss" if count is None else "Hit"
+    newrelic.agent.add_custom_attribute("badge_cache", outcome.lower())
+    newrelic.agent.record_custom_metric(f"Custom/Badge/Cache/{outcome}", 1)
+    if count is not None:
+        return {"total": count}
 
+    count = _count_annotations(request, uri, uri_normalized)
+    cache.set(cache_key, count)
     return {"total": count}
@@ -0,0 +1,76 @@
+import statistics
+import time
+
+import pytest
+
+from h.models.annotation import ModerationStatus
+
+
+@pytest.mark.skip("Only of use during development")
+@pytest.mark.usefixtures("with_clean_db_and_search_index")
+class TestSearchSpeed:  # pragma: no cover
+    """Measure how many annotations per second `/api/search` can present."""
+
+    @pytest.mark.usefixtures("annotations")
+    @pytest.mark.parametrize("authenticated", (False, True))
+    @pytest.mark.parametrize("limit", (20, 200))
+    def test_speed(self, app, auth_header, authenticated, limit):
+        headers = {"Authorization": auth_header} if authenticated else {}
+
+        def search():
+            response = app.get("/api/search", headers=headers, params={"limit": limit})
+            return len(response.json["rows"])
+
+        # Warm up caches and connections before timing anything
+        search()
+
+        rows, durations = 0, []
+        for _ in range(50):
+            start = time.perf_counter()
+            rows += search()
+            durations.append(time.perf_counter() - start)
+
+        print(  # noqa: T201
+            f"limit={limit} authenticated={authenticated}: "
+            f"median {statistics.median(durations) * 1000:.1f} ms, "
+            f"{rows / sum(durations):.0f} rows/sec"
+        )
+
+    @pytest.fixture
+    def annotations(self, app, db_session, factories, user):
+        annotations = factories.Annotation.create_batch(
+            200,
+            userid=user.userid,
+            groupid="__world__",
+            shared=True,
+            moderation_status=ModerationStatus.APPROVED,
+        )
+        # Add some replies so the threads have some work to do
+        annotations.extend(
+            factories.Annotation(
+                userid=user.userid,
+                groupid="__world__",
+                shared=True,
+                moderation_status=ModerationStatus.APPROVED,
+                references=[parent.id],
+            )
+            for parent in annotations[:50]
+        )
+        db_session.commit()
+
+        for annotation in annotations:
+            app.post(f"/api/annotations/{annotation.id}/reindex", {})
+
+        return annotations
+
+    @pytest.fixture
+    def user(self, db_session, factories):
+        user = factories.User()
+        db_session.commit()
+        return user
+
+    @pytest.fixture
+    def auth_header(self, db_session, factories, user):
+        token = factories.DeveloperToken(user=user)
+        db_session.commit()
+        return f"Bearer {token.value}"
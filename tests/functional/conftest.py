@@ -8,6 +8,7 @@ from webtest import TestApp
 
 from h import db
 from h.app import create_app
+from h.services.nipsa import FLAGGED_USERIDS_KEY
 from tests.common import factories as factories_common
 from tests.functional.fixtures.authentication import *  # noqa: F403
 from tests.functional.fixtures.groups import *  # noqa: F403
@@ -57,10 +58,13 @@ def app(pyramid_app):
 
 
 @pytest.fixture(autouse=True)
-def reset_app(app):
+def reset_app(app, pyramid_app):
     yield
 
     app.reset()
+    # Tests change users' NIPSA flags directly in the DB, which the app's
+    # cache of NIPSA'd users doesn't hear about
+    pyramid_app.registry.pop(FLAGGED_USERIDS_KEY, None)
 
 
 @pytest.fixture
@@ -32,6 +32,50 @@ class TestUpdateSettingsCommand:
         return patch("h.cli.commands.search.config.update_index_settings")
 
 
+class TestReindexCommand:
+    def test_it_reindexes(self, cli, cliconfig, pyramid_request, reindex):
+        result = cli.invoke(
+            search.reindex,
+            ["--processes", "2", "--slices", "8", "--chunk-size", "100", "--resume"],
+            obj=cliconfig,
+        )
+
+        assert not result.exit_code
+        reindex.reindex.assert_called_once_with(
+            pyramid_request,
+            cliconfig["bootstrap"],
+            processes=2,
+            slice_count=8,
+            chunk_size=100,
+            resume=True,
+        )
+
+    def test_defaults(self, cli, cliconfig, pyramid_request, reindex):
+        result = cli.invoke(search.reindex, [], obj=cliconfig)
+
+        assert not result.exit_code
+        reindex.reindex.assert_called_once_with(
+            pyramid_request,
+            cliconfig["bootstrap"],
+            processes=4,
+            slice_count=64,
+            chunk_size=500,
+            resume=False,
+        )
+
+    def test_handles_runtimeerror(self, cli, cliconfig, reindex):
+        reindex.reindex.side_effect = RuntimeError("asplode!")
+
+        result = cli.invoke(search.reindex, [], obj=cliconfig)
+
+        assert result.exit_code == 1
+        assert "asplode!" in result.output
+
+    @pytest.fixture
+    def reindex(self, patch):
+        return patch("h.cli.commands.search.reindex_")
+
+
 @pytest.fixture
 def cliconfig(pyramid_request, mock_es_client):
     pyramid_request.es = mock_es_client
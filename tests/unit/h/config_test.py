@@ -17,6 +17,56 @@ from h.config import configure
             "h_pyramid_sentry.init.environment",
             "test-env",
         ),
+        (None, None, "h.search.sync_mode", "queue"),
+        ("SEARCH_SYNC_MODE", "watermark", "h.search.sync_mode", "watermark"),
+        (None, None, "h.search.max_replies", 200),
+        ("SEARCH_MAX_REPLIES", "1000", "h.search.max_replies", 1000),
+        (None, None, "h.realtime.transport", "amqp"),
+        ("REALTIME_TRANSPORT", "memory", "h.realtime.transport", "memory"),
+        (None, None, "h.streamer.worker_count", 1),
+        ("STREAMER_WORKER_COUNT", "4", "h.streamer.worker_count", 4),
+        ("STREAMER_BATCH_SIZE", "20", "h.streamer.batch_size", 20),
+        (None, None, "h.streamer.outbox_high_water_mark", 100),
+        ("STREAMER_URI_CACHE_SIZE", "500", "h.streamer.uri_cache_size", 500),
+        (None, None, "h.streamer.uri_cache_ttl", 60.0),
+        (None, None, "h.badge.cache_ttl", 30.0),
+        ("BADGE_CACHE_SIZE", "500", "h.badge.cache_size", 500),
+        ("BADGE_COUNT_LIMIT", "1000", "h.badge.count_limit", 1000),
+        (
+            "REPLICA_DATABASE_POOL_SIZE",
+            "10",
+            "sqlalchemy.replica.pool_size",
+            10,
+        ),
+        (
+            "REPLICA_DATABASE_MAX_OVERFLOW",
+            "0",
+            "sqlalchemy.replica.max_overflow",
+            0,
+        ),
+        (
+            "REPLICA_DATABASE_POOL_RECYCLE",
+            "3600",
+            "sqlalchemy.replica.pool_recycle",
+            3600,
+        ),
+        (None, None, "h.db.replica_max_lag", 5.0),
+        ("REPLICA_READS", "true", "h.db.replica_reads", True),
+        ("REPLICA_MAX_LAG", "2.5", "h.db.replica_max_lag", 2.5),
+        ("FAST_JSON", "true", "h.fast_json", True),
+        (None, None, "h.group_annotations.cache_totals_above", 10000),
+        (
+            "GROUP_ANNOTATIONS_TOTAL_CACHE_TTL",
+            "30",
+            "h.group_annotations.total_cache_ttl",
+            30.0,
+        ),
+        (
+            "STREAMER_OUTBOX_EVICT_AFTER",
+            "2.5",
+            "h.streamer.outbox_evict_after",
+            2.5,
+        ),
         # There are many other settings that can be updated from env vars.
         # These are not currently tested.
     ],
@@ -13,8 +13,14 @@ from webob.multidict import MultiDict
 
 from h.models import Organization
 from h.models.auth_client import GrantType
-from h.security import Identity
-from h.services import HTTPService, MentionService, NotificationService, OIDCService
+from h.security import Identity, PermitsCache
+from h.services import (
+    HTTPService,
+    MentionService,
+    NotificationService,
+    OIDCService,
+    PublicAnnotationCountService,
+)
 from h.services.analytics import AnalyticsService
 from h.services.annotation_authority_queue import AnnotationAuthorityQueueService
 from h.services.annotation_delete import AnnotationDeleteService
@@ -179,9 +185,14 @@ def pyramid_config(pyramid_settings, pyramid_request):
 def pyramid_request(db_session, db_session_replica, fake_feature, pyramid_settings):
     """Return pyramid request object."""
     request = testing.DummyRequest(
-        db=db_session, db_replica=db_session_replica, feature=fake_feature
+        db=db_session,
+        db_replica=db_session_replica,
+        db_reader=db_session,
+        read_only=False,
+        feature=fake_feature,
     )
     request.default_authority = "example.com"
+    request.permits_cache = PermitsCache()
     request.create_form = mock.Mock()
 
     request.matched_route = mock.Mock(spec=["name"])
@@ -403,6 +414,11 @@ def organization_service(mock_service):
     return mock_service(OrganizationService, name="organization")
 
 
+@pytest.fixture
+def public_annotation_count_service(mock_service):
+    return mock_service(PublicAnnotationCountService)
+
+
 @pytest.fixture
 def search_index(mock_service):
     return mock_service(SearchIndexService, "search_index", spec_set=False)
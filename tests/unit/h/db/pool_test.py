@@ -0,0 +1,87 @@
+from unittest.mock import create_autospec
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from h.db.pool import MeasuredQueuePool, pool_metrics
+
+
+class TestMeasuredQueuePool:
+    def test_it_measures_checkout_wait_times(self, pool, time):
+        time.perf_counter.side_effect = [1.0, 1.5, 2.0, 2.25]
+
+        pool.connect()
+        pool.connect()
+
+        assert pool.checkouts == 2
+        assert pool.wait_time == 0.75
+        assert pool.max_wait_time == 0.5
+
+    def test_reset_wait_times(self, pool):
+        pool.connect()
+
+        pool.reset_wait_times()
+
+        assert not pool.checkouts
+        assert not pool.wait_time
+        assert not pool.max_wait_time
+
+    @pytest.fixture
+    def time(self, patch):
+        return patch("h.db.pool.time")
+
+
+class TestPoolMetrics:
+    def test_it(self, pool, time):
+        time.perf_counter.side_effect = [1.0, 1.5, 2.0, 2.25]
+        connections = [pool.connect(), pool.connect()]
+        connections[0].close()
+
+        metrics = pool_metrics("Replica", pool)
+
+        assert metrics == [
+            ("Custom/DB/Pool/Replica/Size", 1),
+            ("Custom/DB/Pool/Replica/CheckedOut", 1),
+            ("Custom/DB/Pool/Replica/Overflow", 1),
+            ("Custom/DB/Pool/Replica/Checkouts", 2),
+            ("Custom/DB/Pool/Replica/Wait/Average", 0.375),
+            ("Custom/DB/Pool/Replica/Wait/Max", 0.5),
+        ]
+
+    def test_it_resets_the_wait_times(self, pool):
+        pool.connect()
+
+        pool_metrics("Replica", pool)
+
+        assert not pool.checkouts
+        assert pool_metrics("Replica", pool) == [
+            ("Custom/DB/Pool/Replica/Size", 1),
+            ("Custom/DB/Pool/Replica/CheckedOut", 0),
+            ("Custom/DB/Pool/Replica/Overflow", 0),
+        ]
+
+    def test_it_with_other_pools(self):
+        assert not pool_metrics("Replica", NullPool(creator=lambda: None))
+
+    @pytest.fixture
+    def time(self, patch):
+        return patch("h.db.pool.time")
+
+
+@pytest.fixture
+def pool():
+    return MeasuredQueuePool(
+        creator=lambda: create_autospec(DBAPIConnection, instance=True),
+        pool_size=1,
+        max_overflow=1,
+    )
+
+
+class DBAPIConnection:
+    def cursor(self): ...
+
+    def commit(self): ...
+
+    def rollback(self): ...
+
+    def close(self): ...
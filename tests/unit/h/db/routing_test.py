@@ -0,0 +1,151 @@
+from unittest.mock import Mock, sentinel
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from h.db.routing import (
+    LAG_QUERY,
+    ReplicaLag,
+    count_queries,
+    reader_session,
+    replica_lag,
+)
+
+
+class TestReplicaLag:
+    def test_it_measures_the_lag(self, session):
+        lag = ReplicaLag()
+
+        assert lag.get(session) == 1.5
+
+        session.execute.assert_called_once_with(LAG_QUERY)
+
+    def test_it_only_measures_every_check_interval(self, session, time):
+        lag = ReplicaLag(check_interval=5)
+        time.monotonic.side_effect = [100, 104, 106]
+
+        lag.get(session)
+        lag.get(session)
+        lag.get(session)
+
+        assert session.execute.call_count == 2
+
+    def test_it_returns_None_if_the_lag_is_unknown(self, session):
+        session.execute.return_value.scalar.return_value = None
+
+        assert ReplicaLag().get(session) is None
+
+    def test_it_returns_None_if_the_lag_cant_be_measured(self, session):
+        session.execute.side_effect = OperationalError("SELECT", {}, Exception())
+
+        assert ReplicaLag().get(session) is None
+
+        session.rollback.assert_called_once_with()
+
+    @pytest.fixture
+    def session(self):
+        session = Mock(spec_set=["execute", "rollback"])
+        session.execute.return_value.scalar.return_value = 1.5
+        return session
+
+    @pytest.fixture
+    def time(self, patch):
+        return patch("h.db.routing.time")
+
+
+class TestReplicaLagFactory:
+    def test_it_is_shared_by_the_process(self, pyramid_request):
+        assert replica_lag(pyramid_request.registry) is replica_lag(
+            pyramid_request.registry
+        )
+
+
+class TestReaderSession:
+    def test_it_returns_the_replica(self, pyramid_request, ReplicaLag, newrelic):
+        assert reader_session(pyramid_request) == pyramid_request.db_replica
+
+        ReplicaLag.return_value.get.assert_called_once_with(pyramid_request.db_replica)
+        newrelic.agent.add_custom_attribute.assert_called_once_with(
+            "db_reader", "replica"
+        )
+
+    @pytest.mark.parametrize(
+        "read_only,settings",
+        (
+            (False, {}),
+            (True, {"h.db.replica_reads": False}),
+            (True, {"sqlalchemy.replica.url": None}),
+        ),
+    )
+    def test_it_returns_the_primary_if_the_replica_shouldnt_be_used(
+        self, pyramid_request, read_only, settings
+    ):
+        pyramid_request.read_only = read_only
+        pyramid_request.registry.settings.update(settings)
+
+        assert reader_session(pyramid_request) == pyramid_request.db
+
+    @pytest.mark.parametrize("lag", (None, 2.5))
+    def test_it_returns_the_primary_if_the_replica_is_lagging(
+        self, pyramid_request, ReplicaLag, newrelic, lag
+    ):
+        ReplicaLag.return_value.get.return_value = lag
+
+        assert reader_session(pyramid_request) == pyramid_request.db
+
+        newrelic.agent.add_custom_attribute.assert_called_once_with(
+            "db_reader", "primary (replica lag)"
+        )
+
+    @pytest.fixture(autouse=True)
+    def pyramid_request(self, pyramid_request):
+        pyramid_request.db = sentinel.db
+        pyramid_request.db_replica = sentinel.db_replica
+        pyramid_request.read_only = True
+        pyramid_request.registry.settings.update(
+            {
+                "h.db.replica_reads": True,
+                "h.db.replica_max_lag": 2.0,
+                "sqlalchemy.replica.url": "postgresql://replica",
+            }
+        )
+        return pyramid_request
+
+    @pytest.fixture
+    def ReplicaLag(self, patch):
+        ReplicaLag = patch("h.db.routing.ReplicaLag")
+        ReplicaLag.return_value.get.return_value = 0.5
+        return ReplicaLag
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.db.routing.newrelic")
+
+
+class TestCountQueries:
+    def test_it_records_the_number_of_queries(
+        self, pyramid_request, db_session, newrelic
+    ):
+        count_queries(pyramid_request, db_session, "Replica")
+
+        db_session.execute(text("SELECT 1"))
+        db_session.execute(text("SELECT 2"))
+        pyramid_request._process_finished_callbacks()  # noqa: SLF001
+
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/DB/Queries/Route/index/Replica", 2
+        )
+
+    def test_it_doesnt_record_if_there_were_no_queries(
+        self, pyramid_request, db_session, newrelic
+    ):
+        count_queries(pyramid_request, db_session, "Replica")
+
+        pyramid_request._process_finished_callbacks()  # noqa: SLF001
+
+        newrelic.agent.record_custom_metric.assert_not_called()
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.db.routing.newrelic")
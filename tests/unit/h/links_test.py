@@ -130,6 +130,20 @@ def test_jsonld_id_link(factories, pyramid_config, pyramid_request):
     assert link == "http://example.com/annos/e22AJlHYQNCG70bXL7gr1w"
 
 
+def test_route_links_generate_each_route_once_per_request(
+    pyramid_config, pyramid_request, mocker
+):
+    pyramid_config.add_route("api.annotation", "/annos/{id}")
+    route_url = mocker.spy(pyramid_request, "route_url")
+
+    first = links.json_link(pyramid_request, mock.Mock(id="first_id"))
+    second = links.json_link(pyramid_request, mock.Mock(id="second_id"))
+
+    assert first == "http://example.com/annos/first_id"
+    assert second == "http://example.com/annos/second_id"
+    route_url.assert_called_once()
+
+
 @pytest.mark.parametrize(
     "uri,formatted",
     [
@@ -1,7 +1,7 @@
 import functools
 import logging
 from datetime import datetime as _datetime
-from unittest.mock import sentinel
+from unittest.mock import Mock, sentinel
 
 import pytest
 import sqlalchemy as sa
@@ -313,6 +313,15 @@ class TestMergeDocuments:
         with pytest.raises(ConcurrentUpdateError):
             merge_documents(db_session, duplicate_docs)
 
+    def test_it_reports_the_uris_which_expand_differently(
+        self, db_session, duplicate_docs
+    ):
+        on_uris_change = Mock(spec_set=[])
+
+        merge_documents(db_session, duplicate_docs, on_uris_change=on_uris_change)
+
+        on_uris_change.assert_called_once_with({"httpx://example.com/master"})
+
     def test_it_logs_when_its_called(self, caplog, db_session, duplicate_docs):
         caplog.set_level(logging.INFO)
 
@@ -347,6 +356,55 @@ class TestMergeDocuments:
         return documents
 
 
+class TestUpdateDocumentMetadataURIChanges:
+    def test_it_reports_new_uris(self, db_session, factories):
+        factories.Document(
+            document_uris=[factories.DocumentURI(uri="http://example.com/")]
+        )
+        db_session.flush()
+
+        on_uris_change = self.update(
+            db_session, [{"uri": "http://alt.example.com/", "type": "rel-canonical"}]
+        )
+
+        on_uris_change.assert_called_once_with(
+            {"httpx://example.com", "httpx://alt.example.com"}
+        )
+
+    def test_it_doesnt_report_unchanged_uris(self, db_session, factories):
+        factories.Document(
+            document_uris=[
+                factories.DocumentURI(
+                    claimant="http://example.com/",
+                    uri="http://example.com/",
+                    type="self-claim",
+                    content_type="",
+                )
+            ]
+        )
+        db_session.flush()
+
+        on_uris_change = self.update(
+            db_session, [{"uri": "http://example.com/", "type": "self-claim"}]
+        )
+
+        on_uris_change.assert_not_called()
+
+    def update(self, db_session, document_uri_dicts):
+        on_uris_change = Mock(spec_set=[])
+        update_document_metadata(
+            db_session,
+            "http://example.com/",
+            [],
+            [
+                {"claimant": "http://example.com/", "content_type": "", **uri_dict}
+                for uri_dict in document_uri_dicts
+            ],
+            on_uris_change=on_uris_change,
+        )
+        return on_uris_change
+
+
 class TestUpdateDocumentMetadata:
     @pytest.mark.parametrize(
         "created,updated", ((sentinel.created, sentinel.updated), (None, None))
@@ -385,6 +443,7 @@ class TestUpdateDocumentMetadata:
             sentinel.session,
             Document.find_or_create_by_uris.return_value,
             updated=sentinel.updated,
+            on_uris_change=None,
         )
 
     def test_it_for_single_documents_we_return_the_first(self, Document, caller):
@@ -174,6 +174,24 @@ class TestGetConnection:
             matchers.InstanceOf(str), transport_options=RETRY_POLICY_QUICK
         )
 
+    @pytest.mark.parametrize("fail_fast", [True, False])
+    def test_memory_transport(self, Connection, fail_fast):
+        realtime.get_connection(
+            {"h.realtime.transport": "memory", "broker_url": "amqp://example.com"},
+            fail_fast=fail_fast,
+        )
+
+        Connection.assert_called_once_with(
+            "memory://",
+            transport_options={"polling_interval": realtime.MEMORY_POLLING_INTERVAL},
+        )
+
+    def test_it_raises_for_unknown_transports(self, Connection):
+        with pytest.raises(ValueError, match="Unknown realtime transport"):
+            realtime.get_connection({"h.realtime.transport": "carrier_pigeon"})
+
+        Connection.assert_not_called()
+
     @pytest.fixture
     def Connection(self, patch):
         return patch("h.realtime.kombu.Connection")
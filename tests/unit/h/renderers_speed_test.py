@@ -0,0 +1,104 @@
+import functools
+import random
+import string
+import timeit
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from h.renderers import dumps
+
+
+@pytest.mark.skip("Only of use during development")
+class TestDumpsSpeed:  # pragma: no cover
+    @pytest.mark.parametrize("replies", (0, 400, 2000))
+    @pytest.mark.parametrize("fast_json", (False, True))
+    def test_speed(self, replies, fast_json):
+        response = search_response(rows=200, replies=replies)
+        size = len(dumps(response, fast_json=True))
+
+        seconds = min(
+            timeit.repeat(
+                functools.partial(dumps, response, fast_json=fast_json),
+                number=10,
+                repeat=5,
+            )
+        )
+
+        print(  # noqa: T201
+            f"200 rows {replies} replies ({size / 1024:.0f}KB) "
+            f"fast_json={fast_json}: {seconds / 10 * 1000:.3f} ms"
+        )
+
+
+def _text(length):
+    return "".join(random.choices(string.ascii_letters + " ", k=length))  # noqa: S311
+
+
+def _annotation(references=()):
+    annotation_id = uuid.uuid4().hex[:22]
+    uri = f"https://example.com/{_text(20)}"
+    created = datetime.now(UTC).isoformat()
+
+    return {
+        "id": annotation_id,
+        "created": created,
+        "updated": created,
+        "user": "acct:someone@hypothes.is",
+        "uri": uri,
+        "text": _text(300),
+        "tags": ["one", "two"],
+        "group": "__world__",
+        "permissions": {
+            "read": ["group:__world__"],
+            "admin": ["acct:someone@hypothes.is"],
+            "update": ["acct:someone@hypothes.is"],
+            "delete": ["acct:someone@hypothes.is"],
+        },
+        "target": [
+            {
+                "source": uri,
+                "selector": [
+                    {
+                        "type": "RangeSelector",
+                        "endOffset": 120,
+                        "startOffset": 0,
+                        "endContainer": "/main[1]/p[3]",
+                        "startContainer": "/main[1]/p[2]",
+                    },
+                    {"type": "TextPositionSelector", "end": 4120, "start": 3900},
+                    {
+                        "type": "TextQuoteSelector",
+                        "exact": _text(200),
+                        "prefix": _text(32),
+                        "suffix": _text(32),
+                    },
+                ],
+            }
+        ],
+        "document": {"title": [_text(40)]},
+        "links": {
+            "html": f"https://hypothes.is/a/{annotation_id}",
+            "incontext": f"https://hyp.is/{annotation_id}/example.com",
+            "json": f"https://hypothes.is/api/annotations/{annotation_id}",
+        },
+        "user_info": {"display_name": "Someone"},
+        "flagged": False,
+        "hidden": False,
+        "moderation_status": "APPROVED",
+        "references": list(references),
+    }
+
+
+def search_response(rows, replies):
+    annotations = [_annotation() for _ in range(rows)]
+
+    return {
+        "total": rows,
+        "rows": annotations,
+        "replies": [
+            _annotation(references=[random.choice(annotations)["id"]])  # noqa: S311
+            for _ in range(replies)
+        ],
+    }
@@ -1,20 +1,90 @@
+import json
 from collections import OrderedDict
+from datetime import UTC, date, datetime
 from unittest import mock
 
 import pytest
 
-from h.renderers import SVGRenderer, json_sorted_factory
+from h.renderers import SVGRenderer, dumps, fast_json, json_renderer_factory
 
 
-class TestSortedJSONRenderer:
-    def test_sorts_response_keys(self):
+class TestDumps:
+    def test_it(self):
+        assert dumps({"a": [1, "b"]}) == '{"a": [1, "b"]}'
+
+    def test_it_with_fast_json(self):
+        assert dumps({"a": [1, "b"]}, fast_json=True) == b'{"a":[1,"b"]}'
+
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_calls_default_for_unsupported_objects(self, fast_json):
+        result = dumps({"a": {1, 2}}, default=sorted, fast_json=fast_json)
+
+        assert json.loads(result) == {"a": [1, 2]}
+
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_encodes_dates(self, fast_json):
+        result = dumps(
+            [date(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=UTC)],
+            fast_json=fast_json,
+        )
+
+        assert json.loads(result) == [
+            "2024-01-02",
+            "2024-01-02T03:04:05.000006+00:00",
+        ]
+
+    def test_it_falls_back_to_the_standard_library(self):
+        result = dumps({"a": 2**70}, fast_json=True)
+
+        assert result == '{"a": 1180591620717411303424}'
+
+    def test_it_raises_for_objects_neither_can_encode(self):
+        with pytest.raises(TypeError):
+            dumps({"a": object()}, fast_json=True)
+
+
+class TestFastJSON:
+    @pytest.mark.parametrize(
+        "settings,expected",
+        (({}, False), ({"h.fast_json": "true"}, True), ({"h.fast_json": False}, False)),
+    )
+    def test_it(self, pyramid_request, settings, expected):
+        pyramid_request.registry.settings.update(settings)
+
+        assert fast_json(pyramid_request.registry) is expected
+
+
+class TestJSONRendererFactory:
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_renders_json(self, fast_json):
+        renderer = json_renderer_factory(fast_json=fast_json)(info=None)
+
+        result = renderer({"created": datetime(2024, 1, 1)}, system={})  # noqa: DTZ001
+
+        assert json.loads(result) == {"created": "2024-01-01T00:00:00"}
+
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_sorts_response_keys(self, fast_json):
         # An OrderedDict makes sure the keys won't end up in order by chance
         data = OrderedDict([("bar", 1), ("foo", "bang"), ("baz", 5)])
-        renderer = json_sorted_factory(info=None)
+        renderer = json_renderer_factory(sort_keys=True, fast_json=fast_json)(info=None)
 
         result = renderer(data, system={})
 
-        assert result == '{"bar": 1, "baz": 5, "foo": "bang"}'
+        assert list(json.loads(result)) == ["bar", "baz", "foo"]
+
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_renders_objects_with_a_json_method(self, pyramid_request, fast_json):
+        class Presenter:
+            def __json__(self, _request):
+                return {"id": 1}
+
+        renderer = json_renderer_factory(fast_json=fast_json)(info=None)
+
+        result = renderer([Presenter()], system={"request": pyramid_request})
+
+        assert json.loads(result) == [{"id": 1}]
+        assert pyramid_request.response.content_type == "application/json"
 
 
 class TestSVGRenderer:
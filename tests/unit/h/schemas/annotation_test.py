@@ -14,7 +14,7 @@ from h.schemas.annotation import (
     transform_document,
 )
 from h.schemas.util import validate_query_params
-from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX
+from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX, Cursor
 
 
 def create_annotation_schema_validate(request, data):
@@ -801,6 +801,34 @@ class TestSearchParamsSchema:
         assert not params["offset"]
         assert params["search_after"] == "2009-02-16"
 
+    @pytest.mark.parametrize(
+        "cursor", ("", Cursor(pit_id="pit_id", after=[1234, "id"]).encode())
+    )
+    def test_passes_validation_if_valid_cursor(self, schema, cursor):
+        input_params = NestedMultiDict(MultiDict({"cursor": cursor, "offset": 5}))
+
+        params = validate_query_params(schema, input_params)
+
+        assert params["cursor"] == cursor
+        assert not params["offset"]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        (
+            "invalid",
+            Cursor(pit_id="pit_id", sort="text", after=[1234, "id"]).encode(),
+            Cursor(pit_id="pit_id", order="sideways", after=[1234, "id"]).encode(),
+            # A cursor that's been tampered with to search after other values
+            Cursor(pit_id="pit_id", after=[{"script": "..."}, "id"]).encode(),
+            Cursor(pit_id="pit_id", after=["1970-01-01", "id", "id"]).encode(),
+        ),
+    )
+    def test_raises_if_invalid_cursor(self, schema, cursor):
+        input_params = NestedMultiDict(MultiDict({"cursor": cursor}))
+
+        with pytest.raises(ValidationError):
+            validate_query_params(schema, input_params)
+
     @pytest.mark.parametrize(
         "wildcard_uri", ("https://localhost:3000*", "file://localhost*/foo.pdf")
     )
@@ -12,6 +12,8 @@ from h.schemas.pagination import (
 )
 from h.schemas.util import validate_query_params
 
+ANNOTATION_ID = "GDfERGWuEe-FbFOzmA2T1g"
+
 
 class TestDate:
     # A datetime string for use in tests below.
@@ -95,10 +97,22 @@ class TestCursorPaginationQueryParamsSchema:
     @pytest.mark.parametrize(
         "input_,output",
         [
-            ({}, {"page[size]": 20, "page[after]": None}),
+            ({}, {"page[size]": 20, "page[after]": None, "page[after_id]": None}),
             (
                 {"page[size]": 50, "page[after]": TestDate.string},
-                {"page[size]": 50, "page[after]": TestDate.datetime},
+                {
+                    "page[size]": 50,
+                    "page[after]": TestDate.datetime,
+                    "page[after_id]": None,
+                },
+            ),
+            (
+                {"page[after]": TestDate.string, "page[after_id]": ANNOTATION_ID},
+                {
+                    "page[size]": 20,
+                    "page[after]": TestDate.datetime,
+                    "page[after_id]": ANNOTATION_ID,
+                },
             ),
         ],
     )
@@ -123,6 +137,14 @@ class TestCursorPaginationQueryParamsSchema:
                 r'^page\[size\]: "foo" is not a number$',
             ),
             ({"page[after]": "foo"}, r"^page\[after\]: Invalid date$"),
+            (
+                {"page[after_id]": "foo"},
+                r"^page\[after_id\]: Not a valid annotation id$",
+            ),
+            (
+                {"page[after_id]": ANNOTATION_ID},
+                r"^page\[after_id\]: Can only be used with page\[after\]$",
+            ),
         ],
     )
     def test_invalid(self, schema, input_, message):
@@ -142,7 +164,15 @@ class TestCursorPagination:
         [
             (
                 {"page[size]": 20, "page[after]": TestDate.string},
-                (20, TestDate.datetime),
+                (20, TestDate.datetime, None),
+            ),
+            (
+                {
+                    "page[size]": 20,
+                    "page[after]": TestDate.string,
+                    "page[after_id]": ANNOTATION_ID,
+                },
+                (20, TestDate.datetime, ANNOTATION_ID),
             ),
         ],
     )
@@ -151,3 +181,4 @@ class TestCursorPagination:
 
         assert pagination.size == expected[0]
         assert pagination.after == expected[1]
+        assert pagination.after_id == expected[2]
@@ -19,6 +19,23 @@ class TestClient:
 
         conn.transport.close.assert_called_once_with()
 
+    def test_open_point_in_time(self, client, conn):
+        conn.transport.perform_request.return_value = {"id": sentinel.pit_id}
+
+        pit_id = client.open_point_in_time(keep_alive="1m")
+
+        conn.transport.perform_request.assert_called_once_with(
+            "POST", f"/{sentinel.index}/_pit", params={"keep_alive": "1m"}
+        )
+        assert pit_id == sentinel.pit_id
+
+    def test_close_point_in_time(self, client, conn):
+        client.close_point_in_time(sentinel.pit_id)
+
+        conn.transport.perform_request.assert_called_once_with(
+            "DELETE", "/_pit", body={"id": sentinel.pit_id}
+        )
+
     @pytest.mark.parametrize(
         "version,mapping_type",
         (("6.9.9", "annotation"), ("7.0.0", "_doc"), ("7.0.1", "_doc")),
@@ -171,6 +171,96 @@ class TestSearch:
         return patch("h.search.core.query.UriCombinedWildcardFilter")
 
 
+@pytest.mark.usefixtures("group_service", "nipsa_service")
+class TestSearchWithCursor:
+    def test_it_pages_through_all_annotations(self, pyramid_request, Annotation):
+        now = datetime.datetime.now()  # noqa: DTZ005
+        # Some annotations share an updated time so the id has to break ties
+        annotations = [
+            Annotation(updated=now - datetime.timedelta(minutes=i // 2), shared=True)
+            for i in range(5)
+        ]
+
+        pages = list(self.pages(pyramid_request, MultiDict({"limit": 2})))
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [id_ for page in pages for id_ in page] == Any.list.containing(
+            [annotation.id for annotation in annotations]
+        ).only()
+
+    def test_it_pages_in_sort_order(self, pyramid_request, Annotation):
+        annotations = [Annotation(shared=True) for _ in range(3)]
+
+        pages = self.pages(
+            pyramid_request, MultiDict({"limit": 2, "sort": "id", "order": "asc"})
+        )
+
+        assert [id_ for page in pages for id_ in page] == sorted(
+            annotation.id for annotation in annotations
+        )
+
+    def test_pages_dont_change_when_annotations_are_indexed(
+        self, pyramid_request, Annotation
+    ):
+        annotations = [Annotation(shared=True) for _ in range(3)]
+        result = search.Search(pyramid_request).run(
+            MultiDict({"cursor": "", "limit": 2})
+        )
+        Annotation(shared=True)
+
+        result = search.Search(pyramid_request).run(
+            MultiDict({"cursor": result.next_cursor, "limit": 2})
+        )
+
+        assert len(result.annotation_ids) == 1
+        assert result.annotation_ids[0] in [annotation.id for annotation in annotations]
+
+    def test_it_returns_no_next_cursor_after_the_last_page(
+        self, pyramid_request, Annotation
+    ):
+        Annotation(shared=True)
+        result = search.Search(pyramid_request).run(MultiDict({"cursor": ""}))
+
+        result = search.Search(pyramid_request).run(
+            MultiDict({"cursor": result.next_cursor})
+        )
+
+        assert result.annotation_ids == []
+        assert result.next_cursor is None
+
+    def test_it_returns_no_next_cursor_without_a_cursor(
+        self, pyramid_request, Annotation
+    ):
+        Annotation(shared=True)
+
+        result = search.Search(pyramid_request).run(MultiDict({}))
+
+        assert result.next_cursor is None
+
+    def test_it_raises_if_the_cursor_has_expired(self, pyramid_request, Annotation):
+        Annotation(shared=True)
+        result = search.Search(pyramid_request).run(
+            MultiDict({"cursor": "", "limit": 1})
+        )
+        cursor = search.Cursor.decode(result.next_cursor)
+        pyramid_request.es.close_point_in_time(cursor.pit_id)
+
+        with pytest.raises(search.ExpiredCursorError):
+            search.Search(pyramid_request).run(
+                MultiDict({"cursor": result.next_cursor})
+            )
+
+    def pages(self, pyramid_request, params):
+        cursor = ""
+        while cursor is not None:
+            result = search.Search(pyramid_request).run(
+                MultiDict(params, cursor=cursor)
+            )
+            if result.annotation_ids:
+                yield result.annotation_ids
+            cursor = result.next_cursor
+
+
 @pytest.mark.usefixtures("group_service", "nipsa_service")
 class TestSearchWithSeparateReplies:
     """Unit tests for search.Search when separate_replies=True is given."""
@@ -283,26 +373,66 @@ class TestSearchWithSeparateReplies:
         # separate_replies=True.
         assert result.reply_ids == [reply.id]
 
-    def test_only_200_replies_are_included(self, pyramid_request, Annotation):
-        """
-        No more than 200 replies can be included in reply_ids.
+    def test_all_replies_are_included(self, pyramid_request, Annotation):
+        """Replies are fetched a batch at a time until there are no more."""
+        annotation = Annotation(shared=True)
+        now = datetime.datetime.now()  # noqa: DTZ005
+        # Some replies share an updated time so the id has to break ties
+        replies = [
+            Annotation(
+                updated=now - datetime.timedelta(minutes=i // 2),
+                references=[annotation.id],
+                shared=True,
+            )
+            for i in range(7)
+        ]
+
+        # Use the _replies_limit test seam to fetch 3 replies at a time rather
+        # than 200, to make the test faster.
+        result = search.Search(
+            pyramid_request, separate_replies=True, _replies_limit=3
+        ).run(MultiDict({}))
 
-        200 is the total maximum number of replies (to all annotations in
-        annotation_ids) that can be included in reply_ids.
-        """
+        assert (
+            result.reply_ids
+            == Any.list.containing([reply.id for reply in replies]).only()
+        )
+
+    def test_replies_are_fetched_in_batches(self, pyramid_request, Annotation):
         annotation = Annotation(shared=True)
-        oldest_reply = Annotation(references=[annotation.id], shared=True)
+        for _ in range(6):
+            Annotation(references=[annotation.id], shared=True)
+
+        search_ = search.Search(
+            pyramid_request, separate_replies=True, _replies_limit=3
+        )
 
-        # Create three more replies so that the oldest reply will be pushed out
-        # of reply_ids. (We only need 3, not 200, because we're going to use
-        # the _replies_limit test seam to limit it to 3 replies instead of 200.
-        # This is just to make the test faster.)
-        for _ in range(3):
+        batches = list(search_._reply_id_batches([annotation.id]))  # noqa: SLF001
+
+        assert [len(batch) for batch in batches] == [3, 3]
+
+    @pytest.mark.parametrize("max_replies,truncated", ((4, True), (7, False)))
+    def test_replies_are_cut_off_at_the_max_replies_setting(
+        self, pyramid_request, Annotation, max_replies, truncated
+    ):
+        pyramid_request.registry.settings["h.search.max_replies"] = max_replies
+        annotation = Annotation(shared=True)
+        for _ in range(7):
             Annotation(references=[annotation.id], shared=True)
 
         result = search.Search(
             pyramid_request, separate_replies=True, _replies_limit=3
         ).run(MultiDict({}))
 
-        assert len(result.reply_ids) == 3
-        assert oldest_reply.id not in result.reply_ids
+        assert len(result.reply_ids) == min(max_replies, 7)
+        assert result.replies_truncated == truncated
+
+    def test_replies_arent_truncated_by_default(self, pyramid_request, Annotation):
+        annotation = Annotation(shared=True)
+        Annotation(references=[annotation.id], shared=True)
+
+        result = search.Search(pyramid_request, separate_replies=True).run(
+            MultiDict({})
+        )
+
+        assert not result.replies_truncated
@@ -0,0 +1,118 @@
+import time
+import tracemalloc
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import subqueryload
+
+from h import models
+from h.presenters import AnnotationSearchIndexPresenter
+from h.search import index
+
+GROUPID = "index-speed-test"
+DOCUMENT_TITLE = "Index speed test document"
+
+
+@pytest.mark.skip("Only of use during development")
+class TestPrepareSearchIndexDocumentsSpeed:  # pragma: no cover
+    """Compare preparing index documents from ORM objects and from rows."""
+
+    @pytest.mark.parametrize("count", (1000, 10_000, 100_000))
+    @pytest.mark.parametrize("way", ("objects", "rows"))
+    def test_speed(self, db_session, pyramid_request, count, way):
+        self.create_annotations(db_session, count, documents=max(count // 100, 1))
+        prepare = {"objects": self.from_objects, "rows": self.from_rows}[way]
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        prepared = sum(1 for _ in prepare(db_session, pyramid_request))
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert prepared == count
+
+        print(  # noqa: T201
+            f"{way} x {count}: {seconds:.2f}s, {count / seconds:.0f} rows/sec, "
+            f"peak {peak / 1024 / 1024:.0f}MiB"
+        )
+
+    def from_objects(self, db_session, pyramid_request):
+        # The way the indexer used to prepare documents
+        annotations = (
+            db_session.query(models.Annotation)
+            .options(
+                subqueryload(models.Annotation.document).subqueryload(
+                    models.Document.document_uris
+                ),
+                subqueryload(models.Annotation.document).subqueryload(
+                    models.Document.meta
+                ),
+                subqueryload(models.Annotation.thread).load_only(models.Annotation.id),
+            )
+            .execution_options(stream_results=True)
+            .filter(models.Annotation.groupid == GROUPID)
+        )
+
+        for annotation in annotations:
+            yield AnnotationSearchIndexPresenter(annotation, pyramid_request).asdict()
+
+    def from_rows(self, db_session, _pyramid_request):
+        for row in index._annotation_rows(  # noqa: SLF001
+            db_session, models.Annotation.groupid == GROUPID
+        ):
+            yield index.present_row(row, flagged_userids=set())
+
+    def create_annotations(self, db_session, count, documents):
+        # Creating this many annotations with the factories would take ages.
+        # They are removed again when the test's transaction is rolled back.
+        db_session.execute(
+            sa.text(
+                """
+                INSERT INTO document (created, updated, title, web_uri)
+                SELECT now(), now(), :title || ' ' || i, 'https://example.com/' || i
+                FROM generate_series(1, :documents) AS i
+                """
+            ),
+            {"title": DOCUMENT_TITLE, "documents": documents},
+        )
+        db_session.execute(
+            sa.text(
+                """
+                INSERT INTO annotation (
+                    created, updated, userid, groupid, text, text_rendered, tags,
+                    shared, target_uri, target_uri_normalized, target_selectors,
+                    "references", document_id
+                )
+                SELECT
+                    now() - i * interval '1 second',
+                    now() - i * interval '1 second',
+                    'acct:user' || (i % 1000) || '@example.com',
+                    :groupid,
+                    'Annotation number ' || i || ' with some **markdown** text',
+                    '<p>Annotation number ' || i || ' with some <strong>markdown</strong> text</p>',
+                    ARRAY['tag' || (i % 50), 'speed-test'],
+                    true,
+                    'https://example.com/' || (i % :documents),
+                    'httpx://example.com/' || (i % :documents),
+                    jsonb_build_array(
+                        jsonb_build_object(
+                            'type', 'TextQuoteSelector',
+                            'exact', 'quoted text ' || i,
+                            'prefix', 'before ',
+                            'suffix', ' after'
+                        )
+                    ),
+                    ARRAY[]::uuid[],
+                    docs.ids[1 + i % array_length(docs.ids, 1)]
+                FROM generate_series(1, :count) AS i,
+                    (SELECT array_agg(id) AS ids FROM document WHERE title LIKE :title) AS docs
+                """
+            ),
+            {
+                "count": count,
+                "documents": documents,
+                "groupid": GROUPID,
+                "title": DOCUMENT_TITLE + " %",
+            },
+        )
@@ -1,10 +1,14 @@
 import logging
+from datetime import datetime
 from unittest.mock import sentinel
 
 import pytest
 from elasticsearch.exceptions import NotFoundError
+from h_matchers import Any
 
-from h.search.index import BatchIndexer
+from h import models
+from h.presenters import AnnotationSearchIndexPresenter
+from h.search.index import BatchIndexer, _annotation_rows, present_row
 
 pytestmark = [
     pytest.mark.xdist_group("elasticsearch"),
@@ -132,6 +136,47 @@ class TestBatchIndexer:
 
         assert errored == expected_errored_ids
 
+    def test_index_updated_between(self, batch_indexer, factories, get_indexed_ann):
+        before, during, after = [
+            factories.Annotation(updated=datetime(2020, month, 1))  # noqa: DTZ001
+            for month in (1, 2, 3)
+        ]
+        factories.Annotation(updated=datetime(2020, 2, 1), deleted=True)  # noqa: DTZ001
+
+        indexed, errored = batch_indexer.index_updated_between(
+            start=datetime(2020, 2, 1),  # noqa: DTZ001
+            end=datetime(2020, 3, 1),  # noqa: DTZ001
+        )
+
+        assert (indexed, errored) == (1, set())
+        assert get_indexed_ann(during.id) is not None
+        for annotation in (before, after):
+            with pytest.raises(NotFoundError):
+                get_indexed_ann(annotation.id)
+
+    def test_index_updated_between_with_no_bounds(
+        self, batch_indexer, factories, get_indexed_ann
+    ):
+        annotations = factories.Annotation.create_batch(3)
+
+        indexed, _ = batch_indexer.index_updated_between()
+
+        assert indexed == 3
+        for annotation in annotations:
+            assert get_indexed_ann(annotation.id) is not None
+
+    def test_index_updated_between_returns_errored_annotation_ids(
+        self, batch_indexer, es_helpers
+    ):
+        es_helpers.parallel_bulk.return_value = [
+            (True, {}),
+            (False, {"index": {"error": "some error", "_id": "errored_id"}}),
+        ]
+
+        indexed, errored = batch_indexer.index_updated_between()
+
+        assert (indexed, errored) == (1, {"errored_id"})
+
     def test_delete(self, batch_indexer, factories, get_indexed_ann):
         annotations = factories.Annotation.create_batch(2)
         batch_indexer.index([annotation.id for annotation in annotations])
@@ -142,6 +187,63 @@ class TestBatchIndexer:
             assert get_indexed_ann(annotation.id) == {"doc": {"deleted": True}}
 
 
+@pytest.mark.usefixtures("moderation_service")
+class TestPresentRow:
+    @pytest.mark.parametrize(
+        "moderation_status",
+        (None, models.ModerationStatus.APPROVED, models.ModerationStatus.SPAM),
+    )
+    @pytest.mark.parametrize("nipsa", (True, False))
+    def test_it_matches_the_presenter(
+        self,
+        db_session,
+        factories,
+        pyramid_request,
+        nipsa_service,
+        moderation_status,
+        nipsa,
+    ):
+        annotation = factories.Annotation(
+            references=[factories.Annotation().id],
+            tags=["tag_a", "tag_b"],
+            target_description="description",
+            version=2,
+            moderation_status=moderation_status,
+        )
+        factories.Annotation.create_batch(2, references=[annotation.id])
+        nipsa_service.is_flagged.return_value = nipsa
+        flagged_userids = {annotation.userid} if nipsa else set()
+        db_session.flush()
+
+        (row,) = _annotation_rows(db_session, models.Annotation.id == annotation.id)
+
+        body = present_row(row, flagged_userids)
+
+        expected = AnnotationSearchIndexPresenter(annotation, pyramid_request).asdict()
+        assert body == {
+            **expected,
+            "thread_ids": Any.list.containing(expected["thread_ids"]).only(),
+        }
+
+    def test_it_with_an_annotation_without_replies_or_document_fields(
+        self, db_session, factories
+    ):
+        annotation = factories.Annotation(tags=None, text=None)
+        annotation.document.title = annotation.document.web_uri = None
+        db_session.flush()
+
+        (row,) = _annotation_rows(db_session, models.Annotation.id == annotation.id)
+
+        body = present_row(row, set())
+
+        assert body["thread_ids"] == []
+        assert body["tags"] == body["tags_raw"] == []
+        assert body["text"] == ""
+        assert body["document"] == {}
+        assert "references" not in body
+        assert "nipsa" not in body
+
+
 @pytest.fixture
 def batch_indexer(db_session, es_client, pyramid_request, moderation_service):  # noqa: ARG001
     return BatchIndexer(db_session, es_client, pyramid_request)
@@ -1,4 +1,5 @@
 import datetime
+from base64 import b64encode
 from unittest.mock import call
 
 import elasticsearch_dsl
@@ -258,6 +259,111 @@ class TestSorter:
         assert result.annotation_ids == ann_ids
 
 
+class TestCursor:
+    def test_it_round_trips(self):
+        cursor = query.Cursor(
+            pit_id="pit_id", sort="created", order="asc", after=[1234, "id"]
+        )
+
+        assert query.Cursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize(
+        "sort,after",
+        (
+            ("created", [1234, "id"]),
+            ("updated", [1234, "id"]),
+            ("group", ["__world__", "id"]),
+            ("id", ["id", "id"]),
+            ("user", ["acct:user@example.com", "id"]),
+        ),
+    )
+    def test_it_decodes_the_sort_values_of_each_field(self, sort, after):
+        cursor = query.Cursor(pit_id="pit_id", sort=sort, after=after)
+
+        assert query.Cursor.decode(cursor.encode()) == cursor
+
+    def test_next(self):
+        cursor = query.Cursor(pit_id="pit_id", sort="created", order="asc")
+
+        assert cursor.next("new_pit_id", [1234, "id"]) == query.Cursor(
+            pit_id="new_pit_id", sort="created", order="asc", after=[1234, "id"]
+        )
+
+    @pytest.mark.parametrize(
+        "value",
+        (
+            "not base64!",
+            b64encode(b"not JSON").decode(),
+            b64encode(b"{}").decode(),
+            b64encode(b'["pit_id", "updated", "sideways", []]').decode(),
+            b64encode(b'["pit_id", "text", "asc", []]').decode(),
+            b64encode(b'["pit_id", null, "asc", []]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", null]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", []]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", [1234]]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", [1234, "id", "id"]]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", ["1234", "id"]]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", [true, "id"]]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", [1234, 5678]]').decode(),
+            b64encode(b'["pit_id", "updated", "asc", [{"script": ""}, "id"]]').decode(),
+            b64encode(b'["pit_id", "user", "asc", [1234, "id"]]').decode(),
+            b64encode(b'["pit_id", "id", "asc", [null, "id"]]').decode(),
+        ),
+    )
+    def test_decode_raises_for_invalid_cursors(self, value):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            query.Cursor.decode(value)
+
+
+class TestCursorSorter:
+    def test_it(self, es_dsl_search):
+        cursor = query.Cursor(pit_id="pit_id", sort="created", order="asc")
+        params = MultiDict({"sort": "updated", "order": "desc", "search_after": "1"})
+
+        q = query.CursorSorter(cursor)(es_dsl_search, params).to_dict()
+
+        assert q == {
+            "pit": {"id": "pit_id", "keep_alive": query.CursorSorter.KEEP_ALIVE},
+            "sort": [
+                {"created": {"order": "asc", "unmapped_type": "boolean"}},
+                {"id": {"order": "asc"}},
+            ],
+        }
+        assert not params
+
+    def test_it_searches_after_the_cursor(self, es_dsl_search):
+        cursor = query.Cursor(pit_id="pit_id", after=[1234, "id"])
+
+        q = query.CursorSorter(cursor)(es_dsl_search, MultiDict()).to_dict()
+
+        assert q["search_after"] == [1234, "id"]
+
+    def test_it_sorts_by_user_raw(self, es_dsl_search):
+        cursor = query.Cursor(pit_id="pit_id", sort="user")
+
+        q = query.CursorSorter(cursor)(es_dsl_search, MultiDict()).to_dict()
+
+        assert q["sort"][0] == {
+            "user_raw": {"order": "desc", "unmapped_type": "boolean"}
+        }
+
+    def test_it_doesnt_search_an_index(self, es_dsl_search):
+        cursor = query.Cursor(pit_id="pit_id")
+
+        search = query.CursorSorter(cursor)(es_dsl_search, MultiDict())
+
+        assert not search._index  # noqa: SLF001
+
+    def test_it_searches_the_index_without_a_point_in_time(self, es_dsl_search):
+        cursor = query.Cursor(pit_id=None, after=[1234, "id"])
+
+        search = query.CursorSorter(cursor)(es_dsl_search, MultiDict())
+
+        assert search._index == es_dsl_search._index  # noqa: SLF001
+        assert "pit" not in search.to_dict()
+        assert search.to_dict()["search_after"] == [1234, "id"]
+
+
 class TestTopLevelAnnotationsFilter:
     def test_it_filters_out_replies_but_leaves_annotations_in(self, Annotation, search):
         annotation = Annotation()
@@ -273,6 +379,21 @@ class TestTopLevelAnnotationsFilter:
         return search
 
 
+class TestTotalHitsLimit:
+    def test_it_counts_up_to_the_limit(self, Annotation, search):
+        for _ in range(3):
+            Annotation()
+
+        result = search.run(MultiDict({"limit": 0}))
+
+        assert result.total == 2
+
+    @pytest.fixture
+    def search(self, search):
+        search.append_modifier(query.TotalHitsLimit(2))
+        return search
+
+
 class TestAuthorityFilter:
     def test_it_filters_out_non_matching_authorities(self, Annotation, search):
         annotations_auth1 = [
@@ -840,14 +961,14 @@ class TestGroupAndModerationFilter:
         identity_permits.assert_has_calls(
             [
                 call(
-                    identity=Identity.from_models(user=user),
-                    context=GroupContext(group_where_moderator),
-                    permission=Permission.Group.MODERATE,
+                    Identity.from_models(user=user),
+                    GroupContext(group_where_moderator),
+                    Permission.Group.MODERATE,
                 ),
                 call(
-                    identity=Identity.from_models(user=user),
-                    context=GroupContext(group_where_not_moderator),
-                    permission=Permission.Group.MODERATE,
+                    Identity.from_models(user=user),
+                    GroupContext(group_where_not_moderator),
+                    Permission.Group.MODERATE,
                 ),
             ],
             any_order=True,
@@ -895,7 +1016,7 @@ class TestGroupAndModerationFilter:
 
     @pytest.fixture(autouse=True)
     def identity_permits(self, patch):
-        return patch("h.search.query.identity_permits")
+        return patch("h.security.permits.identity_permits")
 
 
 @pytest.mark.usefixtures("pyramid_config")
@@ -0,0 +1,266 @@
+import json
+from datetime import datetime
+from unittest.mock import call, create_autospec, sentinel
+
+import pytest
+
+from h.search import reindex
+from h.services.search_index import SearchIndexService
+from h.services.settings import SettingsService
+
+
+class TestReindex:
+    def test_it_creates_and_fills_a_new_index(
+        self, pyramid_request, config, settings_service, annotation_slices, pool
+    ):
+        reindex.reindex(pyramid_request, sentinel.bootstrap, processes=3)
+
+        annotation_slices.assert_called_once_with(pyramid_request.db, 64)
+        reindex.multiprocessing.get_context.assert_called_once_with("spawn")
+        reindex.multiprocessing.get_context.return_value.Pool.assert_called_once_with(
+            3,
+            initializer=reindex._init_worker,  # noqa: SLF001
+            initargs=(sentinel.bootstrap,),
+        )
+        pool.imap_unordered.assert_called_once_with(
+            reindex._index_slice,  # noqa: SLF001
+            [
+                ("new_index", 0, None, "2020-01-01T00:00:00", 500),
+                ("new_index", 1, "2020-01-01T00:00:00", None, 500),
+            ],
+        )
+        assert settings_service.put.call_args_list[0] == call(
+            SearchIndexService.REINDEX_SETTING_KEY, "new_index"
+        )
+        config.update_aliased_index.assert_called_once_with(
+            pyramid_request.es, "new_index"
+        )
+        assert settings_service.delete.call_args_list == [
+            call(SearchIndexService.REINDEX_SETTING_KEY),
+            call(reindex.CHECKPOINT_SETTING_KEY),
+        ]
+
+    def test_it_tunes_the_index_settings_while_filling_it(
+        self, pyramid_request, mock_es_client
+    ):
+        reindex.reindex(pyramid_request, sentinel.bootstrap)
+
+        assert mock_es_client.conn.indices.put_settings.call_args_list == [
+            call(index="new_index", body={"index": reindex.BULK_INDEXING_SETTINGS}),
+            call(
+                index="new_index",
+                body={"index": {"refresh_interval": "5s", "number_of_replicas": 1}},
+            ),
+        ]
+        mock_es_client.conn.indices.refresh.assert_called_once_with(index="new_index")
+
+    def test_it_saves_progress_after_each_slice(
+        self, pyramid_request, settings_service
+    ):
+        reindex.reindex(pyramid_request, sentinel.bootstrap)
+
+        checkpoints = [
+            json.loads(args[1])
+            for args, _ in settings_service.put.call_args_list
+            if args[0] == reindex.CHECKPOINT_SETTING_KEY
+        ]
+        assert [checkpoint["done"] for checkpoint in checkpoints] == [[], [0], [0, 1]]
+
+    def test_it_resumes(
+        self, pyramid_request, config, settings_service, annotation_slices, pool
+    ):
+        settings_service.get.return_value = json.dumps(
+            {
+                "index": "new_index",
+                "slices": [[None, "2020-01-01"], ["2020-01-01", None]],
+                "done": [0],
+                "index_settings": {},
+            }
+        )
+
+        reindex.reindex(pyramid_request, sentinel.bootstrap, resume=True)
+
+        config.configure_index.assert_not_called()
+        annotation_slices.assert_not_called()
+        pool.imap_unordered.assert_called_once_with(
+            reindex._index_slice,  # noqa: SLF001
+            [("new_index", 1, "2020-01-01", None, 500)],
+        )
+        config.update_aliased_index.assert_called_once_with(
+            pyramid_request.es, "new_index"
+        )
+
+    def test_it_retries_annotations_which_failed(
+        self, pyramid_request, config, pool, BatchIndexer
+    ):
+        pool.imap_unordered.side_effect = lambda _func, args: [
+            (number, 10, {f"id_{number}"}, 2.0) for _, number, *_ in args
+        ]
+        BatchIndexer.return_value.index.return_value = set()
+
+        reindex.reindex(pyramid_request, sentinel.bootstrap)
+
+        BatchIndexer.assert_called_once_with(
+            pyramid_request.db,
+            pyramid_request.es,
+            pyramid_request,
+            target_index="new_index",
+            op_type="create",
+        )
+        BatchIndexer.return_value.index.assert_called_once_with(["id_0", "id_1"])
+        config.update_aliased_index.assert_called_once_with(
+            pyramid_request.es, "new_index"
+        )
+
+    def test_it_retries_annotations_which_failed_before_resuming(
+        self, pyramid_request, settings_service, BatchIndexer
+    ):
+        settings_service.get.return_value = json.dumps(
+            {
+                "index": "new_index",
+                "slices": [[None, None]],
+                "done": [0],
+                "errored": ["id"],
+                "index_settings": {},
+            }
+        )
+        BatchIndexer.return_value.index.return_value = set()
+
+        reindex.reindex(pyramid_request, sentinel.bootstrap, resume=True)
+
+        BatchIndexer.return_value.index.assert_called_once_with(["id"])
+
+    def test_it_doesnt_make_the_new_index_current_if_annotations_still_fail(
+        self, pyramid_request, config, settings_service, pool, BatchIndexer
+    ):
+        pool.imap_unordered.side_effect = lambda _func, args: [
+            (number, 10, {"id"}, 2.0) for _, number, *_ in args if number == 0
+        ]
+        BatchIndexer.return_value.index.return_value = {"id"}
+
+        with pytest.raises(RuntimeError, match="Failed to index 1 annotations"):
+            reindex.reindex(pyramid_request, sentinel.bootstrap)
+
+        config.update_aliased_index.assert_not_called()
+        settings_service.delete.assert_not_called()
+        args, _ = settings_service.put.call_args
+        assert args[0] == reindex.CHECKPOINT_SETTING_KEY
+        assert json.loads(args[1])["errored"] == ["id"]
+
+    def test_it_raises_if_there_is_nothing_to_resume(
+        self, pyramid_request, settings_service
+    ):
+        settings_service.get.return_value = None
+
+        with pytest.raises(RuntimeError, match="no reindex to resume"):
+            reindex.reindex(pyramid_request, sentinel.bootstrap, resume=True)
+
+    def test_it_raises_if_the_index_is_not_aliased(self, pyramid_request, config):
+        config.get_aliased_index.return_value = None
+
+        with pytest.raises(RuntimeError, match="not aliased"):
+            reindex.reindex(pyramid_request, sentinel.bootstrap)
+
+        config.configure_index.assert_not_called()
+
+    @pytest.fixture
+    def pool(self, patch):
+        multiprocessing = patch("h.search.reindex.multiprocessing")
+        Pool = multiprocessing.get_context.return_value.Pool
+        pool = Pool.return_value.__enter__.return_value
+        pool.imap_unordered.side_effect = lambda _func, args: [
+            (number, 10, set(), 2.0) for _, number, *_ in args
+        ]
+        return pool
+
+    @pytest.fixture
+    def BatchIndexer(self, patch):
+        return patch("h.search.reindex.BatchIndexer")
+
+    @pytest.fixture
+    def annotation_slices(self, patch):
+        annotation_slices = patch("h.search.reindex.annotation_slices")
+        annotation_slices.return_value = [
+            (None, datetime(2020, 1, 1)),  # noqa: DTZ001
+            (datetime(2020, 1, 1), None),  # noqa: DTZ001
+        ]
+        return annotation_slices
+
+    @pytest.fixture(autouse=True)
+    def config(self, patch):
+        config = patch("h.search.reindex.config")
+        config.get_aliased_index.return_value = "old_index"
+        config.configure_index.return_value = "new_index"
+        return config
+
+    @pytest.fixture(autouse=True)
+    def pyramid_request(self, pyramid_request, mock_es_client, pool, annotation_slices):  # noqa: ARG002
+        mock_es_client.conn.indices.get_settings.return_value = {
+            "new_index": {"settings": {"index": {"refresh_interval": "5s"}}}
+        }
+        pyramid_request.es = mock_es_client
+        pyramid_request.tm = create_autospec(
+            pyramid_request.tm, instance=True, spec_set=True
+        )
+        return pyramid_request
+
+
+class TestIndexSlice:
+    def test_it(self, BatchIndexer, worker_request):
+        BatchIndexer.return_value.index_updated_between.return_value = (10, {"id"})
+
+        number, indexed, errored, _ = reindex._index_slice(  # noqa: SLF001
+            ("new_index", 3, "2020-01-01T00:00:00", None, 100)
+        )
+
+        BatchIndexer.assert_called_once_with(
+            worker_request.db,
+            worker_request.es,
+            worker_request,
+            target_index="new_index",
+            op_type="create",
+        )
+        BatchIndexer.return_value.index_updated_between.assert_called_once_with(
+            start=datetime(2020, 1, 1),  # noqa: DTZ001
+            end=None,
+            chunk_size=100,
+        )
+        assert (number, indexed, errored) == (3, 10, {"id"})
+
+    @pytest.fixture
+    def BatchIndexer(self, patch):
+        return patch("h.search.reindex.BatchIndexer")
+
+    @pytest.fixture
+    def worker_request(self, mocker):
+        return mocker.patch("h.search.reindex._worker_request")
+
+
+class TestAnnotationSlices:
+    def test_it(self, db_session, factories):
+        for day in range(1, 9):
+            factories.Annotation(updated=datetime(2020, 1, day))  # noqa: DTZ001
+
+        slices = reindex.annotation_slices(db_session, 4)
+
+        assert slices == [
+            (None, datetime(2020, 1, 2)),  # noqa: DTZ001
+            (datetime(2020, 1, 2), datetime(2020, 1, 4)),  # noqa: DTZ001
+            (datetime(2020, 1, 4), datetime(2020, 1, 6)),  # noqa: DTZ001
+            (datetime(2020, 1, 6), None),  # noqa: DTZ001
+        ]
+
+    def test_it_with_no_annotations(self, db_session):
+        assert reindex.annotation_slices(db_session, 4) == [(None, None)]
+
+    def test_it_with_one_slice(self, db_session, factories):
+        factories.Annotation()
+
+        assert reindex.annotation_slices(db_session, 1) == [(None, None)]
+
+
+@pytest.fixture(autouse=True)
+def settings_service(pyramid_config):
+    settings_service = create_autospec(SettingsService, instance=True, spec_set=True)
+    pyramid_config.register_service(settings_service, name="settings")
+    return settings_service
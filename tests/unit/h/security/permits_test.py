@@ -1,12 +1,19 @@
-from unittest.mock import patch, sentinel
+from copy import deepcopy
+from unittest.mock import create_autospec, patch, sentinel
 
 import pytest
 from pyramid.security import Allowed, Denied
 
 from h.models import GroupMembership, GroupMembershipRoles
 from h.security import Identity, Permission
-from h.security.permits import PERMISSION_MAP, identity_permits
-from h.traversal import AnnotationContext
+from h.security.identity import (
+    LongLivedAuthClient,
+    LongLivedGroup,
+    LongLivedMembership,
+    LongLivedUser,
+)
+from h.security.permits import PERMISSION_MAP, PermitsCache, identity_permits
+from h.traversal import AnnotationContext, GroupContext
 
 
 def always_true(_identity, _context):
@@ -55,6 +62,14 @@ class TestIdentityPermits:
 
         assert result == grants
 
+    def test_it_only_calls_each_predicate_once(self, PERMISSION_MAP):
+        predicate = create_autospec(always_true, return_value=False)
+        PERMISSION_MAP[sentinel.permission] = [[predicate], [predicate, always_true]]
+
+        identity_permits(sentinel.identity, sentinel.context, sentinel.permission)
+
+        predicate.assert_called_once_with(sentinel.identity, sentinel.context)
+
     def test_it_denies_with_missing_permission(self):
         assert identity_permits(
             sentinel.identity, sentinel.context, sentinel.non_existent_permission
@@ -66,6 +81,155 @@ class TestIdentityPermits:
             yield mapping
 
 
+class TestPermitsCache:
+    def test_it_returns_the_result_of_identity_permits(
+        self, cache, identity, identity_permits
+    ):
+        result = cache.identity_permits(
+            identity, GroupContext(sentinel.group), sentinel.permission
+        )
+
+        identity_permits.assert_called_once_with(
+            identity, GroupContext(sentinel.group), sentinel.permission
+        )
+        assert result == identity_permits.return_value
+        assert (cache.evaluations, cache.hits) == (1, 0)
+
+    @pytest.mark.parametrize(
+        "context", (None, GroupContext(sentinel.group), GroupContext(None))
+    )
+    def test_it_remembers_results(self, cache, identity, identity_permits, context):
+        first = cache.identity_permits(identity, context, sentinel.permission)
+        second = cache.identity_permits(identity, context, sentinel.permission)
+
+        identity_permits.assert_called_once()
+        assert second == first
+        assert (cache.evaluations, cache.hits) == (1, 1)
+
+    def test_it_remembers_results_for_new_contexts_about_the_same_objects(
+        self, cache, identity_permits
+    ):
+        cache.identity_permits(None, GroupContext(sentinel.group), sentinel.permission)
+        cache.identity_permits(None, GroupContext(sentinel.group), sentinel.permission)
+
+        identity_permits.assert_called_once()
+
+    def test_it_remembers_results_for_other_identities_of_the_same_user(
+        self, cache, identity, identity_permits
+    ):
+        cache.identity_permits(
+            identity, GroupContext(sentinel.group), sentinel.permission
+        )
+        cache.identity_permits(
+            deepcopy(identity), GroupContext(sentinel.group), sentinel.permission
+        )
+
+        identity_permits.assert_called_once()
+
+    def test_it_remembers_results_by_the_context_key_its_given(
+        self, cache, identity, identity_permits
+    ):
+        cache.identity_permits(
+            identity,
+            GroupContext(sentinel.group),
+            sentinel.permission,
+            context_key=(sentinel.key,),
+        )
+        cache.identity_permits(
+            identity,
+            GroupContext(sentinel.other_group),
+            sentinel.permission,
+            context_key=(sentinel.key,),
+        )
+
+        identity_permits.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "change_identity",
+        (
+            lambda identity: setattr(identity.user, "userid", "acct:other@example.com"),
+            lambda identity: setattr(identity.user, "staff", True),
+            lambda identity: setattr(identity.user, "admin", True),
+            lambda identity: identity.user.memberships[0].roles.append("moderator"),
+            lambda identity: identity.user.memberships.clear(),
+            lambda identity: setattr(
+                identity, "auth_client", LongLivedAuthClient("id", "example.com")
+            ),
+            lambda identity: setattr(identity, "user", None),
+        ),
+    )
+    def test_it_checks_different_identities_separately(
+        self, cache, identity, identity_permits, change_identity
+    ):
+        other_identity = deepcopy(identity)
+        change_identity(other_identity)
+
+        cache.identity_permits(
+            identity, GroupContext(sentinel.group), sentinel.permission
+        )
+        cache.identity_permits(
+            other_identity, GroupContext(sentinel.group), sentinel.permission
+        )
+
+        assert identity_permits.call_count == 2
+
+    @pytest.mark.parametrize(
+        "other",
+        (
+            (None, GroupContext(sentinel.group), sentinel.permission),
+            ("identity", GroupContext(sentinel.other_group), sentinel.permission),
+            ("identity", GroupContext(sentinel.group), sentinel.other_permission),
+            ("identity", None, sentinel.permission),
+        ),
+    )
+    def test_it_checks_different_things_separately(
+        self, cache, identity, identity_permits, other
+    ):
+        cache.identity_permits(
+            identity, GroupContext(sentinel.group), sentinel.permission
+        )
+        other_identity, *other = other
+        cache.identity_permits(
+            identity if other_identity == "identity" else other_identity, *other
+        )
+
+        assert identity_permits.call_count == 2
+        assert (cache.evaluations, cache.hits) == (2, 0)
+
+    def test_it_doesnt_remember_results_for_unknown_kinds_of_context(
+        self, cache, identity, identity_permits
+    ):
+        cache.identity_permits(identity, sentinel.context, sentinel.permission)
+        cache.identity_permits(identity, sentinel.context, sentinel.permission)
+
+        assert identity_permits.call_count == 2
+        assert (cache.evaluations, cache.hits) == (2, 0)
+
+    @pytest.fixture
+    def cache(self):
+        return PermitsCache()
+
+    @pytest.fixture
+    def identity(self):
+        user = LongLivedUser(
+            id=1,
+            userid="acct:user@example.com",
+            authority="example.com",
+            staff=False,
+            admin=False,
+        )
+        user.memberships.append(
+            LongLivedMembership(
+                group=LongLivedGroup(id=1, pubid="pubid"), user=user, roles=["member"]
+            )
+        )
+        return Identity(user=user)
+
+    @pytest.fixture(autouse=True)
+    def identity_permits(self, patch):
+        return patch("h.security.permits.identity_permits")
+
+
 class TestIdentityPermitsIntegrated:
     def test_it(self, user, annotation):
         # We aren't going to go bonkers here, but a couple of tests to show
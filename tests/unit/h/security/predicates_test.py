@@ -1150,6 +1150,69 @@ class TestResolvePredicates:
         assert result == {"permission": [expansion]}
 
 
+class TestFlattenPermissions:
+    def test_it_leaves_clauses_of_predicates_alone(self):
+        mapping = {"permission": [[predicates.authenticated], []]}
+
+        assert predicates.flatten_permissions(mapping) == mapping
+
+    def test_it_replaces_permissions_with_their_clauses(self):
+        result = predicates.flatten_permissions(
+            {
+                "permission": [
+                    [predicates.annotation_found, "other", predicates.authenticated]
+                ],
+                "other": [[predicates.group_found], [predicates.user_found]],
+            }
+        )
+
+        assert result["permission"] == [
+            [
+                predicates.annotation_found,
+                predicates.group_found,
+                predicates.authenticated,
+            ],
+            [
+                predicates.annotation_found,
+                predicates.user_found,
+                predicates.authenticated,
+            ],
+        ]
+
+    def test_it_replaces_nested_permissions(self):
+        result = predicates.flatten_permissions(
+            {
+                "permission": [["middle"]],
+                "middle": [[predicates.annotation_found, "last"]],
+                "last": [[predicates.group_found]],
+            }
+        )
+
+        assert result["permission"] == [
+            [predicates.annotation_found, predicates.group_found]
+        ]
+
+    def test_it_removes_duplicates(self):
+        result = predicates.flatten_permissions(
+            {
+                "permission": [
+                    [predicates.authenticated, "other"],
+                    [predicates.authenticated],
+                ],
+                "other": [[predicates.authenticated], [predicates.authenticated]],
+            }
+        )
+
+        assert result["permission"] == [[predicates.authenticated]]
+
+    def test_it_denies_when_included_permissions_have_no_clauses(self):
+        result = predicates.flatten_permissions(
+            {"permission": [[predicates.authenticated, "other"]], "other": []}
+        )
+
+        assert result["permission"] == []
+
+
 @pytest.fixture
 def annotation_context(factories):
     return AnnotationContext(
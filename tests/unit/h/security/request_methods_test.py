@@ -1,7 +1,13 @@
+from unittest.mock import sentinel
+
 import pytest
 
-from h.security import Identity
-from h.security.request_methods import default_authority, effective_authority
+from h.security import Identity, PermitsCache
+from h.security.request_methods import (
+    default_authority,
+    effective_authority,
+    permits_cache,
+)
 
 
 class TestDefaultAuthority:
@@ -42,3 +48,28 @@ class TestEffectiveAuthority:
         pyramid_config.testing_securitypolicy(identity=identity)
 
         return identity
+
+
+class TestPermitsCache:
+    def test_it(self, pyramid_request):
+        assert isinstance(permits_cache(pyramid_request), PermitsCache)
+
+    def test_it_records_metrics_when_the_request_finishes(
+        self, pyramid_request, newrelic
+    ):
+        cache = permits_cache(pyramid_request)
+        cache.identity_permits(None, None, sentinel.permission)
+        cache.identity_permits(None, None, sentinel.permission)
+
+        pyramid_request._process_finished_callbacks()  # noqa: SLF001
+
+        newrelic.agent.record_custom_metrics.assert_called_once_with(
+            [
+                ("Custom/PermitsCache/Evaluations", 1),
+                ("Custom/PermitsCache/Hits", 1),
+            ]
+        )
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.security.request_methods.newrelic")
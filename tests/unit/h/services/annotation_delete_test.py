@@ -21,6 +21,17 @@ class TestAnnotationDeleteService:
 
         assert ann.deleted
 
+    def test_it_updates_the_public_annotation_count(
+        self, svc, annotation, public_annotation_count_service
+    ):
+        ann = annotation()
+        svc.delete(ann)
+
+        public_annotation_count_service.scope.assert_called_once_with(ann)
+        public_annotation_count_service.update.assert_called_once_with(
+            public_annotation_count_service.scope.return_value, None
+        )
+
     def test_it_updates_the_updated_field(self, svc, annotation, datetime):
         ann = annotation()
         svc.delete(ann)
@@ -96,7 +107,13 @@ def annotation(factories):
 
 
 @pytest.fixture
-def svc(db_session, pyramid_request, annotation_write_service, queue_service):  # noqa: ARG001
+def svc(
+    db_session,
+    pyramid_request,
+    annotation_write_service,  # noqa: ARG001
+    queue_service,  # noqa: ARG001
+    public_annotation_count_service,  # noqa: ARG001
+):
     pyramid_request.db = db_session
     return annotation_delete_service_factory({}, pyramid_request)
 
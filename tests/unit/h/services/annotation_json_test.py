@@ -1,11 +1,12 @@
 from datetime import datetime
-from unittest.mock import sentinel
+from unittest.mock import call, sentinel
 
 import pytest
 from h_matchers import Any
 from pyramid.authorization import Everyone
 
 from h.models import Annotation, AnnotationMetadata, ModerationStatus
+from h.security import PermitsCache
 from h.security.permissions import Permission
 from h.services.annotation_json import AnnotationJSONService, factory
 from h.traversal import AnnotationContext
@@ -181,13 +182,22 @@ class TestAnnotationJSONService:
 
         Identity.from_models.assert_called_once_with(user=user)
         identity_permits.assert_called_once_with(
-            identity=Identity.from_models.return_value,
-            context=matchers.InstanceOf(AnnotationContext, annotation=annotation),
-            permission=Permission.Annotation.MODERATE,
+            Identity.from_models.return_value,
+            matchers.InstanceOf(AnnotationContext, annotation=annotation),
+            Permission.Annotation.MODERATE,
         )
 
         assert "moderation" not in result
 
+    def test_present_shares_permission_checks_with_the_rest_of_the_request(
+        self, service, annotation, user, identity_permits
+    ):
+        service.present(annotation, user)
+        service.present(annotation, user)
+
+        # The moderation and the read permission, once each
+        assert identity_permits.call_count == 2
+
     @pytest.mark.usefixtures("with_hidden_annotation")
     def test_present_hidden_status_is_not_shown_to_creator(
         self, service, annotation, user
@@ -252,6 +262,139 @@ class TestAnnotationJSONService:
             Any.dict.containing({"id": Any(), "hidden": False})
         ]
 
+    def test_present_all_for_user_in_chunks(
+        self, service, factories, user, annotation_read_service, flag_service
+    ):
+        annotations = factories.Annotation.create_batch(5)
+        annotation_ids = [annotation.id for annotation in annotations]
+        annotation_read_service.get_annotations_by_id.side_effect = [
+            annotations[:2],
+            annotations[2:4],
+            annotations[4:],
+        ]
+
+        result = service.present_all_for_user(annotation_ids, user, chunk_size=2)
+
+        assert [
+            each.kwargs["ids"]
+            for each in annotation_read_service.get_annotations_by_id.call_args_list
+        ] == [annotation_ids[:2], annotation_ids[2:4], annotation_ids[4:]]
+        assert flag_service.flag_counts.call_args_list == [
+            call(annotation_ids[:2]),
+            call(annotation_ids[2:4]),
+            call(annotation_ids[4:]),
+        ]
+        assert [presented["id"] for presented in result] == annotation_ids
+
+    def test_present_all_for_user_works_out_shared_parts_once(
+        self,
+        service,
+        annotation,
+        user,
+        factories,
+        annotation_read_service,
+        identity_permits,
+        DocumentJSONPresenter,
+        MentionJSONPresenter,
+        Identity,
+        user_service,
+    ):
+        mentioned_user = factories.User()
+        annotation.shared = True
+        others = factories.Annotation.create_batch(
+            2,
+            groupid=annotation.groupid,
+            target_uri=annotation.target_uri,
+            userid=annotation.userid,
+            shared=True,
+        )
+        for each in [annotation, *others]:
+            each.mentions = [
+                factories.Mention(
+                    annotation=each,
+                    user=mentioned_user,
+                    username=mentioned_user.username,
+                )
+            ]
+        annotation_read_service.get_annotations_by_id.return_value = [
+            annotation,
+            *others,
+        ]
+
+        result = service.present_all_for_user(sentinel.annotation_ids, user)
+
+        assert len(result) == 3
+        Identity.from_models.assert_called_once_with(user=user)
+        DocumentJSONPresenter.assert_called_once_with(annotation.document)
+        MentionJSONPresenter.assert_called_once()
+        user_service.fetch.assert_called_once_with(annotation.userid)
+        # Once for READ and once for MODERATE
+        assert identity_permits.call_count == 2
+        assert all(
+            presented["document"] == result[0]["document"] for presented in result
+        )
+        assert all(
+            presented["mentions"]
+            == [MentionJSONPresenter.return_value.asdict.return_value]
+            for presented in result
+        )
+
+    @pytest.mark.usefixtures("MentionJSONPresenter")
+    def test_present_all_for_user_doesnt_share_the_shared_parts(
+        self, service, annotation, user, factories, annotation_read_service
+    ):
+        mentioned_user = factories.User()
+        other = factories.Annotation(
+            target_uri=annotation.target_uri, userid=annotation.userid
+        )
+        for each in (annotation, other):
+            each.mentions = [
+                factories.Mention(
+                    annotation=each,
+                    user=mentioned_user,
+                    username=mentioned_user.username,
+                )
+            ]
+        annotation_read_service.get_annotations_by_id.return_value = [
+            annotation,
+            other,
+        ]
+
+        first, second = service.present_all_for_user(sentinel.annotation_ids, user)
+        first["document"]["title"].append("Changed")
+        first["mentions"][0]["userid"] = "changed"
+        first["user_info"]["display_name"] = "Changed"
+
+        assert second["document"] == {"title": ["Title"]}
+        assert second["mentions"] == [{"userid": "userid"}]
+        assert second["user_info"]["display_name"] != "Changed"
+
+    @pytest.mark.parametrize("moderation_status", (None, ModerationStatus.DENIED))
+    def test_present_all_for_user_checks_permissions_for_each_kind_of_annotation(
+        self,
+        service,
+        annotation,
+        user,
+        factories,
+        annotation_read_service,
+        identity_permits,
+        moderation_status,
+    ):
+        annotation.shared = True
+        other = factories.Annotation(
+            groupid=annotation.groupid, shared=True, moderation_status=moderation_status
+        )
+        annotation_read_service.get_annotations_by_id.return_value = [
+            annotation,
+            other,
+        ]
+
+        service.present_all_for_user(sentinel.annotation_ids, user)
+
+        # Annotations with different moderation statuses can have different
+        # permissions, even in the same group
+        assert identity_permits.call_count == (2 if moderation_status is None else 4)
+
     @pytest.fixture
     def service(
         self,
@@ -268,6 +411,7 @@ class TestAnnotationJSONService:
             flag_service=flag_service,
             user_service=user_service,
             mention_service=mention_service,
+            permits_cache=PermitsCache(),
             request=pyramid_request,
         )
 
@@ -293,11 +437,21 @@ class TestAnnotationJSONService:
 
     @pytest.fixture(autouse=True)
     def identity_permits(self, patch):
-        return patch("h.services.annotation_json.identity_permits")
+        return patch("h.security.permits.identity_permits")
 
     @pytest.fixture(autouse=True)
     def DocumentJSONPresenter(self, patch):
-        return patch("h.services.annotation_json.DocumentJSONPresenter")
+        DocumentJSONPresenter = patch(
+            "h.services.annotation_json.DocumentJSONPresenter"
+        )
+        DocumentJSONPresenter.return_value.asdict.return_value = {"title": ["Title"]}
+        return DocumentJSONPresenter
+
+    @pytest.fixture
+    def MentionJSONPresenter(self, patch):
+        MentionJSONPresenter = patch("h.services.annotation_json.MentionJSONPresenter")
+        MentionJSONPresenter.return_value.asdict.return_value = {"userid": "userid"}
+        return MentionJSONPresenter
 
 
 class TestFactory:
@@ -319,6 +473,7 @@ class TestFactory:
             flag_service=flag_service,
             user_service=user_service,
             mention_service=mention_service,
+            permits_cache=pyramid_request.permits_cache,
             request=pyramid_request,
         )
         assert service == AnnotationJSONService.return_value
@@ -40,6 +40,20 @@ class TestAnnotationModerationService:
         assert annotation.moderation_status is ModerationStatus.APPROVED
         assert annotation.moderation_log == []
 
+    def test_set_status_updates_the_public_annotation_count(
+        self, svc, annotation, user, public_annotation_count_service
+    ):
+        public_annotation_count_service.scope.side_effect = [
+            sentinel.scope_before,
+            sentinel.scope_after,
+        ]
+
+        svc.set_status(annotation, ModerationStatus.DENIED, user)
+
+        public_annotation_count_service.update.assert_called_once_with(
+            sentinel.scope_before, sentinel.scope_after
+        )
+
     @pytest.mark.parametrize("with_slim", [False, True])
     def test_set_status(self, svc, annotation, user, factories, with_slim):
         annotation.moderation_status = ModerationStatus.APPROVED
@@ -177,6 +191,7 @@ class TestAnnotationModerationService:
         existing_status,
         expected_status,
         factories,
+        public_annotation_count_service,
     ):
         group = factories.Group(pre_moderated=pre_moderation_enabled)
         annotation = factories.Annotation(
@@ -185,6 +200,9 @@ class TestAnnotationModerationService:
 
         svc.update_status(action, annotation)
 
+        # The caller (`AnnotationWriteService`) updates the count itself
+        public_annotation_count_service.update.assert_not_called()
+
         assert annotation.moderation_status == expected_status
 
     def test_queue_moderation_change_email_when_group_not_pre_moderated(
@@ -389,17 +407,22 @@ class TestAnnotationModerationService:
 
 
 @pytest.fixture
-def svc(db_session, user_service, subscription_service):
+def svc(
+    db_session, user_service, subscription_service, public_annotation_count_service
+):
     return AnnotationModerationService(
         db_session,
         user_service=user_service,
         subscription_service=subscription_service,
+        public_annotation_count_service=public_annotation_count_service,
         email_subaccount=sentinel.email_subaccount,
     )
 
 
 class TestAnnotationModerationServiceFactory:
-    @pytest.mark.usefixtures("user_service", "subscription_service")
+    @pytest.mark.usefixtures(
+        "user_service", "subscription_service", "public_annotation_count_service"
+    )
     def test_it_returns_service(self, pyramid_request):
         svc = annotation_moderation_service_factory(None, pyramid_request)
         assert isinstance(svc, AnnotationModerationService)
@@ -0,0 +1,33 @@
+import random
+import timeit
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from h.db.types import URLSafeUUID
+from h.services.annotation_read import _sort_by_ids
+
+
+def sort_by_list_index(annotations, ids):
+    # The way `get_annotations_by_id()` used to sort
+    return sorted(annotations, key=lambda annotation: ids.index(annotation.id))
+
+
+@pytest.mark.skip("Only of use during development")
+class TestSortByIdsSpeed:  # pragma: no cover
+    @pytest.mark.parametrize("size", (200, 2000, 20000))
+    @pytest.mark.parametrize(
+        "sort", (sort_by_list_index, _sort_by_ids), ids=("list.index", "dict")
+    )
+    def test_speed(self, size, sort):
+        ids = [URLSafeUUID.hex_to_url_safe(uuid.uuid4().hex) for _ in range(size)]
+        # The database returns the annotations in no particular order
+        annotations = [SimpleNamespace(id=id_) for id_ in random.sample(ids, size)]
+        number = max(1, 20000 // size)
+
+        seconds = min(
+            timeit.repeat(lambda: sort(annotations, ids), number=number, repeat=5)
+        )
+
+        print(f"{size} ids: {seconds / number * 1000:.3f} ms")  # noqa: T201
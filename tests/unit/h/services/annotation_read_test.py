@@ -14,18 +14,33 @@ class TestAnnotationReadService:
     def test_get_annotation_by_id_with_invalid_uuid(self, svc):
         assert not svc.get_annotation_by_id("NOTVALID")
 
+    @pytest.mark.parametrize("order_in_sql", (True, False))
     @pytest.mark.parametrize("reverse", (True, False))
-    def test_get_annotations_by_id(self, svc, factories, reverse):
+    def test_get_annotations_by_id(self, svc, factories, reverse, order_in_sql):
         annotations = factories.Annotation.create_batch(3)
         if reverse:
             annotations = list(reversed(annotations))
 
         results = svc.get_annotations_by_id(
-            [annotation.id for annotation in annotations]
+            [annotation.id for annotation in annotations], order_in_sql=order_in_sql
         )
 
         assert results == annotations
 
+    @pytest.mark.parametrize("order_in_sql", (True, False))
+    def test_get_annotations_by_id_with_repeated_and_missing_ids(
+        self, svc, factories, order_in_sql
+    ):
+        annotations = factories.Annotation.create_batch(2)
+        missing_id = "m" * 22
+
+        results = svc.get_annotations_by_id(
+            [annotations[1].id, missing_id, annotations[0].id, annotations[1].id],
+            order_in_sql=order_in_sql,
+        )
+
+        assert results == [annotations[1], annotations[0]]
+
     def test_get_annotations_by_id_with_no_input(self, svc):
         assert not svc.get_annotations_by_id(ids=[])
 
@@ -108,6 +123,19 @@ class TestAnnotationReadService:
 
         assert db_session.scalar(AnnotationReadService.count_query(query)) == 2
 
+    @pytest.mark.parametrize("limit,expected", ((2, 2), (5, 3)))
+    def test_annotation_count_query_with_a_limit(
+        self, factories, db_session, limit, expected
+    ):
+        factories.Annotation.create_batch(3, shared=True)
+
+        query = AnnotationReadService.annotation_search_query()
+
+        assert (
+            db_session.scalar(AnnotationReadService.count_query(query, limit=limit))
+            == expected
+        )
+
     @pytest.fixture
     def query_counter(self, db_engine):
         class QueryCounter:
@@ -136,7 +164,9 @@ class TestServiceFactory:
     def test_it(self, pyramid_request, AnnotationReadService):
         svc = service_factory(sentinel.context, pyramid_request)
 
-        AnnotationReadService.assert_called_once_with(db_session=pyramid_request.db)
+        AnnotationReadService.assert_called_once_with(
+            db_session=pyramid_request.db_reader
+        )
         assert svc == AnnotationReadService.return_value
 
     @pytest.fixture
@@ -1,12 +1,17 @@
 import datetime
+import json
+from types import SimpleNamespace
 from unittest.mock import create_autospec, sentinel
 
 import pytest
+from freezegun import freeze_time
 from h_matchers import Any
 
 from h.db.types import URLSafeUUID
 from h.search.index import BatchIndexer
 from h.services.annotation_sync import (
+    SETTLE_TIME,
+    WATERMARK_SETTING_KEY,
     AnnotationSyncService,
     Counter,
     DBHelper,
@@ -14,6 +19,7 @@ from h.services.annotation_sync import (
     factory,
 )
 from h.services.search_index import SearchIndexService
+from h.services.settings import SettingsService
 
 pytestmark = [
     pytest.mark.xdist_group("elasticsearch"),
@@ -31,6 +37,15 @@ class TestAnnotationSyncService:
         assert counts == {}
         batch_indexer.index.assert_not_called()
 
+    def test_it_gets_jobs_from_a_partition(self, svc, queue_service):
+        queue_service.get.return_value = []
+
+        svc.sync(10, partition=1, partitions=4)
+
+        queue_service.get.assert_called_once_with(
+            name="sync_annotation", limit=10, partition=1, partitions=4
+        )
+
     def test_if_the_job_has_force_True_it_indexes_the_annotation_and_deletes_the_job(
         self, batch_indexer, factories, svc, queue_service
     ):
@@ -326,9 +341,111 @@ class TestAnnotationSyncService:
             db_helper=DBHelper(db=db_session),
             es_helper=ESHelper(es=es_client),
             queue_service=queue_service,
+            settings_service=sentinel.settings_service,
+        )
+
+
+@freeze_time("2024-01-01 12:00:00")
+class TestSyncFromWatermark:
+    def test_it_starts_from_now_the_first_time(
+        self, svc, db_helper, batch_indexer, watermark
+    ):
+        counts = svc.sync_from_watermark(100)
+
+        db_helper.get_updated_after.assert_not_called()
+        batch_indexer.index.assert_not_called()
+        assert watermark() == {"updated": (NOW - SETTLE_TIME).isoformat(), "id": None}
+        assert counts["Watermark/Synced"] == 0
+        assert counts["Watermark/LagSeconds"] == SETTLE_TIME.total_seconds()
+
+    def test_it_syncs_annotations_updated_after_the_watermark(
+        self, svc, db_helper, batch_indexer, watermark
+    ):
+        watermark.set(WATERMARK, "id_0")
+        db_helper.get_updated_after.return_value = [
+            row("id_1", WATERMARK + datetime.timedelta(minutes=1)),
+            row("id_2", WATERMARK + datetime.timedelta(minutes=2), deleted=True),
+            row("id_3", WATERMARK + datetime.timedelta(minutes=3)),
+        ]
+
+        counts = svc.sync_from_watermark(100)
+
+        db_helper.get_updated_after.assert_called_once_with(
+            (WATERMARK, "id_0"),
+            before=NOW - SETTLE_TIME,
+            limit=100,
+        )
+        batch_indexer.index.assert_called_once_with(["id_1", "id_3"])
+        batch_indexer.delete.assert_called_once_with(["id_2"])
+        assert watermark() == {"updated": "2024-01-01T11:03:00", "id": "id_3"}
+        assert counts == {
+            "Watermark/Synced": 2,
+            "Watermark/Deleted": 1,
+            "Watermark/LagSeconds": 57 * 60,
+            "Watermark/RowsPerSecond": Any(),
+        }
+
+    def test_it_moves_the_watermark_on_when_it_has_caught_up(
+        self, svc, db_helper, batch_indexer, watermark
+    ):
+        watermark.set(WATERMARK, "id_0")
+        db_helper.get_updated_after.return_value = []
+
+        counts = svc.sync_from_watermark(100)
+
+        batch_indexer.index.assert_not_called()
+        batch_indexer.delete.assert_not_called()
+        assert watermark() == {"updated": (NOW - SETTLE_TIME).isoformat(), "id": None}
+        assert counts["Watermark/LagSeconds"] == SETTLE_TIME.total_seconds()
+
+    @pytest.fixture
+    def watermark(self, settings_service):
+        settings = {}
+        settings_service.get.side_effect = settings.get
+        settings_service.put.side_effect = settings.__setitem__
+
+        class Watermark:
+            def __call__(self):
+                return json.loads(settings[WATERMARK_SETTING_KEY])
+
+            def set(self, updated, id_):
+                settings[WATERMARK_SETTING_KEY] = json.dumps(
+                    {"updated": updated.isoformat(), "id": id_}
+                )
+
+        return Watermark()
+
+    @pytest.fixture
+    def batch_indexer(self):
+        return create_autospec(BatchIndexer, spec_set=True, instance=True)
+
+    @pytest.fixture
+    def db_helper(self):
+        return create_autospec(DBHelper, spec_set=True, instance=True)
+
+    @pytest.fixture
+    def settings_service(self):
+        return create_autospec(SettingsService, spec_set=True, instance=True)
+
+    @pytest.fixture
+    def svc(self, batch_indexer, db_helper, queue_service, settings_service):
+        return AnnotationSyncService(
+            batch_indexer=batch_indexer,
+            db_helper=db_helper,
+            es_helper=sentinel.es_helper,
+            queue_service=queue_service,
+            settings_service=settings_service,
         )
 
 
+NOW = datetime.datetime(2024, 1, 1, 12)  # noqa: DTZ001
+WATERMARK = NOW - datetime.timedelta(hours=1)
+
+
+def row(id_, updated, deleted=False):  # noqa: FBT002
+    return SimpleNamespace(id=id_, updated=updated, deleted=deleted)
+
+
 class TestDBHelper:
     def test_get_with_no_jobs(self, db_helper):
         assert db_helper.get([]) == {}
@@ -389,6 +506,52 @@ class TestDBHelper:
 
     # TODO: Annotations that don't exist in the DB.  # noqa: FIX002, TD002, TD003
 
+    def test_get_updated_after(self, db_helper, factories):
+        updated = datetime.datetime(2024, 1, 1)  # noqa: DTZ001
+        annotations = sorted(
+            factories.Annotation.create_batch(3, updated=updated),
+            key=lambda annotation: URLSafeUUID.url_safe_to_hex(annotation.id),
+        )
+        later = factories.Annotation(
+            updated=updated + datetime.timedelta(minutes=1), deleted=True
+        )
+        # Too old and too new
+        factories.Annotation(updated=updated - datetime.timedelta(minutes=1))
+        factories.Annotation(updated=updated + datetime.timedelta(minutes=2))
+
+        result = db_helper.get_updated_after(
+            (updated, annotations[0].id),
+            before=updated + datetime.timedelta(minutes=2),
+            limit=10,
+        )
+
+        assert result == [
+            (annotations[1].id, updated, False),
+            (annotations[2].id, updated, False),
+            (later.id, later.updated, True),
+        ]
+
+    def test_get_updated_after_with_no_id(self, db_helper, factories):
+        updated = datetime.datetime(2024, 1, 1)  # noqa: DTZ001
+        annotation = factories.Annotation(updated=updated)
+        factories.Annotation(updated=updated - datetime.timedelta(minutes=1))
+
+        result = db_helper.get_updated_after(
+            (updated, None), before=updated + datetime.timedelta(minutes=1), limit=10
+        )
+
+        assert result == [(annotation.id, updated, False)]
+
+    def test_get_updated_after_limit(self, db_helper, factories):
+        updated = datetime.datetime(2024, 1, 1)  # noqa: DTZ001
+        factories.Annotation.create_batch(3, updated=updated)
+
+        result = db_helper.get_updated_after(
+            (updated, None), before=updated + datetime.timedelta(minutes=1), limit=2
+        )
+
+        assert len(result) == 2
+
     @pytest.fixture
     def db_helper(self, db_session):
         return DBHelper(db_session)
@@ -618,6 +781,7 @@ class TestFactory:
         db_session,
         pyramid_request,
         queue_service,
+        settings_service,
     ):
         svc = factory(sentinel.context, pyramid_request)
 
@@ -631,9 +795,14 @@ class TestFactory:
             db_helper=DBHelper.return_value,
             es_helper=ESHelper.return_value,
             queue_service=queue_service,
+            settings_service=settings_service,
         )
         assert svc == AnnotationSyncService.return_value
 
+    @pytest.fixture
+    def settings_service(self, mock_service):
+        return mock_service(SettingsService, name="settings")
+
     @pytest.fixture(autouse=True)
     def AnnotationSyncService(self, patch):
         return patch("h.services.annotation_sync.AnnotationSyncService")
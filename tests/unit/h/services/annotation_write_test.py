@@ -24,6 +24,7 @@ class TestAnnotationWriteService:
         _validate_group,  # noqa: PT019
         db_session,
         moderation_service,
+        public_annotation_count_service,
         matchers,
     ):
         root_annotation = factories.Annotation()
@@ -46,6 +47,10 @@ class TestAnnotationWriteService:
         )
         mention_service.update_mentions.assert_called_once_with(anno)
         moderation_service.update_status.assert_called_once_with("create", anno)
+        public_annotation_count_service.scope.assert_called_once_with(anno)
+        public_annotation_count_service.update.assert_called_once_with(
+            None, public_annotation_count_service.scope.return_value
+        )
 
         assert anno == matchers.InstanceOf(
             Annotation,
@@ -140,10 +145,16 @@ class TestAnnotationWriteService:
         queue_service,
         _validate_group,  # noqa: PT019
         moderation_service,
+        public_annotation_count_service,
+        on_document_uris_change,
     ):
         then = datetime.now() - timedelta(days=1)  # noqa: DTZ005
         annotation.extra = {"key": "value"}
         annotation.updated = then
+        public_annotation_count_service.scope.side_effect = [
+            sentinel.scope_before,
+            sentinel.scope_after,
+        ]
 
         anno = svc.update_annotation(
             annotation,
@@ -169,8 +180,12 @@ class TestAnnotationWriteService:
             {"meta": 1},
             {"uri": 1},
             updated=anno.updated,
+            on_uris_change=on_document_uris_change,
         )
         moderation_service.update_status.assert_called_once_with("update", anno)
+        public_annotation_count_service.update.assert_called_once_with(
+            sentinel.scope_before, sentinel.scope_after
+        )
 
         queue_service.add_by_id.assert_called_once_with(
             "sync_annotation",
@@ -369,6 +384,8 @@ class TestAnnotationWriteService:
         annotation_metadata_service,
         mention_service,
         moderation_service,
+        public_annotation_count_service,
+        on_document_uris_change,
     ):
         return AnnotationWriteService(
             db_session=db_session,
@@ -378,8 +395,14 @@ class TestAnnotationWriteService:
             annotation_metadata_service=annotation_metadata_service,
             mention_service=mention_service,
             moderation_service=moderation_service,
+            public_annotation_count_service=public_annotation_count_service,
+            on_document_uris_change=on_document_uris_change,
         )
 
+    @pytest.fixture
+    def on_document_uris_change(self):
+        return Mock(spec_set=[])
+
     @pytest.fixture
     def _validate_group(self, svc):
         with patch.object(svc, "_validate_group") as _validate_group:
@@ -415,6 +438,7 @@ class TestServiceFactory:
         annotation_metadata_service,
         mention_service,
         moderation_service,
+        public_annotation_count_service,
     ):
         svc = service_factory(sentinel.context, pyramid_request)
 
@@ -426,9 +450,29 @@ class TestServiceFactory:
             annotation_metadata_service=annotation_metadata_service,
             mention_service=mention_service,
             moderation_service=moderation_service,
+            public_annotation_count_service=public_annotation_count_service,
+            on_document_uris_change=Any.function(),
         )
         assert svc == AnnotationWriteService.return_value
 
+    def test_it_publishes_document_uri_changes(
+        self, pyramid_request, AnnotationWriteService, storage
+    ):
+        service_factory(sentinel.context, pyramid_request)
+
+        on_document_uris_change = AnnotationWriteService.call_args.kwargs[
+            "on_document_uris_change"
+        ]
+        on_document_uris_change(sentinel.uris)
+
+        storage.publish_expanded_uris_change.assert_called_once_with(
+            pyramid_request, sentinel.uris
+        )
+
+    @pytest.fixture
+    def storage(self, patch):
+        return patch("h.services.annotation_write.storage")
+
     @pytest.fixture
     def AnnotationWriteService(self, patch):
         return patch("h.services.annotation_write.AnnotationWriteService")
@@ -1,13 +1,15 @@
-from unittest.mock import sentinel  # noqa: INP001
+from itertools import count  # noqa: INP001
+from unittest.mock import create_autospec, sentinel
 
 import pytest
 from _pytest.mark import param
 from h_matchers import Any
-from sqlalchemy import select
+from sqlalchemy import orm, select, text
 
 from h.models import Annotation
-from h.services.bulk_api._helpers import date_match
+from h.services.bulk_api._helpers import date_match, stream_rows
 from h.services.bulk_api.exceptions import BadDateFilter
+from h.views.api.bulk._ndjson import get_ndjson_response
 
 
 class TestDateMatch:
@@ -50,3 +52,41 @@ class TestDateMatch:
     def test_it_raises_for_bad_spec(self, bad_spec):
         with pytest.raises(BadDateFilter):
             date_match(sentinel.column, bad_spec)
+
+
+class TestStreamRows:
+    def test_it(self, db_session, factories):
+        annotations = factories.Annotation.create_batch(3)
+
+        ids = stream_rows(
+            db_session,
+            select(Annotation.id).order_by(Annotation.id),
+            lambda row: row.id,
+            yield_per=2,
+        )
+
+        assert list(ids) == sorted(annotation.id for annotation in annotations)
+
+    def test_it_doesnt_query_until_iterated(self, db_session):
+        rows = stream_rows(db_session, select(text("nonsense")), lambda row: row)
+
+        rows.close()
+
+    def test_the_session_is_closed_if_the_client_goes_away(self, Session):
+        session = create_autospec(orm.Session, instance=True, spec_set=True)
+        stream_session = Session.return_value.__enter__.return_value
+        stream_session.execute.return_value = ({"id": "x" * 1000} for _ in count())
+        response = get_ndjson_response(
+            stream_rows(session, select(text("1")), lambda row: row),
+            present=lambda row: row,
+        )
+
+        next(response.app_iter)
+        Session.return_value.__exit__.assert_not_called()
+        response.app_iter.close()
+
+        Session.return_value.__exit__.assert_called_once()
+
+    @pytest.fixture
+    def Session(self, patch):
+        return patch("h.services.bulk_api._helpers.Session")
@@ -0,0 +1,51 @@
+import time  # noqa: INP001
+import tracemalloc
+
+import pytest
+
+from h.models import GroupMembership
+from h.services.bulk_api.annotation import BulkAnnotationService
+from h.views.api.bulk._ndjson import get_ndjson_response
+from h.views.api.bulk.annotation import _present_annotation
+
+
+@pytest.mark.skip("Only of use during development")
+class TestBulkAnnotationResponseSpeed:  # pragma: no cover
+    """Compare streaming bulk annotation responses with loading them into a list."""
+
+    AUTHORITY = "my.authority"
+
+    @pytest.mark.parametrize("count", (1000, 10_000))
+    @pytest.mark.parametrize("mode", ("stream", "list"))
+    def test_speed(self, db_session, factories, count, mode):
+        user = factories.User(authority=self.AUTHORITY)
+        group = factories.Group(memberships=[GroupMembership(user=user)])
+        factories.AnnotationSlim.create_batch(
+            count, user=user, group=group, shared=True, deleted=False
+        )
+        db_session.flush()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        annotations = BulkAnnotationService(db_session).annotation_search(
+            authority=self.AUTHORITY,
+            username=user.username,
+            created={"gt": "1970-01-01"},
+            limit=count,
+        )
+        if mode == "list":
+            annotations = list(annotations)
+        response = get_ndjson_response(annotations, present=_present_annotation)
+
+        first_chunk_at = None
+        for _chunk in response.app_iter:
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+        end = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(  # noqa: T201
+            f"{mode} x {count}: first chunk {(first_chunk_at - start) * 1000:.1f} ms, "
+            f"total {(end - start) * 1000:.1f} ms, peak {peak / 1024 / 1024:.1f}MiB"
+        )
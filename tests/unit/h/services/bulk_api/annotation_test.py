@@ -4,6 +4,7 @@ import pytest
 from h_matchers import Any
 
 from h.models import GroupMembership
+from h.services.bulk_api import BadDateFilter
 from h.services.bulk_api.annotation import (
     BulkAnnotation,
     BulkAnnotationService,
@@ -66,10 +67,12 @@ class TestBulkAnnotationService:
                 annotation_slim=anno_slim, data={"some": "value"}
             )
 
-        annotations = svc.annotation_search(
-            authority=self.AUTHORITY,
-            username="USERNAME",
-            created={"gt": "2020-01-01", "lte": "2022-01-01"},
+        annotations = list(
+            svc.annotation_search(
+                authority=self.AUTHORITY,
+                username="USERNAME",
+                created={"gt": "2020-01-01", "lte": "2022-01-01"},
+            )
         )
 
         if visible:
@@ -105,10 +108,12 @@ class TestBulkAnnotationService:
             )
         ]
 
-        matched_annos = svc.annotation_search(
-            authority=self.AUTHORITY,
-            username=viewer.username,
-            created={"gt": "2020-01-01", "lte": "2099-01-01"},
+        matched_annos = list(
+            svc.annotation_search(
+                authority=self.AUTHORITY,
+                username=viewer.username,
+                created={"gt": "2020-01-01", "lte": "2099-01-01"},
+            )
         )
 
         # Only the first two annotations should match
@@ -126,6 +131,12 @@ class TestBulkAnnotationService:
             ).only()
         )
 
+    def test_it_raises_for_bad_date_filters_before_iterating(self, svc):
+        with pytest.raises(BadDateFilter):
+            svc.annotation_search(
+                authority=self.AUTHORITY, username="USERNAME", created={}
+            )
+
     @pytest.fixture
     def svc(self, db_session):
         return BulkAnnotationService(db_session)
@@ -135,7 +146,9 @@ class TestServiceFactory:
     def test_it(self, pyramid_request, BulkAnnotationService):
         svc = service_factory(sentinel.context, pyramid_request)
 
-        BulkAnnotationService.assert_called_once_with(db_session=pyramid_request.db)
+        BulkAnnotationService.assert_called_once_with(
+            db_session=pyramid_request.db_reader
+        )
         assert svc == BulkAnnotationService.return_value
 
     @pytest.fixture
@@ -15,10 +15,12 @@ class TestBulkLMSStatsService:
     def test_get_annotation_counts_by_user(
         self, svc, group, user, annotation, annotation_reply, reply_user
     ):
-        stats = svc.get_annotation_counts(
-            groups=[group.authority_provided_id],
-            assignment_ids=["ASSIGNMENT_ID"],
-            group_by=CountsGroupBy.USER,
+        stats = list(
+            svc.get_annotation_counts(
+                groups=[group.authority_provided_id],
+                assignment_ids=["ASSIGNMENT_ID"],
+                group_by=CountsGroupBy.USER,
+            )
         )
 
         assert len(stats) == 2
@@ -53,8 +55,10 @@ class TestBulkLMSStatsService:
         annotation_reply,
         annotation_in_another_assignment,
     ):
-        stats = svc.get_annotation_counts(
-            groups=[group.authority_provided_id], group_by=CountsGroupBy.ASSIGNMENT
+        stats = list(
+            svc.get_annotation_counts(
+                groups=[group.authority_provided_id], group_by=CountsGroupBy.ASSIGNMENT
+            )
         )
 
         assert len(stats) == 2
@@ -88,10 +92,12 @@ class TestBulkLMSStatsService:
         annotation_in_another_assignment,  # noqa: ARG002
         reply_user,
     ):
-        stats = svc.get_annotation_counts(
-            groups=[group.authority_provided_id],
-            group_by=CountsGroupBy.ASSIGNMENT,
-            h_userids=[reply_user.userid],
+        stats = list(
+            svc.get_annotation_counts(
+                groups=[group.authority_provided_id],
+                group_by=CountsGroupBy.ASSIGNMENT,
+                h_userids=[reply_user.userid],
+            )
         )
 
         assert stats == [
@@ -199,7 +205,7 @@ class TestServiceFactory:
         svc = service_factory(sentinel.context, pyramid_request)
 
         BulkLMSStatsService.assert_called_once_with(
-            db=pyramid_request.db,
+            db=pyramid_request.db_reader,
             authorized_authority=pyramid_request.identity.auth_client.authority,
         )
         assert svc == BulkLMSStatsService.return_value
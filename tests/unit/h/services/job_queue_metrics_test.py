@@ -2,6 +2,7 @@ import datetime
 from unittest import mock
 
 import pytest
+from h_matchers import Any
 
 from h.services.job_queue_metrics import JobQueueMetrics, factory
 
@@ -17,15 +18,17 @@ class TestJobQueue:
             priority = 1
             tag = "tag_1"
 
-        JobFactory()
+        JobFactory(collapsed=3)
         JobFactory(name="name_2", scheduled_at=now + one_minute)
         JobFactory(tag="tag_2")
         JobFactory(priority=2)
-        JobFactory(expires_at=now - one_minute)
+        JobFactory(expires_at=now - one_minute, collapsed=5)
 
         metrics = job_queue_metrics.metrics()
 
         assert sorted(metrics) == [
+            ("Custom/JobQueue/Collapsed/Name/name_1", 3),
+            ("Custom/JobQueue/Collapsed/Name/name_2", 0),
             ("Custom/JobQueue/Count/Expired", 1),
             ("Custom/JobQueue/Count/Name/name_1/Tag/tag_1", 2),
             ("Custom/JobQueue/Count/Name/name_1/Tag/tag_2", 1),
@@ -35,7 +38,12 @@ class TestJobQueue:
             ("Custom/JobQueue/Count/Priority/1", 3),
             ("Custom/JobQueue/Count/Priority/2", 1),
             ("Custom/JobQueue/Count/Total", 4),
+            ("Custom/JobQueue/Latency/Name/name_1/Average", Any.float()),
+            ("Custom/JobQueue/Latency/Name/name_1/Max", Any.float()),
         ]
+        latencies = dict(metrics)
+        assert latencies["Custom/JobQueue/Latency/Name/name_1/Max"] >= 60
+        assert latencies["Custom/JobQueue/Latency/Name/name_1/Average"] >= 60
 
     @pytest.fixture
     def job_queue_metrics(self, db_session):
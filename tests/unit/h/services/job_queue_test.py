@@ -9,7 +9,9 @@ from sqlalchemy.sql.expression import BinaryExpression
 
 from h.db.types import URLSafeUUID
 from h.models import Annotation, Job
+from h.services.annotation_sync import WATERMARK_SETTING_KEY
 from h.services.job_queue import JobQueueService, Priority, factory
+from h.services.settings import SettingsService
 
 ONE_WEEK = timedelta(weeks=1)
 ONE_WEEK_IN_SECONDS = int(ONE_WEEK.total_seconds())
@@ -37,6 +39,19 @@ class TestQueueService:
 
         assert len(jobs) == limit
 
+    def test_get_with_partitions(self, factories, svc):
+        jobs = factories.SyncAnnotationJob.create_batch(size=10)
+
+        partitions = [
+            svc.get("sync_annotation", limit=100, partition=partition, partitions=3)
+            for partition in range(3)
+        ]
+
+        # Each job is in exactly one partition
+        assert sorted(job.id for jobs in partitions for job in jobs) == sorted(
+            job.id for job in jobs
+        )
+
     @freeze_time("2023-01-01")
     def test_add_where(self, factories, db_session, svc, matchers):
         now = datetime.utcnow()  # noqa: DTZ003
@@ -99,6 +114,62 @@ class TestQueueService:
 
         assert db_session.query(Job).one().kwargs["force"] == expected_force
 
+    @freeze_time("2023-01-01")
+    def test_add_where_collapses_jobs_which_arent_scheduled_yet(
+        self, factories, db_session, svc
+    ):
+        now = datetime.utcnow()  # noqa: DTZ003
+        annotation = factories.Annotation()
+        where = [Annotation.id == annotation.id]
+        svc.add_where("sync_annotation", where, "tag_1", 10, schedule_in=60)
+
+        svc.add_where("sync_annotation", where, "tag_2", 1, schedule_in=120)
+        svc.add_where("sync_annotation", where, "tag_3", 100, schedule_in=30)
+
+        job = db_session.query(Job).one()
+        assert job.tag == "tag_1"
+        assert job.scheduled_at == now + timedelta(seconds=120)
+        assert job.priority == 1
+        assert job.collapsed == 2
+
+    def test_add_where_doesnt_collapse_jobs_which_are_scheduled(
+        self, factories, db_session, svc
+    ):
+        annotation = factories.Annotation()
+        where = [Annotation.id == annotation.id]
+        svc.add_where("sync_annotation", where, "tag", 1)
+
+        svc.add_where("sync_annotation", where, "tag", 1)
+
+        assert db_session.query(Job).count() == 2
+
+    def test_add_where_doesnt_collapse_forced_jobs_into_unforced_ones(
+        self, factories, db_session, svc
+    ):
+        annotation = factories.Annotation()
+        where = [Annotation.id == annotation.id]
+        svc.add_where("sync_annotation", where, "tag", 1, schedule_in=60)
+
+        svc.add_where("sync_annotation", where, "tag", 1, force=True, schedule_in=60)
+        svc.add_where("sync_annotation", where, "tag", 1, schedule_in=60)
+
+        jobs = db_session.query(Job).order_by(Job.id).all()
+        assert [(job.kwargs["force"], job.collapsed) for job in jobs] == [
+            (False, 1),
+            (True, 1),
+        ]
+
+    def test_add_where_doesnt_collapse_jobs_with_other_names(
+        self, factories, db_session, svc
+    ):
+        annotation = factories.Annotation()
+        where = [Annotation.id == annotation.id]
+        svc.add_where("sync_annotation", where, "tag", 1, schedule_in=60)
+
+        svc.add_where("other_job", where, "tag", 1, schedule_in=60)
+
+        assert db_session.query(Job).count() == 2
+
     def test_add_by_id(self, svc, add_where, matchers):
         svc.add_by_id(
             sentinel.name,
@@ -120,6 +191,22 @@ class TestQueueService:
         where = add_where.call_args[0][1]
         assert where[0].compare(Annotation.id == sentinel.annotation_id)
 
+    @pytest.mark.parametrize(
+        "name,force,expected_job",
+        (
+            ("sync_annotation", False, False),
+            ("sync_annotation", True, True),
+            ("other_job", False, True),
+        ),
+    )
+    def test_add_by_id_with_watermark_sync(self, db_session, name, force, expected_job):
+        svc = JobQueueService(db_session, watermark_sync=True)
+
+        with patch.object(svc, "add_where") as add_where:
+            svc.add_by_id(name, sentinel.annotation_id, sentinel.tag, force=force)
+
+        assert add_where.called == expected_job
+
     def test_add_annotations_by_ids(self, svc, add_where, matchers):
         svc.add_by_ids(
             sentinel.name,
@@ -212,10 +299,39 @@ class TestQueueService:
 
         assert not db_session.query(Job).all()
 
-    def test_factory(self, pyramid_request, db_session):
+    def test_delete_with_no_jobs(self, svc, db_session):
+        svc.delete([])
+
+        assert not db_session.query(Job).all()
+
+    @pytest.mark.parametrize(
+        "sync_mode,watermark_sync",
+        ((None, False), ("queue", False), ("watermark", True)),
+    )
+    def test_factory(
+        self, pyramid_request, db_session, settings_service, sync_mode, watermark_sync
+    ):
+        if sync_mode:
+            pyramid_request.registry.settings["h.search.sync_mode"] = sync_mode
+        settings_service.get.return_value = '{"updated": "2025-01-01", "id": null}'
+
         svc = factory(sentinel.context, pyramid_request)
 
         assert svc._db == db_session  # noqa: SLF001
+        assert svc._watermark_sync == watermark_sync  # noqa: SLF001
+
+    def test_factory_keeps_queueing_jobs_until_there_is_a_watermark(
+        self, pyramid_request, settings_service
+    ):
+        # Otherwise changes between switching to watermark mode and the first
+        # sync from the watermark would never be synced
+        pyramid_request.registry.settings["h.search.sync_mode"] = "watermark"
+        settings_service.get.return_value = None
+
+        svc = factory(sentinel.context, pyramid_request)
+
+        settings_service.get.assert_called_once_with(WATERMARK_SETTING_KEY)
+        assert not svc._watermark_sync  # noqa: SLF001
 
     def database_id(self, annotation):
         """Return `annotation.id` in the internal format used within the database."""
@@ -229,3 +345,7 @@ class TestQueueService:
     @pytest.fixture
     def svc(self, db_session):
         return JobQueueService(db_session)
+
+    @pytest.fixture
+    def settings_service(self, mock_service):
+        return mock_service(SettingsService, name="settings")
@@ -1,6 +1,18 @@
+from unittest import mock
+from unittest.mock import create_autospec
+
 import pytest
 
-from h.services.nipsa import NipsaService, nipsa_factory
+from h.exceptions import RealtimeMessageQueueError
+from h.services.nipsa import (
+    FLAGGED_USERIDS_KEY,
+    NIPSA_CHANGE_EVENT,
+    VERSION_SETTING_KEY,
+    FlaggedUserids,
+    NipsaService,
+    nipsa_factory,
+)
+from h.services.settings import SettingsService
 
 
 class TestNipsaService:
@@ -80,34 +92,223 @@ class TestNipsaService:
 
         assert not svc.is_flagged(users["flagged_user"].userid)
 
-    def test_clear_resets_cache(self, svc, users):
+    @pytest.mark.parametrize("method", ("flag", "unflag"))
+    def test_changes_update_the_version_and_are_published(
+        self, svc, users, settings, publish, method
+    ):
+        getattr(svc, method)(users["flagged_user"])
+        first_version = settings.get(VERSION_SETTING_KEY)
+        getattr(svc, method)(users["flagged_user"])
+
+        assert first_version
+        assert settings.get(VERSION_SETTING_KEY) not in {None, first_version}
+        assert publish.call_args_list == [
+            mock.call(users["flagged_user"].userid),
+            mock.call(users["flagged_user"].userid),
+        ]
+
+    def test_clear_resets_cache(self, svc, users, settings, flagged_userids):
         svc.fetch_all_flagged_userids()
         users["flagged_user"].nipsa = False
+        settings.put(VERSION_SETTING_KEY, "new_version")
+        flagged_userids.expire()
         svc.clear()
 
         assert not svc.is_flagged("acct:flagged_user@example.com")
 
+    def test_it_shares_the_flagged_userids_between_instances(
+        self, svc, db_session, settings, flagged_userids, publish, users
+    ):
+        svc.fetch_all_flagged_userids()
+        users["flagged_user"].nipsa = False
+
+        other_svc = NipsaService(db_session, settings, flagged_userids, publish)
+
+        # Returns `True` because the version hasn't changed.
+        assert other_svc.is_flagged("acct:flagged_user@example.com")
+
     @pytest.fixture
-    def svc(self, db_session):
-        return NipsaService(db_session)
+    def svc(self, db_session, settings, flagged_userids, publish):
+        return NipsaService(db_session, settings, flagged_userids, publish)
+
+    @pytest.fixture
+    def settings(self, db_session):
+        return SettingsService(db_session)
+
+    @pytest.fixture
+    def flagged_userids(self):
+        return FlaggedUserids()
+
+    @pytest.fixture
+    def publish(self):
+        return mock.Mock(spec_set=[])
 
     @pytest.fixture(autouse=True)
     def tasks(self, patch):
         return patch("h.services.nipsa.tasks")
 
     @pytest.fixture(autouse=True)
-    def users(self, db_session, factories):
-        users = {
-            "flagged_user": factories.User(username="flagged_user", nipsa=True),
-            "flagged_user_2": factories.User(username="flagged_user_2", nipsa=True),
-            "unflagged_user": factories.User(username="unflagged_user", nipsa=False),
-        }
-        db_session.flush()
+    def users(self, users):
         return users
 
 
-def test_nipsa_factory(pyramid_request):
-    svc = nipsa_factory(None, pyramid_request)
+class TestFlaggedUserids:
+    def test_it_loads_the_userids(self, cache, session, settings):
+        userids = cache.get(session, settings)
+
+        settings.get.assert_called_once_with(VERSION_SETTING_KEY)
+        session.scalars.assert_called_once()
+        assert userids == frozenset(["acct:flagged@example.com"])
+
+    def test_it_doesnt_check_again_until_the_interval_has_passed(
+        self, cache, session, settings
+    ):
+        cache.get(session, settings)
+        userids = cache.get(session, settings)
+
+        settings.get.assert_called_once()
+        session.scalars.assert_called_once()
+        assert userids == frozenset(["acct:flagged@example.com"])
+
+    def test_it_doesnt_load_again_if_the_version_hasnt_changed(
+        self, cache, session, settings
+    ):
+        cache.check_interval = 0
+
+        cache.get(session, settings)
+        cache.get(session, settings)
+
+        assert settings.get.call_count == 2
+        session.scalars.assert_called_once()
+
+    def test_it_loads_again_if_the_version_has_changed(self, cache, session, settings):
+        cache.check_interval = 0
+
+        cache.get(session, settings)
+        settings.get.return_value = "new_version"
+        session.scalars.return_value = []
+        userids = cache.get(session, settings)
+
+        assert session.scalars.call_count == 2
+        assert userids == frozenset()
+
+    def test_expire_makes_it_check_the_version(self, cache, session, settings):
+        cache.get(session, settings)
+        cache.expire()
+        cache.get(session, settings)
+
+        assert settings.get.call_count == 2
+        session.scalars.assert_called_once()
+
+    @pytest.fixture
+    def cache(self):
+        return FlaggedUserids(check_interval=60)
+
+    @pytest.fixture
+    def session(self):
+        session = mock.Mock(spec_set=["scalars"])
+        session.scalars.return_value = ["acct:flagged@example.com"]
+        return session
+
+    @pytest.fixture
+    def settings(self):
+        settings = create_autospec(SettingsService, instance=True, spec_set=True)
+        settings.get.return_value = "version"
+        return settings
+
+
+class TestNipsaFactory:
+    def test_it(self, pyramid_request, settings_service):
+        svc = nipsa_factory(None, pyramid_request)
+
+        assert isinstance(svc, NipsaService)
+        assert svc.session == pyramid_request.db
+        assert svc._settings == settings_service  # noqa: SLF001
+
+    def test_it_shares_the_flagged_userids_cache(self, pyramid_request):
+        del pyramid_request.registry[FLAGGED_USERIDS_KEY]
+
+        svc = nipsa_factory(None, pyramid_request)
+        other_svc = nipsa_factory(None, pyramid_request)
+
+        cache = pyramid_request.registry[FLAGGED_USERIDS_KEY]
+        assert isinstance(cache, FlaggedUserids)
+        assert svc._flagged_userids_cache == cache  # noqa: SLF001
+        assert other_svc._flagged_userids_cache == cache  # noqa: SLF001
+
+    def test_it_publishes_changes_after_commit(
+        self, pyramid_request, user, after_commit, flagged_userids
+    ):
+        nipsa_factory(None, pyramid_request).flag(user)
+        pyramid_request.realtime.publish_user.assert_not_called()
+
+        after_commit(success=True)
+
+        flagged_userids.expire.assert_called_once_with()
+        pyramid_request.realtime.publish_user.assert_called_once_with(
+            {"type": NIPSA_CHANGE_EVENT, "userid": user.userid}
+        )
+
+    def test_it_doesnt_publish_changes_which_arent_committed(
+        self, pyramid_request, user, after_commit, flagged_userids
+    ):
+        nipsa_factory(None, pyramid_request).flag(user)
+
+        after_commit(success=False)
+
+        flagged_userids.expire.assert_not_called()
+        pyramid_request.realtime.publish_user.assert_not_called()
+
+    def test_it_logs_changes_it_cant_publish(
+        self, pyramid_request, user, after_commit, caplog
+    ):
+        pyramid_request.realtime.publish_user.side_effect = RealtimeMessageQueueError
+        nipsa_factory(None, pyramid_request).flag(user)
+
+        after_commit(success=True)
+
+        assert "Failed to publish NIPSA change" in caplog.text
+
+    @pytest.fixture
+    def user(self, factories):
+        return factories.User.build()
+
+    @pytest.fixture
+    def after_commit(self, pyramid_request):
+        def after_commit(success):
+            transaction = pyramid_request.tm.get.return_value
+            hook = transaction.addAfterCommitHook.call_args.args[0]
+            hook(success)
+
+        return after_commit
+
+    @pytest.fixture(autouse=True)
+    def flagged_userids(self, pyramid_request):
+        flagged_userids = create_autospec(FlaggedUserids, instance=True)
+        pyramid_request.registry[FLAGGED_USERIDS_KEY] = flagged_userids
+        return flagged_userids
+
+    @pytest.fixture
+    def settings_service(self, mock_service):
+        return mock_service(SettingsService, name="settings")
+
+    @pytest.fixture(autouse=True)
+    def pyramid_request(self, pyramid_request, settings_service):  # noqa: ARG002
+        pyramid_request.realtime = mock.Mock(spec_set=["publish_user"])
+        pyramid_request.tm = mock.Mock(spec_set=["get"])
+        return pyramid_request
+
+    @pytest.fixture(autouse=True)
+    def tasks(self, patch):
+        return patch("h.services.nipsa.tasks")
+
 
-    assert isinstance(svc, NipsaService)
-    assert svc.session == pyramid_request.db
+@pytest.fixture
+def users(db_session, factories):
+    users = {
+        "flagged_user": factories.User(username="flagged_user", nipsa=True),
+        "flagged_user_2": factories.User(username="flagged_user_2", nipsa=True),
+        "unflagged_user": factories.User(username="unflagged_user", nipsa=False),
+    }
+    db_session.flush()
+    return users
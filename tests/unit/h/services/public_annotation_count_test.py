@@ -0,0 +1,259 @@
+from unittest.mock import sentinel
+
+import pytest
+
+from h.models import ModerationStatus, PublicAnnotationCount
+from h.services.public_annotation_count import (
+    RECONCILED_SETTING_KEY,
+    PublicAnnotationCountService,
+    factory,
+)
+from h.services.settings import SettingsService
+
+
+class TestPublicAnnotationCountService:
+    def test_scope(self, svc, public_annotation):
+        assert svc.scope(public_annotation) == "httpx://example.com"
+
+    def test_scope_with_a_version(self, svc, public_annotation):
+        public_annotation.version = 3
+
+        assert svc.scope(public_annotation) == "httpx://example.com__v3"
+
+    @pytest.mark.parametrize(
+        "attribute,value",
+        (
+            ("deleted", True),
+            ("shared", False),
+            ("moderation_status", ModerationStatus.DENIED),
+            ("moderation_status", ModerationStatus.PENDING),
+        ),
+    )
+    def test_scope_is_None_if_the_annotation_isnt_public(
+        self, svc, public_annotation, attribute, value
+    ):
+        setattr(public_annotation, attribute, value)
+
+        assert svc.scope(public_annotation) is None
+
+    def test_scope_is_None_if_the_group_isnt_world_readable(
+        self, svc, factories, db_session
+    ):
+        group = factories.Group()
+        annotation = factories.Annotation(groupid=group.pubid, shared=True)
+        db_session.flush()
+
+        assert svc.scope(annotation) is None
+
+    def test_scope_is_None_if_the_user_is_nipsad(
+        self, svc, public_annotation, nipsa_service
+    ):
+        nipsa_service.is_flagged.return_value = True
+
+        assert svc.scope(public_annotation) is None
+
+        nipsa_service.is_flagged.assert_called_once_with(public_annotation.userid)
+
+    def test_update(self, svc, db_session):
+        db_session.add_all(
+            [
+                PublicAnnotationCount(scope="before", count=2),
+                PublicAnnotationCount(scope="after", count=5),
+            ]
+        )
+        db_session.flush()
+
+        svc.update("before", "after")
+
+        assert self.counts(db_session) == {"before": 1, "after": 6}
+
+    def test_update_adds_new_counts(self, svc, db_session):
+        svc.update(None, "after")
+
+        assert self.counts(db_session) == {"after": 1}
+
+    def test_update_doesnt_go_below_zero(self, svc, db_session):
+        db_session.add(PublicAnnotationCount(scope="before", count=0))
+        db_session.flush()
+
+        svc.update("before", None)
+
+        assert self.counts(db_session) == {"before": 0}
+
+    def test_update_does_nothing_if_the_scope_hasnt_changed(self, svc, db_session):
+        db_session.add(PublicAnnotationCount(scope="scope", count=2))
+        db_session.flush()
+
+        svc.update("scope", "scope")
+
+        assert self.counts(db_session) == {"scope": 2}
+
+    def test_count(self, svc, db_session, factories):
+        document = factories.Document()
+        factories.DocumentURI(
+            document=document,
+            uri="http://example.com",
+            claimant="http://example.com",
+            type="self-claim",
+        )
+        factories.DocumentURI(
+            document=document,
+            uri="http://example.org",
+            claimant="http://example.com",
+            type="rel-alternate",
+        )
+        db_session.add_all(
+            [
+                PublicAnnotationCount(scope="httpx://example.com", count=2),
+                PublicAnnotationCount(scope="httpx://example.org", count=3),
+                PublicAnnotationCount(scope="httpx://example.com__v2", count=7),
+            ]
+        )
+        db_session.flush()
+
+        assert svc.count("http://example.com") == 5
+
+    def test_count_for_an_unannotated_uri(self, svc):
+        assert svc.count("http://example.com") == 0
+
+    def test_count_is_None_for_versioned_uris(self, svc):
+        assert svc.count("http://example.com__v2") is None
+
+    def test_count_is_None_until_the_counts_have_been_reconciled(
+        self, svc, settings_service
+    ):
+        settings_service.delete(RECONCILED_SETTING_KEY)
+
+        assert svc.count("http://example.com") is None
+
+    def test_remove(self, svc, db_session, factories):
+        group = factories.OpenGroup()
+        annotations = [
+            factories.Annotation(
+                groupid=group.pubid, shared=shared, target_uri="http://example.com"
+            )
+            for shared in (True, True, False)
+        ]
+        db_session.add(PublicAnnotationCount(scope="httpx://example.com", count=5))
+        db_session.flush()
+
+        svc.remove([annotation.id for annotation in annotations])
+
+        assert self.counts(db_session) == {"httpx://example.com": 3}
+
+    def test_remove_with_no_annotations(self, svc, db_session):
+        svc.remove([])
+
+        assert not self.counts(db_session)
+
+    def test_reconcile(
+        self, svc, db_session, factories, nipsa_service, settings_service
+    ):
+        group = factories.OpenGroup()
+        private_group = factories.Group()
+        annotation = factories.Annotation(
+            groupid=group.pubid, shared=True, target_uri="http://example.com"
+        )
+        factories.Annotation(
+            groupid=group.pubid,
+            shared=True,
+            target_uri="http://example.com",
+            references=[annotation.id],
+        )
+        factories.Annotation(
+            groupid=group.pubid,
+            shared=True,
+            target_uri="http://example.com",
+            version=2,
+        )
+        # Annotations which aren't counted
+        for kwargs in (
+            {"deleted": True},
+            {"shared": False},
+            {"moderation_status": ModerationStatus.SPAM},
+            {"groupid": private_group.pubid},
+            {"userid": "acct:nipsa@example.com"},
+        ):
+            factories.Annotation(
+                **{
+                    "groupid": group.pubid,
+                    "shared": True,
+                    "target_uri": "http://example.com",
+                    **kwargs,
+                }
+            )
+        nipsa_service.fetch_all_flagged_userids.return_value = {
+            "acct:nipsa@example.com"
+        }
+        db_session.add_all(
+            [
+                PublicAnnotationCount(scope="httpx://example.com", count=7),
+                PublicAnnotationCount(scope="httpx://example.com__v2", count=1),
+                PublicAnnotationCount(scope="httpx://example.org", count=1),
+            ]
+        )
+        db_session.flush()
+
+        result = svc.reconcile()
+
+        assert result == {"Corrected": 1, "Removed": 1}
+        assert settings_service.get(RECONCILED_SETTING_KEY)
+        assert self.counts(db_session) == {
+            "httpx://example.com": 2,
+            "httpx://example.com__v2": 1,
+        }
+
+    def counts(self, db_session):
+        db_session.expire_all()
+        return {
+            count.scope: count.count
+            for count in db_session.query(PublicAnnotationCount)
+        }
+
+    @pytest.fixture
+    def public_annotation(self, factories, db_session):
+        group = factories.OpenGroup()
+        annotation = factories.Annotation(
+            groupid=group.pubid,
+            shared=True,
+            target_uri="http://example.com",
+            moderation_status=ModerationStatus.APPROVED,
+        )
+        db_session.flush()
+        return annotation
+
+    @pytest.fixture
+    def settings_service(self, db_session):
+        settings_service = SettingsService(db_session)
+        settings_service.put(RECONCILED_SETTING_KEY, "2025-01-01T00:00:00+00:00")
+        return settings_service
+
+    @pytest.fixture
+    def svc(self, db_session, nipsa_service, settings_service):
+        return PublicAnnotationCountService(
+            db_session, nipsa_service, settings=settings_service
+        )
+
+
+class TestFactory:
+    def test_it(
+        self,
+        pyramid_request,
+        nipsa_service,
+        settings_service,
+        PublicAnnotationCountService,
+    ):
+        svc = factory(sentinel.context, pyramid_request)
+
+        PublicAnnotationCountService.assert_called_once_with(
+            pyramid_request.db, nipsa_service=nipsa_service, settings=settings_service
+        )
+        assert svc == PublicAnnotationCountService.return_value
+
+    @pytest.fixture
+    def settings_service(self, mock_service):
+        return mock_service(SettingsService, name="settings")
+
+    @pytest.fixture
+    def PublicAnnotationCountService(self, patch):
+        return patch("h.services.public_annotation_count.PublicAnnotationCountService")
@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, call, create_autospec, patch, sentinel
 
 import pytest
+import transaction
 from h_matchers import Any
 
 from h.events import AnnotationEvent
@@ -237,6 +238,175 @@ class TestHandleAnnotationEvent:
             yield delete_annotation_by_id
 
 
+class TestBufferedWrites:
+    @pytest.mark.usefixtures("with_reindex_in_progress")
+    def test_it_sends_writes_together_when_the_transaction_commits(
+        self,
+        search_index,
+        pyramid_request,
+        annotation_read_service,
+        reply_annotation,
+        root_annotation,
+        mock_es_client,
+        es_helpers,
+        AnnotationSearchIndexPresenter,
+    ):
+        annotation_read_service.get_annotation_by_id.side_effect = (
+            reply_annotation,
+            root_annotation,
+        )
+        body = AnnotationSearchIndexPresenter.return_value.asdict.return_value
+
+        with pyramid_request.tm:
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, reply_annotation.id, "create")
+            )
+
+            es_helpers.bulk.assert_not_called()
+
+        mock_es_client.conn.index.assert_not_called()
+        es_helpers.bulk.assert_called_once_with(
+            mock_es_client.conn,
+            [
+                {
+                    "_op_type": "index",
+                    "_index": index,
+                    "_type": mock_es_client.mapping_type,
+                    "_id": annotation.id,
+                    "_source": body,
+                }
+                for annotation in (reply_annotation, root_annotation)
+                for index in (mock_es_client.index, "another_index")
+            ],
+            raise_on_error=False,
+        )
+
+    def test_it_sends_writes_when_the_transaction_aborts(
+        self, search_index, pyramid_request, es_helpers
+    ):
+        pyramid_request.tm.begin()
+        search_index.handle_annotation_event(
+            AnnotationEvent(pyramid_request, sentinel.annotation_id, "delete")
+        )
+
+        pyramid_request.tm.abort()
+
+        es_helpers.bulk.assert_called_once_with(
+            Any(),
+            [Any.dict.containing({"_id": sentinel.annotation_id})],
+            raise_on_error=False,
+        )
+
+    def test_it_starts_a_new_buffer_for_each_transaction(
+        self, search_index, pyramid_request, es_helpers
+    ):
+        for _ in range(2):
+            with pyramid_request.tm:
+                search_index.handle_annotation_event(
+                    AnnotationEvent(pyramid_request, sentinel.annotation_id, "delete")
+                )
+
+        assert es_helpers.bulk.call_count == 2
+
+    def test_it_does_nothing_if_there_are_no_writes(
+        self, search_index, pyramid_request, es_helpers, newrelic
+    ):
+        with pyramid_request.tm:
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, sentinel.annotation_id, "strange")
+            )
+        search_index.flush()
+
+        es_helpers.bulk.assert_not_called()
+        newrelic.agent.record_custom_metrics.assert_not_called()
+
+    def test_it_records_metrics(
+        self, search_index, pyramid_request, es_helpers, newrelic
+    ):
+        es_helpers.bulk.return_value = (0, [{"index": {"_id": "id_1"}}])
+
+        with pyramid_request.tm:
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "id_1", "delete")
+            )
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "id_2", "delete")
+            )
+
+        newrelic.agent.record_custom_metrics.assert_called_once_with(
+            [
+                ("Custom/SearchIndex/BulkWrite/Actions", 2),
+                ("Custom/SearchIndex/BulkWrite/Failed", 1),
+            ]
+        )
+
+    def test_it_queues_failed_writes_for_celery(
+        self, search_index, pyramid_request, es_helpers, tasks, annotation_read_service
+    ):
+        annotation = annotation_read_service.get_annotation_by_id.return_value
+        annotation.deleted = False
+        annotation.is_reply = False
+        es_helpers.bulk.return_value = (
+            1,
+            [{"index": {"_id": "added_id"}}, {"index": {"_id": "deleted_id"}}],
+        )
+
+        with pyramid_request.tm:
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "added_id", "create")
+            )
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "deleted_id", "delete")
+            )
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "ok_id", "delete")
+            )
+
+        tasks.indexer.add_annotation.delay.assert_called_once_with("added_id")
+        tasks.indexer.delete_annotation.delay.assert_called_once_with("deleted_id")
+
+    def test_it_queues_all_writes_for_celery_if_the_request_fails(
+        self, search_index, pyramid_request, es_helpers, tasks, report_exception
+    ):
+        es_helpers.bulk.side_effect = ValueError
+
+        with pyramid_request.tm:
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "id_1", "delete")
+            )
+            search_index.handle_annotation_event(
+                AnnotationEvent(pyramid_request, "id_2", "delete")
+            )
+
+        report_exception.assert_called_once_with(Any.instance_of(ValueError))
+        assert (
+            tasks.indexer.delete_annotation.delay.call_args_list
+            == Any.list.containing([call("id_1"), call("id_2")]).only()
+        )
+
+    @pytest.fixture
+    def root_annotation(self, factories):
+        return factories.Annotation.build(references=[])
+
+    @pytest.fixture
+    def reply_annotation(self, factories, root_annotation):
+        return factories.Annotation.build(references=[root_annotation.id])
+
+    @pytest.fixture(autouse=True)
+    def AnnotationSearchIndexPresenter(self, patch):
+        return patch("h.services.search_index.AnnotationSearchIndexPresenter")
+
+    @pytest.fixture(autouse=True)
+    def es_helpers(self, patch):
+        es_helpers = patch("h.services.search_index.es_helpers")
+        es_helpers.bulk.return_value = (0, [])
+        return es_helpers
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.services.search_index.newrelic")
+
+
 class TestFactory:
     def test_it(
         self, pyramid_request, SearchIndexService, settings, annotation_read_service
@@ -298,6 +468,12 @@ def search_index(
     )
 
 
+@pytest.fixture
+def pyramid_request(pyramid_request):
+    pyramid_request.tm = transaction.TransactionManager()
+    return pyramid_request
+
+
 @pytest.fixture(autouse=True)
 def tasks(patch):
     return patch("h.services.search_index.tasks")
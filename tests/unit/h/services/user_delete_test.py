@@ -107,6 +107,7 @@ class TestUserDeleteService:
         UserPurger,
         purger,
         caplog,
+        public_annotation_count_service,
     ):
         users = factories.User.create_batch(3)
         user_service.fetch.side_effect = users
@@ -120,7 +121,9 @@ class TestUserDeleteService:
 
         queue_service.get.assert_called_once_with("purge_user", 1000)
         LimitedWorker.assert_called_once_with(db_session, 1000)
-        UserPurger.assert_called_once_with(db_session, queue_service, limited_worker)
+        UserPurger.assert_called_once_with(
+            db_session, queue_service, limited_worker, public_annotation_count_service
+        )
         assert user_service.fetch.call_args_list == [
             call(user.userid) for user in users
         ]
@@ -302,7 +305,15 @@ class TestUserPurger:
         )
 
     def test_delete_annotations(
-        self, worker, purger, user, factories, queue_service, log_updated_rows, matchers
+        self,
+        worker,
+        purger,
+        user,
+        factories,
+        queue_service,
+        log_updated_rows,
+        matchers,
+        public_annotation_count_service,
     ):
         annotations = factories.Annotation.create_batch(2, userid=user.userid)
         annotation_slims = [
@@ -327,6 +338,9 @@ class TestUserPurger:
             "marked annotations as deleted",
             sorted([annotation.id for annotation in annotations]),
         )
+        public_annotation_count_service.remove.assert_called_once_with(
+            sorted([annotation.id for annotation in annotations])
+        )
         for annotation_slim in annotation_slims:
             assert annotation_slim.deleted is True
         assert other_users_annotation.deleted is False
@@ -533,12 +547,20 @@ class TestUserPurger:
         ],
     )
     def test_it_when_limit_exceeded(
-        self, db_session, queue_service, mocker, factories, method
+        self,
+        db_session,
+        queue_service,
+        mocker,
+        factories,
+        method,
+        public_annotation_count_service,
     ):
         worker = mocker.create_autospec(LimitedWorker, spec_set=True, instance=True)
         worker.delete.side_effect = LimitReached
         worker.update.side_effect = LimitReached
-        purger = UserPurger(db_session, queue_service, worker)
+        purger = UserPurger(
+            db_session, queue_service, worker, public_annotation_count_service
+        )
 
         with pytest.raises(LimitReached):
             getattr(purger, method)(factories.User())
@@ -551,8 +573,12 @@ class TestUserPurger:
         return worker
 
     @pytest.fixture
-    def purger(self, db_session, queue_service, worker):
-        return UserPurger(db_session, queue_service, worker)
+    def purger(
+        self, db_session, queue_service, worker, public_annotation_count_service
+    ):
+        return UserPurger(
+            db_session, queue_service, worker, public_annotation_count_service
+        )
 
     @pytest.fixture
     def user(self, factories, db_session):
@@ -707,13 +733,21 @@ class TestLimitedWorker:
 
 
 class TestServiceFactory:
-    def test_it(self, pyramid_request, UserDeleteService, queue_service, user_service):
+    def test_it(
+        self,
+        pyramid_request,
+        UserDeleteService,
+        queue_service,
+        user_service,
+        public_annotation_count_service,
+    ):
         svc = service_factory(sentinel.context, pyramid_request)
 
         UserDeleteService.assert_called_once_with(
             pyramid_request.db,
             job_queue=queue_service,
             user_svc=user_service,
+            public_annotation_count=public_annotation_count_service,
         )
         assert svc == UserDeleteService.return_value
 
@@ -723,11 +757,12 @@ class TestServiceFactory:
 
 
 @pytest.fixture
-def svc(db_session, queue_service, user_service):
+def svc(db_session, queue_service, user_service, public_annotation_count_service):
     return UserDeleteService(
         db_session,
         job_queue=queue_service,
         user_svc=user_service,
+        public_annotation_count=public_annotation_count_service,
     )
 
 
@@ -1,6 +1,9 @@
+from unittest.mock import Mock
+
 import pytest
 
 from h import storage
+from h.exceptions import RealtimeMessageQueueError
 from h.models.document import Document, DocumentURI
 
 
@@ -75,3 +78,179 @@ class TestExpandURI:
         )
 
         assert sorted(uris) == sorted(expected_uris)
+
+
+@pytest.mark.usefixtures("search_index")
+class TestExpandURIs:
+    @pytest.mark.parametrize("normalized", (True, False))
+    def test_it_matches_expand_uri(self, db_session, normalized):
+        db_session.add_all(
+            [
+                Document(
+                    document_uris=[
+                        DocumentURI(
+                            uri="http://example.com/", claimant="http://example.com"
+                        ),
+                        DocumentURI(
+                            uri="http://alt.example.com/",
+                            claimant="http://example.com",
+                        ),
+                    ]
+                ),
+                Document(
+                    document_uris=[
+                        DocumentURI(
+                            uri="http://canonical.example.com/",
+                            type="rel-canonical",
+                            claimant="http://canonical.example.com",
+                        ),
+                        DocumentURI(
+                            uri="http://noise.example.com/",
+                            claimant="http://canonical.example.com",
+                        ),
+                    ]
+                ),
+            ]
+        )
+        db_session.flush()
+        uris = [
+            "http://example.com/",
+            "http://alt.example.com/",
+            "http://canonical.example.com/",
+            "http://no-document.example.com/",
+        ]
+
+        expanded = storage.expand_uris(db_session, uris, normalized=normalized)
+
+        assert {uri: sorted(values) for uri, values in expanded.items()} == {
+            uri: sorted(storage.expand_uri(db_session, uri, normalized=normalized))
+            for uri in uris
+        }
+
+    def test_it_with_no_uris(self, db_session):
+        assert storage.expand_uris(db_session, []) == {}
+
+    @pytest.mark.parametrize("normalized", (True, False))
+    def test_it_caches_expansions(self, db_session, normalized):
+        document = Document(
+            document_uris=[
+                DocumentURI(uri="http://example.com/", claimant="http://example.com")
+            ]
+        )
+        db_session.add(document)
+        db_session.flush()
+        uris = ["http://example.com/", "http://no-document.example.com/"]
+        expected = storage.expand_uris(
+            db_session, uris, normalized=normalized, cached=True
+        )
+
+        document.document_uris.append(
+            DocumentURI(uri="http://alt.example.com/", claimant="http://example.com")
+        )
+        db_session.flush()
+
+        assert (
+            storage.expand_uris(db_session, uris, normalized=normalized, cached=True)
+            == expected
+        )
+        assert storage.EXPANDED_URI_CACHE.hits == 2
+
+    def test_it_doesnt_use_the_cache_by_default(self, db_session):
+        storage.expand_uris(db_session, ["http://example.com/"], cached=True)
+        db_session.add(
+            Document(
+                document_uris=[
+                    DocumentURI(
+                        uri="http://example.com/", claimant="http://example.com"
+                    ),
+                    DocumentURI(
+                        uri="http://alt.example.com/", claimant="http://example.com"
+                    ),
+                ]
+            )
+        )
+        db_session.flush()
+
+        expanded = storage.expand_uris(db_session, ["http://example.com/"])
+
+        assert sorted(expanded["http://example.com/"]) == [
+            "http://alt.example.com/",
+            "http://example.com/",
+        ]
+
+    def test_expand_uri_can_use_the_cache(self, db_session):
+        storage.expand_uris(db_session, ["http://example.com/"], cached=True)
+
+        assert storage.expand_uri(db_session, "http://example.com/", cached=True) == [
+            "http://example.com/"
+        ]
+        assert storage.EXPANDED_URI_CACHE.hits == 1
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        storage.EXPANDED_URI_CACHE.clear()
+        storage.EXPANDED_URI_CACHE.reset_counts()
+
+
+class TestPublishExpandedURIsChange:
+    def test_it_publishes_changes_after_commit(self, pyramid_request, after_commit):
+        storage.EXPANDED_URI_CACHE.set("httpx://example.com", [])
+        storage.EXPANDED_URI_CACHE.set("httpx://other.example.com", [])
+
+        storage.publish_expanded_uris_change(
+            pyramid_request, {"httpx://example.com", "httpx://alt.example.com"}
+        )
+        pyramid_request.realtime.publish_user.assert_not_called()
+
+        after_commit(success=True)
+
+        assert storage.EXPANDED_URI_CACHE.get("httpx://example.com") is None
+        assert storage.EXPANDED_URI_CACHE.get("httpx://other.example.com") == []
+        pyramid_request.realtime.publish_user.assert_called_once_with(
+            {
+                "type": storage.EXPANDED_URIS_CHANGE_EVENT,
+                "uris": ["httpx://alt.example.com", "httpx://example.com"],
+            }
+        )
+
+    def test_it_doesnt_publish_changes_which_arent_committed(
+        self, pyramid_request, after_commit
+    ):
+        storage.EXPANDED_URI_CACHE.set("httpx://example.com", [])
+
+        storage.publish_expanded_uris_change(pyramid_request, {"httpx://example.com"})
+        after_commit(success=False)
+
+        assert storage.EXPANDED_URI_CACHE.get("httpx://example.com") == []
+        pyramid_request.realtime.publish_user.assert_not_called()
+
+    def test_it_logs_changes_it_cant_publish(
+        self, pyramid_request, after_commit, caplog
+    ):
+        pyramid_request.realtime.publish_user.side_effect = RealtimeMessageQueueError
+
+        storage.publish_expanded_uris_change(pyramid_request, {"httpx://example.com"})
+        after_commit(success=True)
+
+        assert "Failed to publish the expanded URIs change" in caplog.text
+
+    @pytest.fixture
+    def after_commit(self, pyramid_request):
+        def after_commit(success):
+            transaction = pyramid_request.tm.get.return_value
+            hook = transaction.addAfterCommitHook.call_args.args[0]
+            hook(success)
+
+        return after_commit
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request):
+        pyramid_request.realtime = Mock(spec_set=["publish_user"])
+        pyramid_request.tm = Mock(spec_set=["get"])
+        return pyramid_request
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        storage.EXPANDED_URI_CACHE.clear()
+        yield
+        storage.EXPANDED_URI_CACHE.clear()
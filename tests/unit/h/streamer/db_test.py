@@ -3,7 +3,11 @@ from unittest.mock import sentinel
 
 import pytest
 
-from h.streamer.db import get_session, read_only_transaction
+from h.streamer.db import (
+    get_session,
+    read_only_transaction,
+    restart_read_only_transaction,
+)
 from h.streamer.streamer import UnknownMessageType
 
 
@@ -51,6 +55,17 @@ class TestReadOnlyTransaction:
 
         self._assert_rollback_and_close(session)
 
+    def test_restart_read_only_transaction(self, session, text):
+        restart_read_only_transaction(session)
+
+        text.assert_called_once_with(
+            "SET TRANSACTION ISOLATION LEVEL SERIALIZABLE READ ONLY DEFERRABLE"
+        )
+        assert session.method_calls == [
+            mock.call.rollback(),
+            mock.call.execute(text.return_value),
+        ]
+
     def _assert_rollback_and_close(self, session):
         session.commit.assert_not_called()
         assert session.method_calls[-2:] == [mock.call.rollback(), mock.call.close()]
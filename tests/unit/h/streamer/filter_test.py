@@ -80,7 +80,7 @@ class TestFilterHandler:
 
         assert result  # It matches!
         storage.expand_uri.assert_called_once_with(
-            db_session, annotation.target_uri, normalized=True
+            db_session, annotation.target_uri, normalized=True, cached=True
         )
 
     def test_it_matches_id(self, factories, filter_matches, annotation):
@@ -374,23 +374,150 @@ class TestFilterHandler:
         )
         assert not filter_matches(filter_, ann)
 
+    def test_indexed_matching_only_returns_matching_sockets(
+        self, factories, db_session
+    ):
+        annotation = factories.Annotation(groupid="group_1")
+        sockets = [FakeSocket() for _ in range(3)]
+        for socket, groupid in zip(
+            sockets, ["group_1", "group_2", "group_1"], strict=True
+        ):
+            SocketFilter.set_filter(socket, self.group_filter(groupid))
+
+        result = list(SocketFilter.indexed_matching(annotation, db_session))
+
+        assert result == Any.list.containing([sockets[0], sockets[2]]).only()
+
+    def test_indexed_matching_returns_each_socket_once(self, factories, db_session):
+        parent = factories.Annotation()
+        annotation = factories.Annotation(references=[parent.id])
+        socket = FakeSocket()
+        SocketFilter.set_filter(
+            socket,
+            {
+                "match_policy": "include_any",
+                "actions": {},
+                "clauses": [
+                    {"field": "/id", "operator": "equals", "value": annotation.id},
+                    {"field": "/references", "operator": "one_of", "value": parent.id},
+                ],
+            },
+        )
+
+        result = list(SocketFilter.indexed_matching(annotation, db_session))
+
+        assert result == [socket]
+
+    def test_indexed_matching_uses_expanded_uris(self, factories, db_session, storage):
+        annotation = factories.Annotation(target_uri="http://example.com")
+        socket = FakeSocket()
+        SocketFilter.set_filter(
+            socket,
+            {
+                "match_policy": "include_any",
+                "actions": {},
+                "clauses": [
+                    {"field": "/uri", "operator": "one_of", "value": "urn:x-pdf:1234"}
+                ],
+            },
+        )
+
+        result = list(
+            SocketFilter.indexed_matching(
+                annotation,
+                db_session,
+                expanded_uris={annotation.target_uri: ["urn:x-pdf:1234"]},
+            )
+        )
+
+        assert result == [socket]
+        storage.expand_uri.assert_not_called()
+
+    def test_set_filter_replaces_previous_index_entries(self, factories, db_session):
+        annotation = factories.Annotation(groupid="group_1")
+        socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.group_filter("group_1"))
+
+        SocketFilter.set_filter(socket, self.group_filter("group_2"))
+
+        assert not list(SocketFilter.indexed_matching(annotation, db_session))
+        assert ("/group", "group_1") not in SocketFilter._index  # noqa: SLF001
+
+    def test_set_filter_ignores_unhashable_values(self, factories, db_session):
+        socket = FakeSocket()
+
+        SocketFilter.set_filter(
+            socket,
+            {
+                "match_policy": "include_any",
+                "actions": {},
+                "clauses": [{"field": "/id", "operator": "equals", "value": {}}],
+            },
+        )
+        SocketFilter.remove_filter(socket)
+
+        assert not list(
+            SocketFilter.indexed_matching(factories.Annotation(), db_session)
+        )
+
+    def test_remove_filter(self, factories, db_session):
+        annotation = factories.Annotation(groupid="group_1")
+        socket = FakeSocket()
+        other_socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.group_filter("group_1"))
+        SocketFilter.set_filter(other_socket, self.group_filter("group_1"))
+
+        SocketFilter.remove_filter(socket)
+
+        assert list(SocketFilter.indexed_matching(annotation, db_session)) == [
+            other_socket
+        ]
+
+    def test_remove_filter_removes_empty_index_entries(self):
+        socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.group_filter("group_1"))
+
+        SocketFilter.remove_filter(socket)
+        # A second removal (however unusual) should not raise
+        SocketFilter.remove_filter(socket)
+
+        assert not SocketFilter._index  # noqa: SLF001
+
+    def test_remove_filter_with_no_filter(self):
+        SocketFilter.remove_filter(FakeSocket())
+
     @pytest.mark.skip(reason="For dev purposes only")
-    def test_speed(self, factories, db_session):  # pragma: no cover
-        # I think the max number connected at once is 4096
-        sockets = [FakeSocket() for _ in range(4096)]
+    @pytest.mark.parametrize("socket_count", (1_000, 10_000, 50_000))
+    @pytest.mark.parametrize("method", ("matching", "indexed_matching"))
+    def test_speed(
+        self, factories, db_session, socket_count, method
+    ):  # pragma: no cover
+        sockets = [FakeSocket() for _ in range(socket_count)]
 
         for socket in sockets:
             SocketFilter.set_filter(socket, self.get_randomized_filter())
 
         ann = factories.Annotation(target_uri="https://example.org")
 
+        if method == "matching":
+            match = lambda: SocketFilter.matching(sockets, ann, db_session)  # noqa: E731
+        else:
+            match = lambda: SocketFilter.indexed_matching(ann, db_session)  # noqa: E731
+
         start = datetime.utcnow()  # noqa: DTZ003
         # This returns a generator, we need to force it to produce answers
-        tuple(SocketFilter.matching(sockets, ann, db_session))
+        tuple(match())
 
         diff = datetime.utcnow() - start  # noqa: DTZ003
         ms = diff.seconds * 1000 + diff.microseconds / 1000
-        print(ms, "ms")  # noqa: T201
+        print(f"{method} x {socket_count}: {ms} ms")  # noqa: T201
+
+    def group_filter(self, groupid):
+        return {
+            "match_policy": "include_any",
+            "actions": {},
+            "clauses": [{"field": "/group", "operator": "equals", "value": [groupid]}],
+        }
 
     def get_randomized_filter(self):  # pragma: no cover
         return {
@@ -429,6 +556,12 @@ class TestFilterHandler:
             ],
         }
 
+    @pytest.fixture(autouse=True)
+    def with_empty_index(self):
+        # The index is populated as filters are set and can couple different
+        # tests together
+        SocketFilter._index.clear()  # noqa: SLF001
+
     @pytest.fixture
     def storage(self, patch):
         return patch("h.streamer.filter.storage")
@@ -437,12 +570,17 @@ class TestFilterHandler:
     def annotation(self, factories):
         return factories.Annotation()
 
-    @pytest.fixture
-    def filter_matches(self, db_session):
+    @pytest.fixture(params=["matching", "indexed_matching"])
+    def filter_matches(self, request, db_session):
         def filter_matches(filter_, annotation):
             socket = FakeSocket()
             SocketFilter.set_filter(socket, filter_)
 
-            return bool(tuple(SocketFilter.matching([socket], annotation, db_session)))
+            if request.param == "matching":
+                matches = SocketFilter.matching([socket], annotation, db_session)
+            else:
+                matches = SocketFilter.indexed_matching(annotation, db_session)
+
+            return socket in tuple(matches)
 
         return filter_matches
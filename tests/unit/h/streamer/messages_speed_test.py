@@ -19,9 +19,12 @@ class TestHandleAnnotationEventSpeed:  # pragma: no cover
 
     @pytest.mark.parametrize("reps", (1, 16, 256, 4096))
     @pytest.mark.parametrize("action", ("create", "delete"))
-    def test_speed(self, db_session, pyramid_request, socket, message, action, reps):
+    def test_speed(
+        self, db_session, pyramid_request, socket, message, action, reps, SocketFilter
+    ):
         sockets = list(socket for _ in range(reps))  # noqa: C400
         message["action"] = action
+        SocketFilter.indexed_matching.return_value = iter(sockets)
 
         start = datetime.utcnow()
         handle_annotation_event(
@@ -72,9 +75,7 @@ class TestHandleAnnotationEventSpeed:  # pragma: no cover
     def SocketFilter(self, patch):
         # We aren't interested in the speed of the socket filter, as that has
         # it's own speed tests
-        SocketFilter = patch("h.streamer.messages.SocketFilter")
-        SocketFilter.matching.side_effect = lambda sockets, annotation: iter(sockets)  # noqa: ARG005
-        return SocketFilter
+        return patch("h.streamer.messages.SocketFilter")
 
     @pytest.fixture
     def socket(self):
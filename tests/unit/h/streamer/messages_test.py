@@ -1,14 +1,21 @@
+from collections import Counter
+from copy import deepcopy
 from unittest import mock
-from unittest.mock import ANY, Mock, sentinel
+from unittest.mock import ANY, Mock, create_autospec, sentinel
 
 import pytest
 from gevent.queue import Queue
 from h_matchers import Any
 from pyramid.request import Request
 
-from h.security import Permission
+from h import storage
+from h.db.types import InvalidUUID
+from h.models.document import update_document_metadata
+from h.security import Identity, Permission
 from h.services.checkpoint import CheckpointService
+from h.services.nipsa import NIPSA_CHANGE_EVENT
 from h.streamer import messages
+from h.streamer.websocket import WebSocket
 
 
 class TestProcessMessages:
@@ -103,6 +110,126 @@ class TestHandleMessage:
         return patch("h.streamer.websocket.WebSocket")
 
 
+@pytest.mark.usefixtures("annotation_read_service", "nipsa_service")
+class TestHandleAnnotationEvents:
+    def test_it(
+        self,
+        registry,
+        websocket,
+        annotation_read_service,
+        nipsa_service,
+        storage,
+        handle_annotation_event,
+        annotation_messages,
+        matchers,
+    ):
+        websocket.instances = [sentinel.socket_1, sentinel.socket_2]
+        annotation_read_service.get_annotations_by_id.return_value = [
+            Mock(target_uri="http://example.com/1"),
+            Mock(target_uri="http://example.com/2"),
+        ]
+
+        messages.handle_annotation_events(
+            annotation_messages, registry, sentinel.db_session
+        )
+
+        annotation_read_service.get_annotations_by_id.assert_called_once_with(
+            ["id_1", "id_2"]
+        )
+        nipsa_service.fetch_all_flagged_userids.assert_called_once_with()
+        storage.expand_uris.assert_called_once_with(
+            sentinel.db_session,
+            {"http://example.com/1", "http://example.com/2"},
+            normalized=True,
+            cached=True,
+        )
+        assert handle_annotation_event.call_args_list == [
+            mock.call(
+                message.payload,
+                websocket.instances,
+                matchers.InstanceOf(Request, registry=registry),
+                sentinel.db_session,
+                expanded_uris=storage.expand_uris.return_value,
+            )
+            for message in annotation_messages
+        ]
+
+    def test_it_does_not_prefetch_when_there_are_no_annotations(
+        self,
+        registry,
+        annotation_read_service,
+        nipsa_service,
+        handle_annotation_event,
+        annotation_messages,
+    ):
+        annotation_read_service.get_annotations_by_id.return_value = []
+
+        messages.handle_annotation_events(
+            annotation_messages, registry, sentinel.db_session
+        )
+
+        nipsa_service.fetch_all_flagged_userids.assert_not_called()
+        assert handle_annotation_event.call_count == 2
+
+    def test_it_falls_back_to_single_loads_for_invalid_ids(
+        self,
+        registry,
+        annotation_read_service,
+        storage,
+        handle_annotation_event,
+        annotation_messages,
+    ):
+        annotation_read_service.get_annotations_by_id.side_effect = InvalidUUID
+
+        messages.handle_annotation_events(
+            annotation_messages, registry, sentinel.db_session
+        )
+
+        storage.expand_uris.assert_called_once_with(
+            sentinel.db_session, set(), normalized=True, cached=True
+        )
+        assert handle_annotation_event.call_count == 2
+
+    def test_it_carries_on_after_an_event_fails(
+        self, registry, handle_annotation_event, annotation_messages, db
+    ):
+        handle_annotation_event.side_effect = [ValueError, None]
+
+        messages.handle_annotation_events(
+            annotation_messages, registry, sentinel.db_session
+        )
+
+        db.restart_read_only_transaction.assert_called_once_with(sentinel.db_session)
+        assert handle_annotation_event.call_count == 2
+
+    @pytest.fixture
+    def annotation_messages(self):
+        return [
+            messages.Message(topic="annotation", payload={"annotation_id": id_})
+            for id_ in ("id_1", "id_2")
+        ]
+
+    @pytest.fixture
+    def registry(self, pyramid_request):
+        return pyramid_request.registry
+
+    @pytest.fixture
+    def websocket(self, patch):
+        return patch("h.streamer.websocket.WebSocket")
+
+    @pytest.fixture(autouse=True)
+    def storage(self, patch):
+        return patch("h.streamer.messages.storage")
+
+    @pytest.fixture(autouse=True)
+    def handle_annotation_event(self, patch):
+        return patch("h.streamer.messages.handle_annotation_event")
+
+    @pytest.fixture(autouse=True)
+    def db(self, patch):
+        return patch("h.streamer.messages.db")
+
+
 @pytest.mark.usefixtures(
     "annotation_json_service",
     "annotation_read_service",
@@ -129,8 +256,8 @@ class TestHandleAnnotationEvent:
         )
         annotation = annotation_read_service.get_annotation_by_id.return_value
 
-        SocketFilter.matching.assert_called_once_with(
-            [socket], annotation, sentinel.session
+        SocketFilter.indexed_matching.assert_called_once_with(
+            annotation, sentinel.session, expanded_uris=None
         )
 
         user_service.fetch.assert_called_once_with(socket.identity.user.userid)
@@ -160,12 +287,14 @@ class TestHandleAnnotationEvent:
         else:
             expected_payload = annotation_json_service.present.return_value
 
-        socket.send_json.assert_called_once_with(
+        socket.send_frame.assert_called_once_with(
             {
                 "payload": [expected_payload],
                 "type": "annotation-notification",
                 "options": {"action": action},
-            }
+            },
+            coalesce_key=message["annotation_id"],
+            droppable=True,
         )
 
     def test_no_send_for_sender_socket(self, handle_annotation_event, socket, message):
@@ -173,16 +302,12 @@ class TestHandleAnnotationEvent:
 
         handle_annotation_event(message=message, sockets=[socket])
 
-        socket.send_json.assert_not_called()
+        socket.send_frame.assert_not_called()
 
-    def test_no_send_if_filter_does_not_match(
-        self, handle_annotation_event, socket, SocketFilter
-    ):
-        SocketFilter.matching.side_effect = None
-        SocketFilter.matching.return_value = iter(())
-        handle_annotation_event(sockets=[socket])
+    def test_no_send_if_filter_does_not_match(self, handle_annotation_event, socket):
+        handle_annotation_event(sockets=[])
 
-        socket.send_json.assert_not_called()
+        socket.send_frame.assert_not_called()
 
     @pytest.mark.parametrize("user_is_nipsaed", (True, False))
     def test_nipsaed_content_visibility(
@@ -201,7 +326,7 @@ class TestHandleAnnotationEvent:
         )
         handle_annotation_event(sockets=[socket])
 
-        assert bool(socket.send_json.call_count) == user_is_nipsaed
+        assert bool(socket.send_frame.call_count) == user_is_nipsaed
 
     @pytest.mark.parametrize("can_see", (True, False))
     def test_visibility_is_based_on_identity(
@@ -226,7 +351,7 @@ class TestHandleAnnotationEvent:
             Permission.Annotation.READ_REALTIME_UPDATES,
         )
 
-        assert bool(socket.send_json.call_count) == can_see
+        assert bool(socket.send_frame.call_count) == can_see
 
     def test_it_does_not_send_annotations_hidden_by_a_checkpoint(
         self, handle_annotation_event, socket, checkpoint_service
@@ -235,7 +360,7 @@ class TestHandleAnnotationEvent:
 
         handle_annotation_event(sockets=[socket])
 
-        socket.send_json.assert_not_called()
+        socket.send_frame.assert_not_called()
 
     def test_it_sends_annotations_not_hidden_by_a_checkpoint(
         self, handle_annotation_event, socket, checkpoint_service
@@ -244,7 +369,111 @@ class TestHandleAnnotationEvent:
 
         handle_annotation_event(sockets=[socket])
 
-        socket.send_json.assert_called_once()
+        socket.send_frame.assert_called_once()
+
+    def test_it_builds_one_reply_per_user(
+        self,
+        handle_annotation_event,
+        socket,
+        other_socket,
+        annotation_json_service,
+        checkpoint_service,
+    ):
+        other_socket.identity = socket.identity
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        annotation_json_service.present.assert_called_once()
+        checkpoint_service.hides_annotation.assert_called_once()
+        socket.send_frame.assert_called_once()
+        other_socket.send_frame.assert_called_once_with(
+            socket.send_frame.call_args.args[0],
+            coalesce_key=Any(),
+            droppable=True,
+        )
+
+    def test_it_builds_one_reply_for_all_anonymous_sockets(
+        self, handle_annotation_event, socket, other_socket, annotation_json_service
+    ):
+        socket.identity = None
+        other_socket.identity = None
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        annotation_json_service.present.assert_called_once_with(ANY, user=None)
+        socket.send_frame.assert_called_once()
+        other_socket.send_frame.assert_called_once()
+
+    def test_it_builds_a_reply_for_each_user(
+        self,
+        handle_annotation_event,
+        socket,
+        other_socket,
+        annotation_json_service,
+        user_service,
+    ):
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        assert user_service.fetch.call_args_list == [
+            mock.call(socket.identity.user.userid),
+            mock.call(other_socket.identity.user.userid),
+        ]
+        assert annotation_json_service.present.call_count == 2
+
+    def test_it_builds_one_reply_for_all_users_for_deletes(
+        self, handle_annotation_event, message, socket, other_socket, user_service
+    ):
+        message["action"] = "delete"
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        user_service.fetch.assert_not_called()
+        socket.send_frame.assert_called_once_with(
+            other_socket.send_frame.call_args.args[0]
+        )
+
+    def test_it_counts_payloads_built_and_sockets_served(
+        self, handle_annotation_event, socket, other_socket, COUNTERS
+    ):
+        other_socket.identity = socket.identity
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        assert COUNTERS == {
+            "AnnotationEvent/PayloadsBuilt": 1,
+            "AnnotationEvent/SocketsServed": 2,
+            "AnnotationEvent/PermissionChecks": 1,
+            "AnnotationEvent/PermissionCacheHits": 1,
+        }
+
+    def test_it_checks_permission_once_for_sockets_with_the_same_identity(
+        self, handle_annotation_event, socket, other_socket, identity_permits
+    ):
+        socket.identity = other_socket.identity = None
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        identity_permits.assert_called_once()
+        assert other_socket.send_frame.call_count == 1
+
+    def test_it_checks_permission_once_for_sockets_of_the_same_user(
+        self, handle_annotation_event, socket, other_socket, identity_permits
+    ):
+        other_socket.identity = deepcopy(socket.identity)
+
+        handle_annotation_event(sockets=[socket, other_socket])
+
+        identity_permits.assert_called_once()
+
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_uses_the_fast_json_setting(
+        self, handle_annotation_event, pyramid_request, prepare_frame, fast_json
+    ):
+        pyramid_request.registry.settings["h.streamer.fast_json"] = fast_json
+
+        handle_annotation_event()
+
+        prepare_frame.assert_called_once_with(Any(), fast_json=fast_json)
 
     def test_with_no_identity(
         self, handle_annotation_event, socket, user_service, annotation_json_service
@@ -267,13 +496,18 @@ class TestHandleAnnotationEvent:
         annotation_json_service.present.assert_called_once_with(ANY, user=None)
 
     @pytest.fixture
-    def handle_annotation_event(self, message, socket, pyramid_request, session):
+    def handle_annotation_event(
+        self, message, socket, pyramid_request, session, SocketFilter
+    ):
         def handle_annotation_event(
             message=message, sockets=None, request=pyramid_request, session=session
         ):
             if sockets is None:
                 sockets = [socket]
 
+            # Pretend every socket we are given matches the annotation
+            SocketFilter.indexed_matching.return_value = iter(sockets)
+
             return messages.handle_annotation_event(message, sockets, request, session)
 
         return handle_annotation_event
@@ -291,6 +525,16 @@ class TestHandleAnnotationEvent:
     def session(self):
         return sentinel.db_session
 
+    @pytest.fixture
+    def other_socket(self, factories):
+        socket = create_autospec(WebSocket, instance=True)
+        socket.identity = Identity.from_models(user=factories.User())
+        return socket
+
+    @pytest.fixture(autouse=True)
+    def COUNTERS(self, mocker):
+        return mocker.patch("h.streamer.messages.COUNTERS", Counter())
+
     @pytest.fixture
     def message(self, annotation_read_service):
         return {
@@ -307,7 +551,7 @@ class TestHandleAnnotationEvent:
 
     @pytest.fixture(autouse=True)
     def identity_permits(self, patch):
-        identity_permits = patch("h.streamer.messages.identity_permits")
+        identity_permits = patch("h.security.permits.identity_permits")
         identity_permits.return_value = True
         return identity_permits
 
@@ -319,38 +563,113 @@ class TestHandleAnnotationEvent:
 
     @pytest.fixture(autouse=True)
     def SocketFilter(self, patch):
-        SocketFilter = patch("h.streamer.messages.SocketFilter")
-        SocketFilter.matching.side_effect = (
-            lambda sockets, annotation, db_session: iter(sockets)  # noqa: ARG005
-        )
-        return SocketFilter
+        return patch("h.streamer.messages.SocketFilter")
+
+    @pytest.fixture(autouse=True)
+    def prepare_frame(self, patch):
+        prepare_frame = patch("h.streamer.websocket.prepare_frame")
+        # Send the payload as is, so we can see what would have been encoded
+        prepare_frame.side_effect = lambda payload, fast_json: payload  # noqa: ARG005
+        return prepare_frame
 
 
 class TestHandleUserEvent:
-    def test_sends_session_change_when_joining_or_leaving_group(self, socket, message):
+    def test_sends_session_change_when_joining_or_leaving_group(
+        self, socket, message, pyramid_request, prepare_frame
+    ):
         message["userid"] = socket.identity.user.userid
 
-        messages.handle_user_event(message, [socket, socket], None, None)
-
-        reply = {
-            "type": "session-change",
-            "action": "group-join",
-            "model": message["session_model"],
-        }
+        messages.handle_user_event(message, [socket, socket], pyramid_request, None)
 
-        assert socket.send_json.call_args_list == [
-            mock.call(reply),
-            mock.call(reply),
+        prepare_frame.assert_called_once_with(
+            {
+                "type": "session-change",
+                "action": "group-join",
+                "model": message["session_model"],
+            },
+            fast_json=False,
+        )
+        assert socket.send_frame.call_args_list == [
+            mock.call(prepare_frame.return_value),
+            mock.call(prepare_frame.return_value),
         ]
 
-    def test_no_send_when_socket_is_not_event_users(self, socket, message):
+    @pytest.mark.parametrize("fast_json", (True, False))
+    def test_it_uses_the_fast_json_setting(
+        self, socket, message, pyramid_request, prepare_frame, fast_json
+    ):
+        message["userid"] = socket.identity.user.userid
+        pyramid_request.registry.settings["h.streamer.fast_json"] = fast_json
+
+        messages.handle_user_event(message, [socket], pyramid_request, None)
+
+        prepare_frame.assert_called_once_with(Any(), fast_json=fast_json)
+
+    def test_no_send_when_socket_is_not_event_users(
+        self, socket, message, pyramid_request
+    ):
         """Don't send session-change events if the event user is not the socket user."""
         message["userid"] = "amy"
         socket.identity.user.username = "bob"
 
-        messages.handle_user_event(message, [socket], None, None)
+        messages.handle_user_event(message, [socket], pyramid_request, None)
 
-        socket.send_json.assert_not_called()
+        socket.send_frame.assert_not_called()
+
+    def test_nipsa_changes_expire_the_flagged_userids_cache(
+        self, socket, pyramid_request, flagged_userids_cache
+    ):
+        message = {"type": NIPSA_CHANGE_EVENT, "userid": socket.identity.user.userid}
+
+        messages.handle_user_event(message, [socket], pyramid_request, None)
+
+        flagged_userids_cache.assert_called_once_with(pyramid_request.registry)
+        flagged_userids_cache.return_value.expire.assert_called_once_with()
+        socket.send_frame.assert_not_called()
+
+    def test_expanded_uris_changes_are_seen_straight_away(
+        self, socket, pyramid_request, db_session, factories
+    ):
+        factories.Document(
+            document_uris=[factories.DocumentURI(uri="http://example.com/")]
+        )
+        db_session.flush()
+        storage.expand_uris(db_session, ["http://example.com/"], cached=True)
+        changed_uris = set()
+        update_document_metadata(
+            db_session,
+            "http://example.com/",
+            [],
+            [
+                {
+                    "claimant": "http://example.com/",
+                    "uri": "http://alt.example.com/",
+                    "type": "rel-canonical",
+                    "content_type": "",
+                }
+            ],
+            on_uris_change=changed_uris.update,
+        )
+        message = {
+            "type": storage.EXPANDED_URIS_CHANGE_EVENT,
+            "uris": sorted(changed_uris),
+        }
+
+        messages.handle_user_event(message, [socket], pyramid_request, db_session)
+
+        expanded = storage.expand_uris(db_session, ["http://example.com/"], cached=True)
+        assert "http://alt.example.com/" in expanded["http://example.com/"]
+        socket.send_frame.assert_not_called()
+
+    @pytest.fixture
+    def flagged_userids_cache(self, patch):
+        return patch("h.streamer.messages.flagged_userids_cache")
+
+    @pytest.fixture(autouse=True)
+    def clear_expanded_uri_cache(self):
+        storage.EXPANDED_URI_CACHE.clear()
+        yield
+        storage.EXPANDED_URI_CACHE.clear()
 
     @pytest.fixture
     def message(self):
@@ -360,3 +679,7 @@ class TestHandleUserEvent:
             "group": "groupid",
             "session_model": sentinel.session_model,
         }
+
+    @pytest.fixture
+    def prepare_frame(self, patch):
+        return patch("h.streamer.websocket.prepare_frame")
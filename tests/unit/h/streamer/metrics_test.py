@@ -1,3 +1,4 @@
+from collections import Counter
 from unittest.mock import create_autospec
 
 import pytest
@@ -6,8 +7,10 @@ from gevent.queue import Queue
 from h_matchers import Any
 
 from h.security import Identity
-from h.streamer.metrics import websocket_metrics
+from h.streamer.filter import normalize_uri
+from h.streamer.metrics import record_timing, websocket_metrics
 from h.streamer.websocket import WebSocket
+from h.util.cache import TTLCache
 
 
 class TestWebsocketMetrics:
@@ -34,6 +37,22 @@ class TestWebsocketMetrics:
             [("Custom/WebSocket/WorkQueueSize", size)]
         )
 
+    def test_it_records_worker_queue_metrics(self, queue):
+        worker_queues = [
+            create_autospec(Queue, instance=True, spec_set=True) for _ in range(2)
+        ]
+        for size, worker_queue in enumerate(worker_queues, 3):
+            worker_queue.qsize.return_value = size
+
+        metrics = websocket_metrics(queue, worker_queues)
+
+        assert list(metrics) == Any.list.containing(
+            [
+                ("Custom/WebSocket/WorkerQueueSize/0", 3),
+                ("Custom/WebSocket/WorkerQueueSize/1", 4),
+            ]
+        )
+
     def test_it_records_alive_metric(self, generate_metrics):
         metrics = generate_metrics()
 
@@ -53,6 +72,84 @@ class TestWebsocketMetrics:
             ]
         )
 
+    def test_it_records_and_resets_counters(self, generate_metrics, COUNTERS):
+        COUNTERS["AnnotationEvent/PayloadsBuilt"] += 2
+
+        metrics = list(generate_metrics())
+
+        assert metrics == Any.list.containing(
+            [("Custom/WebSocket/AnnotationEvent/PayloadsBuilt", 2)]
+        )
+        assert not COUNTERS
+
+    def test_it_records_uri_cache_metrics(self, generate_metrics, uri_cache):
+        uri_cache.set("httpx://example.com", ())
+        uri_cache.get("httpx://example.com")
+        uri_cache.get("httpx://example.com")
+        uri_cache.get("httpx://example.org")
+        normalize_uri.cache_clear()
+        normalize_uri("http://example.com")
+        normalize_uri("http://example.com")
+
+        metrics = list(generate_metrics())
+
+        assert metrics == Any.list.containing(
+            [
+                ("Custom/WebSocket/URICache/Size", 1),
+                ("Custom/WebSocket/URICache/Hits", 2),
+                ("Custom/WebSocket/URICache/Misses", 1),
+                ("Custom/WebSocket/URICache/HitRatio", 2 / 3),
+                ("Custom/WebSocket/NormalizeURICache/Size", 1),
+                ("Custom/WebSocket/NormalizeURICache/HitRatio", 0.5),
+            ]
+        )
+        assert (uri_cache.hits, uri_cache.misses) == (0, 0)
+
+    def test_it_skips_hit_ratios_with_no_lookups(self, generate_metrics):
+        normalize_uri.cache_clear()
+
+        metrics = [name for name, _ in generate_metrics()]
+
+        assert "Custom/WebSocket/URICache/HitRatio" not in metrics
+        assert "Custom/WebSocket/NormalizeURICache/HitRatio" not in metrics
+
+    def test_it_records_and_resets_timings(self, generate_metrics, TIMINGS):
+        record_timing("WorkQueue/WaitTime", 0.2)
+        record_timing("WorkQueue/WaitTime", 0.04)
+
+        metrics = list(generate_metrics())
+
+        assert metrics == Any.list.containing(
+            [
+                (
+                    "Custom/WebSocket/WorkQueue/WaitTime",
+                    {
+                        "count": 2,
+                        "total": pytest.approx(0.24),
+                        "min": 0.04,
+                        "max": 0.2,
+                        "sum_of_squares": pytest.approx(0.0416),
+                    },
+                ),
+                ("Custom/WebSocket/WorkQueue/WaitTime/Buckets/LessThan50ms", 1),
+                ("Custom/WebSocket/WorkQueue/WaitTime/Buckets/LessThan500ms", 1),
+            ]
+        )
+        assert not TIMINGS
+
+    def test_record_timing_records_long_timings(self, COUNTERS):
+        record_timing("WorkQueue/Latency", 60)
+
+        assert COUNTERS == {"WorkQueue/Latency/Buckets/MoreThan5000ms": 1}
+
+    @pytest.fixture(autouse=True)
+    def COUNTERS(self, mocker):
+        return mocker.patch("h.streamer.metrics.COUNTERS", Counter())
+
+    @pytest.fixture(autouse=True)
+    def TIMINGS(self, mocker):
+        return mocker.patch("h.streamer.metrics.TIMINGS", {})
+
     @pytest.fixture
     def generate_metrics(self, queue):
         return lambda: websocket_metrics(queue)
@@ -71,11 +168,18 @@ class TestWebsocketMetrics:
 
     @pytest.fixture(autouse=True)
     def WebSocket(self, patch, sockets):
-        WebSocket = patch("h.streamer.metrics.WebSocket")
+        WebSocket = patch("h.streamer.metrics.websocket.WebSocket")
         WebSocket.instances = sockets
 
         return WebSocket
 
+    @pytest.fixture(autouse=True)
+    def uri_cache(self, mocker):
+        return mocker.patch(
+            "h.streamer.metrics.storage.EXPANDED_URI_CACHE",
+            TTLCache(maxsize=10, ttl=60),
+        )
+
     @pytest.fixture
     def server_instance(self, patch):
         WSGIServer = patch("h.streamer.metrics.WSGIServer")
@@ -1,9 +1,26 @@
 from unittest import mock
 
 import pytest
+from gevent.queue import Empty, Queue
 
 from h.streamer import messages, streamer, websocket
-from h.streamer.streamer import TOPIC_HANDLERS, UnknownMessageType
+from h.streamer.streamer import ANNOTATION_TOPIC, TOPIC_HANDLERS, UnknownMessageType
+
+
+class FakeQueue:
+    """A queue which stops iterating when it's empty, instead of blocking."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __iter__(self):
+        while self.items:
+            yield self.items.pop(0)
+
+    def get_nowait(self):
+        if not self.items:
+            raise Empty
+        return self.items.pop(0)
 
 
 class TestProcessWorkQueue:
@@ -45,13 +62,61 @@ class TestProcessWorkQueue:
         assert context_manager.__enter__.call_count == len(messages)
         assert context_manager.__exit__.call_count == len(messages)
 
+    def test_it_handles_waiting_annotation_events_together(
+        self, process_work_queue, message, annotation_message, registry, session, db
+    ):
+        queue = FakeQueue([annotation_message, annotation_message, message])
+
+        process_work_queue(queue=queue, batch_size=10)
+
+        messages.handle_annotation_events.assert_called_once_with(
+            [annotation_message, annotation_message], registry, session
+        )
+        messages.handle_message.assert_called_once_with(
+            message, registry, session, topic_handlers=TOPIC_HANDLERS
+        )
+        assert db.read_only_transaction.return_value.__enter__.call_count == 2
+
+    def test_it_limits_the_batch_size(
+        self, process_work_queue, annotation_message, registry, session
+    ):
+        queue = FakeQueue([annotation_message] * 3)
+
+        process_work_queue(queue=queue, batch_size=2)
+
+        assert messages.handle_annotation_events.call_args_list == [
+            mock.call([annotation_message] * 2, registry, session),
+        ]
+        messages.handle_message.assert_called_once_with(
+            annotation_message, registry, session, topic_handlers=TOPIC_HANDLERS
+        )
+
+    def test_it_records_timings(self, process_work_queue, message, record_timing):
+        process_work_queue(queue=[message._replace(enqueued_at=0)])
+
+        assert record_timing.call_args_list == [
+            mock.call("WorkQueue/WaitTime", mock.ANY),
+            mock.call("WorkQueue/Latency", mock.ANY),
+        ]
+
+    def test_it_does_not_record_timings_without_enqueue_time(
+        self, process_work_queue, message, record_timing
+    ):
+        process_work_queue(queue=[message])
+
+        record_timing.assert_not_called()
+
     @pytest.fixture
     def process_work_queue(self, registry, message):
-        def process_work_queue(queue=None):
-            return streamer.process_work_queue(registry, queue or [message])
+        def process_work_queue(queue=None, batch_size=1):
+            return streamer.process_work_queue(registry, queue or [message], batch_size)
 
         return process_work_queue
 
+    @pytest.fixture
+    def annotation_message(self):
+        return messages.Message(topic=ANNOTATION_TOPIC, payload={"annotation_id": "id"})
+
     @pytest.fixture
     def message(self):
         return messages.Message(topic="foo", payload="bar")
@@ -81,3 +146,54 @@ class TestProcessWorkQueue:
     @pytest.fixture(autouse=True)
     def messages_handle_message(self, patch):
         return patch("h.streamer.messages.handle_message")
+
+    @pytest.fixture(autouse=True)
+    def messages_handle_annotation_events(self, patch):
+        return patch("h.streamer.messages.handle_annotation_events")
+
+    @pytest.fixture(autouse=True)
+    def record_timing(self, patch):
+        return patch("h.streamer.streamer.record_timing")
+
+
+class TestDispatchWorkQueue:
+    def test_it_sends_messages_from_one_socket_to_one_worker(self, worker_queues):
+        socket = mock.sentinel.socket
+        queue = [websocket.Message(socket=socket, payload=n) for n in range(10)]
+
+        streamer.dispatch_work_queue(queue, worker_queues)
+
+        assert [q.qsize() for q in worker_queues].count(0) == len(worker_queues) - 1
+        worker_queue = next(q for q in worker_queues if q.qsize())
+        assert [worker_queue.get_nowait() for _ in range(10)] == queue
+
+    @pytest.mark.parametrize(
+        "payload", ({"annotation_id": "annotation_id"}, {"userid": "userid"})
+    )
+    def test_it_sends_messages_about_one_thing_to_one_worker(
+        self, worker_queues, payload
+    ):
+        queue = [messages.Message(topic="topic", payload=payload)] * 10
+
+        streamer.dispatch_work_queue(queue, worker_queues)
+
+        assert sorted(q.qsize() for q in worker_queues) == [0, 0, 0, 10]
+
+    def test_it_shares_messages_between_workers(self, worker_queues):
+        queue = [
+            messages.Message(topic="topic", payload={"annotation_id": n})
+            for n in range(100)
+        ]
+
+        streamer.dispatch_work_queue(queue, worker_queues)
+
+        assert all(q.qsize() for q in worker_queues)
+
+    def test_it_dispatches_unknown_messages(self, worker_queues):
+        streamer.dispatch_work_queue(["not a message"], worker_queues)
+
+        assert sum(q.qsize() for q in worker_queues) == 1
+
+    @pytest.fixture
+    def worker_queues(self):
+        return [Queue() for _ in range(4)]
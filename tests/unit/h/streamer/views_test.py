@@ -28,6 +28,33 @@ class TestWebsocketView:
         views.websocket_view(pyramid_request)
         assert pyramid_request.environ["h.ws.debug"] is True
 
+    @pytest.mark.parametrize(
+        "high_water_mark,evict_after", ((10, 5.0), ("10", "5.0"), ("10", "5"))
+    )
+    def test_it_adds_outbox_settings_to_environ(
+        self, pyramid_request, high_water_mark, evict_after
+    ):
+        pyramid_request.registry.settings.update(
+            {
+                "h.streamer.outbox_high_water_mark": high_water_mark,
+                "h.streamer.outbox_evict_after": evict_after,
+            }
+        )
+
+        views.websocket_view(pyramid_request)
+
+        high_water_mark = pyramid_request.environ["h.ws.outbox_high_water_mark"]
+        evict_after = pyramid_request.environ["h.ws.outbox_evict_after"]
+        assert high_water_mark == 10
+        assert isinstance(high_water_mark, int)
+        assert evict_after == 5.0
+        assert isinstance(evict_after, float)
+
+    def test_it_leaves_outbox_defaults_if_not_configured(self, pyramid_request):
+        views.websocket_view(pyramid_request)
+
+        assert "h.ws.outbox_high_water_mark" not in pyramid_request.environ
+
     @pytest.fixture
     def pyramid_request(self, pyramid_request):
         pyramid_request.get_response = lambda _: None
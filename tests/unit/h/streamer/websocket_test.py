@@ -1,5 +1,5 @@
 import json
-from collections import namedtuple
+from collections import Counter, namedtuple
 from unittest import mock
 
 import pytest
@@ -13,6 +13,12 @@ from h.streamer import websocket
 FakeMessage = namedtuple("FakeMessage", ["data"])  # noqa: PYI024
 
 
+def flush(client):
+    """Wait for everything queued for `client` to be written."""
+    if client._outbox_writer:  # noqa: SLF001
+        client._outbox_writer.join()  # noqa: SLF001
+
+
 class TestMessage:
     def test_reply_adds_reply_to(self, socket):
         """Adds an appropriate `reply_to` field to the sent message."""
@@ -80,6 +86,13 @@ class TestWebSocket:
         # A second closure (however unusual) should not raise
         client1.closed(1000)
 
+    def test_removes_filter_when_closed(self, client, patch):
+        SocketFilter = patch("h.streamer.websocket.SocketFilter")
+
+        client.closed(1000)
+
+        SocketFilter.remove_filter.assert_called_once_with(client)
+
     def test_enqueues_incoming_messages(self, client, queue):
         """Valid messages are pushed onto the queue."""
         message = FakeMessage('{"foo":"bar"}')
@@ -107,6 +120,14 @@ class TestWebSocket:
 
         assert result.payload == {"foo": "bar"}
 
+    def test_enqueued_message_has_enqueue_time(self, client, queue):
+        message = FakeMessage('{"foo":"bar"}')
+
+        client.received_message(message)
+        result = queue.get_nowait()
+
+        assert isinstance(result.enqueued_at, float)
+
     def test_invalid_incoming_message_not_queued(self, client, queue):
         """Invalid messages should not end up on the queue."""
         message = FakeMessage('{"foo":missingquotes}')
@@ -132,21 +153,129 @@ class TestWebSocket:
     def test_socket_sets_auth_data_from_environ(self, client, fake_environ):
         assert client.identity == fake_environ["h.ws.identity"]
 
-    def test_socket_send_json(self, client, fake_socket_send):
-        payload = {"foo": "bar"}
-
-        client.send_json(payload)
+    def test_socket_send_json(self, client):
+        client.send_json({"foo": "bar"})
+        flush(client)
 
-        fake_socket_send.assert_called_once_with(client, '{"foo": "bar"}')
+        client.sock.sendall.assert_called_once_with(b'\x81\x0e{"foo": "bar"}')
 
     def test_socket_send_json_skips_when_terminated(
-        self, client, fake_socket_send, fake_socket_terminated
+        self, client, fake_socket_terminated
     ):
         fake_socket_terminated.return_value = True
 
         client.send_json({"foo": "bar"})
+        flush(client)
+
+        client.sock.sendall.assert_not_called()
+
+    def test_socket_send_frame(self, client):
+        client.send_frame(b"frame")
+        flush(client)
+
+        client.sock.sendall.assert_called_once_with(b"frame")
+
+    def test_socket_send_frame_skips_when_terminated(
+        self, client, fake_socket_terminated
+    ):
+        fake_socket_terminated.return_value = True
+
+        client.send_frame(b"frame")
+        flush(client)
+
+        client.sock.sendall.assert_not_called()
+
+    def test_socket_send_frame_sends_frames_in_order(self, client):
+        client.send_frame(b"frame_1")
+        client.send_frame(b"frame_2")
+        flush(client)
+
+        assert client.sock.sendall.call_args_list == [
+            mock.call(b"frame_1"),
+            mock.call(b"frame_2"),
+        ]
+
+    def test_socket_send_frame_coalesces_frames_waiting_to_be_sent(
+        self, client, counters
+    ):
+        client.send_frame(b"frame_1", coalesce_key="id_1")
+        client.send_frame(b"frame_2", coalesce_key="id_2")
+        client.send_frame(b"frame_3", coalesce_key="id_1")
+        flush(client)
+
+        assert client.sock.sendall.call_args_list == [
+            mock.call(b"frame_3"),
+            mock.call(b"frame_2"),
+        ]
+        assert counters["Outbox/CoalescedFrames"] == 1
 
-        assert not fake_socket_send.called
+    def test_socket_send_frame_doesnt_coalesce_frames_already_sent(self, client):
+        client.send_frame(b"frame_1", coalesce_key="id_1")
+        flush(client)
+        client.send_frame(b"frame_2", coalesce_key="id_1")
+        flush(client)
+
+        assert client.sock.sendall.call_args_list == [
+            mock.call(b"frame_1"),
+            mock.call(b"frame_2"),
+        ]
+
+    def test_socket_send_frame_drops_droppable_frames_for_slow_clients(
+        self, slow_client, counters
+    ):
+        slow_client.send_frame(b"frame_1", droppable=True)
+        slow_client.send_frame(b"frame_2", droppable=True)
+        slow_client.send_frame(b"frame_3", droppable=True)
+        slow_client.send_frame(b"frame_4")
+        flush(slow_client)
+
+        assert slow_client.sock.sendall.call_args_list == [
+            mock.call(b"frame_1"),
+            mock.call(b"frame_2"),
+            mock.call(b"frame_4"),
+        ]
+        assert counters["Outbox/DroppedFrames"] == 1
+
+    def test_socket_send_frame_evicts_clients_which_stay_slow(
+        self, slow_client, counters, monotonic, fake_socket_close_connection
+    ):
+        monotonic.return_value = 0
+        for frame in (b"frame_1", b"frame_2", b"frame_3"):
+            slow_client.send_frame(frame)
+
+        monotonic.return_value = 11
+        slow_client.send_frame(b"frame_4")
+        flush(slow_client)
+
+        assert counters["Outbox/EvictedSockets"] == 1
+        assert slow_client.server_terminated
+        fake_socket_close_connection.assert_called_once_with(slow_client)
+        slow_client.sock.sendall.assert_not_called()
+
+    def test_socket_send_frame_doesnt_evict_clients_which_catch_up(
+        self, slow_client, counters, monotonic
+    ):
+        monotonic.return_value = 0
+        for frame in (b"frame_1", b"frame_2", b"frame_3"):
+            slow_client.send_frame(frame)
+        flush(slow_client)
+
+        monotonic.return_value = 11
+        for frame in (b"frame_4", b"frame_5", b"frame_6"):
+            slow_client.send_frame(frame)
+        flush(slow_client)
+
+        assert not counters["Outbox/EvictedSockets"]
+        assert slow_client.sock.sendall.call_count == 6
+
+    def test_socket_send_frame_gives_up_if_the_connection_fails(self, client):
+        client.sock.sendall.side_effect = OSError
+        client.send_frame(b"frame_1")
+        client.send_frame(b"frame_2")
+        flush(client)
+
+        client.sock.sendall.assert_called_once_with(b"frame_1")
+        assert not client._outbox  # noqa: SLF001
 
     def test_debug_mode(self, fake_environ, log):
         sock = mock.Mock(spec_set=["sendall"])
@@ -158,9 +287,11 @@ class TestWebSocket:
 
         client.received_message(message)
         client.send_json({"type": "whoyouare", "ok": True, "reply_to": 1})
+        client.send_frame(b"frame")
+        flush(client)
         client.closed(code=1006, reason="Client went away")
 
-        assert len(log.info.mock_calls) == 3
+        assert len(log.info.mock_calls) == 4
 
     @pytest.fixture(autouse=True)
     def with_no_socket_instances(self):
@@ -173,10 +304,25 @@ class TestWebSocket:
         sock = mock.Mock(spec_set=["sendall"])
         return websocket.WebSocket(sock, environ=fake_environ)
 
+    @pytest.fixture
+    def slow_client(self, fake_environ):
+        fake_environ["h.ws.outbox_high_water_mark"] = 2
+        fake_environ["h.ws.outbox_evict_after"] = 10
+        sock = mock.Mock(spec_set=["sendall"])
+        return websocket.WebSocket(sock, environ=fake_environ)
+
     @pytest.fixture
     def queue(self):
         return Queue()
 
+    @pytest.fixture
+    def counters(self, mocker):
+        return mocker.patch("h.streamer.websocket.metrics.COUNTERS", Counter())
+
+    @pytest.fixture
+    def monotonic(self, patch):
+        return patch("h.streamer.websocket.time").monotonic
+
     @pytest.fixture
     def fake_environ(self, queue):
         return {
@@ -191,14 +337,26 @@ class TestWebSocket:
         return patch("h.streamer.websocket.WebSocket.close")
 
     @pytest.fixture
-    def fake_socket_send(self, patch):
-        return patch("h.streamer.websocket.WebSocket.send")
+    def fake_socket_close_connection(self, patch):
+        return patch("h.streamer.websocket.WebSocket.close_connection")
 
     @pytest.fixture
     def fake_socket_terminated(self, patch):
         return patch("h.streamer.websocket.WebSocket.terminated")
 
 
+class TestPrepareFrame:
+    @pytest.mark.parametrize(
+        "fast_json,expected",
+        (
+            (False, b'\x81\x0e{"foo": "bar"}'),
+            (True, b'\x81\x0d{"foo":"bar"}'),
+        ),
+    )
+    def test_it(self, fast_json, expected):
+        assert websocket.prepare_frame({"foo": "bar"}, fast_json=fast_json) == expected
+
+
 @pytest.mark.usefixtures("handlers")
 class TestHandleMessage:
     def test_uses_unknown_handler_for_missing_type(self, socket, unknown_handler):
@@ -2,6 +2,7 @@ import pytest
 
 from h.tasks.annotations import (
     publish_annotation_event_for_authority,
+    reconcile_public_annotation_counts,
     sync_annotation_slim,
 )
 
@@ -62,6 +63,28 @@ class TestPublishAnnotationEventForAuthority:
         )
 
 
+class TestReconcilePublicAnnotationCounts:
+    def test_it(self, public_annotation_count_service, newrelic):
+        public_annotation_count_service.reconcile.return_value = {
+            "Corrected": 2,
+            "Removed": 3,
+        }
+
+        reconcile_public_annotation_counts()
+
+        public_annotation_count_service.reconcile.assert_called_once_with()
+        newrelic.agent.record_custom_metrics.assert_called_once_with(
+            [
+                ("Custom/PublicAnnotationCount/Corrected", 2),
+                ("Custom/PublicAnnotationCount/Removed", 3),
+            ]
+        )
+
+    @pytest.fixture
+    def newrelic(self, patch):
+        return patch("h.tasks.annotations.newrelic")
+
+
 @pytest.fixture(autouse=True)
 def celery(patch, pyramid_request):
     cel = patch("h.tasks.annotations.celery", autospec=False)
@@ -30,9 +30,11 @@ class TestSearchIndexServicesWrapperTasks:
 
 class TestSyncAnnotations:
     def test_it(self, newrelic, log, annotation_sync_service):
-        indexer.sync_annotations("test_queue")
+        indexer.sync_annotations("test_queue", partition=1, partitions=4)
 
-        annotation_sync_service.sync.assert_called_once_with("test_queue")
+        annotation_sync_service.sync.assert_called_once_with(
+            "test_queue", partition=1, partitions=4
+        )
         log.info.assert_called_once_with(annotation_sync_service.sync.return_value)
         newrelic.agent.record_custom_metrics.assert_called_once_with(
             [
@@ -51,6 +53,31 @@ class TestSyncAnnotations:
         return annotation_sync_service
 
 
+class TestSyncAnnotationsFromWatermark:
+    def test_it(self, newrelic, log, annotation_sync_service):
+        annotation_sync_service.sync_from_watermark.return_value = {
+            "Watermark/Synced": 2,
+            "Watermark/LagSeconds": 60.0,
+        }
+
+        indexer.sync_annotations_from_watermark(100)
+
+        annotation_sync_service.sync_from_watermark.assert_called_once_with(100)
+        log.info.assert_called_once_with(
+            annotation_sync_service.sync_from_watermark.return_value
+        )
+        newrelic.agent.record_custom_metrics.assert_called_once_with(
+            [
+                ("Custom/SyncAnnotations/Watermark/Synced", 2),
+                ("Custom/SyncAnnotations/Watermark/LagSeconds", 60.0),
+            ]
+        )
+
+    @pytest.fixture
+    def log(self, patch):
+        return patch("h.tasks.indexer.log")
+
+
 class TestReportJobQueueMetrics:
     def test_it(self, job_queue_metrics, newrelic):
         indexer.report_job_queue_metrics()
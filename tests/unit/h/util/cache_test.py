@@ -0,0 +1,80 @@
+from unittest.mock import Mock
+
+import pytest
+
+from h.util.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_returns_cached_values(self, cache):
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_get_returns_the_default_for_missing_keys(self, cache):
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_entries_expire(self, cache, timer):
+        cache.set("key", "value")
+
+        timer.return_value = 9.9
+        assert cache.get("key") == "value"
+        timer.return_value = 10
+        assert cache.get("key") is None
+        assert not len(cache)
+
+    def test_set_replaces_expired_entries(self, cache, timer):
+        cache.set("key", "old_value")
+        timer.return_value = 10
+
+        cache.set("key", "new_value")
+
+        assert cache.get("key") == "new_value"
+
+    def test_it_evicts_the_least_recently_used_entries(self, cache):
+        cache.set("key_1", "value_1")
+        cache.set("key_2", "value_2")
+        cache.get("key_1")
+
+        cache.set("key_3", "value_3")
+
+        assert cache.get("key_1") == "value_1"
+        assert cache.get("key_2") is None
+        assert cache.get("key_3") == "value_3"
+        assert len(cache) == 2
+
+    def test_invalidate(self, cache):
+        cache.set("key_1", "value_1")
+        cache.set("key_2", "value_2")
+
+        cache.invalidate(["key_1", "missing_key"])
+
+        assert cache.get("key_1") is None
+        assert cache.get("key_2") == "value_2"
+
+    def test_clear(self, cache):
+        cache.set("key", "value")
+
+        cache.clear()
+
+        assert not len(cache)
+
+    def test_reset_counts(self, cache):
+        cache.get("key")
+        cache.set("key", "value")
+        cache.get("key")
+
+        cache.reset_counts()
+
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    @pytest.fixture
+    def timer(self):
+        return Mock(return_value=0)
+
+    @pytest.fixture
+    def cache(self, timer):
+        return TTLCache(maxsize=2, ttl=10, timer=timer)
@@ -1,6 +1,6 @@
 import pytest
 
-from h.viewderivers import csp_protected_view
+from h.viewderivers import csp_protected_view, read_only_view
 
 
 class TestCSPProtectedView:
@@ -111,6 +111,35 @@ class TestCSPProtectedView:
         return _impl
 
 
+class TestReadOnlyView:
+    def test_it_marks_requests_as_read_only(self, pyramid_request, derive_view):
+        view = derive_view(_dummy_view, read_only=True)
+
+        view(None, pyramid_request)
+
+        assert pyramid_request.read_only
+
+    def test_requests_arent_read_only_by_default(self, pyramid_request, derive_view):
+        view = derive_view(_dummy_view)
+
+        view(None, pyramid_request)
+
+        assert not pyramid_request.read_only
+
+    @pytest.fixture
+    def derive_view(self, pyramid_config):
+        def _impl(view, **kwargs):
+            pyramid_config.add_view_deriver(read_only_view)
+            pyramid_config.add_route("testview", "/test")
+            pyramid_config.add_view(view, route_name="testview", **kwargs)
+            introspector = pyramid_config.registry.introspector
+
+            view_ = introspector.get_category("views")[0]
+            return view_["introspectable"]["derived_callable"]
+
+        return _impl
+
+
 def _dummy_view(request):
     return request.response
 
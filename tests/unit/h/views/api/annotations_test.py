@@ -4,7 +4,9 @@ import pytest
 from pyramid.httpexceptions import HTTPNotFound
 from webob.multidict import MultiDict, NestedMultiDict
 
+from h.schemas import ValidationError
 from h.search.core import SearchResult
+from h.search.query import ExpiredCursorError
 from h.traversal import AnnotationContext
 from h.views.api import annotations as views
 from h.views.api.exceptions import PayloadError
@@ -55,7 +57,9 @@ class TestSearch:
         views.search(pyramid_request)
 
         annotation_json_service.present_all_for_user.assert_called_with(
-            annotation_ids=["reply-1", "reply-2"], user=pyramid_request.user
+            annotation_ids=["reply-1", "reply-2"],
+            user=pyramid_request.user,
+            chunk_size=200,
         )
 
     def test_it_returns_replies(
@@ -72,10 +76,114 @@ class TestSearch:
             "replies": annotation_json_service.present_all_for_user(
                 annotation_ids=["reply-1", "reply-2"], user=pyramid_request.user
             ),
+            "replies_truncated": False,
         }
 
         assert views.search(pyramid_request) == expected
 
+    def test_it_says_when_replies_were_truncated(self, pyramid_request, search_run):
+        pyramid_request.params = NestedMultiDict(MultiDict({"_separate_replies": "1"}))
+        search_run.return_value = SearchResult(
+            1, ["row-1"], ["reply-1"], {}, replies_truncated=True
+        )
+
+        assert views.search(pyramid_request)["replies_truncated"]
+
+    def test_it_returns_the_next_cursor(
+        self, pyramid_request, search_run, annotation_json_service
+    ):
+        pyramid_request.params = NestedMultiDict(MultiDict({"cursor": ""}))
+        search_run.return_value = SearchResult(
+            1, ["row-1"], [], {}, next_cursor="next_cursor"
+        )
+
+        assert views.search(pyramid_request) == {
+            "total": 1,
+            "rows": annotation_json_service.present_all_for_user.return_value,
+            "next_cursor": "next_cursor",
+        }
+
+    def test_it_raises_if_the_cursor_has_expired(
+        self, pyramid_request, search_lib, search_run
+    ):
+        search_lib.ExpiredCursorError = ExpiredCursorError
+        pyramid_request.params = NestedMultiDict(MultiDict({"cursor": ""}))
+        search_run.side_effect = ExpiredCursorError
+
+        with pytest.raises(ValidationError, match="cursor has expired"):
+            views.search(pyramid_request)
+
+    @pytest.mark.parametrize("key", ["uri", "url"])
+    def test_it_returns_public_counts(
+        self, pyramid_request, search_run, public_annotation_count_service, key
+    ):
+        pyramid_request.params = NestedMultiDict(
+            MultiDict({key: "http://example.com", "limit": "0"})
+        )
+
+        result = views.search(pyramid_request)
+
+        public_annotation_count_service.count.assert_called_once_with(
+            "http://example.com"
+        )
+        search_run.assert_not_called()
+        assert result == {
+            "total": public_annotation_count_service.count.return_value,
+            "rows": [],
+        }
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            # Not just a count
+            {"uri": "http://example.com"},
+            # Not for a single URI
+            {"limit": "0"},
+            {"uri": "http://example.com", "url": "http://example.org", "limit": "0"},
+            # Counts of only some of the annotations
+            {"uri": "http://example.com", "limit": "0", "user": "acct:a@example.com"},
+            {"uri": "http://example.com", "limit": "0", "_separate_replies": "1"},
+        ],
+    )
+    def test_it_searches_if_it_cant_use_public_counts(
+        self, pyramid_request, search_run, public_annotation_count_service, params
+    ):
+        pyramid_request.params = NestedMultiDict(MultiDict(params))
+
+        views.search(pyramid_request)
+
+        public_annotation_count_service.count.assert_not_called()
+        search_run.assert_called_once()
+
+    def test_it_searches_if_the_uri_cant_be_counted(
+        self, pyramid_request, search_run, public_annotation_count_service
+    ):
+        pyramid_request.params = NestedMultiDict(
+            MultiDict({"uri": "http://example.com__v2", "limit": "0"})
+        )
+        public_annotation_count_service.count.return_value = None
+
+        views.search(pyramid_request)
+
+        search_run.assert_called_once()
+
+    def test_it_searches_for_logged_in_users(
+        self,
+        pyramid_request,
+        pyramid_config,
+        search_run,
+        public_annotation_count_service,
+    ):
+        pyramid_config.testing_securitypolicy("acct:user@example.com")
+        pyramid_request.params = NestedMultiDict(
+            MultiDict({"uri": "http://example.com", "limit": "0"})
+        )
+
+        views.search(pyramid_request)
+
+        public_annotation_count_service.count.assert_not_called()
+        search_run.assert_called_once()
+
     @pytest.fixture
     def search_lib(self, patch):
         return patch("h.views.api.annotations.search_lib")
@@ -3,7 +3,11 @@ import json
 import pytest
 from pyramid.response import Response
 
-from h.views.api.bulk._ndjson import get_ndjson_response
+from h.views.api.bulk._ndjson import (
+    CHUNK_SIZE,
+    get_json_array_response,
+    get_ndjson_response,
+)
 
 
 class TestGetNDJSONResponse:
@@ -25,11 +29,6 @@ class TestGetNDJSONResponse:
 
         assert not result.body.decode("utf-8")
 
-    def test_it_returns_204_if_no_content_is_to_be_returned(self):
-        result = get_ndjson_response(None)
-
-        assert result.status == "204 No Content"
-
     def test_it_captures_initial_errors(self):
         def failing_method(fail=True):  # noqa: FBT002
             if fail:
@@ -39,3 +38,57 @@ class TestGetNDJSONResponse:
 
         with pytest.raises(ValueError):  # noqa: PT011
             get_ndjson_response(failing_method())
+
+    def test_it_writes_lines_in_chunks(self):
+        return_values = [{"id": "x" * 1000} for _ in range(200)]
+
+        result = get_ndjson_response(return_values)
+
+        chunks = list(result.app_iter)
+        assert len(chunks) == 4
+        assert all(len(chunk) >= CHUNK_SIZE for chunk in chunks[:-1])
+        assert b"".join(chunks).count(b"\n") == 200
+
+    def test_it_closes_the_results_if_the_client_goes_away(self):
+        closed = []
+
+        def results():
+            try:
+                while True:
+                    yield {"id": "x" * 1000}
+            finally:
+                closed.append(True)
+
+        result = get_ndjson_response(results())
+
+        next(result.app_iter)
+        result.app_iter.close()
+
+        assert closed
+
+    def test_it_returns_204_if_no_content_is_to_be_returned(self):
+        result = get_ndjson_response(None)
+
+        assert result.status == "204 No Content"
+
+
+class TestGetJSONArrayResponse:
+    @pytest.mark.parametrize("count", (0, 1, 3, 200))
+    def test_it_formats_responses_correctly(self, count):
+        return_values = [{"id": id_, "padding": "x" * 1000} for id_ in range(count)]
+
+        result = get_json_array_response(
+            iter(return_values), content_type="application/x-ndjson"
+        )
+
+        assert result.status == "200 OK"
+        assert result.content_type == "application/x-ndjson"
+        assert result.json == return_values
+
+    def test_it_captures_initial_errors(self):
+        def failing_method():
+            raise ValueError("Oh no!")  # noqa: EM101, TRY003
+            yield 1  # pragma: nocover
+
+        with pytest.raises(ValueError):  # noqa: PT011
+            get_json_array_response(failing_method(), content_type="application/json")
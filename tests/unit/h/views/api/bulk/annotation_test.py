@@ -1,10 +1,13 @@
 import pytest
-from h_matchers import Any
 
 from h.schemas import ValidationError
 from h.services.bulk_api.annotation import BulkAnnotation
 from h.services.bulk_api.exceptions import BadDateFilter
-from h.views.api.bulk.annotation import BulkAnnotationSchema, bulk_annotation
+from h.views.api.bulk.annotation import (
+    BulkAnnotationSchema,
+    _present_annotation,
+    bulk_annotation,
+)
 
 
 class TestBulkAnnotationSchema:
@@ -48,7 +51,15 @@ class TestBulkAnnotation:
             created=valid_request["filter"]["created"],
         )
 
-        return_data = [
+        get_ndjson_response.assert_called_once_with(
+            bulk_annotation_service.annotation_search.return_value,
+            fast_json=False,
+            present=_present_annotation,
+        )
+        assert [
+            _present_annotation(annotation)
+            for annotation in bulk_annotation_service.annotation_search.return_value
+        ] == [
             {
                 "author": {"username": f"USERNAME_{i}"},
                 "group": {"authority_provided_id": f"AUTHORITY_PROVIDED_ID_{i}"},
@@ -56,9 +67,6 @@ class TestBulkAnnotation:
             }
             for i in range(3)
         ]
-        get_ndjson_response.assert_called_once_with(
-            Any.iterable.containing(return_data).only()
-        )
 
         assert response == get_ndjson_response.return_value
 
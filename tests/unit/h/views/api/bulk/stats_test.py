@@ -58,6 +58,35 @@ class TestBulkGroup:
         assert response.status_code == 200
         assert response.content_type == "application/x-ndjson"
 
+    @pytest.mark.usefixtures("assignment_request")
+    def test_get_annotation_counts_with_fast_json(
+        self, pyramid_request, bulk_stats_service
+    ):
+        pyramid_request.registry.settings["h.fast_json"] = True
+        bulk_stats_service.get_annotation_counts.return_value = [
+            AnnotationCounts(
+                userid="acct:user@authority",
+                annotations=1,
+                replies=2,
+                page_notes=3,
+                last_activity=datetime(2024, 1, 1),  # noqa: DTZ001
+            )
+        ]
+
+        response = get_annotation_counts(pyramid_request)
+
+        assert response.json == [
+            {
+                "assignment_id": None,
+                "userid": "acct:user@authority",
+                "display_name": None,
+                "annotations": 1,
+                "replies": 2,
+                "page_notes": 3,
+                "last_activity": "2024-01-01T00:00:00",
+            }
+        ]
+
     @pytest.fixture
     def assignment_request(self, pyramid_request):
         pyramid_request.json = {
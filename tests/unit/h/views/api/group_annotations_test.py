@@ -1,14 +1,22 @@
+from datetime import datetime
 from operator import attrgetter
 from unittest.mock import call, create_autospec, sentinel
 
 import pytest
 from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 
+from h.db.types import URLSafeUUID
 from h.models import Annotation, ModerationStatus
 from h.schemas import ValidationError
 from h.schemas.pagination import CursorPagination as CursorPagination_
 from h.traversal import GroupContext
-from h.views.api.group_annotations import list_annotations
+from h.util.datetime import utc_iso8601
+from h.views.api.group_annotations import (
+    TOTAL_CACHE_KEY,
+    list_annotations,
+    total_cache,
+)
 
 pytestmark = pytest.mark.usefixtures("annotation_json_service")
 
@@ -41,17 +49,18 @@ class TestListAnnotations:
         sorted_annotations = sorted(
             annotations, key=attrgetter("created"), reverse=True
         )
-        assert annotation_json_service.present.call_args_list == [
-            call(annotation, pyramid_request.user) for annotation in sorted_annotations
-        ]
+        annotation_json_service.present_all_for_user.assert_called_once_with(
+            [annotation.id for annotation in sorted_annotations], pyramid_request.user
+        )
         assert response == {
             "data": [
                 # It returns the JSON presentation (the result of calling
-                # AnnotationJSONService.present()) of each annotation.
+                # AnnotationJSONService.present_all_for_user()) of each
+                # annotation.
                 getattr(sentinel, f"annotation_json_{annotation.id}")
                 for annotation in sorted_annotations
             ],
-            "meta": {"page": {"total": len(annotations)}},
+            "meta": {"page": {"total": len(annotations), "next": None}},
         }
 
     def test_page_size(self, factories, context, pyramid_request, CursorPagination):
@@ -69,7 +78,16 @@ class TestListAnnotations:
                 getattr(sentinel, f"annotation_json_{annotation.id}")
                 for annotation in annotations[:2]
             ],
-            "meta": {"page": {"total": len(annotations)}},
+            "meta": {
+                "page": {
+                    "total": len(annotations),
+                    # The params to get the page after this one
+                    "next": {
+                        "after": utc_iso8601(annotations[1].created),
+                        "after_id": annotations[1].id,
+                    },
+                }
+            },
         }
 
     def test_cursor(self, factories, context, pyramid_request, CursorPagination):
@@ -88,13 +106,87 @@ class TestListAnnotations:
                 getattr(sentinel, f"annotation_json_{annotation.id}")
                 for annotation in annotations[2:4]
             ],
-            "meta": {"page": {"total": len(annotations)}},
+            "meta": {
+                "page": {
+                    "total": len(annotations),
+                    "next": {
+                        "after": utc_iso8601(annotations[3].created),
+                        "after_id": annotations[3].id,
+                    },
+                }
+            },
         }
 
+    def test_cursor_with_an_id(
+        self, factories, context, pyramid_request, CursorPagination
+    ):
+        created = datetime(2025, 1, 1)  # noqa: DTZ001
+        annotations = sorted(
+            factories.Annotation.create_batch(size=5, created=created),
+            # The order of the ids in the DB
+            key=lambda annotation: URLSafeUUID.url_safe_to_hex(annotation.id),
+            reverse=True,
+        )
+        CursorPagination.from_params.return_value.size = 2
+        CursorPagination.from_params.return_value.after = created
+        CursorPagination.from_params.return_value.after_id = annotations[1].id
+
+        response = list_annotations(context, pyramid_request)
+
+        # Annotations created at the same time are told apart by their ids
+        assert response["data"] == [
+            getattr(sentinel, f"annotation_json_{annotation.id}")
+            for annotation in annotations[2:4]
+        ]
+
+    def test_it_caches_the_totals_of_big_groups(
+        self, factories, context, pyramid_request, AnnotationReadService
+    ):
+        pyramid_request.registry.settings["h.group_annotations.cache_totals_above"] = 3
+        factories.Annotation.create_batch(size=3)
+
+        first_response = list_annotations(context, pyramid_request)
+        factories.Annotation()
+        second_response = list_annotations(context, pyramid_request)
+
+        assert AnnotationReadService.count_query.call_args_list == [
+            call(AnnotationReadService.annotation_search_query.return_value, limit=3),
+            call(AnnotationReadService.annotation_search_query.return_value),
+        ]
+        assert first_response["meta"] == second_response["meta"]
+
+    def test_it_counts_small_groups_every_time(
+        self, factories, context, pyramid_request
+    ):
+        factories.Annotation.create_batch(size=2)
+
+        list_annotations(context, pyramid_request)
+        factories.Annotation()
+        response = list_annotations(context, pyramid_request)
+
+        assert response["meta"]["page"]["total"] == 3
+
+    def test_it_reads_from_the_session_it_presents_from(
+        self, factories, context, pyramid_request, db_session
+    ):
+        annotation = factories.Annotation()
+        # AnnotationJSONService reads the annotations from `db_reader`, which
+        # can be a replica, so the page must be read from there too
+        pyramid_request.db = create_autospec(Session, instance=True, spec_set=True)
+        pyramid_request.db_reader = db_session
+
+        response = list_annotations(context, pyramid_request)
+
+        pyramid_request.db.execute.assert_not_called()
+        assert response["data"] == [
+            getattr(sentinel, f"annotation_json_{annotation.id}")
+        ]
+        assert response["meta"]["page"]["total"] == 1
+
     def test_it_with_no_annotations(self, context, pyramid_request):
         response = list_annotations(context, pyramid_request)
 
-        assert response == {"data": [], "meta": {"page": {"total": 0}}}
+        assert response == {"data": [], "meta": {"page": {"total": 0, "next": None}}}
 
     @pytest.mark.parametrize(
         "moderation_status_query_param,expected_moderation_status_filter",
@@ -166,13 +258,36 @@ class TestListAnnotations:
 
     @pytest.fixture
     def annotation_json_service(self, annotation_json_service):
-        annotation_json_service.present.side_effect = (
-            lambda annotation, *_args, **_kwargs: getattr(
-                sentinel, f"annotation_json_{annotation.id}"
-            )
+        annotation_json_service.present_all_for_user.side_effect = (
+            lambda annotation_ids, *_args, **_kwargs: [
+                getattr(sentinel, f"annotation_json_{annotation_id}")
+                for annotation_id in annotation_ids
+            ]
         )
         return annotation_json_service
 
+    @pytest.fixture(autouse=True)
+    def clear_total_cache(self, pyramid_request):
+        pyramid_request.registry.pop(TOTAL_CACHE_KEY, None)
+        yield
+        pyramid_request.registry.pop(TOTAL_CACHE_KEY, None)
+
+
+class TestTotalCache:
+    def test_it_is_shared_by_the_process(self, pyramid_request):
+        pyramid_request.registry.settings["h.group_annotations.total_cache_ttl"] = 30
+
+        cache = total_cache(pyramid_request.registry)
+
+        assert cache.ttl == 30.0
+        assert total_cache(pyramid_request.registry) is cache
+
+    @pytest.fixture(autouse=True)
+    def clear_total_cache(self, pyramid_request):
+        pyramid_request.registry.pop(TOTAL_CACHE_KEY, None)
+        yield
+        pyramid_request.registry.pop(TOTAL_CACHE_KEY, None)
+
 
 @pytest.fixture(autouse=True)
 def FilterGroupAnnotationsSchema(mocker):
@@ -5,7 +5,8 @@ import pytest
 from pyramid import httpexceptions
 from webob.multidict import MultiDict
 
-from h.views.badge import Blocklist, badge
+from h.models import GroupMembership
+from h.views.badge import COUNT_CACHE_KEY, Blocklist, badge, count_cache
 
 
 class TestBlocklist:
@@ -93,6 +94,94 @@ class TestBadge:
         )
         assert result == {"total": search_run.return_value.total}
 
+    def test_it_caches_the_count(self, badge_request, search_run, newrelic):
+        badge_request("http://example.com", annotated=True, blocked=False)
+        search_run.reset_mock()
+
+        result = badge_request("http://example.com", annotated=False, blocked=False)
+
+        search_run.assert_not_called()
+        assert result == {"total": search_run.return_value.total}
+        newrelic.agent.record_custom_metric.assert_called_with(
+            "Custom/Badge/Cache/Hit", 1
+        )
+        newrelic.agent.add_custom_attribute.assert_called_with("badge_cache", "hit")
+
+    def test_it_caches_counts_by_normalized_uri(self, badge_request, search_run):
+        badge_request("http://example.com", annotated=True, blocked=False)
+
+        result = badge_request("http://example.com/", annotated=False, blocked=False)
+
+        search_run.assert_called_once()
+        assert result == {"total": search_run.return_value.total}
+
+    def test_it_caches_counts_per_user(
+        self, badge_request, search_run, pyramid_request, factories
+    ):
+        badge_request("http://example.com", annotated=True, blocked=False)
+        pyramid_request.user = factories.User()
+
+        badge_request("http://example.com", annotated=False, blocked=False)
+
+        assert search_run.call_count == 2
+
+    def test_it_caches_counts_per_set_of_memberships(
+        self, badge_request, search_run, pyramid_request, factories
+    ):
+        pyramid_request.user = factories.User()
+        badge_request("http://example.com", annotated=True, blocked=False)
+        factories.Group(memberships=[GroupMembership(user=pyramid_request.user)])
+        pyramid_request.db.flush()
+
+        badge_request("http://example.com", annotated=False, blocked=False)
+
+        assert search_run.call_count == 2
+
+    def test_it_records_cache_misses(self, badge_request, newrelic):
+        badge_request("http://example.com", annotated=True, blocked=False)
+
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/Badge/Cache/Miss", 1
+        )
+        newrelic.agent.add_custom_attribute.assert_called_once_with(
+            "badge_cache", "miss"
+        )
+
+    def test_it_limits_the_count(
+        self, badge_request, pyramid_request, search_lib, search_run
+    ):
+        pyramid_request.registry.settings["h.badge.count_limit"] = 1000
+
+        badge_request("http://example.com", annotated=True, blocked=False)
+
+        search_lib.TotalHitsLimit.assert_called_once_with(1000)
+        search_lib.Search.return_value.append_modifier.assert_called_once_with(
+            search_lib.TotalHitsLimit.return_value
+        )
+        search_run.assert_called_once()
+
+    def test_it_returns_the_public_count_for_anonymous_users(
+        self, badge_request, search_run, public_annotation_count_service
+    ):
+        public_annotation_count_service.count.return_value = 3
+
+        result = badge_request("http://example.com", annotated=True, blocked=False)
+
+        public_annotation_count_service.count.assert_called_once_with(
+            "http://example.com"
+        )
+        search_run.assert_not_called()
+        assert result == {"total": 3}
+
+    def test_it_doesnt_use_the_public_count_for_logged_in_users(
+        self, badge_request, pyramid_config, public_annotation_count_service
+    ):
+        pyramid_config.testing_securitypolicy("acct:user@example.com")
+
+        badge_request("http://example.com", annotated=True, blocked=False)
+
+        public_annotation_count_service.count.assert_not_called()
+
     def test_it_raises_if_no_uri(self):
         with pytest.raises(httpexceptions.HTTPBadRequest):
             badge(mock.Mock(params={}))
@@ -116,9 +205,45 @@ class TestBadge:
         return patch("h.views.badge.Blocklist")
 
     @pytest.fixture(autouse=True)
-    def search_run(self, patch):
-        search_lib = patch("h.views.badge.search")
+    def search_lib(self, patch):
+        return patch("h.views.badge.search")
 
+    @pytest.fixture(autouse=True)
+    def search_run(self, search_lib):
         search_run = search_lib.Search.return_value.run
         search_run.return_value = mock.Mock(total=29)
         return search_run
+
+    @pytest.fixture(autouse=True)
+    def public_annotation_count_service(self, public_annotation_count_service):
+        # By default the URIs can't be counted this way, so the search is used
+        public_annotation_count_service.count.return_value = None
+        return public_annotation_count_service
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.views.badge.newrelic")
+
+    @pytest.fixture(autouse=True)
+    def clear_count_cache(self, pyramid_request):
+        yield
+        pyramid_request.registry.pop(COUNT_CACHE_KEY, None)
+
+
+class TestCountCache:
+    def test_it(self, pyramid_request):
+        pyramid_request.registry.settings.update(
+            {"h.badge.cache_size": 10, "h.badge.cache_ttl": 5.0}
+        )
+
+        cache = count_cache(pyramid_request.registry)
+
+        assert cache.maxsize == 10
+        assert cache.ttl == 5.0
+        assert count_cache(pyramid_request.registry) is cache
+
+    @pytest.fixture(autouse=True)
+    def clear_count_cache(self, pyramid_request):
+        pyramid_request.registry.pop(COUNT_CACHE_KEY, None)
+        yield
+        pyramid_request.registry.pop(COUNT_CACHE_KEY, None)